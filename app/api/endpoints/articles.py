@@ -1,39 +1,130 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-
-from app.database import get_db
-from app.schemas.article import Article, ArticleCreate, ArticleUpdate
-from app.crud import article as crud_article
-
-router = APIRouter()
-
-@router.post("/articles/", response_model=Article)
-def create_article(article: ArticleCreate, db: Session = Depends(get_db)):
-    return crud_article.create_article(db=db, article=article)
-
-@router.get("/articles/", response_model=List[Article])
-def read_articles(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    articles = crud_article.get_articles(db, skip=skip, limit=limit)
-    return articles
-
-@router.get("/articles/{article_id}", response_model=Article)
-def read_article(article_id: int, db: Session = Depends(get_db)):
-    db_article = crud_article.get_article(db, article_id=article_id)
-    if db_article is None:
-        raise HTTPException(status_code=404, detail="Article not found")
-    return db_article
-
-@router.put("/articles/{article_id}", response_model=Article)
-def update_article(article_id: int, article: ArticleUpdate, db: Session = Depends(get_db)):
-    db_article = crud_article.update_article(db, article_id=article_id, article=article)
-    if db_article is None:
-        raise HTTPException(status_code=404, detail="Article not found")
-    return db_article
-
-@router.delete("/articles/{article_id}")
-def delete_article(article_id: int, db: Session = Depends(get_db)):
-    db_article = crud_article.delete_article(db, article_id=article_id)
-    if db_article is None:
-        raise HTTPException(status_code=404, detail="Article not found")
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.database import get_db, get_async_db
+from app.schemas.article import (
+    Article, ArticleCreate, ArticleListItem, ArticleUpdate, ArticleSearchResult, ClusterMember
+)
+from app.crud import article as crud_article
+from app.crud import near_duplicate as crud_near_duplicate
+from app.crud import search as crud_search
+from app.services.near_duplicate import near_duplicate_detector
+
+router = APIRouter()
+
+@router.post("/articles/", response_model=Article)
+def create_article(article: ArticleCreate, db: Session = Depends(get_db)):
+    db_article = crud_article.create_article(db=db, article=article)
+    near_duplicate_detector.assign_clusters(db, [db_article.id])
+    return db_article
+
+# Reads are async so a slow query doesn't hold a threadpool slot. Listings leave out
+# content and iocs (fields= can still ask for them); GET /articles/{id} has everything.
+@router.get("/articles/", response_model=List[ArticleListItem])
+async def read_articles(
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    source: Optional[str] = None,
+    threat_type: Optional[str] = None,
+    severity: Optional[str] = None,
+    published_after: Optional[datetime] = None,
+    published_before: Optional[datetime] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. id,title,severity"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    try:
+        articles = await crud_article.get_articles_async(
+            db,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            source=source,
+            threat_type=threat_type,
+            severity=severity,
+            published_after=published_after,
+            published_before=published_before,
+            fields=field_list
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    next_cursor = None
+    if len(articles) == limit:
+        last = articles[-1]
+        if field_list:
+            next_cursor = crud_article.encode_cursor(last["published_date"], last["id"])
+        else:
+            next_cursor = crud_article.encode_cursor(last.published_date, last.id)
+
+    if field_list:
+        # Projected rows don't fit the full Article schema, return them as-is
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        return JSONResponse(content=jsonable_encoder(articles), headers=headers)
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return articles
+
+# Declared before /articles/{article_id} so "search" isn't taken for an id
+@router.get("/articles/search", response_model=List[ArticleSearchResult])
+async def search_articles(
+    q: str = Query(..., min_length=1, description='Terms, "quoted phrases", prefix*, OR / NOT'),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    source: Optional[str] = None,
+    threat_type: Optional[str] = None,
+    severity: Optional[str] = None,
+    published_after: Optional[datetime] = None,
+    published_before: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await crud_search.search_articles_async(
+        db,
+        q,
+        skip=skip,
+        limit=limit,
+        source=source,
+        threat_type=threat_type,
+        severity=severity,
+        published_after=published_after,
+        published_before=published_before
+    )
+
+@router.get("/articles/{article_id}", response_model=Article)
+async def read_article(article_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_article = await crud_article.get_article_async(db, article_id=article_id)
+    if db_article is None:
+        raise HTTPException(status_code=404, detail="Article not found")
+    return db_article
+
+@router.get("/articles/{article_id}/duplicates", response_model=List[ClusterMember])
+def read_article_duplicates(article_id: int, limit: int = Query(100, ge=1, le=1000), db: Session = Depends(get_db)):
+    """Every article of this one's near-duplicate cluster, canonical first"""
+    db_article = crud_article.get_article(db, article_id=article_id)
+    if db_article is None:
+        raise HTTPException(status_code=404, detail="Article not found")
+    if db_article.cluster_id is None:
+        return [db_article]
+    return crud_near_duplicate.get_cluster_members(db, db_article.cluster_id, limit=limit)
+
+@router.put("/articles/{article_id}", response_model=Article)
+def update_article(article_id: int, article: ArticleUpdate, db: Session = Depends(get_db)):
+    db_article = crud_article.update_article(db, article_id=article_id, article=article)
+    if db_article is None:
+        raise HTTPException(status_code=404, detail="Article not found")
+    return db_article
+
+@router.delete("/articles/{article_id}")
+def delete_article(article_id: int, db: Session = Depends(get_db)):
+    db_article = crud_article.delete_article(db, article_id=article_id)
+    if db_article is None:
+        raise HTTPException(status_code=404, detail="Article not found")
     return {"message": "Article deleted successfully"}
\ No newline at end of file
@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.services.exporter import FORMATS, bulk_exporter
+
+router = APIRouter()
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip: listed, or covered by *, with a q-value above 0"""
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in qualities:
+            return qualities[coding] > 0
+    return False
+
+def export_response(request: Request, chunks, fmt: str, name: str) -> StreamingResponse:
+    """Stream the export, gzipped when the client accepts it"""
+    headers = {
+        "Content-Disposition": f'attachment; filename="{name}.{"json" if fmt == "stix" else fmt}"',
+        # Pass this back as `since` to get only what changed after this export started
+        "X-Export-Watermark": datetime.now(timezone.utc).isoformat(),
+        "Vary": "Accept-Encoding",
+    }
+    if accepts_gzip(request.headers.get("accept-encoding", "")):
+        chunks = bulk_exporter.gzip(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(chunks, media_type=FORMATS[fmt], headers=headers)
+
+# -------------------------------
+# Stream every article (or those changed since a watermark)
+# -------------------------------
+@router.get("/export/articles")
+async def export_articles(
+    request: Request,
+    format: str = Query("ndjson", regex="^(ndjson|csv)$"),
+    since: Optional[datetime] = None,
+    source: Optional[str] = None,
+    include_content: bool = False
+):
+    chunks = bulk_exporter.articles(format, since=since, source=source, include_content=include_content)
+    return export_response(request, chunks, format, "articles")
+
+# -------------------------------
+# Stream indicators as NDJSON, CSV or a STIX 2.1 bundle
+# -------------------------------
+@router.get("/export/indicators")
+async def export_indicators(
+    request: Request,
+    format: str = Query("ndjson", regex="^(ndjson|csv|stix)$"),
+    since: Optional[datetime] = None,
+    type: Optional[str] = None
+):
+    chunks = bulk_exporter.indicators(format, since=since, ioc_type=type)
+    return export_response(request, chunks, format, "indicators")
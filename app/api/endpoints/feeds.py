@@ -0,0 +1,56 @@
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.database import get_db
+from app.schemas.feed import Feed, FeedCreate, FeedUpdate
+from app.crud import feed as crud_feed
+
+router = APIRouter()
+
+# -------------------------------
+# List feeds with their schedule and health
+# -------------------------------
+@router.get("/feeds", response_model=List[Feed])
+def list_feeds(enabled: Optional[bool] = None, db: Session = Depends(get_db)):
+    return crud_feed.get_feeds(db, enabled=enabled)
+
+# -------------------------------
+# Add a feed; it is polled on the scheduler's next tick
+# -------------------------------
+@router.post("/feeds", response_model=Feed, status_code=201)
+def create_feed(feed: FeedCreate, db: Session = Depends(get_db)):
+    if crud_feed.get_feed_by_url(db, feed.url):
+        raise HTTPException(status_code=409, detail="Feed already exists")
+    return crud_feed.create_feed(db, feed)
+
+# -------------------------------
+# Rename, enable/disable or reschedule a feed
+# -------------------------------
+@router.patch("/feeds/{feed_id}", response_model=Feed)
+def update_feed(feed_id: int, feed: FeedUpdate, db: Session = Depends(get_db)):
+    db_feed = crud_feed.update_feed(db, feed_id, feed)
+    if db_feed is None:
+        raise HTTPException(status_code=404, detail="Feed not found")
+    return db_feed
+
+# -------------------------------
+# Poll a feed on the scheduler's next tick
+# -------------------------------
+@router.post("/feeds/{feed_id}/poll", response_model=Feed)
+def poll_feed(feed_id: int, db: Session = Depends(get_db)):
+    db_feed = crud_feed.update_feed(db, feed_id, {"next_poll_at": datetime.now(timezone.utc)})
+    if db_feed is None:
+        raise HTTPException(status_code=404, detail="Feed not found")
+    return db_feed
+
+# -------------------------------
+# Remove a feed (its articles stay)
+# -------------------------------
+@router.delete("/feeds/{feed_id}")
+def delete_feed(feed_id: int, db: Session = Depends(get_db)):
+    db_feed = crud_feed.delete_feed(db, feed_id)
+    if db_feed is None:
+        raise HTTPException(status_code=404, detail="Feed not found")
+    return {"message": "Feed deleted successfully"}
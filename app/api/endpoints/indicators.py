@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.database import get_db
+from app.schemas.indicator import Indicator, IndicatorLookup, IndicatorCheckRequest, IndicatorCheckResponse
+from app.crud import indicator as crud_indicator
+from app.services.indicator_index import indicator_index
+from app.services.ioc_extractor import canonical
+
+router = APIRouter()
+
+# -------------------------------
+# Exact lookup: which articles mention this indicator
+# -------------------------------
+@router.get("/indicators/lookup", response_model=List[IndicatorLookup])
+def lookup_indicator(
+    value: str,
+    type: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    value = canonical(value)
+    indicators = []
+    if value in indicator_index.filter_known(db, [value]):
+        indicators = crud_indicator.get_indicator(db, value, ioc_type=type)
+    if not indicators:
+        raise HTTPException(status_code=404, detail="Indicator not found")
+
+    return [
+        IndicatorLookup(
+            **Indicator.from_orm(indicator).dict(),
+            articles=crud_indicator.get_indicator_articles(db, indicator.id, limit=limit)
+        )
+        for indicator in indicators
+    ]
+
+# -------------------------------
+# Prefix or CIDR search
+# -------------------------------
+@router.get("/indicators/search", response_model=List[Indicator])
+def search_indicators(
+    prefix: Optional[str] = None,
+    cidr: Optional[str] = None,
+    type: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    if cidr:
+        try:
+            return crud_indicator.search_indicators_by_cidr(db, cidr, limit=limit)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid CIDR: {e}")
+    if prefix:
+        return crud_indicator.search_indicators_by_prefix(db, canonical(prefix), ioc_type=type, limit=limit)
+    raise HTTPException(status_code=400, detail="Pass either prefix or cidr")
+
+# -------------------------------
+# Bulk check a list of indicators
+# -------------------------------
+@router.post("/indicators/check", response_model=IndicatorCheckResponse)
+def check_indicators(request: IndicatorCheckRequest, db: Session = Depends(get_db)):
+    values = {canonical(value) for value in request.values if value.strip()}
+    # Most values in a bulk check are unknown, the in-memory index rules those out without a query
+    candidates = indicator_index.filter_known(db, values)
+
+    matches = {}
+    for indicator in crud_indicator.get_indicators_by_values(db, sorted(candidates)):
+        matches.setdefault(indicator.value, []).append(indicator)
+
+    return {"checked": len(values), "matched": len(matches), "matches": matches}
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.database import get_db
+from app.schemas.job import Job
+from app.crud import job as crud_job
+
+router = APIRouter()
+
+# -------------------------------
+# List recent jobs
+# -------------------------------
+@router.get("/jobs", response_model=List[Job])
+def list_jobs(
+    status: Optional[str] = None,
+    kind: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    return crud_job.list_jobs(db, status=status, kind=kind, limit=limit)
+
+# -------------------------------
+# Poll a job's status and progress
+# -------------------------------
+@router.get("/jobs/{job_id}", response_model=Job)
+def read_job(job_id: int, db: Session = Depends(get_db)):
+    job = crud_job.get_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+# -------------------------------
+# Cancel a queued or running job
+# -------------------------------
+@router.post("/jobs/{job_id}/cancel", response_model=Job)
+def cancel_job(job_id: int, db: Session = Depends(get_db)):
+    job = crud_job.request_cancel(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -1,111 +1,152 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.services.data_collector import rss_collector
-from app.services.ai_processor import ai_processor
-from app.services.ioc_extractor import ioc_extractor
-from app.crud import article as crud_article
-from app.schemas.article import ArticleUpdate
-
-router = APIRouter()
-
-# -------------------------------
-# Fetch articles from RSS feeds
-# -------------------------------
-@router.post("/operations/fetch-articles")
-def fetch_articles(db: Session = Depends(get_db)):
-    try:
-        new_count = rss_collector.save_articles_to_db(db)
-        return {
-            "message": f"Successfully fetched {new_count} new articles",
-            "new_articles": new_count
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch articles: {str(e)}")
-
-
-# -------------------------------
-# Process a single article
-# -------------------------------
-@router.post("/articles/{article_id}/process")
-def process_article(article_id: int, db: Session = Depends(get_db)):
-    try:
-        if ai_processor is None:
-            return {
-                "message": "AI processing is currently disabled. Please set GROQ_API_KEY in your .env file.",
-                "ai_enabled": False
-            }
-
-        success = ai_processor.process_article(db, article_id)
-        if success:
-            return {"message": f"Article {article_id} processed successfully", "ai_enabled": True}
-        else:
-            raise HTTPException(status_code=404, detail=f"Article {article_id} not found or processing failed")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to process article: {str(e)}")
-
-
-# -------------------------------
-# Extract IOCs from a single article
-# -------------------------------
-@router.post("/articles/{article_id}/extract-iocs")
-def extract_iocs_for_article(article_id: int, db: Session = Depends(get_db)):
-    try:
-        article = crud_article.get_article(db, article_id)
-        if not article:
-            raise HTTPException(status_code=404, detail=f"Article {article_id} not found")
-
-        text_to_analyze = f"{article.title} {article.content}"
-        iocs = ioc_extractor.extract_iocs(text_to_analyze)
-
-        update_data = ArticleUpdate(iocs=iocs)
-        crud_article.update_article(db, article_id, update_data)
-
-        return {
-            "message": f"Extracted {sum(len(v) for v in iocs.values())} IOCs from article {article_id}",
-            "iocs": iocs
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to extract IOCs: {str(e)}")
-
-
-# -------------------------------
-# Operations status
-# -------------------------------
-@router.get("/operations/status")
-def get_operations_status():
-    return {
-        "ai_processing": ai_processor is not None,
-        "rss_feeds": len(rss_collector.feeds),
-        "ioc_extraction": True,
-        "message": "AI Processing: " + ("ENABLED" if ai_processor else "DISABLED - Set GROQ_API_KEY to enable")
-    }
-
-
-# -------------------------------
-# Batch process all articles safely
-# -------------------------------
-@router.post("/batch/process-all")
-def process_all_articles(db: Session = Depends(get_db)):
-    if ai_processor is None:
-        return {"message": "AI processing is currently disabled.", "ai_enabled": False}
-
-    articles = crud_article.get_all_articles(db)
-    processed_count = 0
-    failed_articles = []
-
-    for article in articles:
-        try:
-            success = ai_processor.process_article(db, article.id)
-            if success:
-                processed_count += 1
-        except Exception as e:
-            failed_articles.append({"article_id": article.id, "error": str(e)})
-
-    return {
-        "message": f"Batch processing completed. {processed_count} articles processed.",
-        "ai_enabled": True,
-        "total_articles": len(articles),
-        "processed_articles": processed_count,
-        "failed_articles": failed_articles
-    }
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.config import settings
+from app.database import get_db, get_async_db
+from app.schemas.job import JobSubmitted
+from app.services.ai_processor import AIProcessor, ai_processing_enabled, get_ai_processor
+from app.services.ioc_extractor import ioc_extractor, content_hash
+from app.services.jobs import job_queue
+from app.services.feed_scheduler import feed_scheduler
+from app.services.llm_cache import response_cache
+from app.services.stats_cache import stats_cache
+from app.services.watchlist import watchlist_matcher
+from app.crud import article as crud_article
+from app.crud import indicator as crud_indicator
+from app.crud import feed as crud_feed
+
+router = APIRouter()
+
+def submit_job(db: Session, kind: str, params: dict = None, parallel: int = 1) -> dict:
+    """Queue the work and answer right away; poll /jobs/{job_id} for progress"""
+    submitted = job_queue.submit_parallel(db, kind, params, parallel)
+    job, created = submitted[0]
+    response = {
+        "job_id": job.id,
+        "status": job.status,
+        "deduplicated": not created,
+        "message": f"{kind} job {'queued' if created else 'already ' + job.status}"
+    }
+    if parallel > 1:
+        response["job_ids"] = [job.id for job, _ in submitted]
+    return response
+
+# Parallel runs are split into jobs that lease their articles chunk by chunk, so the workers
+# that pick them up (`python -m app.cli worker` on any node) share the work without overlap
+PARALLEL = Query(1, ge=1, le=64, description="Split the run into this many jobs for separate workers")
+
+# -------------------------------
+# Fetch articles from RSS feeds
+# -------------------------------
+@router.post("/operations/fetch-articles", status_code=202, response_model=JobSubmitted)
+def fetch_articles(db: Session = Depends(get_db)):
+    return submit_job(db, "fetch-articles")
+
+
+# -------------------------------
+# Process a single article
+# -------------------------------
+@router.post("/articles/{article_id}/process", status_code=202)
+def process_article(
+    article_id: int,
+    db: Session = Depends(get_db),
+    ai_processor: Optional[AIProcessor] = Depends(get_ai_processor)
+):
+    if ai_processor is None:
+        return {
+            "message": "AI processing is currently disabled. Please set GROQ_API_KEY in your .env file.",
+            "ai_enabled": False
+        }
+    if not crud_article.get_article(db, article_id):
+        raise HTTPException(status_code=404, detail=f"Article {article_id} not found")
+
+    return {**submit_job(db, "process-article", {"article_id": article_id}), "ai_enabled": True}
+
+
+# -------------------------------
+# Extract IOCs from a single article
+# -------------------------------
+@router.post("/articles/{article_id}/extract-iocs")
+def extract_iocs_for_article(article_id: int, db: Session = Depends(get_db)):
+    try:
+        article = crud_article.get_article(db, article_id)
+        if not article:
+            raise HTTPException(status_code=404, detail=f"Article {article_id} not found")
+
+        text_to_analyze = f"{article.title} {article.content}"
+        iocs = ioc_extractor.extract_iocs(text_to_analyze)
+
+        # Indicator links and watchlist matches ride on the article update's commit
+        crud_indicator.sync_article_indicators(db, {article_id: iocs})
+        matches = watchlist_matcher.match_and_record(db, {article_id: (iocs, text_to_analyze)})
+        update_data = {"iocs": iocs, "iocs_content_hash": content_hash(text_to_analyze)}
+        crud_article.update_article(db, article_id, update_data)
+
+        return {
+            "message": f"Extracted {sum(len(v) for v in iocs.values())} IOCs from article {article_id}",
+            "iocs": iocs,
+            "watchlist_matches": matches
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to extract IOCs: {str(e)}")
+
+
+# -------------------------------
+# Re-extract IOCs for every article
+# -------------------------------
+@router.post("/operations/extract-iocs", status_code=202, response_model=JobSubmitted)
+def extract_iocs_for_all_articles(force: bool = False, parallel: int = PARALLEL, db: Session = Depends(get_db)):
+    return submit_job(db, "extract-iocs", {"force": force}, parallel)
+
+
+# -------------------------------
+# Fetch the full pages of articles whose feed only carried a summary
+# -------------------------------
+@router.post("/operations/fetch-full-text", status_code=202, response_model=JobSubmitted)
+def fetch_full_text(force: bool = False, db: Session = Depends(get_db)):
+    return submit_job(db, "fetch-full-text", {"force": force})
+
+
+# -------------------------------
+# Match the watchlists against every article's stored IOCs, e.g. after adding a list
+# -------------------------------
+@router.post("/operations/match-watchlists", status_code=202, response_model=JobSubmitted)
+def match_watchlists(db: Session = Depends(get_db)):
+    return submit_job(db, "match-watchlists")
+
+
+# -------------------------------
+# Operations status
+# -------------------------------
+@router.get("/operations/status")
+async def get_operations_status(db: AsyncSession = Depends(get_async_db)):
+    return {
+        "ai_processing": ai_processing_enabled(),
+        "rss_feeds": await crud_feed.count_feeds_async(db, enabled=True),
+        "feed_scheduler_in_process": feed_scheduler.is_running,
+        "ioc_extraction": True,
+        "full_text_fetch": settings.FULL_TEXT_FETCH,
+        "llm_cache": response_cache.stats(),
+        "triage": settings.TRIAGE_ENABLED,
+        "stats_cache": stats_cache.stats(),
+        "watchlists": watchlist_matcher.stats(),
+        "job_workers_in_process": job_queue.is_running,
+        "message": "AI Processing: " + ("ENABLED" if ai_processing_enabled() else "DISABLED - Set GROQ_API_KEY to enable")
+    }
+
+
+# -------------------------------
+# Batch process all articles safely
+# -------------------------------
+@router.post("/batch/process-all", status_code=202)
+def process_all_articles(
+    parallel: int = PARALLEL,
+    db: Session = Depends(get_db),
+    ai_processor: Optional[AIProcessor] = Depends(get_ai_processor)
+):
+    if ai_processor is None:
+        return {"message": "AI processing is currently disabled.", "ai_enabled": False}
+
+    # Only unprocessed, failed or stale articles, with bounded concurrency and rate limiting
+    return {**submit_job(db, "process-all", parallel=parallel), "ai_enabled": True}
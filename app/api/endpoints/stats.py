@@ -0,0 +1,128 @@
+import re
+from datetime import date, timedelta
+from typing import Awaitable, Callable, Optional
+
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.crud import stats as crud_stats
+from app.crud import triage as crud_triage
+from app.database import get_async_db
+from app.schemas.stats import BatchStats, Stats, TriageStats
+from app.services.ioc_extractor import IOC_TYPES
+from app.services.stats_cache import stats_cache
+from app.services.triage import triage
+
+router = APIRouter()
+
+# One entity tag of an If-None-Match list; an opaque tag may itself contain commas
+_ENTITY_TAG = re.compile(r'\s*(?:W/)?("[^"]*")\s*(?:,|$)')
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of etag against an If-None-Match header, as RFC 9110 specifies for it"""
+    if if_none_match.strip() == "*":
+        return True
+    return etag.removeprefix("W/") in (match.group(1) for match in _ENTITY_TAG.finditer(if_none_match))
+
+async def cached_response(request: Request, response: Response, key: tuple,
+                          compute: Callable[[], Awaitable[dict]]):
+    """Serve key's payload from the stats cache; 304 when the client already has it"""
+    etag, payload = await stats_cache.get(key, compute)
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={int(settings.STATS_CACHE_TTL)}"}
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return payload
+
+def _share(part: int, whole: int) -> Optional[float]:
+    return round(part / whole, 4) if whole else None
+
+def _totals(counts: dict) -> dict:
+    return {
+        "total_articles": counts.get("total", {}).get("", 0),
+        "processed_articles": counts.get("processed", {}).get("", 0),
+        "articles_with_iocs": counts.get("with_iocs", {}).get("", 0),
+    }
+
+# -------------------------------
+# Dashboard statistics from the rollup counters
+# -------------------------------
+@router.get("/stats", response_model=Stats)
+async def read_stats(
+    request: Request,
+    response: Response,
+    days: int = Query(30, ge=1, le=365),
+    top: int = Query(10, ge=0, le=100),
+    ioc_type: Optional[str] = Query(None, regex=f"^({'|'.join(IOC_TYPES)})$"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    async def compute():
+        counts = await crud_stats.get_counts_async(db)
+        by_day = counts.get("day", {})
+        today = date.today()
+        first_day = today - timedelta(days=days - 1)
+        return {
+            **_totals(counts),
+            "by_severity": counts.get("severity", {}),
+            "by_threat_type": counts.get("threat_type", {}),
+            "by_source": counts.get("source", {}),
+            "by_day": [
+                {"day": day, "count": by_day.get(day, 0)}
+                for day in ((first_day + timedelta(days=n)).isoformat() for n in range(days))
+            ],
+            "top_iocs": await crud_stats.get_top_indicators_async(db, limit=top, ioc_type=ioc_type) if top else [],
+        }
+
+    return await cached_response(request, response, ("stats", days, top, ioc_type), compute)
+
+# -------------------------------
+# Processing progress for the dashboard header
+# -------------------------------
+@router.get("/batch/stats", response_model=BatchStats)
+async def read_batch_stats(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    async def compute():
+        totals = _totals(await crud_stats.get_counts_async(db))
+        total = totals["total_articles"]
+        return {
+            **totals,
+            "processing_percentage": round(totals["processed_articles"] / total * 100, 1) if total else 0.0,
+        }
+
+    return await cached_response(request, response, ("batch",), compute)
+
+# -------------------------------
+# How much the triage tier labels itself, and how often it agrees with the LLM
+# -------------------------------
+@router.get("/stats/triage", response_model=TriageStats)
+async def read_triage_stats(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    async def compute():
+        counts = await crud_triage.get_route_counts_async(db)
+        # Only audits measure the local labels: the other LLM routes' predictions are the ones the tier
+        # didn't trust, and local routes agree with themselves
+        audits = [row for row in counts if row["route"] == "audit"]
+        compared = sum(row["compared"] for row in audits)
+        triaged = sum(row["articles"] for row in counts)
+        local = sum(row["articles"] for row in counts if row["route"] not in crud_triage.LLM_ROUTES)
+        return {
+            "enabled": settings.TRIAGE_ENABLED,
+            "triaged_articles": triaged,
+            "labelled_locally": local,
+            "local_share": _share(local, triaged) or 0.0,
+            "threat_type_agreement": _share(sum(row["threat_type_agreed"] or 0 for row in audits), compared),
+            "severity_agreement": _share(sum(row["severity_agreed"] or 0 for row in audits), compared),
+            "routes": [
+                {
+                    "route": row["route"],
+                    "articles": row["articles"],
+                    "llm_call": row["route"] in crud_triage.LLM_ROUTES,
+                    "compared": row["compared"],
+                    "threat_type_agreement": _share(row["threat_type_agreed"] or 0, row["compared"]),
+                    "severity_agreement": _share(row["severity_agreed"] or 0, row["compared"]),
+                }
+                for row in counts
+            ],
+            "model": triage.info(),
+        }
+
+    return await cached_response(request, response, ("triage",), compute)
@@ -0,0 +1,127 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.database import get_db
+from app.schemas.watchlist import (
+    Watchlist, WatchlistCreate, WatchlistUpdate, WatchlistEntry, WatchlistEntriesAdd, WatchlistEntriesAdded,
+    WatchlistMatch, WatchlistCheckRequest, WatchlistCheckResponse
+)
+from app.crud import watchlist as crud_watchlist
+from app.services.ioc_extractor import ioc_extractor
+from app.services.watchlist import parse_entry, watchlist_matcher
+
+router = APIRouter()
+
+def get_watchlist_or_404(db: Session, watchlist_id: int):
+    db_watchlist = crud_watchlist.get_watchlist(db, watchlist_id)
+    if db_watchlist is None:
+        raise HTTPException(status_code=404, detail="Watchlist not found")
+    return db_watchlist
+
+# -------------------------------
+# List watchlists
+# -------------------------------
+@router.get("/watchlists", response_model=List[Watchlist])
+def list_watchlists(enabled: Optional[bool] = None, db: Session = Depends(get_db)):
+    return crud_watchlist.get_watchlists(db, enabled=enabled)
+
+# -------------------------------
+# Create a watchlist; add entries with POST /watchlists/{id}/entries
+# -------------------------------
+@router.post("/watchlists", response_model=Watchlist, status_code=201)
+def create_watchlist(watchlist: WatchlistCreate, db: Session = Depends(get_db)):
+    if crud_watchlist.get_watchlist_by_name(db, watchlist.name):
+        raise HTTPException(status_code=409, detail="Watchlist already exists")
+    return crud_watchlist.create_watchlist(db, watchlist)
+
+# -------------------------------
+# Recorded matches, newest first; page with before_id
+# -------------------------------
+# Declared before /watchlists/{watchlist_id} so "matches" isn't taken for an id
+@router.get("/watchlists/matches", response_model=List[WatchlistMatch])
+def list_matches(
+    watchlist_id: Optional[int] = None,
+    article_id: Optional[int] = None,
+    before_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    return crud_watchlist.get_matches(db, watchlist_id=watchlist_id, article_id=article_id,
+                                      before_id=before_id, limit=limit)
+
+# -------------------------------
+# Dry run: what the watchlists would match in these values or this text
+# -------------------------------
+@router.post("/watchlists/check", response_model=WatchlistCheckResponse)
+def check_watchlists(request: WatchlistCheckRequest, db: Session = Depends(get_db)):
+    # Goes through the extractor like an article would, so values are refanged and classified the same way
+    text = "\n".join([*request.values, request.text or ""])
+    iocs = ioc_extractor.extract_iocs(text)
+    watchlist_matcher.refresh(db)
+    hits = watchlist_matcher.match(iocs, text)
+    return {"checked": sum(len(values) for values in iocs.values()), "hits": [hit._asdict() for hit in hits]}
+
+@router.get("/watchlists/{watchlist_id}", response_model=Watchlist)
+def read_watchlist(watchlist_id: int, db: Session = Depends(get_db)):
+    return get_watchlist_or_404(db, watchlist_id)
+
+# -------------------------------
+# Rename, describe, enable/disable a watchlist
+# -------------------------------
+@router.patch("/watchlists/{watchlist_id}", response_model=Watchlist)
+def update_watchlist(watchlist_id: int, watchlist: WatchlistUpdate, db: Session = Depends(get_db)):
+    db_watchlist = crud_watchlist.update_watchlist(db, watchlist_id, watchlist)
+    if db_watchlist is None:
+        raise HTTPException(status_code=404, detail="Watchlist not found")
+    watchlist_matcher.refresh(db, force=True)
+    return db_watchlist
+
+# -------------------------------
+# Remove a watchlist with its entries and matches
+# -------------------------------
+@router.delete("/watchlists/{watchlist_id}")
+def delete_watchlist(watchlist_id: int, db: Session = Depends(get_db)):
+    if crud_watchlist.delete_watchlist(db, watchlist_id) is None:
+        raise HTTPException(status_code=404, detail="Watchlist not found")
+    watchlist_matcher.refresh(db, force=True)
+    return {"message": "Watchlist deleted successfully"}
+
+# -------------------------------
+# Entries: list, bulk add, remove
+# -------------------------------
+@router.get("/watchlists/{watchlist_id}/entries", response_model=List[WatchlistEntry])
+def list_entries(
+    watchlist_id: int,
+    type: Optional[str] = None,
+    after_id: int = 0,
+    limit: int = Query(100, ge=1, le=10000),
+    db: Session = Depends(get_db)
+):
+    get_watchlist_or_404(db, watchlist_id)
+    return crud_watchlist.get_entries(db, watchlist_id, entry_type=type, after_id=after_id, limit=limit)
+
+@router.post("/watchlists/{watchlist_id}/entries", response_model=WatchlistEntriesAdded)
+def add_entries(watchlist_id: int, request: WatchlistEntriesAdd, db: Session = Depends(get_db)):
+    get_watchlist_or_404(db, watchlist_id)
+    entries, errors = {}, []
+    for value in request.values:
+        try:
+            entry_type, canonical = parse_entry(value, request.type)
+        except ValueError as e:
+            errors.append(str(e))
+            continue
+        entries[(entry_type, canonical)] = {"type": entry_type, "value": canonical, "note": request.note}
+
+    added = crud_watchlist.add_entries(db, watchlist_id, list(entries.values())) if entries else 0
+    # Apply at once in this process; other processes pick it up within WATCHLIST_RELOAD_INTERVAL
+    watchlist_matcher.refresh(db, force=True)
+    return {"added": added, "duplicates": len(request.values) - len(errors) - added, "invalid": len(errors),
+            "errors": errors[:100]}
+
+@router.delete("/watchlists/{watchlist_id}/entries/{entry_id}")
+def delete_entry(watchlist_id: int, entry_id: int, db: Session = Depends(get_db)):
+    if crud_watchlist.delete_entry(db, watchlist_id, entry_id) is None:
+        raise HTTPException(status_code=404, detail="Entry not found")
+    watchlist_matcher.refresh(db, force=True)
+    return {"message": "Entry deleted successfully"}
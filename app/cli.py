@@ -0,0 +1,324 @@
+"""Command line entry points for batch work that shouldn't go through the API.
+
+Usage:
+    python -m app.cli migrate [--revision REV] [--check]
+    python -m app.cli extract-iocs [--force] [--workers N] [--chunk-size N]
+    python -m app.cli worker [--threads N] [--metrics-port N]
+    python -m app.cli reindex-search
+    python -m app.cli cluster-articles [--rebuild]
+    python -m app.cli fetch-full-text [--force]
+    python -m app.cli rebuild-stats
+    python -m app.cli compress-content [--vacuum]
+    python -m app.cli import-watchlist NAME FILE [--type T]
+    python -m app.cli match-watchlists
+    python -m app.cli triage-report
+"""
+import argparse
+import json
+import threading
+import time
+
+
+def prepare_schema():
+    from app.database import ensure_schema
+
+    ensure_schema()
+
+
+def migrate(args):
+    """Apply the Alembic migrations up to --revision, or with --check only report whether any are pending"""
+    from app.database import migrate as upgrade, schema_revisions
+
+    if not args.check:
+        start = time.time()
+        upgrade(revision=args.revision)
+        print(f"Migrated to {args.revision} in {time.time() - start:.1f}s")
+    current, head = schema_revisions()
+    print(f"Database at {', '.join(sorted(current)) or 'no revision'}, migrations head {', '.join(sorted(head))}")
+    return 0 if current == head else 1
+
+
+def extract_iocs(args):
+    from app.services.batch_extractor import batch_ioc_extractor
+
+    done = threading.Event()
+
+    def report_progress():
+        while not done.wait(args.progress_interval):
+            status = batch_ioc_extractor.status()
+            print(
+                f"scanned {status['scanned']}  extracted {status['extracted']}  "
+                f"skipped {status['skipped']}  {status.get('articles_per_second', 0)} articles/s"
+            )
+
+    reporter = threading.Thread(target=report_progress, daemon=True)
+    reporter.start()
+    try:
+        status = batch_ioc_extractor.run(force=args.force, workers=args.workers, chunk_size=args.chunk_size)
+    finally:
+        done.set()
+    print(json.dumps(status, indent=2))
+    return 1 if status["error"] else 0
+
+
+def worker(args):
+    """Run job queue workers, and the feed scheduler, in this process until interrupted"""
+    from app.config import settings
+    from app.services.feed_scheduler import feed_scheduler
+    from app.services.jobs import job_queue
+
+    prepare_schema()
+    if args.metrics_port:
+        from prometheus_client import start_http_server
+        from app import metrics
+        from app.database import engine
+
+        metrics.instrument_engine(engine, "sync")
+        start_http_server(args.metrics_port)
+        print(f"Serving metrics on :{args.metrics_port}/metrics")
+    job_queue.start(args.threads)
+    if settings.FEED_SCHEDULER and not args.no_scheduler:
+        feed_scheduler.start()
+    try:
+        while job_queue.is_running:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("Stopping, running jobs go back to the queue...")
+    finally:
+        feed_scheduler.stop()
+        job_queue.stop()
+    return 0
+
+
+def reindex_search(args):
+    """Rebuild the full-text index from the articles table"""
+    from app.crud.search import rebuild_search_index
+    from app.database import SessionLocal
+
+    prepare_schema()
+    start = time.time()
+    db = SessionLocal()
+    try:
+        count = rebuild_search_index(db)
+    finally:
+        db.close()
+    print(f"Re-indexed {count} articles in {time.time() - start:.1f}s")
+    return 0
+
+
+def cluster_articles(args):
+    """Assign near-duplicate clusters to articles stored before clustering existed"""
+    from app.database import SessionLocal
+    from app.services.near_duplicate import near_duplicate_detector
+
+    prepare_schema()
+    start = time.time()
+    db = SessionLocal()
+    try:
+        totals = near_duplicate_detector.cluster_all(db, rebuild=args.rebuild)
+    finally:
+        db.close()
+    print(f"Clustered {totals['clustered']} articles, {totals['duplicates']} near-duplicates, "
+          f"in {time.time() - start:.1f}s")
+    return 0
+
+
+def fetch_full_text(args):
+    """Fetch the pages of articles whose feed only carried a summary, through the page cache"""
+    from app.database import SessionLocal
+    from app.services.page_fetcher import page_fetcher
+
+    prepare_schema()
+    start = time.time()
+    db = SessionLocal()
+    try:
+        stats = page_fetcher.enrich(db, force=args.force)
+    finally:
+        db.close()
+    print(f"Fetched {stats['fetched']} pages ({stats['failed']} failed), "
+          f"updated {stats['updated']} articles in {time.time() - start:.1f}s")
+    return 0
+
+
+def rebuild_stats(args):
+    """Recompute the dashboard rollups from the articles table"""
+    from app.crud.stats import rebuild_stats as rebuild
+    from app.database import SessionLocal
+
+    prepare_schema()
+    start = time.time()
+    db = SessionLocal()
+    try:
+        count = rebuild(db)
+    finally:
+        db.close()
+    print(f"Counted {count} articles in {time.time() - start:.1f}s")
+    return 0
+
+
+def compress_content(args):
+    """Convert article bodies stored before compression; the app reads either kind meanwhile"""
+    from app.crud.article import compress_content as compress
+    from app.database import SessionLocal, engine
+
+    prepare_schema()
+    start = time.time()
+    db = SessionLocal()
+    try:
+        count = compress(db, chunk_size=args.chunk_size)
+    finally:
+        db.close()
+    print(f"Compressed {count} articles in {time.time() - start:.1f}s")
+    if args.vacuum and engine.dialect.name == "sqlite":
+        # Freed pages only go back to the filesystem with a VACUUM, which rewrites the whole file
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.exec_driver_sql("VACUUM")
+        print(f"Vacuumed in {time.time() - start:.1f}s")
+    return 0
+
+
+def import_watchlist(args):
+    """Add one entry per line of FILE (# comments allowed) to a watchlist, creating the list if needed"""
+    from app.crud import watchlist as crud_watchlist
+    from app.database import SessionLocal
+    from app.services.watchlist import parse_entry
+
+    prepare_schema()
+    entries, invalid = {}, 0
+    with open(args.file, encoding="utf-8") as f:
+        for line in f:
+            value = line.split("#", 1)[0].strip()
+            if not value:
+                continue
+            try:
+                entry_type, value = parse_entry(value, args.type)
+            except ValueError as e:
+                invalid += 1
+                if invalid <= 10:
+                    print(f"skipped: {e}")
+                continue
+            entries[(entry_type, value)] = {"type": entry_type, "value": value}
+
+    start = time.time()
+    db = SessionLocal()
+    try:
+        watchlist = crud_watchlist.get_watchlist_by_name(db, args.name)
+        if watchlist is None:
+            watchlist = crud_watchlist.create_watchlist(db, {"name": args.name})
+        added = crud_watchlist.add_entries(db, watchlist.id, list(entries.values()))
+    finally:
+        db.close()
+    print(f"Added {added} entries to {args.name!r} ({len(entries) - added} already on it, {invalid} invalid) "
+          f"in {time.time() - start:.1f}s")
+    return 0
+
+
+def match_watchlists(args):
+    """Match the watchlists against every stored article, e.g. after importing a list"""
+    from app.database import SessionLocal
+    from app.services.watchlist import watchlist_matcher
+
+    prepare_schema()
+    start = time.time()
+    db = SessionLocal()
+    try:
+        result = watchlist_matcher.scan(db)
+    finally:
+        db.close()
+    print(f"Scanned {result['scanned']} articles, {result['new_matches']} new matches, in {time.time() - start:.1f}s")
+    return 0
+
+
+def triage_report(args):
+    """Train the triage classifier on the stored LLM labels and show how it would do"""
+    from app.config import settings
+    from app.crud.triage import LLM_ROUTES, get_route_counts
+    from app.database import SessionLocal
+    from app.services.triage import triage
+
+    prepare_schema()
+    start = time.time()
+    db = SessionLocal()
+    try:
+        model = triage.model(db)
+        routes = get_route_counts(db)
+    finally:
+        db.close()
+    if model is None:
+        print(f"Not enough LLM labels to train on, {settings.TRIAGE_MIN_LABELS} needed")
+    else:
+        report = model.report
+        print(f"Trained on {report['trained_on']} articles ({report['vocabulary']} terms) in {time.time() - start:.1f}s")
+        print(f"Thresholds {report['thresholds']} for {settings.TRIAGE_TARGET_AGREEMENT:.0%} agreement")
+        print(f"Held out {report['held_out']}: {report['held_out_coverage']:.1%} labelled locally, "
+              f"agreement {report['held_out_agreement']}, accuracy {report['held_out_accuracy']}")
+    for row in routes:
+        where = "LLM" if row["route"] in LLM_ROUTES else "local"
+        agreed = (f", threat_type {row['threat_type_agreed']}/{row['compared']} "
+                  f"severity {row['severity_agreed']}/{row['compared']} agreed" if where == "LLM" and row["compared"] else "")
+        print(f"{row['route']:>10} ({where}): {row['articles']} articles{agreed}")
+    return 0
+
+
+def main(argv=None):
+    from app.logging_config import configure_logging
+
+    configure_logging()
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Argus batch operations")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    migration = subcommands.add_parser("migrate", help="upgrade the database schema")
+    migration.add_argument("--revision", default="head", help="target revision (default: head)")
+    migration.add_argument("--check", action="store_true", help="only report, exit 1 if migrations are pending")
+    migration.set_defaults(handler=migrate)
+
+    extract = subcommands.add_parser("extract-iocs", help="re-extract IOCs for every article")
+    extract.add_argument("--force", action="store_true", help="ignore stored content hashes")
+    extract.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    extract.add_argument("--chunk-size", type=int, help="articles read from the DB per chunk")
+    extract.add_argument("--progress-interval", type=float, default=5.0)
+    extract.set_defaults(handler=extract_iocs)
+
+    work = subcommands.add_parser("worker", help="run background jobs submitted through the API")
+    work.add_argument("--threads", type=int, default=2, help="jobs run concurrently by this process")
+    work.add_argument("--no-scheduler", action="store_true", help="don't poll feeds on their schedule")
+    work.add_argument("--metrics-port", type=int, default=0, help="serve Prometheus metrics on this port")
+    work.set_defaults(handler=worker)
+
+    reindex = subcommands.add_parser("reindex-search", help="rebuild the full-text search index")
+    reindex.set_defaults(handler=reindex_search)
+
+    cluster = subcommands.add_parser("cluster-articles", help="cluster near-duplicate articles")
+    cluster.add_argument("--rebuild", action="store_true", help="drop every cluster and start over")
+    cluster.set_defaults(handler=cluster_articles)
+
+    full_text = subcommands.add_parser("fetch-full-text", help="fetch full article pages")
+    full_text.add_argument("--force", action="store_true", help="re-fetch pages fetched before (cached ones aside)")
+    full_text.set_defaults(handler=fetch_full_text)
+
+    stats = subcommands.add_parser("rebuild-stats", help="recompute the dashboard statistics rollups")
+    stats.set_defaults(handler=rebuild_stats)
+
+    compress = subcommands.add_parser("compress-content", help="compress article bodies stored as plain text")
+    compress.add_argument("--chunk-size", type=int, default=500, help="articles rewritten per transaction")
+    compress.add_argument("--vacuum", action="store_true", help="shrink the SQLite file afterwards")
+    compress.set_defaults(handler=compress_content)
+
+    watchlist = subcommands.add_parser("import-watchlist", help="bulk-add entries to a watchlist from a file")
+    watchlist.add_argument("name", help="watchlist name, created if it doesn't exist")
+    watchlist.add_argument("file", help="one value per line")
+    watchlist.add_argument("--type", help="entry type of every line (default: guessed per line)")
+    watchlist.set_defaults(handler=import_watchlist)
+
+    match = subcommands.add_parser("match-watchlists", help="match the watchlists against every article's IOCs")
+    match.set_defaults(handler=match_watchlists)
+
+    report = subcommands.add_parser("triage-report", help="train the triage classifier and report its agreement")
+    report.set_defaults(handler=triage_report)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
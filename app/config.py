@@ -1,19 +1,121 @@
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-class Settings:
-    PROJECT_NAME: str = "Argus Cybersecurity"
-    PROJECT_VERSION: str = "1.0.0"
-    
-    # Database
-    DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./argus.db")
-    
-    # OpenAI
-    GROQ_API_KEY: str = os.getenv("GROQ_API_KEY", "")
-    
-    # Security
-    SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
-
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class Settings:
+    PROJECT_NAME: str = "Argus Cybersecurity"
+    PROJECT_VERSION: str = "1.0.0"
+    
+    # Database
+    DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./argus.db")
+    # Used by the async endpoints; derived from DATABASE_URL (aiosqlite/asyncpg) when empty
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL", "")
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds, -1 = never
+    SQLITE_WAL: bool = os.getenv("SQLITE_WAL", "true").lower() in ("1", "true", "yes")
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    # Apply pending Alembic migrations on startup; off, a process refuses to start on an outdated schema
+    # and `python -m app.cli migrate` (or `alembic upgrade head`) is a separate deploy step
+    AUTO_MIGRATE: bool = os.getenv("AUTO_MIGRATE", "true").lower() in ("1", "true", "yes")
+    MIGRATION_LOCK_TIMEOUT: float = float(os.getenv("MIGRATION_LOCK_TIMEOUT", "600"))  # Seconds to wait for another migrator
+    
+    # OpenAI
+    GROQ_API_KEY: str = os.getenv("GROQ_API_KEY", "")
+    GROQ_MODEL: str = os.getenv("GROQ_MODEL", "groq/compound-mini")
+    GROQ_BASE_URL: str = os.getenv("GROQ_BASE_URL", "")  # Override to point at a proxy or a fake server
+
+    # Batch LLM processing, limits should match the provider's quota for the key; every run has its own
+    # limiter, so split the quota between the parts of a parallel run
+    LLM_CONCURRENCY: int = int(os.getenv("LLM_CONCURRENCY", "8"))
+    LLM_REQUESTS_PER_MINUTE: int = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "30"))
+    LLM_TOKENS_PER_MINUTE: int = int(os.getenv("LLM_TOKENS_PER_MINUTE", "15000"))
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "5"))
+    LLM_COMMIT_BATCH: int = int(os.getenv("LLM_COMMIT_BATCH", "20"))
+    LLM_REPROCESS_AFTER_DAYS: int = int(os.getenv("LLM_REPROCESS_AFTER_DAYS", "0"))  # 0 = never
+
+    # Local triage before the LLM: obvious marketing and confidently classified articles are labelled
+    # without a call. The classifier trains on the LLM's labels once there are TRIAGE_MIN_LABELS of them,
+    # and only labels articles when held-out labels say it agrees with the LLM at TRIAGE_TARGET_AGREEMENT
+    TRIAGE_ENABLED: bool = os.getenv("TRIAGE_ENABLED", "true").lower() in ("1", "true", "yes")
+    TRIAGE_MIN_LABELS: int = int(os.getenv("TRIAGE_MIN_LABELS", "200"))
+    TRIAGE_MAX_LABELS: int = int(os.getenv("TRIAGE_MAX_LABELS", "5000"))  # Latest LLM labels trained on
+    TRIAGE_TARGET_AGREEMENT: float = float(os.getenv("TRIAGE_TARGET_AGREEMENT", "0.9"))
+    TRIAGE_AUDIT_RATE: float = float(os.getenv("TRIAGE_AUDIT_RATE", "0.05"))  # Share still sent to the LLM as a check
+    TRIAGE_HIGH_VALUE_IOCS: int = int(os.getenv("TRIAGE_HIGH_VALUE_IOCS", "5"))  # From this many IOCs, always the LLM
+    TRIAGE_RETRAIN_SECONDS: float = float(os.getenv("TRIAGE_RETRAIN_SECONDS", "3600"))
+    
+    # Feed ingestion
+    FEED_CONCURRENCY: int = int(os.getenv("FEED_CONCURRENCY", "20"))
+    FEED_PER_HOST_LIMIT: int = int(os.getenv("FEED_PER_HOST_LIMIT", "4"))
+    FEED_TIMEOUT: float = float(os.getenv("FEED_TIMEOUT", "30"))
+    FEED_USER_AGENT: str = os.getenv("FEED_USER_AGENT", "Argus/1.0 (+threat-intel feed collector)")
+    # Full-text stage: fetch each new article's page when the feed only carries a summary
+    FULL_TEXT_FETCH: bool = os.getenv("FULL_TEXT_FETCH", "false").lower() in ("1", "true", "yes")
+    PAGE_CACHE_DIR: str = os.getenv("PAGE_CACHE_DIR", "./page_cache")
+    PAGE_CACHE_TTL: float = float(os.getenv("PAGE_CACHE_TTL", "604800"))  # Seconds before a cached page is revalidated
+    PAGE_CONCURRENCY: int = int(os.getenv("PAGE_CONCURRENCY", "16"))
+    PAGE_PER_DOMAIN_LIMIT: int = int(os.getenv("PAGE_PER_DOMAIN_LIMIT", "2"))
+    PAGE_DOMAIN_DELAY: float = float(os.getenv("PAGE_DOMAIN_DELAY", "0.5"))  # Seconds between requests to one host
+    PAGE_TIMEOUT: float = float(os.getenv("PAGE_TIMEOUT", "20"))
+    PAGE_MAX_BYTES: int = int(os.getenv("PAGE_MAX_BYTES", "5000000"))
+
+    # Feed scheduler: per-feed poll intervals adapt to each feed's publish rate within these bounds (seconds)
+    FEED_SCHEDULER: bool = os.getenv("FEED_SCHEDULER", "true").lower() in ("1", "true", "yes")
+    FEED_DEFAULT_INTERVAL: float = float(os.getenv("FEED_DEFAULT_INTERVAL", "3600"))
+    FEED_MIN_INTERVAL: float = float(os.getenv("FEED_MIN_INTERVAL", "300"))
+    FEED_MAX_INTERVAL: float = float(os.getenv("FEED_MAX_INTERVAL", "86400"))
+    FEED_MAX_BACKOFF: float = float(os.getenv("FEED_MAX_BACKOFF", "21600"))  # Longest retry delay of a failing feed
+    FEED_LEASE_SECONDS: float = float(os.getenv("FEED_LEASE_SECONDS", "600"))
+    FEED_SCHEDULER_TICK: float = float(os.getenv("FEED_SCHEDULER_TICK", "30"))  # Longest sleep between checks
+
+    # Batch IOC extraction (0 = one worker per CPU core)
+    IOC_WORKERS: int = int(os.getenv("IOC_WORKERS", "0"))
+    IOC_CHUNK_SIZE: int = int(os.getenv("IOC_CHUNK_SIZE", "500"))
+
+    # Batch runs (LLM processing, IOC extraction) lease each chunk of articles they take on, so any number
+    # of them can share the work; a crashed run's chunk is picked up again once its lease runs out
+    ARTICLE_LEASE_SECONDS: float = float(os.getenv("ARTICLE_LEASE_SECONDS", "900"))
+
+    # Article bodies are stored compressed: zstd (needs the zstandard package, else zlib), zlib or none
+    CONTENT_COMPRESSION: str = os.getenv("CONTENT_COMPRESSION", "zstd").lower()
+    CONTENT_COMPRESSION_LEVEL: int = int(os.getenv("CONTENT_COMPRESSION_LEVEL", "6"))
+
+    # In-memory indicator index: ids under its high-water mark are rechecked for this long, since Postgres
+    # transactions can commit ids out of order; a full reload covers anything slower
+    INDICATOR_INDEX_SETTLE_SECONDS: float = float(os.getenv("INDICATOR_INDEX_SETTLE_SECONDS", "300"))
+    INDICATOR_INDEX_RELOAD_SECONDS: float = float(os.getenv("INDICATOR_INDEX_RELOAD_SECONDS", "3600"))
+
+    # Near-duplicate clustering: estimated Jaccard similarity of word shingles to join a cluster
+    NEAR_DUPLICATE_THRESHOLD: float = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.7"))
+
+    # Watchlists: seconds between checks for changed lists; a change made through this process's API applies at once
+    WATCHLIST_RELOAD_INTERVAL: float = float(os.getenv("WATCHLIST_RELOAD_INTERVAL", "5"))
+
+    # Dashboard stats: seconds a computed /stats payload is served from memory
+    STATS_CACHE_TTL: float = float(os.getenv("STATS_CACHE_TTL", "10"))
+
+    # Background jobs (JOB_WORKERS=0 leaves them to `python -m app.cli worker`)
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "1"))
+    JOB_POLL_INTERVAL: float = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+    JOB_HEARTBEAT_INTERVAL: float = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "2.0"))
+    JOB_STALE_AFTER_SECONDS: float = float(os.getenv("JOB_STALE_AFTER_SECONDS", "300"))
+
+    # Observability: /metrics (Prometheus) and app logs, as JSON lines or plain text
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json").lower()
+    READY_TIMEOUT: float = float(os.getenv("READY_TIMEOUT", "2"))  # Seconds /ready waits for the database
+
+    # Request profiling: off, header (only requests sending X-Profile, matching PROFILING_TOKEN if set) or all
+    PROFILING: str = os.getenv("PROFILING", "off").lower()
+    PROFILING_TOKEN: str = os.getenv("PROFILING_TOKEN", "")
+    PROFILER: str = os.getenv("PROFILER", "cprofile").lower()  # cprofile, or pyinstrument if installed
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "./profiles")
+
+    # Security
+    SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
+
 settings = Settings()
\ No newline at end of file
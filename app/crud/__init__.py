@@ -1,17 +1,37 @@
-from .article import (
-    get_article,
-    get_articles,
-    get_article_by_url,
-    create_article,
-    update_article,
-    delete_article
-)
-
-__all__ = [
-    "get_article",
-    "get_articles", 
-    "get_article_by_url",
-    "create_article",
-    "update_article",
-    "delete_article"
+from .article import (
+    get_article,
+    get_articles,
+    get_article_by_url,
+    get_article_async,
+    get_articles_async,
+    get_article_by_url_async,
+    create_article,
+    bulk_create_articles,
+    update_article,
+    bulk_update_articles,
+    get_article_texts,
+    get_articles_to_process,
+    count_articles_to_process,
+    count_articles,
+    count_articles_async,
+    delete_article
+)
+
+__all__ = [
+    "get_article",
+    "get_articles", 
+    "get_article_by_url",
+    "get_article_async",
+    "get_articles_async",
+    "get_article_by_url_async",
+    "create_article",
+    "bulk_create_articles",
+    "update_article",
+    "bulk_update_articles",
+    "get_article_texts",
+    "get_articles_to_process",
+    "count_articles_to_process",
+    "count_articles",
+    "count_articles_async",
+    "delete_article"
 ]
\ No newline at end of file
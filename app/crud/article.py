@@ -1,50 +1,468 @@
-from sqlalchemy.orm import Session
-from app.models.article import Article
-from app.schemas.article import ArticleCreate, ArticleUpdate
-from typing import List, Optional
-
-def get_article(db: Session, article_id: int):
-    return db.query(Article).filter(Article.id == article_id).first()
-
-def get_articles(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(Article).offset(skip).limit(limit).all()
-
-def get_article_by_url(db: Session, url: str):
-    return db.query(Article).filter(Article.url == url).first()
-
-def create_article(db: Session, article: ArticleCreate):
-    # Check if article already exists
-    db_article = get_article_by_url(db, url=article.url)
-    if db_article:
-        return db_article
-    
-    db_article = Article(**article.dict())
-    db.add(db_article)
-    db.commit()
-    db.refresh(db_article)
-    return db_article
-
-def update_article(db: Session, article_id: int, article):
-    db_article = db.query(Article).filter(Article.id == article_id).first()
-    if db_article:
-        # Handle both Pydantic models and dict inputs
-        if hasattr(article, 'dict'):
-            update_data = article.dict(exclude_unset=True)
-        else:
-            update_data = article
-        for field, value in update_data.items():
-            setattr(db_article, field, value)
-        db.commit()
-        db.refresh(db_article)
-    return db_article
-
-def delete_article(db: Session, article_id: int):
-    db_article = db.query(Article).filter(Article.id == article_id).first()
-    if db_article:
-        db.delete(db_article)
-        db.commit()
-    return db_article
-
-def get_all_articles(db: Session):
-    """Return all articles in the database"""
-    return db.query(Article).all()
+import base64
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import LargeBinary, and_, bindparam, func, insert, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased, undefer_group
+from app.models.article import Article
+from app.crud import indicator as crud_indicator
+from app.crud import near_duplicate as crud_near_duplicate
+from app.crud import search as crud_search
+from app.crud import stats as crud_stats
+from app.crud import watchlist as crud_watchlist
+from app.schemas.article import ArticleCreate, ArticleUpdate
+from typing import Dict, List, Optional
+
+# Stay well under SQLite's bound-parameter limit when expanding IN (...) lists
+IN_CHUNK_SIZE = 500
+
+BULK_INSERT_FIELDS = ("title", "url", "content", "source", "published_date")
+
+# Copied from a cluster's canonical article to its near-duplicates
+ANALYSIS_FIELDS = ("summary", "threat_type", "severity", "processed_at")
+
+# Lease column of each batch stage, see claim_articles
+LEASE_COLUMNS = {"analysis": "analysis_lease_until", "extraction": "extraction_lease_until"}
+
+# Columns a list request may project with fields=
+LIST_FIELDS = (
+    "id", "title", "url", "content", "summary", "source", "threat_type", "severity",
+    "iocs", "published_date", "cluster_id", "created_at", "updated_at"
+)
+
+def get_article(db: Session, article_id: int):
+    """One article with its heavy columns (content, iocs) loaded"""
+    return db.query(Article).options(undefer_group("heavy")).filter(Article.id == article_id).first()
+
+def encode_cursor(published_date: Optional[datetime], article_id: int) -> str:
+    raw = f"{published_date.isoformat() if published_date else ''}|{article_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str):
+    """Return (published_date, id) from a cursor, raising ValueError if it is malformed"""
+    try:
+        published, article_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return (datetime.fromisoformat(published) if published else None), int(article_id)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+def _keyset_segments(dialect: str, published_date: Optional[datetime], article_id: int):
+    """Filters for the rows after a cursor, one per index range, in result order.
+
+    Rows with and without a published_date are paged as separate segments so each one
+    stays a plain (published_date, id) range seek. The segment order follows the dialect's
+    NULL placement on DESC: Postgres sorts NULLs first, SQLite sorts them last.
+    """
+    dated = Article.published_date.isnot(None)
+    undated = Article.published_date.is_(None)
+    nulls_first = dialect == "postgresql"
+
+    if published_date is None:
+        segments = [and_(undated, Article.id < article_id)]
+        return segments + ([dated] if nulls_first else [])
+
+    segments = [and_(dated, tuple_(Article.published_date, Article.id) < (published_date, article_id))]
+    return segments + ([] if nulls_first else [undated])
+
+def _list_statements(
+    dialect: str,
+    skip: int,
+    limit: int,
+    cursor: Optional[str],
+    source: Optional[str],
+    threat_type: Optional[str],
+    severity: Optional[str],
+    published_after: Optional[datetime],
+    published_before: Optional[datetime],
+    fields: Optional[List[str]]
+):
+    """SELECTs for one page, to run in order until limit rows are collected.
+
+    Shared by the sync and async listings so both page identically.
+    """
+    if fields:
+        unknown = set(fields) - set(LIST_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        columns = list(dict.fromkeys(["id", "published_date", *fields]))
+        query = select(*(getattr(Article, column) for column in columns))
+    else:
+        query = select(Article)
+
+    if source:
+        query = query.where(Article.source == source)
+    if threat_type:
+        query = query.where(Article.threat_type == threat_type)
+    if severity:
+        query = query.where(Article.severity == severity)
+    if published_after:
+        query = query.where(Article.published_date >= published_after)
+    if published_before:
+        query = query.where(Article.published_date < published_before)
+
+    query = query.order_by(Article.published_date.desc(), Article.id.desc())
+    if cursor:
+        return [query.where(segment) for segment in _keyset_segments(dialect, *decode_cursor(cursor))]
+    return [query.offset(skip)]
+
+def _list_rows(result, fields: Optional[List[str]]) -> list:
+    if fields:
+        return [dict(row) for row in result.mappings()]
+    return list(result.scalars())
+
+def get_articles(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    source: Optional[str] = None,
+    threat_type: Optional[str] = None,
+    severity: Optional[str] = None,
+    published_after: Optional[datetime] = None,
+    published_before: Optional[datetime] = None,
+    fields: Optional[List[str]] = None
+):
+    """List articles newest first.
+
+    Passing the cursor of the previous page seeks on (published_date, id) instead of
+    skipping rows, so every page costs the same. With fields, only those columns (plus
+    id and published_date, which make up the cursor) are selected and plain dicts are
+    returned instead of Article objects.
+    """
+    statements = _list_statements(db.get_bind().dialect.name, skip, limit, cursor, source, threat_type,
+                                  severity, published_after, published_before, fields)
+    rows = []
+    for statement in statements:
+        rows += _list_rows(db.execute(statement.limit(limit - len(rows))), fields)
+        if len(rows) >= limit:
+            break
+    return rows
+
+async def get_articles_async(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    source: Optional[str] = None,
+    threat_type: Optional[str] = None,
+    severity: Optional[str] = None,
+    published_after: Optional[datetime] = None,
+    published_before: Optional[datetime] = None,
+    fields: Optional[List[str]] = None
+):
+    """Same as get_articles, on an AsyncSession"""
+    statements = _list_statements(db.get_bind().dialect.name, skip, limit, cursor, source, threat_type,
+                                  severity, published_after, published_before, fields)
+    rows = []
+    for statement in statements:
+        rows += _list_rows(await db.execute(statement.limit(limit - len(rows))), fields)
+        if len(rows) >= limit:
+            break
+    return rows
+
+async def get_article_async(db: AsyncSession, article_id: int):
+    # Deferred columns can't lazy-load on an AsyncSession, load them with the row
+    return await db.get(Article, article_id, options=[undefer_group("heavy")])
+
+async def get_article_by_url_async(db: AsyncSession, url: str):
+    return (await db.execute(select(Article).where(Article.url == url))).scalars().first()
+
+async def count_articles_async(db: AsyncSession) -> int:
+    return (await db.execute(select(func.count(Article.id)))).scalar()
+
+def get_article_by_url(db: Session, url: str):
+    return db.query(Article).filter(Article.url == url).first()
+
+def create_article(db: Session, article: ArticleCreate):
+    # Check if article already exists
+    db_article = get_article_by_url(db, url=article.url)
+    if db_article:
+        return db_article
+    
+    db_article = Article(**article.dict())
+    db.add(db_article)
+    db.flush()
+    crud_search.index_articles(db, [db_article.id])
+    crud_stats.apply_changes(db, {}, crud_stats.snapshot(db, [db_article.id]))
+    db.commit()
+    db.refresh(db_article)
+    return db_article
+
+def bulk_create_articles(db: Session, articles: List[dict]) -> List[int]:
+    """Insert every article whose URL isn't stored yet in a single transaction.
+
+    Returns the IDs of the rows that were actually inserted.
+    """
+    # Dedupe inside the batch, keeping the first occurrence of each URL
+    candidates = {}
+    for data in articles:
+        candidates.setdefault(data["url"], data)
+    if not candidates:
+        return []
+
+    urls = list(candidates)
+    existing = set()
+    for i in range(0, len(urls), IN_CHUNK_SIZE):
+        chunk = urls[i:i + IN_CHUNK_SIZE]
+        existing.update(db.scalars(select(Article.url).where(Article.url.in_(chunk))))
+
+    new_rows = [
+        {field: data.get(field) for field in BULK_INSERT_FIELDS}
+        for url, data in candidates.items() if url not in existing
+    ]
+    if not new_rows:
+        return []
+
+    # ON CONFLICT keeps a concurrent writer that inserted the same URL from failing the batch
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        stmt = sqlite_insert(Article).on_conflict_do_nothing(index_elements=["url"])
+    elif dialect == "postgresql":
+        stmt = postgresql_insert(Article).on_conflict_do_nothing(index_elements=["url"])
+    else:
+        stmt = insert(Article)
+
+    inserted_ids = list(db.scalars(stmt.returning(Article.id), new_rows))
+    crud_search.index_articles(db, inserted_ids)
+    crud_stats.apply_changes(db, {}, crud_stats.snapshot(db, inserted_ids))
+    db.commit()
+    return inserted_ids
+
+def update_article(db: Session, article_id: int, article):
+    db_article = get_article(db, article_id)
+    if db_article:
+        # Handle both Pydantic models and dict inputs
+        if hasattr(article, 'dict'):
+            update_data = article.dict(exclude_unset=True)
+        else:
+            update_data = article
+        tracked = any(field in update_data for field in crud_stats.TRACKED_FIELDS)
+        before = crud_stats.snapshot(db, [article_id]) if tracked else {}
+        for field, value in update_data.items():
+            setattr(db_article, field, value)
+        db.flush()
+        if any(field in update_data for field in crud_search.INDEXED_FIELDS):
+            crud_search.index_articles(db, [article_id])
+        if tracked:
+            crud_stats.apply_changes(db, before, crud_stats.snapshot(db, [article_id]))
+        db.commit()
+        db.refresh(db_article)
+    return db_article
+
+def bulk_update_articles(db: Session, rows: List[dict]):
+    """Apply per-article updates (each dict carries its "id") in one executemany and commit"""
+    if not rows:
+        return
+    tracked = [row["id"] for row in rows if any(field in row for field in crud_stats.TRACKED_FIELDS)]
+    before = crud_stats.snapshot(db, tracked)
+    db.execute(update(Article), rows)
+    crud_search.index_articles(db, [
+        row["id"] for row in rows if any(field in row for field in crud_search.INDEXED_FIELDS)
+    ])
+    crud_stats.apply_changes(db, before, crud_stats.snapshot(db, tracked))
+    db.commit()
+
+def get_article_texts(db: Session, after_id: int = 0, limit: int = 500, article_ids: Optional[List[int]] = None,
+                      unleased: Optional[str] = None):
+    """Next chunk of (id, title, content, iocs_content_hash) rows after after_id, by id.
+
+    With unleased set to a stage, rows a run holds a lease on for that stage are left out.
+    """
+    query = (
+        db.query(Article.id, Article.title, Article.content, Article.iocs_content_hash)
+        .filter(Article.id > after_id)
+    )
+    if article_ids is not None:
+        query = query.filter(Article.id.in_(article_ids))
+    if unleased:
+        lease = getattr(Article, LEASE_COLUMNS[unleased])
+        query = query.filter(or_(lease.is_(None), lease < datetime.now(timezone.utc)))
+    return query.order_by(Article.id).limit(limit).all()
+
+def claim_articles(db: Session, stage: str, lease_seconds: float, after_id: int = 0, limit: int = 100,
+                   condition=None) -> List[int]:
+    """Lease the next limit articles after after_id (matching condition) that no run holds for stage.
+
+    Returns their ids in order and commits. Postgres picks the candidates with FOR UPDATE
+    SKIP LOCKED, so concurrent claimers split the rows instead of queuing on each other;
+    SQLite has one writer at a time and the UPDATE's own lease check settles races, as
+    for feeds. Clear the lease when writing the row back, or with release_articles.
+    """
+    lease = getattr(Article, LEASE_COLUMNS[stage])
+    now = datetime.now(timezone.utc)
+    free = or_(lease.is_(None), lease < now)
+    candidates = select(Article.id).where(Article.id > after_id, free).order_by(Article.id).limit(limit)
+    if condition is not None:
+        candidates = candidates.where(condition)
+    if db.get_bind().dialect.name == "postgresql":
+        candidates = candidates.with_for_update(skip_locked=True)
+    claimed = db.scalars(
+        update(Article).where(Article.id.in_(candidates), free)
+        # A lease isn't a change incremental exports should pick up
+        .values({lease: now + timedelta(seconds=lease_seconds), Article.updated_at: Article.updated_at})
+        .returning(Article.id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.commit()
+    return sorted(claimed)
+
+def claim_articles_to_extract(db: Session, lease_seconds: float, read_hashes: Dict[int, Optional[str]]) -> List[int]:
+    """claim_articles for extraction, of the articles whose iocs_content_hash is still the one read.
+
+    Read {id: iocs_content_hash} first: an article another run extracted since is left out,
+    even though that run's lease is already gone.
+    """
+    claimed = []
+    items = sorted(read_hashes.items())
+    for i in range(0, len(items), IN_CHUNK_SIZE):
+        chunk = items[i:i + IN_CHUNK_SIZE]
+        unchanged = or_(
+            and_(Article.id.in_([article_id for article_id, digest in chunk if digest is None]),
+                 Article.iocs_content_hash.is_(None)),
+            tuple_(Article.id, Article.iocs_content_hash).in_([item for item in chunk if item[1] is not None]),
+        )
+        claimed.extend(claim_articles(db, "extraction", lease_seconds, limit=len(chunk), condition=unchanged))
+    return claimed
+
+def release_articles(db: Session, stage: str, article_ids: List[int]):
+    """Drop the stage's lease on these articles, e.g. ones a run skipped or gave up on, and commit"""
+    lease = getattr(Article, LEASE_COLUMNS[stage])
+    for i in range(0, len(article_ids), IN_CHUNK_SIZE):
+        db.execute(
+            update(Article).where(Article.id.in_(article_ids[i:i + IN_CHUNK_SIZE]))
+            .values({lease: None, Article.updated_at: Article.updated_at})
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+
+def get_article_iocs(db: Session, after_id: int = 0, limit: int = 500):
+    """Next chunk of (id, title, content, iocs) rows after after_id, by id"""
+    return (
+        db.query(Article.id, Article.title, Article.content, Article.iocs)
+        .filter(Article.id > after_id)
+        .order_by(Article.id)
+        .limit(limit)
+        .all()
+    )
+
+def get_articles_without_full_text(db: Session, after_id: int = 0, limit: int = 100, force: bool = False,
+                                   article_ids: Optional[List[int]] = None):
+    """Next chunk of (id, url, content) rows whose page hasn't been fetched yet (any with force), by id"""
+    query = db.query(Article.id, Article.url, Article.content).filter(Article.id > after_id)
+    if not force:
+        query = query.filter(Article.full_text_at.is_(None))
+    if article_ids is not None:
+        query = query.filter(Article.id.in_(article_ids))
+    return query.order_by(Article.id).limit(limit).all()
+
+def _needs_processing(stale_before: Optional[datetime] = None):
+    # Never processed, or the last attempt stored the summary error fallback
+    condition = or_(Article.summary.is_(None), Article.summary.like("Summary unavailable%"))
+    if stale_before:
+        condition = or_(condition, Article.processed_at < stale_before)
+    # Near-duplicates get their canonical article's analysis instead
+    canonical = or_(Article.cluster_id.is_(None), Article.cluster_id == Article.id)
+    return and_(condition, canonical)
+
+def copy_cluster_analysis(db: Session, canonical_ids: List[int]) -> List[int]:
+    """Give the near-duplicates of these (processed) canonical articles their analysis.
+
+    Does not commit; returns the ids of the updated duplicates.
+    """
+    canonical = aliased(Article)
+    members = []
+    for i in range(0, len(canonical_ids), IN_CHUNK_SIZE):
+        chunk = canonical_ids[i:i + IN_CHUNK_SIZE]
+        members += db.scalars(
+            select(Article.id)
+            .join(canonical, canonical.id == Article.cluster_id)
+            .where(canonical.id.in_(chunk), Article.id != Article.cluster_id, canonical.processed_at.isnot(None))
+        )
+    if not members:
+        return []
+
+    before = crud_stats.snapshot(db, members)
+    values = {
+        field: select(getattr(canonical, field)).where(canonical.id == Article.cluster_id).scalar_subquery()
+        for field in ANALYSIS_FIELDS
+    }
+    for i in range(0, len(members), IN_CHUNK_SIZE):
+        db.execute(
+            update(Article).where(Article.id.in_(members[i:i + IN_CHUNK_SIZE])).values(**values)
+            .execution_options(synchronize_session=False)
+        )
+    crud_search.index_articles(db, members)
+    crud_stats.apply_changes(db, before, crud_stats.snapshot(db, members))
+    return members
+
+def get_articles_to_process(db: Session, after_id: int = 0, limit: int = 100,
+                            stale_before: Optional[datetime] = None, article_ids: Optional[List[int]] = None):
+    """Next chunk of (id, title, content) rows that need AI processing, by id"""
+    query = db.query(Article.id, Article.title, Article.content).filter(
+        Article.id > after_id, _needs_processing(stale_before)
+    )
+    if article_ids is not None:
+        query = query.filter(Article.id.in_(article_ids))
+    return query.order_by(Article.id).limit(limit).all()
+
+def claim_articles_to_process(db: Session, lease_seconds: float, after_id: int = 0, limit: int = 100,
+                              stale_before: Optional[datetime] = None) -> List[int]:
+    """claim_articles for the analysis stage, among the articles that need AI processing"""
+    return claim_articles(db, "analysis", lease_seconds, after_id, limit, _needs_processing(stale_before))
+
+def count_articles_to_process(db: Session, stale_before: Optional[datetime] = None) -> int:
+    return db.query(func.count(Article.id)).filter(_needs_processing(stale_before)).scalar()
+
+def count_articles(db: Session) -> int:
+    return db.query(func.count(Article.id)).scalar()
+
+def delete_article(db: Session, article_id: int):
+    db_article = db.query(Article).filter(Article.id == article_id).first()
+    if db_article:
+        # Drop its indicator links so hit counts stay right (SQLite doesn't enforce the FK cascade)
+        crud_indicator.sync_article_indicators(db, {article_id: {}})
+        crud_search.remove_articles(db, [article_id])
+        crud_near_duplicate.remove_article(db, article_id)
+        crud_watchlist.remove_article_matches(db, [article_id])
+        crud_stats.apply_changes(db, crud_stats.snapshot(db, [article_id]), {})
+        db.delete(db_article)
+        db.commit()
+    return db_article
+
+def get_all_articles(db: Session):
+    """Return all articles in the database; content and iocs load per article on access"""
+    return db.query(Article).all()
+
+def compress_content(db: Session, chunk_size: int = 500) -> int:
+    """Rewrite article bodies still stored as plain text, one committed chunk at a time.
+
+    Returns the number of rows rewritten. The text itself doesn't change, so the search
+    index, rollups and updated_at (export watermarks) are left alone.
+    """
+    table = Article.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        pending = func.typeof(table.c.content) == "text"
+    elif dialect == "postgresql":
+        # Stored values start with a 0x00-0x02 header byte, converted TEXT rows with their first character
+        pending = func.substr(table.c.content, 1, 1) > bindparam("header", b"\x02", type_=LargeBinary)
+    else:
+        pending = table.c.content.isnot(None)
+    stmt = (
+        update(table).where(table.c.id == bindparam("_id"))
+        .values(content=bindparam("_content", type_=table.c.content.type), updated_at=table.c.updated_at)
+    )
+    count, last_id = 0, 0
+    while True:
+        rows = db.execute(
+            select(table.c.id, table.c.content)
+            .where(table.c.id > last_id, table.c.content.isnot(None), pending)
+            .order_by(table.c.id).limit(chunk_size)
+        ).all()
+        if not rows:
+            return count
+        db.execute(stmt, [{"_id": article_id, "_content": content} for article_id, content in rows])
+        db.commit()
+        count += len(rows)
+        last_id = rows[-1].id
@@ -0,0 +1,51 @@
+"""Row streams for bulk exports.
+
+Rows come off a server-side cursor in partitions of yield_per rows, as plain
+column tuples rather than ORM objects, so an export holds one partition in
+memory whatever its total size.
+"""
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Optional, Sequence
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.article import Article
+from app.models.indicator import Indicator
+
+ARTICLE_FIELDS = (
+    "id", "title", "url", "source", "published_date", "threat_type", "severity", "summary",
+    "iocs", "cluster_id", "processed_at", "created_at", "updated_at"
+)
+INDICATOR_FIELDS = ("id", "type", "value", "first_seen", "last_seen", "hit_count")
+
+def _utc(since: datetime) -> datetime:
+    # Timestamps are stored in UTC; a naive watermark is taken to be UTC already
+    return since.astimezone(timezone.utc) if since.tzinfo else since.replace(tzinfo=timezone.utc)
+
+def article_fields(include_content: bool = False) -> List[str]:
+    return [*ARTICLE_FIELDS, "content"] if include_content else list(ARTICLE_FIELDS)
+
+async def stream_articles(db: AsyncSession, fields: Sequence[str], since: Optional[datetime] = None,
+                          source: Optional[str] = None, chunk_size: int = 1000) -> AsyncIterator[list]:
+    """Partitions of article rows; with since, only rows changed at or after it, oldest change first"""
+    query = select(*(getattr(Article, field) for field in fields))
+    if since is not None:
+        query = query.where(Article.updated_at >= _utc(since)).order_by(Article.updated_at, Article.id)
+    else:
+        query = query.order_by(Article.id)
+    if source:
+        query = query.where(Article.source == source)
+    result = await db.stream(query.execution_options(yield_per=chunk_size))
+    async for partition in result.partitions():
+        yield partition
+
+async def stream_indicators(db: AsyncSession, since: Optional[datetime] = None, ioc_type: Optional[str] = None,
+                            chunk_size: int = 1000) -> AsyncIterator[list]:
+    """Partitions of indicator rows still mentioned by an article; with since, only ones seen at or after it"""
+    query = select(*(getattr(Indicator, field) for field in INDICATOR_FIELDS)).where(Indicator.hit_count > 0)
+    if since is not None:
+        query = query.where(Indicator.last_seen >= _utc(since))
+    if ioc_type:
+        query = query.where(Indicator.type == ioc_type)
+    result = await db.stream(query.order_by(Indicator.id).execution_options(yield_per=chunk_size))
+    async for partition in result.partitions():
+        yield partition
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.feed import Feed
+
+# What a poll needs to know about its feed; handed out as plain dicts so they outlive the session
+POLL_FIELDS = (
+    "id", "url", "source", "etag", "last_modified", "poll_interval", "consecutive_failures", "last_new_at"
+)
+
+def get_feed(db: Session, feed_id: int):
+    return db.query(Feed).filter(Feed.id == feed_id).first()
+
+def get_feed_by_url(db: Session, url: str):
+    return db.query(Feed).filter(Feed.url == url).first()
+
+def get_feeds(db: Session, enabled: Optional[bool] = None):
+    query = db.query(Feed)
+    if enabled is not None:
+        query = query.filter(Feed.enabled == enabled)
+    return query.order_by(Feed.id).all()
+
+async def count_feeds_async(db: AsyncSession, enabled: Optional[bool] = None) -> int:
+    query = select(func.count(Feed.id))
+    if enabled is not None:
+        query = query.where(Feed.enabled == enabled)
+    return (await db.execute(query)).scalar()
+
+def create_feed(db: Session, feed) -> Feed:
+    data = feed.dict() if hasattr(feed, "dict") else dict(feed)
+    db_feed = Feed(**data, next_poll_at=datetime.now(timezone.utc))
+    db.add(db_feed)
+    db.commit()
+    db.refresh(db_feed)
+    return db_feed
+
+def update_feed(db: Session, feed_id: int, feed):
+    db_feed = get_feed(db, feed_id)
+    if db_feed:
+        data = feed.dict(exclude_unset=True) if hasattr(feed, "dict") else feed
+        for field, value in data.items():
+            setattr(db_feed, field, value)
+        db.commit()
+        db.refresh(db_feed)
+    return db_feed
+
+def delete_feed(db: Session, feed_id: int):
+    db_feed = get_feed(db, feed_id)
+    if db_feed:
+        db.delete(db_feed)
+        db.commit()
+    return db_feed
+
+def seed_feeds(db: Session, feeds: Iterable[dict]) -> int:
+    """Store a feed list in an empty feeds table; returns the number added"""
+    if db.scalar(select(Feed.id).limit(1)) is not None:
+        return 0
+    now = datetime.now(timezone.utc)
+    rows = [Feed(url=feed["url"], source=feed["source"], next_poll_at=now) for feed in feeds]
+    db.add_all(rows)
+    db.commit()
+    return len(rows)
+
+def claim_feeds(db: Session, lease_seconds: float, limit: int = 20, due_only: bool = True,
+                exclude: Iterable[int] = ()) -> List[dict]:
+    """Lease up to limit enabled feeds (only due ones with due_only) to this caller.
+
+    The conditional UPDATE is the lock, as for jobs: a feed leased by another
+    scheduler or a manual fetch is skipped until that poll records its outcome
+    or the lease runs out.
+    """
+    now = datetime.now(timezone.utc)
+    free = or_(Feed.lease_until.is_(None), Feed.lease_until < now)
+    conditions = [Feed.enabled.is_(True), free]
+    if due_only:
+        conditions.append(or_(Feed.next_poll_at.is_(None), Feed.next_poll_at <= now))
+    exclude = list(exclude)
+    if exclude:
+        conditions.append(Feed.id.notin_(exclude))
+
+    claimed = []
+    candidates = db.execute(
+        select(*(getattr(Feed, field) for field in POLL_FIELDS))
+        .where(*conditions).order_by(Feed.next_poll_at, Feed.id).limit(limit)
+    ).all()
+    for row in candidates:
+        result = db.execute(
+            update(Feed).where(Feed.id == row.id, free)
+            .values(lease_until=now + timedelta(seconds=lease_seconds))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        if result.rowcount == 1:
+            claimed.append(dict(row._mapping))
+    return claimed
+
+def next_due_at(db: Session) -> Optional[datetime]:
+    """When the next enabled feed falls due, leased ones aside"""
+    return db.scalar(
+        select(func.min(Feed.next_poll_at))
+        .where(Feed.enabled.is_(True), Feed.lease_until.is_(None))
+    )
+
+def record_poll(db: Session, feed_id: int, values: dict, new_articles: int = 0):
+    """Store a poll's outcome and schedule, and release the lease"""
+    db.execute(
+        update(Feed).where(Feed.id == feed_id)
+        .values(**values, lease_until=None, last_polled_at=datetime.now(timezone.utc),
+                articles_found=Feed.articles_found + new_articles)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
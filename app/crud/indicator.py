@@ -0,0 +1,174 @@
+import ipaddress
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from sqlalchemy import and_, bindparam, delete, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.models.article import Article
+from app.models.indicator import Indicator, ArticleIndicator
+
+# Stay well under SQLite's bound-parameter limit when expanding IN (...) lists
+IN_CHUNK_SIZE = 500
+
+def _chunks(items: list, size: int = IN_CHUNK_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def ip_to_int(value: str) -> Optional[int]:
+    try:
+        return int(ipaddress.IPv4Address(value))
+    except ValueError:
+        return None
+
+def _insert_ignore(db: Session, model):
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        return sqlite_insert(model).on_conflict_do_nothing()
+    if dialect == "postgresql":
+        return postgresql_insert(model).on_conflict_do_nothing()
+    return insert(model)
+
+def get_indicator_ids(db: Session, pairs: List[tuple]) -> Dict[tuple, int]:
+    """Map (type, value) pairs to indicator IDs, one IN query per chunk of values"""
+    ids = {}
+    values = list({value for _, value in pairs})
+    wanted = set(pairs)
+    for chunk in _chunks(values):
+        rows = db.execute(
+            select(Indicator.id, Indicator.type, Indicator.value).where(Indicator.value.in_(chunk))
+        )
+        for indicator_id, ioc_type, value in rows:
+            if (ioc_type, value) in wanted:
+                ids[(ioc_type, value)] = indicator_id
+    return ids
+
+def sync_article_indicators(db: Session, article_iocs: Dict[int, Dict[str, List[str]]]) -> List[str]:
+    """Make the join table match the IOC dicts of the given articles.
+
+    Creates missing indicators, links/unlinks articles and keeps hit_count and last_seen
+    current. Does not commit; returns the values of indicators created by this call.
+    """
+    if not article_iocs:
+        return []
+    now = datetime.now(timezone.utc)
+
+    wanted = {
+        article_id: {(ioc_type, value) for ioc_type, values in (iocs or {}).items() for value in values}
+        for article_id, iocs in article_iocs.items()
+    }
+    all_pairs = set().union(*wanted.values())
+
+    indicator_ids = get_indicator_ids(db, list(all_pairs))
+    missing = [pair for pair in all_pairs if pair not in indicator_ids]
+    if missing:
+        # Core executemany, like the links below; the ORM bulk path compiled one INSERT per row here
+        db.connection().execute(_insert_ignore(db, Indicator.__table__), [
+            {"type": ioc_type, "value": value, "ip_int": ip_to_int(value) if ioc_type == "ipv4" else None,
+             "first_seen": now, "last_seen": now, "hit_count": 0}
+            for ioc_type, value in missing
+        ])
+        indicator_ids.update(get_indicator_ids(db, missing))
+
+    current = {}
+    for chunk in _chunks(list(wanted)):
+        rows = db.execute(
+            select(ArticleIndicator.article_id, ArticleIndicator.indicator_id)
+            .where(ArticleIndicator.article_id.in_(chunk))
+        )
+        for article_id, indicator_id in rows:
+            current.setdefault(article_id, set()).add(indicator_id)
+
+    links_to_add, links_to_remove, hit_delta = [], [], {}
+    for article_id, pairs in wanted.items():
+        target = {indicator_ids[pair] for pair in pairs}
+        existing = current.get(article_id, set())
+        for indicator_id in target - existing:
+            links_to_add.append({"article_id": article_id, "indicator_id": indicator_id})
+            hit_delta[indicator_id] = hit_delta.get(indicator_id, 0) + 1
+        for indicator_id in existing - target:
+            links_to_remove.append({"b_article_id": article_id, "b_indicator_id": indicator_id})
+            hit_delta[indicator_id] = hit_delta.get(indicator_id, 0) - 1
+
+    # Core executemany: one round-trip per statement instead of one per link/indicator
+    conn = db.connection()
+    links, indicators = ArticleIndicator.__table__, Indicator.__table__
+    if links_to_add:
+        conn.execute(insert(links), links_to_add)
+    if links_to_remove:
+        conn.execute(
+            delete(links).where(and_(
+                links.c.article_id == bindparam("b_article_id"),
+                links.c.indicator_id == bindparam("b_indicator_id")
+            )),
+            links_to_remove
+        )
+    seen = [{"b_id": i, "b_delta": d} for i, d in hit_delta.items() if d > 0]
+    dropped = [{"b_id": i, "b_delta": d} for i, d in hit_delta.items() if d < 0]
+    if seen:
+        conn.execute(
+            update(indicators).where(indicators.c.id == bindparam("b_id"))
+            .values(hit_count=indicators.c.hit_count + bindparam("b_delta"), last_seen=now),
+            seen
+        )
+    if dropped:
+        conn.execute(
+            update(indicators).where(indicators.c.id == bindparam("b_id"))
+            .values(hit_count=indicators.c.hit_count + bindparam("b_delta")),
+            dropped
+        )
+
+    return [value for _, value in missing]
+
+def get_indicator(db: Session, value: str, ioc_type: Optional[str] = None):
+    """value in canonical form, see app.services.ioc_extractor.canonical"""
+    query = db.query(Indicator).filter(Indicator.value == value)
+    if ioc_type:
+        query = query.filter(Indicator.type == ioc_type)
+    return query.all()
+
+def get_indicator_articles(db: Session, indicator_id: int, limit: int = 100):
+    return (
+        db.query(Article.id, Article.title, Article.url, Article.published_date)
+        .join(ArticleIndicator, ArticleIndicator.article_id == Article.id)
+        .filter(ArticleIndicator.indicator_id == indicator_id)
+        .order_by(Article.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+def search_indicators_by_prefix(db: Session, prefix: str, ioc_type: Optional[str] = None, limit: int = 100):
+    # A half-open range instead of LIKE so the B-tree on value is used on every backend
+    query = db.query(Indicator).filter(Indicator.value >= prefix, Indicator.value < prefix + "\uffff")
+    if ioc_type:
+        query = query.filter(Indicator.type == ioc_type)
+    return query.order_by(Indicator.value).limit(limit).all()
+
+def search_indicators_by_cidr(db: Session, cidr: str, limit: int = 100):
+    """Raises ValueError for anything that isn't an IPv4 network"""
+    network = ipaddress.IPv4Network(cidr, strict=False)
+    return (
+        db.query(Indicator)
+        .filter(Indicator.ip_int >= int(network.network_address), Indicator.ip_int <= int(network.broadcast_address))
+        .order_by(Indicator.ip_int)
+        .limit(limit)
+        .all()
+    )
+
+def get_indicators_by_values(db: Session, values: List[str]):
+    indicators = []
+    for chunk in _chunks(values):
+        indicators.extend(db.query(Indicator).filter(Indicator.value.in_(chunk)).all())
+    return indicators
+
+def get_indicator_values_after(db: Session, after_id: int = 0, up_to_id: Optional[int] = None):
+    """(id, value) rows with after_id < id <= up_to_id, used to refresh the in-memory index"""
+    query = select(Indicator.id, Indicator.value).where(Indicator.id > after_id)
+    if up_to_id is not None:
+        query = query.where(Indicator.id <= up_to_id)
+    return db.execute(query.order_by(Indicator.id)).all()
+
+def count_indicators_between(db: Session, after_id: int, up_to_id: int) -> int:
+    return db.execute(
+        select(func.count()).select_from(Indicator).where(Indicator.id > after_id, Indicator.id <= up_to_id)
+    ).scalar()
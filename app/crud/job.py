@@ -0,0 +1,141 @@
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.job import Job, ACTIVE_STATUSES
+
+def dedup_key(kind: str, params: Optional[dict]) -> str:
+    return hashlib.sha256(f"{kind}|{json.dumps(params or {}, sort_keys=True)}".encode()).hexdigest()
+
+def get_job(db: Session, job_id: int):
+    return db.query(Job).filter(Job.id == job_id).first()
+
+def get_active_job(db: Session, key: str):
+    return db.query(Job).filter(Job.dedup_key == key, Job.status.in_(ACTIVE_STATUSES)).first()
+
+def list_jobs(db: Session, status: Optional[str] = None, kind: Optional[str] = None, limit: int = 50):
+    query = db.query(Job)
+    if status:
+        query = query.filter(Job.status == status)
+    if kind:
+        query = query.filter(Job.kind == kind)
+    return query.order_by(Job.id.desc()).limit(limit).all()
+
+def create_job(db: Session, kind: str, params: Optional[dict] = None) -> Tuple[Job, bool]:
+    """Queue a job unless an identical one is already queued or running.
+
+    Returns (job, created); the partial unique index settles races between submitters.
+    """
+    key = dedup_key(kind, params)
+    existing = get_active_job(db, key)
+    if existing:
+        return existing, False
+
+    job = Job(kind=kind, params=params or {}, dedup_key=key, status="queued")
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        existing = get_active_job(db, key)
+        if existing:
+            return existing, False
+        raise
+    db.refresh(job)
+    return job, True
+
+def claim_next_job(db: Session, worker_id: str, kinds=None):
+    """Move the oldest queued job to running for this worker, or return None.
+
+    The conditional UPDATE is the lock: when two workers pick the same row only one
+    of them sees a rowcount of 1, the other moves on to the next candidate.
+    """
+    query = db.query(Job.id).filter(Job.status == "queued")
+    if kinds:
+        query = query.filter(Job.kind.in_(kinds))
+    for (job_id,) in query.order_by(Job.id).limit(5).all():
+        now = datetime.now(timezone.utc)
+        claimed = db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == "queued")
+            .values(status="running", worker_id=worker_id, started_at=now, heartbeat_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        if claimed.rowcount == 1:
+            return get_job(db, job_id)
+    return None
+
+def heartbeat(db: Session, job_id: int, progress: int, total: Optional[int], message: Optional[str]) -> bool:
+    """Store progress and refresh the heartbeat; returns whether cancellation was requested"""
+    db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.status == "running")
+        .values(progress=progress, total=total, message=message, heartbeat_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    cancel_requested = db.query(Job.cancel_requested).filter(Job.id == job_id).scalar()
+    return bool(cancel_requested)
+
+def finish_job(db: Session, job_id: int, status: str, result: Optional[dict] = None, error: Optional[str] = None):
+    db.execute(
+        update(Job)
+        .where(Job.id == job_id)
+        .values(status=status, result=result, error=error, finished_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+def requeue_job(db: Session, job_id: int):
+    """Hand a running job back to the queue, e.g. when its worker shuts down"""
+    db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.status == "running")
+        .values(status="queued", worker_id=None, started_at=None, heartbeat_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+def request_cancel(db: Session, job_id: int):
+    """Queued jobs are cancelled on the spot, running ones at their next progress report"""
+    job = get_job(db, job_id)
+    if not job:
+        return None
+    if job.status == "queued":
+        db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == "queued")
+            .values(status="cancelled", cancel_requested=True, finished_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
+    elif job.status == "running":
+        db.execute(
+            update(Job).where(Job.id == job_id).values(cancel_requested=True)
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+    db.refresh(job)
+    return job
+
+def requeue_stale_jobs(db: Session, stale_after_seconds: float) -> int:
+    """Requeue running jobs whose worker stopped sending heartbeats (crashed or killed)"""
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=stale_after_seconds)
+    result = db.execute(
+        update(Job)
+        .where(Job.status == "running", Job.heartbeat_at < cutoff)
+        .values(status="queued", worker_id=None, started_at=None, heartbeat_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+def count_active_jobs(db: Session) -> dict:
+    """{status: count} of queued and running jobs"""
+    counts = dict.fromkeys(ACTIVE_STATUSES, 0)
+    rows = db.query(Job.status, func.count(Job.id)).filter(Job.status.in_(ACTIVE_STATUSES)).group_by(Job.status)
+    counts.update(dict(rows.all()))
+    return counts
@@ -0,0 +1,23 @@
+from typing import List, Optional
+from sqlalchemy import insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.models.llm_cache import LLMResponse
+
+def get_response(db: Session, cache_key: str) -> Optional[dict]:
+    row = db.query(LLMResponse.response).filter(LLMResponse.cache_key == cache_key).first()
+    return row.response if row else None
+
+def put_responses(db: Session, rows: List[dict]):
+    """Insert cache rows, ignoring keys another writer stored first. Does not commit."""
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        stmt = sqlite_insert(LLMResponse).on_conflict_do_nothing(index_elements=["cache_key"])
+    elif dialect == "postgresql":
+        stmt = postgresql_insert(LLMResponse).on_conflict_do_nothing(index_elements=["cache_key"])
+    else:
+        stmt = insert(LLMResponse)
+    db.execute(stmt, rows)
@@ -0,0 +1,83 @@
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import and_, delete, func, insert, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.models.article import Article
+from app.models.near_duplicate import ArticleLSHBucket
+
+IN_CHUNK_SIZE = 500
+
+def _chunks(items: list, size: int = IN_CHUNK_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def get_candidate_ids(db: Session, keys: List[Tuple[int, str]]) -> Set[int]:
+    """Articles sharing at least one (band, bucket) with the given keys; one PK seek per band"""
+    if not keys:
+        return set()
+    condition = or_(*(and_(ArticleLSHBucket.band == band, ArticleLSHBucket.bucket == bucket) for band, bucket in keys))
+    return set(db.scalars(select(ArticleLSHBucket.article_id).where(condition)))
+
+def get_signatures(db: Session, article_ids: List[int]) -> Dict[int, Tuple[Optional[int], bytes]]:
+    """{id: (cluster_id, minhash)} for the clustered ones among article_ids"""
+    signatures = {}
+    for chunk in _chunks(list(article_ids)):
+        rows = db.execute(
+            select(Article.id, Article.cluster_id, Article.minhash)
+            .where(Article.id.in_(chunk), Article.minhash.isnot(None))
+        )
+        for article_id, cluster_id, minhash in rows:
+            signatures[article_id] = (cluster_id, minhash)
+    return signatures
+
+def get_unclustered_ids(db: Session, after_id: int = 0, limit: int = 500) -> List[int]:
+    return list(db.scalars(
+        select(Article.id).where(Article.id > after_id, Article.minhash.is_(None)).order_by(Article.id).limit(limit)
+    ))
+
+def add_buckets(db: Session, rows: List[dict]):
+    """Insert bucket rows, ignoring ones already present. Does not commit."""
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        stmt = sqlite_insert(ArticleLSHBucket).on_conflict_do_nothing()
+    elif dialect == "postgresql":
+        stmt = postgresql_insert(ArticleLSHBucket).on_conflict_do_nothing()
+    else:
+        stmt = insert(ArticleLSHBucket)
+    db.execute(stmt, rows)
+
+def get_cluster_members(db: Session, cluster_id: int, limit: int = 100):
+    return (
+        db.query(Article.id, Article.title, Article.url, Article.source, Article.published_date)
+        .filter(Article.cluster_id == cluster_id)
+        .order_by(Article.id)
+        .limit(limit)
+        .all()
+    )
+
+def count_clusters(db: Session) -> dict:
+    clustered = db.query(func.count(Article.id)).filter(Article.cluster_id.isnot(None)).scalar()
+    duplicates = db.query(func.count(Article.id)).filter(Article.cluster_id != Article.id).scalar()
+    return {"clustered_articles": clustered, "duplicates": duplicates}
+
+def clear_clusters(db: Session):
+    """Drop every signature, bucket and cluster assignment, e.g. before re-clustering with new parameters"""
+    db.execute(delete(ArticleLSHBucket))
+    db.execute(update(Article).values(cluster_id=None, minhash=None).execution_options(synchronize_session=False))
+    db.commit()
+
+def remove_article(db: Session, article_id: int):
+    """Forget an article's buckets; if it was a canonical, promote its oldest remaining member. Does not commit."""
+    db.execute(delete(ArticleLSHBucket).where(ArticleLSHBucket.article_id == article_id))
+    successor = db.scalar(
+        select(func.min(Article.id)).where(Article.cluster_id == article_id, Article.id != article_id)
+    )
+    if successor is not None:
+        db.execute(
+            update(Article).where(Article.cluster_id == article_id, Article.id != article_id)
+            .values(cluster_id=successor)
+            .execution_options(synchronize_session=False)
+        )
@@ -0,0 +1,210 @@
+"""Full-text index over article title, summary and content.
+
+SQLite uses an FTS5 table keyed by the article id, Postgres a side table with a
+weighted tsvector under a GIN index. Both are maintained by the article write
+paths rather than triggers, since the stored content column isn't always the
+plain text that has to be indexed. The tables themselves are created by the
+baseline migration.
+"""
+import re
+from datetime import datetime
+from typing import Iterable, List, Optional
+from sqlalchemy import DateTime, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.article import Article
+
+IN_CHUNK_SIZE = 500
+
+# Columns a change to which needs the article re-indexed
+INDEXED_FIELDS = ("title", "summary", "content")
+
+HIGHLIGHT_START, HIGHLIGHT_END = "<mark>", "</mark>"
+
+POSTGRES_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(:title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(:summary, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(:content, '')), 'C')"
+)
+
+_OPERATORS = ("OR", "AND", "NOT")
+
+# Quoted phrases, or runs of anything but whitespace and quotes
+_QUERY_TERM = re.compile(r'"([^"]+)"|([^\s"]+)')
+
+
+def _chunks(items: list, size: int = IN_CHUNK_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _table_name(dialect: str) -> Optional[str]:
+    return {"sqlite": "articles_fts", "postgresql": "article_search"}.get(dialect)
+
+
+def rebuild_search_index(db: Session, chunk_size: int = 2000) -> int:
+    """Re-index every article, one committed chunk at a time; returns the number indexed"""
+    count, last_id = 0, 0
+    while True:
+        ids = list(db.scalars(select(Article.id).where(Article.id > last_id).order_by(Article.id).limit(chunk_size)))
+        if not ids:
+            return count
+        index_articles(db, ids)
+        db.commit()
+        count += len(ids)
+        last_id = ids[-1]
+
+
+def index_articles(db: Session, article_ids: Iterable[int]):
+    """(Re)index the given articles from their current row. Does not commit."""
+    dialect = db.get_bind().dialect.name
+    if _table_name(dialect) is None:
+        return
+    for chunk in _chunks(list(article_ids)):
+        rows = [
+            {"id": article_id, "title": title, "summary": summary, "content": content}
+            for article_id, title, summary, content in db.execute(
+                select(Article.id, Article.title, Article.summary, Article.content).where(Article.id.in_(chunk))
+            )
+        ]
+        if dialect == "sqlite":
+            db.execute(text("DELETE FROM articles_fts WHERE rowid = :id"), [{"id": i} for i in chunk])
+            if rows:
+                db.execute(text(
+                    "INSERT INTO articles_fts (rowid, title, summary, content) VALUES (:id, :title, :summary, :content)"
+                ), rows)
+        elif rows:
+            db.execute(text(
+                "INSERT INTO article_search (article_id, title, summary, content, document) "
+                f"VALUES (:id, :title, :summary, :content, {POSTGRES_DOCUMENT}) "
+                "ON CONFLICT (article_id) DO UPDATE SET title = EXCLUDED.title, summary = EXCLUDED.summary, "
+                "content = EXCLUDED.content, document = EXCLUDED.document"
+            ), rows)
+
+
+def remove_articles(db: Session, article_ids: Iterable[int]):
+    """Drop articles from the index. Does not commit."""
+    dialect = db.get_bind().dialect.name
+    ids = [{"id": i} for i in article_ids]
+    if dialect == "sqlite" and ids:
+        db.execute(text("DELETE FROM articles_fts WHERE rowid = :id"), ids)
+    elif dialect == "postgresql" and ids:
+        db.execute(text("DELETE FROM article_search WHERE article_id = :id"), ids)
+
+
+def fts5_query(query: str) -> str:
+    """Turn user input into an FTS5 query that can't be a syntax error.
+
+    Every term is quoted, so CVE-2024-3400 or 10.0.0.1 are matched as phrases instead of
+    being parsed as operators; a trailing * keeps prefix search and OR/AND/NOT pass through
+    when they stand between two terms.
+    """
+    parts = []
+    for phrase, word in _QUERY_TERM.findall(query):
+        if word in _OPERATORS:
+            # An operator needs a term on either side: drop one that leads or follows another
+            if parts and parts[-1] not in _OPERATORS:
+                parts.append(word)
+            continue
+        term = phrase or word
+        prefix = term.endswith("*") and not phrase
+        term = term.rstrip("*") if prefix else term
+        if term:
+            parts.append('"' + term.replace('"', '""') + '"' + ("*" if prefix else ""))
+    if parts and parts[-1] in _OPERATORS:
+        parts.pop()
+    return " ".join(parts)
+
+
+def _search_statement(
+    dialect: str,
+    query: str,
+    skip: int,
+    limit: int,
+    source: Optional[str],
+    threat_type: Optional[str],
+    severity: Optional[str],
+    published_after: Optional[datetime],
+    published_before: Optional[datetime]
+):
+    filters, params = [], {"skip": skip, "limit": limit}
+    for column, value in (("source", source), ("threat_type", threat_type), ("severity", severity)):
+        if value:
+            filters.append(f"a.{column} = :{column}")
+            params[column] = value
+    if published_after:
+        filters.append("a.published_date >= :published_after")
+        params["published_after"] = published_after
+    if published_before:
+        filters.append("a.published_date < :published_before")
+        params["published_before"] = published_before
+    where = "".join(f" AND {condition}" for condition in filters)
+    columns = "a.id, a.title, a.url, a.source, a.threat_type, a.severity, a.summary, a.published_date"
+
+    if dialect == "sqlite":
+        params["query"] = fts5_query(query)
+        # Rank and page on the index alone, then build snippets for the returned rows only;
+        # SQLite evaluates every selected column before sorting. bm25 weights per column:
+        # title, summary, content; lower is better.
+        join = "JOIN articles a ON a.id = articles_fts.rowid " if filters else ""
+        statement = (
+            "WITH ranked AS ("
+            "SELECT articles_fts.rowid AS id, bm25(articles_fts, 10.0, 4.0, 1.0) AS score FROM articles_fts "
+            f"{join}WHERE articles_fts MATCH :query{where} ORDER BY score LIMIT :limit OFFSET :skip) "
+            f"SELECT {columns}, "
+            f"snippet(articles_fts, -1, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}', '…', 24) AS snippet, "
+            "-ranked.score AS rank "
+            "FROM ranked JOIN articles_fts ON articles_fts.rowid = ranked.id JOIN articles a ON a.id = ranked.id "
+            "WHERE articles_fts MATCH :query ORDER BY ranked.score"
+        )
+    elif dialect == "postgresql":
+        params["query"] = query
+        # Rank and page first, so ts_headline only runs on the rows returned
+        statement = (
+            f"SELECT {columns}, "
+            "ts_headline('english', coalesce(s.content, ''), q.query, "
+            f"'StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, MaxFragments=2, MaxWords=30, MinWords=10') "
+            "AS snippet, ranked.rank "
+            "FROM (SELECT s.article_id, ts_rank_cd(s.document, q.query) AS rank "
+            "      FROM article_search s JOIN articles a ON a.id = s.article_id, "
+            "           websearch_to_tsquery('english', :query) q(query) "
+            f"      WHERE s.document @@ q.query{where} "
+            "      ORDER BY rank DESC, s.article_id DESC LIMIT :limit OFFSET :skip) ranked "
+            "JOIN article_search s ON s.article_id = ranked.article_id "
+            "JOIN articles a ON a.id = ranked.article_id, "
+            "websearch_to_tsquery('english', :query) q(query) "
+            "ORDER BY ranked.rank DESC, a.id DESC"
+        )
+    else:
+        # No full-text support: substring match on title and summary (content is stored compressed), newest first
+        params["query"] = f"%{query}%"
+        statement = (
+            f"SELECT {columns}, substr(a.summary, 1, 200) AS snippet, 0.0 AS rank FROM articles a "
+            f"WHERE (a.title LIKE :query OR a.summary LIKE :query){where} "
+            "ORDER BY a.published_date DESC, a.id DESC LIMIT :limit OFFSET :skip"
+        )
+    # Raw SQL gets no type processing; SQLite hands back published_date as a string otherwise
+    return text(statement).columns(published_date=DateTime), params
+
+
+def search_articles(db: Session, query: str, skip: int = 0, limit: int = 20, source: Optional[str] = None,
+                    threat_type: Optional[str] = None, severity: Optional[str] = None,
+                    published_after: Optional[datetime] = None, published_before: Optional[datetime] = None) -> List[dict]:
+    """Ranked matches with a highlighted snippet, best first"""
+    statement, params = _search_statement(db.get_bind().dialect.name, query, skip, limit, source, threat_type,
+                                          severity, published_after, published_before)
+    if params["query"] in ("", "%%"):
+        return []
+    return [dict(row) for row in db.execute(statement, params).mappings()]
+
+
+async def search_articles_async(db: AsyncSession, query: str, skip: int = 0, limit: int = 20,
+                                source: Optional[str] = None, threat_type: Optional[str] = None,
+                                severity: Optional[str] = None, published_after: Optional[datetime] = None,
+                                published_before: Optional[datetime] = None) -> List[dict]:
+    """Same as search_articles, on an AsyncSession"""
+    statement, params = _search_statement(db.get_bind().dialect.name, query, skip, limit, source, threat_type,
+                                          severity, published_after, published_before)
+    if params["query"] in ("", "%%"):
+        return []
+    return [dict(row) for row in (await db.execute(statement, params)).mappings()]
@@ -0,0 +1,119 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.article import Article
+from app.models.indicator import Indicator
+from app.models.stats import StatCount
+
+IN_CHUNK_SIZE = 500
+
+# Article columns the rollups depend on; writes touching none of them skip the bookkeeping
+TRACKED_FIELDS = ("severity", "threat_type", "source", "published_date", "processed_at", "iocs")
+
+UNKNOWN = "unknown"
+
+def _contributions(row) -> List[tuple]:
+    """The (dimension, value) counters one article adds 1 to"""
+    day = row.published_date or row.created_at
+    contributions = [
+        ("total", ""),
+        ("severity", row.severity or UNKNOWN),
+        ("threat_type", row.threat_type or UNKNOWN),
+        ("source", row.source or UNKNOWN),
+        ("day", day.date().isoformat() if day else UNKNOWN),
+    ]
+    if row.processed_at:
+        contributions.append(("processed", ""))
+    if row.iocs and any(row.iocs.values()):
+        contributions.append(("with_iocs", ""))
+    return contributions
+
+def snapshot(db: Session, article_ids: Iterable[int]) -> Dict[int, List[tuple]]:
+    """Current contributions of the given articles, taken before and after a write"""
+    contributions = {}
+    ids = list(article_ids)
+    for i in range(0, len(ids), IN_CHUNK_SIZE):
+        rows = db.execute(
+            select(Article.id, Article.severity, Article.threat_type, Article.source, Article.published_date,
+                   Article.created_at, Article.processed_at, Article.iocs)
+            .where(Article.id.in_(ids[i:i + IN_CHUNK_SIZE]))
+        )
+        for row in rows:
+            contributions[row.id] = _contributions(row)
+    return contributions
+
+def apply_changes(db: Session, before: Dict[int, List[tuple]], after: Dict[int, List[tuple]]):
+    """Add the difference between two snapshots to the rollups. Does not commit."""
+    delta = Counter()
+    for contributions in after.values():
+        delta.update(contributions)
+    for contributions in before.values():
+        delta.subtract(contributions)
+    _increment(db, {key: n for key, n in delta.items() if n})
+
+def _increment(db: Session, delta: Dict[tuple, int]):
+    if not delta:
+        return
+    rows = [{"dimension": dimension, "value": value, "count": n} for (dimension, value), n in delta.items()]
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+        stmt = insert(StatCount)
+        # One atomic upsert per counter, so concurrent writers never lose increments
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["dimension", "value"],
+            set_={"count": StatCount.count + stmt.excluded.count}
+        ), rows)
+        return
+    for row in rows:
+        updated = db.execute(
+            update(StatCount)
+            .where(StatCount.dimension == row["dimension"], StatCount.value == row["value"])
+            .values(count=StatCount.count + row["count"])
+        )
+        if not updated.rowcount:
+            db.add(StatCount(**row))
+
+def rebuild_stats(db: Session, chunk_size: int = 5000) -> int:
+    """Recompute every rollup from the articles table and commit; returns the articles counted"""
+    db.execute(delete(StatCount))
+    delta, counted, last_id = Counter(), 0, 0
+    while True:
+        ids = list(db.scalars(select(Article.id).where(Article.id > last_id).order_by(Article.id).limit(chunk_size)))
+        if not ids:
+            break
+        for contributions in snapshot(db, ids).values():
+            delta.update(contributions)
+        counted += len(ids)
+        last_id = ids[-1]
+    _increment(db, dict(delta))
+    db.commit()
+    return counted
+
+def rebuild_stats_if_empty(db: Session) -> bool:
+    """Fill the rollups for a database that has articles from before they existed"""
+    if db.scalar(select(StatCount.dimension).limit(1)) is not None:
+        return False
+    if db.scalar(select(Article.id).limit(1)) is None:
+        return False
+    rebuild_stats(db)
+    return True
+
+async def get_counts_async(db: AsyncSession) -> Dict[str, Dict[str, int]]:
+    """{dimension: {value: count}} for every non-zero counter"""
+    counts = {}
+    result = await db.execute(select(StatCount.dimension, StatCount.value, StatCount.count).where(StatCount.count != 0))
+    for dimension, value, count in result:
+        counts.setdefault(dimension, {})[value] = count
+    return counts
+
+async def get_top_indicators_async(db: AsyncSession, limit: int = 10, ioc_type: Optional[str] = None):
+    query = select(Indicator.type, Indicator.value, Indicator.hit_count).where(Indicator.hit_count > 0)
+    if ioc_type:
+        query = query.where(Indicator.type == ioc_type)
+    result = await db.execute(query.order_by(Indicator.hit_count.desc(), Indicator.id).limit(limit))
+    return [dict(row) for row in result.mappings()]
@@ -0,0 +1,50 @@
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.article import Article
+
+# Routes whose labels came from the LLM, see app.services.triage
+LLM_ROUTES = ("audit", "high_value", "uncertain", "untrained")
+
+def get_training_rows(db: Session, limit: int = 5000):
+    """(title, content, threat_type, severity) of the latest articles the LLM labelled, newest first.
+
+    Labels the triage tier set itself, error fallbacks and near-duplicates (which carry
+    their canonical article's labels) are left out.
+    """
+    return db.execute(
+        select(Article.title, Article.content, Article.threat_type, Article.severity)
+        .where(
+            Article.processed_at.isnot(None),
+            Article.threat_type.isnot(None),
+            Article.severity.isnot(None),
+            Article.summary.notlike("Summary unavailable%"),
+            or_(Article.triage_route.is_(None), Article.triage_route.in_(LLM_ROUTES)),
+            or_(Article.cluster_id.is_(None), Article.cluster_id == Article.id),
+        )
+        .order_by(Article.processed_at.desc())
+        .limit(limit)
+    ).all()
+
+def _route_counts():
+    def matches(predicted, actual):
+        return func.sum(case((predicted == actual, 1), else_=0))
+
+    return (
+        select(
+            Article.triage_route.label("route"),
+            func.count(Article.id).label("articles"),
+            func.count(Article.triage_threat_type).label("compared"),
+            matches(Article.triage_threat_type, Article.threat_type).label("threat_type_agreed"),
+            matches(Article.triage_severity, Article.severity).label("severity_agreed"),
+        )
+        .where(Article.triage_route.isnot(None))
+        .group_by(Article.triage_route)
+    )
+
+async def get_route_counts_async(db: AsyncSession) -> list:
+    """Per triage route: articles, how many carry a prediction and how many of those matched the stored labels"""
+    return [dict(row) for row in (await db.execute(_route_counts())).mappings()]
+
+def get_route_counts(db: Session) -> list:
+    return [dict(row) for row in db.execute(_route_counts()).mappings()]
@@ -0,0 +1,160 @@
+from datetime import datetime, timezone
+from typing import Iterator, List, Optional, Set, Tuple
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.models.article import Article
+from app.models.watchlist import Watchlist, WatchlistEntry, WatchlistMatch
+
+# Stay well under SQLite's bound-parameter limit when expanding IN (...) lists
+IN_CHUNK_SIZE = 500
+
+def _chunks(items: list, size: int = IN_CHUNK_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def _insert_ignore(db: Session, model):
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        return sqlite_insert(model).on_conflict_do_nothing()
+    if dialect == "postgresql":
+        return postgresql_insert(model).on_conflict_do_nothing()
+    return insert(model)
+
+def get_watchlist(db: Session, watchlist_id: int):
+    return db.query(Watchlist).filter(Watchlist.id == watchlist_id).first()
+
+def get_watchlist_by_name(db: Session, name: str):
+    return db.query(Watchlist).filter(Watchlist.name == name).first()
+
+def get_watchlists(db: Session, enabled: Optional[bool] = None):
+    query = db.query(Watchlist)
+    if enabled is not None:
+        query = query.filter(Watchlist.enabled == enabled)
+    return query.order_by(Watchlist.id).all()
+
+def create_watchlist(db: Session, watchlist) -> Watchlist:
+    data = watchlist.dict() if hasattr(watchlist, "dict") else dict(watchlist)
+    db_watchlist = Watchlist(**data, updated_at=datetime.now(timezone.utc))
+    db.add(db_watchlist)
+    db.commit()
+    db.refresh(db_watchlist)
+    return db_watchlist
+
+def update_watchlist(db: Session, watchlist_id: int, watchlist):
+    db_watchlist = get_watchlist(db, watchlist_id)
+    if db_watchlist:
+        data = watchlist.dict(exclude_unset=True) if hasattr(watchlist, "dict") else watchlist
+        for field, value in data.items():
+            setattr(db_watchlist, field, value)
+        db_watchlist.updated_at = datetime.now(timezone.utc)
+        db.commit()
+        db.refresh(db_watchlist)
+    return db_watchlist
+
+def delete_watchlist(db: Session, watchlist_id: int):
+    db_watchlist = get_watchlist(db, watchlist_id)
+    if db_watchlist:
+        # Explicit, SQLite doesn't enforce the FK cascade
+        db.execute(delete(WatchlistMatch).where(WatchlistMatch.watchlist_id == watchlist_id))
+        db.execute(delete(WatchlistEntry).where(WatchlistEntry.watchlist_id == watchlist_id))
+        db.delete(db_watchlist)
+        db.commit()
+    return db_watchlist
+
+def _touch(db: Session, watchlist_id: int):
+    """Recount a list's entries and bump updated_at so matchers pick the change up"""
+    count = select(func.count(WatchlistEntry.id)).where(WatchlistEntry.watchlist_id == watchlist_id).scalar_subquery()
+    db.execute(
+        update(Watchlist).where(Watchlist.id == watchlist_id)
+        .values(entry_count=count, updated_at=datetime.now(timezone.utc))
+    )
+
+def add_entries(db: Session, watchlist_id: int, entries: List[dict]) -> int:
+    """Insert {type, value, note} entries, skipping ones already on the list; returns the number added"""
+    before = db.scalar(select(Watchlist.entry_count).where(Watchlist.id == watchlist_id)) or 0
+    stmt = _insert_ignore(db, WatchlistEntry)
+    for chunk in _chunks(entries, 5000):
+        db.execute(stmt, [{**entry, "watchlist_id": watchlist_id} for entry in chunk])
+    _touch(db, watchlist_id)
+    db.commit()
+    return db.scalar(select(Watchlist.entry_count).where(Watchlist.id == watchlist_id)) - before
+
+def get_entries(db: Session, watchlist_id: int, entry_type: Optional[str] = None, after_id: int = 0,
+                limit: int = 100):
+    query = db.query(WatchlistEntry).filter(WatchlistEntry.watchlist_id == watchlist_id, WatchlistEntry.id > after_id)
+    if entry_type:
+        query = query.filter(WatchlistEntry.type == entry_type)
+    return query.order_by(WatchlistEntry.id).limit(limit).all()
+
+def delete_entry(db: Session, watchlist_id: int, entry_id: int):
+    db_entry = (
+        db.query(WatchlistEntry)
+        .filter(WatchlistEntry.id == entry_id, WatchlistEntry.watchlist_id == watchlist_id)
+        .first()
+    )
+    if db_entry:
+        db.execute(delete(WatchlistMatch).where(WatchlistMatch.entry_id == entry_id))
+        db.delete(db_entry)
+        db.flush()
+        _touch(db, watchlist_id)
+        db.commit()
+    return db_entry
+
+def get_version(db: Session) -> tuple:
+    """Changes whenever any list or entry does; cheap enough to poll"""
+    return tuple(db.execute(
+        select(func.count(Watchlist.id), func.max(Watchlist.updated_at), func.sum(Watchlist.entry_count))
+    ).one())
+
+def iter_enabled_entries(db: Session, batch: int = 10000) -> Iterator[Tuple[int, int, str, str]]:
+    """(entry id, watchlist id, type, value) of every entry on an enabled list, streamed"""
+    query = (
+        select(WatchlistEntry.id, WatchlistEntry.watchlist_id, WatchlistEntry.type, WatchlistEntry.value)
+        .join(Watchlist, Watchlist.id == WatchlistEntry.watchlist_id)
+        .where(Watchlist.enabled.is_(True))
+    )
+    yield from db.execute(query.execution_options(yield_per=batch))
+
+def get_existing_matches(db: Session, article_ids: List[int]) -> Set[Tuple[int, int, str]]:
+    """(entry id, article id, ioc value) already recorded for these articles"""
+    existing = set()
+    for chunk in _chunks(list(article_ids)):
+        existing.update(db.execute(
+            select(WatchlistMatch.entry_id, WatchlistMatch.article_id, WatchlistMatch.ioc_value)
+            .where(WatchlistMatch.article_id.in_(chunk))
+        ).all())
+    return existing
+
+def add_matches(db: Session, matches: List[dict]):
+    """Insert {watchlist_id, entry_id, article_id, ioc_type, ioc_value} rows. Does not commit."""
+    if matches:
+        db.execute(_insert_ignore(db, WatchlistMatch), matches)
+
+def remove_article_matches(db: Session, article_ids: List[int]):
+    for chunk in _chunks(list(article_ids)):
+        db.execute(delete(WatchlistMatch).where(WatchlistMatch.article_id.in_(chunk)))
+
+def get_matches(db: Session, watchlist_id: Optional[int] = None, article_id: Optional[int] = None,
+                before_id: Optional[int] = None, limit: int = 100):
+    """Newest first; pass the last id seen as before_id for the next page"""
+    query = (
+        db.query(
+            WatchlistMatch.id, WatchlistMatch.watchlist_id, Watchlist.name.label("watchlist_name"),
+            WatchlistMatch.entry_id, WatchlistEntry.type.label("entry_type"), WatchlistEntry.value.label("entry_value"),
+            WatchlistEntry.note.label("entry_note"), WatchlistMatch.article_id,
+            Article.title.label("article_title"), Article.url.label("article_url"),
+            WatchlistMatch.ioc_type, WatchlistMatch.ioc_value, WatchlistMatch.matched_at
+        )
+        .join(Watchlist, Watchlist.id == WatchlistMatch.watchlist_id)
+        .join(WatchlistEntry, WatchlistEntry.id == WatchlistMatch.entry_id)
+        .join(Article, Article.id == WatchlistMatch.article_id)
+    )
+    if watchlist_id is not None:
+        query = query.filter(WatchlistMatch.watchlist_id == watchlist_id)
+    if article_id is not None:
+        query = query.filter(WatchlistMatch.article_id == article_id)
+    if before_id is not None:
+        query = query.filter(WatchlistMatch.id < before_id)
+    return query.order_by(WatchlistMatch.id.desc()).limit(limit).all()
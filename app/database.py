@@ -1,25 +1,189 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-
-from app.config import settings
-
-# Create SQLAlchemy engine
-engine = create_engine(
-    settings.DATABASE_URL, 
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
-)
-
-# Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-# Create Base class
-Base = declarative_base()
-
-# Dependency to get database session
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
\ No newline at end of file
+import logging
+import os
+from contextlib import contextmanager
+from typing import Optional, Set, Tuple
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import NoSuchModuleError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+
+from app.config import settings
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+# pg_advisory_xact_lock key serializing migrations across processes
+SCHEMA_LOCK_KEY = 0x61726775
+
+logger = logging.getLogger(__name__)
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+def async_database_url(url: str) -> Optional[str]:
+    """The async driver's URL for a sync DATABASE_URL, e.g. sqlite:// -> sqlite+aiosqlite://; None if unknown"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        return None
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+def _is_sqlite_memory(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+
+def _engine_options(url: str, is_async: bool = False) -> dict:
+    options = {}
+    if make_url(url).get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+        # In-memory databases live in a single connection, pooling them makes no sense
+        if _is_sqlite_memory(url):
+            return options
+        if is_async:
+            # aiosqlite defaults to NullPool, i.e. a fresh connection (and PRAGMAs) per session
+            options["poolclass"] = AsyncAdaptedQueuePool
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+    return options
+
+def _configure_sqlite(dbapi_connection, connection_record):
+    """WAL lets readers run while a writer commits; busy_timeout makes writers wait instead of failing"""
+    cursor = dbapi_connection.cursor()
+    if settings.SQLITE_WAL:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+# Create SQLAlchemy engine
+engine = create_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL))
+
+def _create_async_engine():
+    """Async engine for the non-blocking endpoints, sharing the same database.
+
+    None, with a warning, when DATABASE_URL's backend has no known async driver or it isn't
+    installed: the sync API, the CLI and migrations still work, async routes fail when called.
+    """
+    url = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+    if url:
+        try:
+            return create_async_engine(url, **_engine_options(url, is_async=True))
+        except (ImportError, NoSuchModuleError) as e:
+            logger.warning("Async database driver not installed, async routes are unavailable",
+                           extra={"url": make_url(url).render_as_string(), "error": str(e)})
+            return None
+    logger.warning("No async driver for this database, set ASYNC_DATABASE_URL; async routes are unavailable",
+                   extra={"backend": make_url(settings.DATABASE_URL).get_backend_name()})
+    return None
+
+def _no_async_engine():
+    raise RuntimeError("No async database engine: set ASYNC_DATABASE_URL or install the async driver")
+
+async_engine = _create_async_engine()
+
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", _configure_sqlite)
+if async_engine is not None and async_engine.dialect.name == "sqlite":
+    event.listen(async_engine.sync_engine, "connect", _configure_sqlite)
+
+# Create SessionLocal class
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = (async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+                     if async_engine is not None else _no_async_engine)
+
+# Create Base class
+Base = declarative_base()
+
+def alembic_config():
+    """Alembic configuration for the app's migrations, independent of the working directory"""
+    from alembic.config import Config
+
+    config = Config()
+    config.set_main_option("script_location", MIGRATIONS_DIR)
+    return config
+
+@contextmanager
+def schema_lock(bind=None):
+    """A connection in a transaction that holds the schema lock until it ends.
+
+    Processes starting together (uvicorn --workers, several CLI workers) take turns:
+    the first one migrates, the others wait for it and then find nothing to do.
+    """
+    bind = bind or engine
+    if bind.dialect.name == "sqlite" and not _is_sqlite_memory(bind.url):
+        # pysqlite runs DDL outside of transactions; a connection that issues BEGIN IMMEDIATE
+        # itself holds the write lock for the whole migration, and waiters block on busy_timeout
+        lock_engine = create_engine(
+            bind.url, poolclass=NullPool,
+            connect_args={"check_same_thread": False, "timeout": settings.MIGRATION_LOCK_TIMEOUT}
+        )
+        event.listen(lock_engine, "connect", lambda dbapi_connection, record: setattr(
+            dbapi_connection, "isolation_level", None
+        ))
+        event.listen(lock_engine, "begin", lambda conn: conn.exec_driver_sql("BEGIN IMMEDIATE"))
+        try:
+            with lock_engine.begin() as connection:
+                yield connection
+        finally:
+            lock_engine.dispose()
+        return
+    with bind.begin() as connection:
+        if bind.dialect.name == "postgresql":
+            # DDL is transactional on Postgres, the migration commits or rolls back as a whole
+            connection.execute(text(f"SET LOCAL lock_timeout = '{int(settings.MIGRATION_LOCK_TIMEOUT * 1000)}ms'"))
+            connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+        yield connection
+
+def migrate(bind=None, revision: str = "head"):
+    """Upgrade the schema to revision with Alembic; safe to call from several processes at once"""
+    from alembic import command
+    from alembic.migration import MigrationContext
+
+    config = alembic_config()
+    with schema_lock(bind) as connection:
+        before = MigrationContext.configure(connection).get_current_heads()
+        config.attributes["connection"] = connection
+        command.upgrade(config, revision)
+        after = MigrationContext.configure(connection).get_current_heads()
+    if after != before:
+        logger.info("Database schema migrated", extra={"from_revision": ",".join(before) or None,
+                                                       "to_revision": ",".join(after)})
+
+def schema_revisions(bind=None) -> Tuple[Set[str], Set[str]]:
+    """(revisions the database is at, head revisions of the migration scripts)"""
+    from alembic.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    with (bind or engine).connect() as connection:
+        current = set(MigrationContext.configure(connection).get_current_heads())
+    return current, set(ScriptDirectory.from_config(alembic_config()).get_heads())
+
+def ensure_schema(bind=None):
+    """On startup: migrate with AUTO_MIGRATE, otherwise refuse to run against an outdated schema"""
+    if settings.AUTO_MIGRATE:
+        migrate(bind)
+        return
+    current, head = schema_revisions(bind)
+    if current != head:
+        raise RuntimeError(
+            f"Database schema is at {', '.join(sorted(current)) or 'no revision'}, the code expects "
+            f"{', '.join(sorted(head))}; run `python -m app.cli migrate` or set AUTO_MIGRATE=true"
+        )
+
+# Dependency to get database session
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
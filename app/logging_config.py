@@ -0,0 +1,56 @@
+"""Logging for the app.* loggers: one JSON object per line, or key=value text for a terminal.
+
+Modules log through logging.getLogger(__name__) and pass structured fields as
+extra={...}; they become keys of the JSON object rather than being formatted into
+the message, so logs can be filtered on feed, job or article ids.
+"""
+import json
+import logging
+import sys
+from datetime import datetime, timezone
+
+from app.config import settings
+
+# Attributes every LogRecord has; anything else on a record came in through extra=
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+def _extra(record: logging.LogRecord) -> dict:
+    return {key: value for key, value in vars(record).items() if key not in _RESERVED}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **_extra(record),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = " ".join(f"{key}={value}" for key, value in _extra(record).items())
+        return f"{line} {fields}" if fields else line
+
+
+def configure_logging():
+    """Send app.* records to stderr in LOG_FORMAT at LOG_LEVEL; safe to call more than once"""
+    logger = logging.getLogger("app")
+    if getattr(logger, "_argus_configured", False):
+        return
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else TextFormatter())
+    logger.addHandler(handler)
+    logger.setLevel(settings.LOG_LEVEL)
+    logger.propagate = False
+    logger._argus_configured = True
@@ -1,39 +1,111 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from app.config import settings
-from app.database import engine, Base
-
-# Import routers
-from app.api.endpoints import articles, operations
-
-# Create tables
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI(
-    title=settings.PROJECT_NAME,
-    version=settings.PROJECT_VERSION
-)
-
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3000"],  # React app origin
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(articles.router, prefix="/api/v1", tags=["articles"])
-app.include_router(operations.router, prefix="/api/v1", tags=["operations"])
-
-@app.get("/")
-async def root():
-    return {
-        "message": "Welcome to Argus Cybersecurity Threat Intelligence API",
-        "version": settings.PROJECT_VERSION
-    }
-
-@app.get("/health")
-async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from app.config import settings
+from app.logging_config import configure_logging
+from app import metrics
+from app.profiling import ProfilingMiddleware
+from app.database import engine, async_engine, ensure_schema
+from app.services.jobs import job_queue
+from app.services.feed_scheduler import feed_scheduler
+
+# Import routers
+from app.api.endpoints import articles, operations, indicators, jobs, stats, export, feeds, watchlists
+
+# Importing this module only builds the app: logging, the schema and background services are set up
+# in lifespan, and services with a costly setup are built on first use (see benchmarks/bench_startup.py)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_logging()
+    if settings.METRICS_ENABLED:
+        metrics.instrument_engine(engine, "sync")
+        if async_engine is not None:
+            metrics.instrument_engine(async_engine.sync_engine, "async")
+    # Migrations take a database lock, so workers starting together run them one at a time
+    ensure_schema()
+    # In-process job workers and feed scheduler; set JOB_WORKERS=0 and run `python -m app.cli worker`
+    # to keep the API read-only
+    if settings.JOB_WORKERS > 0:
+        job_queue.start(settings.JOB_WORKERS)
+        if settings.FEED_SCHEDULER:
+            feed_scheduler.start()
+    yield
+    feed_scheduler.stop()
+    job_queue.stop()
+    if async_engine is not None:
+        await async_engine.dispose()
+    engine.dispose()
+
+app = FastAPI(
+    title=settings.PROJECT_NAME,
+    version=settings.PROJECT_VERSION,
+    lifespan=lifespan
+)
+
+# Add CORS middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["http://localhost:3000"],  # React app origin
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Export-Watermark", "X-Profile-Path"],
+)
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+# Outermost, so a profile covers the whole request including the other middleware
+if settings.PROFILING != "off":
+    app.add_middleware(ProfilingMiddleware)
+
+# Include routers
+app.include_router(articles.router, prefix="/api/v1", tags=["articles"])
+app.include_router(operations.router, prefix="/api/v1", tags=["operations"])
+app.include_router(indicators.router, prefix="/api/v1", tags=["indicators"])
+app.include_router(jobs.router, prefix="/api/v1", tags=["jobs"])
+app.include_router(stats.router, prefix="/api/v1", tags=["stats"])
+app.include_router(export.router, prefix="/api/v1", tags=["export"])
+app.include_router(feeds.router, prefix="/api/v1", tags=["feeds"])
+app.include_router(watchlists.router, prefix="/api/v1", tags=["watchlists"])
+
+@app.get("/")
+async def root():
+    return {
+        "message": "Welcome to Argus Cybersecurity Threat Intelligence API",
+        "version": settings.PROJECT_VERSION
+    }
+
+@app.get("/health")
+async def health_check():
+    """Liveness: the process is up and serving"""
+    return {"status": "healthy"}
+
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: the database answers within READY_TIMEOUT"""
+    def ping_sync():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    async def ping():
+        if async_engine is None:
+            # No async driver for this database, see app.database
+            return await asyncio.to_thread(ping_sync)
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    try:
+        await asyncio.wait_for(ping(), settings.READY_TIMEOUT)
+    except Exception as e:
+        return JSONResponse(status_code=503, content={"status": "unavailable", "database": str(e) or type(e).__name__})
+    return {"status": "ready", "database": "ok"}
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    if not settings.METRICS_ENABLED:
+        return Response(status_code=404)
+    body, content_type = metrics.render()
+    return Response(content=body, headers={"Content-Type": content_type})
\ No newline at end of file
@@ -0,0 +1,181 @@
+"""Prometheus metrics for the API and the pipeline stages behind it.
+
+Metrics live in the default registry of each process: GET /metrics serves the API
+process's, `python -m app.cli worker --metrics-port N` serves a worker's.
+"""
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+
+# Seconds; the pipeline stages run much longer than the API's requests
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SLOW_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0, 64.0, 128.0)
+
+HTTP_REQUESTS = Counter("argus_http_requests_total", "HTTP requests", ["method", "route", "status"])
+HTTP_LATENCY = Histogram("argus_http_request_duration_seconds", "HTTP request latency, until the last body byte",
+                         ["method", "route"])
+HTTP_DB_QUERIES = Histogram("argus_http_request_db_queries", "Database queries run by one HTTP request", ["route"],
+                            buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 500))
+HTTP_DB_SECONDS = Histogram("argus_http_request_db_seconds", "Database time of one HTTP request", ["route"],
+                            buckets=FAST_BUCKETS)
+
+DB_QUERIES = Counter("argus_db_queries_total", "Database queries", ["engine"])
+DB_QUERY_SECONDS = Histogram("argus_db_query_duration_seconds", "Database query latency", ["engine"],
+                             buckets=FAST_BUCKETS)
+
+FEED_FETCHES = Counter("argus_feed_fetches_total", "Feed fetches by outcome", ["status"])
+FEED_FETCH_SECONDS = Histogram("argus_feed_fetch_duration_seconds", "Feed fetch and parse time", ["status"],
+                               buckets=SLOW_BUCKETS)
+FEED_BYTES = Counter("argus_feed_bytes_total", "Feed response bytes downloaded")
+FEED_NEW_ARTICLES = Counter("argus_feed_new_articles_total", "Articles stored from feeds that weren't seen before")
+
+PAGE_FETCHES = Counter("argus_page_fetches_total", "Full-text page lookups by outcome", ["result"])
+PAGE_BYTES = Counter("argus_page_bytes_total", "Full-text page bytes downloaded")
+
+IOC_ARTICLES = Counter("argus_ioc_articles_total", "Articles through batch IOC extraction", ["result"])
+IOC_BYTES = Counter("argus_ioc_bytes_total", "Text bytes scanned by batch IOC extraction")
+IOC_FOUND = Counter("argus_ioc_found_total", "Indicators found by batch IOC extraction")
+
+LLM_REQUESTS = Counter("argus_llm_requests_total", "LLM calls by outcome", ["outcome"])
+LLM_LATENCY = Histogram("argus_llm_request_duration_seconds", "LLM call latency", buckets=SLOW_BUCKETS)
+LLM_TOKENS = Counter("argus_llm_tokens_total", "LLM tokens reported by the provider", ["kind"])
+LLM_RETRIES = Counter("argus_llm_retries_total", "LLM calls retried after a rate limit or transient error")
+LLM_INVALID_REPLIES = Counter("argus_llm_invalid_replies_total", "LLM replies that didn't fit the analysis schema")
+TRIAGE_DECISIONS = Counter("argus_triage_decisions_total", "Articles routed by the local triage tier", ["route"])
+TRIAGE_AGREEMENT = Counter("argus_triage_agreement_total", "Triage predictions checked against the LLM's labels",
+                           ["field", "route", "result"])
+
+WATCHLIST_ENTRIES = Gauge("argus_watchlist_entries", "Watchlist entries loaded for matching", ["type"])
+WATCHLIST_RELOADS = Counter("argus_watchlist_reloads_total", "Watchlist snapshots rebuilt")
+WATCHLIST_MATCHES = Counter("argus_watchlist_matches_total", "New watchlist matches recorded")
+WATCHLIST_MATCH_SECONDS = Histogram("argus_watchlist_match_duration_seconds", "Matching one article against the watchlists",
+                                    buckets=(0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.005))
+
+CACHE_LOOKUPS = Counter("argus_cache_lookups_total", "Cache lookups", ["cache", "result"])
+
+JOBS_FINISHED = Counter("argus_jobs_finished_total", "Background jobs finished", ["kind", "status"])
+JOB_SECONDS = Histogram("argus_job_duration_seconds", "Background job run time", ["kind"],
+                        buckets=(1, 5, 15, 60, 300, 900, 3600, 14400))
+
+# [queries, seconds] of the HTTP request being served, None outside of one
+_request_db: ContextVar[Optional[list]] = ContextVar("request_db", default=None)
+
+
+def cache_lookup(cache: str, hit: bool):
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def llm_call(seconds: float, outcome: str, usage=None):
+    """One provider call: outcome is ok, rate_limited or error; usage is the response's token usage"""
+    LLM_REQUESTS.labels(outcome).inc()
+    LLM_LATENCY.observe(seconds)
+    if usage is not None:
+        LLM_TOKENS.labels("prompt").inc(usage.prompt_tokens or 0)
+        LLM_TOKENS.labels("completion").inc(usage.completion_tokens or 0)
+
+
+def instrument_engine(engine, name: str):
+    """Count and time every query on a (sync) engine; pass async_engine.sync_engine for the async one"""
+    if getattr(engine, "_argus_instrumented", False):
+        return
+    engine._argus_instrumented = True
+    queries, seconds = DB_QUERIES.labels(name), DB_QUERY_SECONDS.labels(name)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        queries.inc()
+        seconds.observe(elapsed)
+        request = _request_db.get()
+        if request is not None:
+            request[0] += 1
+            request[1] += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(context):
+        # A failed statement never reaches after_cursor_execute; drop its start so the stack doesn't grow
+        conn = context.connection
+        starts = conn.info.get("query_start") if conn is not None else None
+        if starts:
+            starts.pop()
+
+
+class JobQueueCollector:
+    """Queued and running jobs, counted in the database at scrape time"""
+
+    def collect(self):
+        from app.crud import job as crud_job
+        from app.database import SessionLocal
+
+        gauge = GaugeMetricFamily("argus_jobs", "Jobs in the queue by status", labels=["status"])
+        try:
+            with SessionLocal() as db:
+                counts = crud_job.count_active_jobs(db)
+        except Exception:
+            return  # A scrape shouldn't fail because the database is down; /ready reports that
+        for status, count in counts.items():
+            gauge.add_metric([status], count)
+        yield gauge
+
+
+REGISTRY.register(JobQueueCollector())
+
+
+class MetricsMiddleware:
+    """Latency, status and database usage of every HTTP request, labelled by route template.
+
+    Plain ASGI rather than BaseHTTPMiddleware, so streamed responses are timed until
+    their last chunk and the request's DB counter is visible to the endpoint.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._routes: Dict[object, str] = {}
+
+    def _route(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"  # Keeps 404 scans from creating a series per path
+        if endpoint not in self._routes:
+            for route in scope["app"].routes:
+                self._routes[getattr(route, "endpoint", None)] = route.path
+        return self._routes.get(endpoint, "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        db = [0, 0.0]
+        token = _request_db.set(db)
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_db.reset(token)
+            route = self._route(scope)
+            HTTP_REQUESTS.labels(scope["method"], route, str(status)).inc()
+            HTTP_LATENCY.labels(scope["method"], route).observe(elapsed)
+            HTTP_DB_QUERIES.labels(route).observe(db[0])
+            HTTP_DB_SECONDS.labels(route).observe(db[1])
+
+
+def render() -> tuple:
+    """(body, content type) of the exposition format"""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,49 @@
+"""Alembic environment.
+
+Run through app.database.migrate(), which passes in a connection holding the
+schema lock, or from the repository root with `alembic upgrade head` /
+`alembic revision --autogenerate -m "..."`, which take the same lock here.
+The database is always settings.DATABASE_URL.
+"""
+from alembic import context
+
+from app.config import settings
+from app.database import Base, engine, schema_lock
+# Every model module, so autogenerate sees all the tables
+from app.models import article, feed, indicator, job, llm_cache, near_duplicate, stats, watchlist  # noqa: F401
+
+config = context.config
+target_metadata = Base.metadata
+
+# Full-text index tables are created by hand (see app.crud.search), autogenerate must not drop them
+SEARCH_TABLES = ("articles_fts", "article_search")
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    return not (type_ == "table" and compare_to is None and name.startswith(SEARCH_TABLES))
+
+
+def run_migrations(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        # SQLite can't ALTER most things in place, batch mode rebuilds the table instead
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    context.configure(url=settings.DATABASE_URL, target_metadata=target_metadata, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+elif config.attributes.get("connection") is not None:
+    run_migrations(config.attributes["connection"])
+else:
+    from app.logging_config import configure_logging
+
+    configure_logging()
+    with schema_lock(engine) as connection:
+        run_migrations(connection)
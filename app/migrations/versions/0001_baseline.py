@@ -0,0 +1,345 @@
+"""Baseline: the schema as it was when migrations were introduced
+
+Fresh databases get every table. Databases created before migrations existed
+(by create_all plus the old upgrade_schema) are adopted in place: missing
+tables, columns and indexes are added, Postgres article bodies still stored as
+TEXT are converted to BYTEA, and the search index and stats rollups are built
+when they are missing.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+import zlib
+from collections import Counter
+from datetime import datetime, timezone
+
+from alembic import context, op
+import sqlalchemy as sa
+
+try:
+    import zstandard
+except ImportError:  # Only needed to backfill zstd-compressed bodies
+    zstandard = None
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Frozen copies of the tables, later model changes belong in later revisions
+metadata = sa.MetaData()
+
+sa.Table(
+    "articles", metadata,
+    sa.Column("id", sa.Integer(), primary_key=True, index=True),
+    sa.Column("title", sa.String(), index=True),
+    sa.Column("url", sa.String(), unique=True, index=True),
+    sa.Column("content", sa.LargeBinary()),  # Compressed text, see app.models.types
+    sa.Column("summary", sa.Text()),
+    sa.Column("source", sa.String()),
+    sa.Column("threat_type", sa.String()),
+    sa.Column("severity", sa.String()),
+    sa.Column("iocs", sa.JSON()),
+    sa.Column("iocs_content_hash", sa.String(64)),
+    sa.Column("published_date", sa.DateTime()),
+    sa.Column("processed_at", sa.DateTime(timezone=True)),
+    sa.Column("full_text_at", sa.DateTime(timezone=True)),
+    sa.Column("cluster_id", sa.Integer(), index=True),
+    sa.Column("minhash", sa.LargeBinary()),
+    sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    sa.Column("updated_at", sa.DateTime(timezone=True)),
+    sa.Index("ix_articles_published_id", "published_date", "id"),
+    sa.Index("ix_articles_severity_published_id", "severity", "published_date", "id"),
+    sa.Index("ix_articles_source_published_id", "source", "published_date", "id"),
+    sa.Index("ix_articles_threat_type_published_id", "threat_type", "published_date", "id"),
+    sa.Index("ix_articles_updated_id", "updated_at", "id"),
+)
+
+sa.Table(
+    "feeds", metadata,
+    sa.Column("id", sa.Integer(), primary_key=True, index=True),
+    sa.Column("url", sa.String(), nullable=False, unique=True),
+    sa.Column("source", sa.String(), nullable=False),
+    sa.Column("enabled", sa.Boolean(), nullable=False),
+    sa.Column("poll_interval", sa.Float()),
+    sa.Column("next_poll_at", sa.DateTime(timezone=True)),
+    sa.Column("lease_until", sa.DateTime(timezone=True)),
+    sa.Column("etag", sa.String()),
+    sa.Column("last_modified", sa.String()),
+    sa.Column("last_polled_at", sa.DateTime(timezone=True)),
+    sa.Column("last_success_at", sa.DateTime(timezone=True)),
+    sa.Column("last_new_at", sa.DateTime(timezone=True)),
+    sa.Column("consecutive_failures", sa.Integer(), nullable=False),
+    sa.Column("last_error", sa.Text()),
+    sa.Column("articles_found", sa.Integer(), nullable=False),
+    sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    sa.Index("ix_feeds_enabled_next_poll", "enabled", "next_poll_at"),
+)
+
+sa.Table(
+    "indicators", metadata,
+    sa.Column("id", sa.Integer(), primary_key=True, index=True),
+    sa.Column("type", sa.String(16), nullable=False),
+    sa.Column("value", sa.String(), nullable=False),
+    sa.Column("ip_int", sa.BigInteger()),
+    sa.Column("first_seen", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    sa.Column("last_seen", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    sa.Column("hit_count", sa.Integer(), nullable=False),
+    sa.UniqueConstraint("type", "value", name="uq_indicators_type_value"),
+    sa.Index("ix_indicators_hit_count", "hit_count"),
+    sa.Index("ix_indicators_ip_int", "ip_int"),
+    sa.Index("ix_indicators_last_seen", "last_seen"),
+    sa.Index("ix_indicators_value", "value"),
+)
+
+sa.Table(
+    "article_indicators", metadata,
+    sa.Column("article_id", sa.Integer(), sa.ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True),
+    sa.Column("indicator_id", sa.Integer(), sa.ForeignKey("indicators.id", ondelete="CASCADE"), primary_key=True),
+    sa.Index("ix_article_indicators_indicator_id", "indicator_id", "article_id"),
+)
+
+sa.Table(
+    "jobs", metadata,
+    sa.Column("id", sa.Integer(), primary_key=True, index=True),
+    sa.Column("kind", sa.String(32), nullable=False),
+    sa.Column("params", sa.JSON()),
+    sa.Column("dedup_key", sa.String(64), nullable=False),
+    sa.Column("status", sa.String(16), nullable=False),
+    sa.Column("progress", sa.Integer(), nullable=False),
+    sa.Column("total", sa.Integer()),
+    sa.Column("message", sa.String()),
+    sa.Column("result", sa.JSON()),
+    sa.Column("error", sa.Text()),
+    sa.Column("cancel_requested", sa.Boolean(), nullable=False),
+    sa.Column("worker_id", sa.String(64)),
+    sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    sa.Column("started_at", sa.DateTime(timezone=True)),
+    sa.Column("finished_at", sa.DateTime(timezone=True)),
+    sa.Column("heartbeat_at", sa.DateTime(timezone=True)),
+    sa.Index("ix_jobs_status_id", "status", "id"),
+    sa.Index(
+        "uq_jobs_active_dedup_key", "dedup_key", unique=True,
+        sqlite_where=sa.text("status IN ('queued', 'running')"),
+        postgresql_where=sa.text("status IN ('queued', 'running')"),
+    ),
+)
+
+sa.Table(
+    "llm_responses", metadata,
+    sa.Column("cache_key", sa.String(64), primary_key=True),
+    sa.Column("model", sa.String(), nullable=False),
+    sa.Column("prompt_version", sa.String(16), nullable=False),
+    sa.Column("content_hash", sa.String(64), nullable=False),
+    sa.Column("response", sa.JSON(), nullable=False),
+    sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+)
+
+sa.Table(
+    "article_lsh_buckets", metadata,
+    sa.Column("band", sa.Integer(), primary_key=True),
+    sa.Column("bucket", sa.String(16), primary_key=True),
+    sa.Column("article_id", sa.Integer(), sa.ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True),
+)
+
+sa.Table(
+    "stat_counts", metadata,
+    sa.Column("dimension", sa.String(16), primary_key=True),
+    sa.Column("value", sa.String(), primary_key=True),
+    sa.Column("count", sa.Integer(), nullable=False),
+)
+
+sa.Table(
+    "watchlists", metadata,
+    sa.Column("id", sa.Integer(), primary_key=True, index=True),
+    sa.Column("name", sa.String(), nullable=False, unique=True),
+    sa.Column("description", sa.Text()),
+    sa.Column("enabled", sa.Boolean(), nullable=False),
+    sa.Column("entry_count", sa.Integer(), nullable=False),
+    sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+)
+
+sa.Table(
+    "watchlist_entries", metadata,
+    sa.Column("id", sa.Integer(), primary_key=True),
+    sa.Column("watchlist_id", sa.Integer(), sa.ForeignKey("watchlists.id", ondelete="CASCADE"), nullable=False),
+    sa.Column("type", sa.String(16), nullable=False),
+    sa.Column("value", sa.String(), nullable=False),
+    sa.Column("note", sa.String()),
+    sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    sa.UniqueConstraint("watchlist_id", "type", "value", name="uq_watchlist_entries_value"),
+)
+
+sa.Table(
+    "watchlist_matches", metadata,
+    sa.Column("id", sa.Integer(), primary_key=True),
+    sa.Column("watchlist_id", sa.Integer(), sa.ForeignKey("watchlists.id", ondelete="CASCADE"), nullable=False),
+    sa.Column("entry_id", sa.Integer(), sa.ForeignKey("watchlist_entries.id", ondelete="CASCADE"), nullable=False),
+    sa.Column("article_id", sa.Integer(), sa.ForeignKey("articles.id", ondelete="CASCADE"), nullable=False),
+    sa.Column("ioc_type", sa.String(16), nullable=False),
+    sa.Column("ioc_value", sa.String(), nullable=False),
+    sa.Column("matched_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    sa.UniqueConstraint("entry_id", "article_id", "ioc_value", name="uq_watchlist_matches"),
+    sa.Index("ix_watchlist_matches_watchlist_id", "watchlist_id", "id"),
+    sa.Index("ix_watchlist_matches_article_id", "article_id"),
+)
+
+# Full-text index, see app.crud.search
+SQLITE_SEARCH_SCHEMA = [
+    "CREATE VIRTUAL TABLE articles_fts USING fts5("
+    "title, summary, content, tokenize = 'porter unicode61 remove_diacritics 2')",
+]
+POSTGRES_SEARCH_SCHEMA = [
+    "CREATE TABLE article_search ("
+    "article_id INTEGER PRIMARY KEY REFERENCES articles(id) ON DELETE CASCADE, "
+    "title TEXT, summary TEXT, content TEXT, document TSVECTOR NOT NULL)",
+    "CREATE INDEX ix_article_search_document ON article_search USING GIN (document)",
+]
+
+POSTGRES_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(:title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(:summary, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(:content, '')), 'C')"
+)
+SEARCH_INSERT = {
+    "sqlite": "INSERT INTO articles_fts (rowid, title, summary, content) VALUES (:id, :title, :summary, :content)",
+    "postgresql": "INSERT INTO article_search (article_id, title, summary, content, document) "
+                  f"VALUES (:id, :title, :summary, :content, {POSTGRES_DOCUMENT})",
+}
+
+BACKFILL_CHUNK_SIZE = 2000
+
+# Seeded into a new feeds table; manage them through /feeds afterwards
+DEFAULT_FEEDS = [
+    {"url": "https://feeds.feedburner.com/TheHackersNews", "source": "The Hacker News"},
+]
+
+
+def _adopt_table(bind, inspector, table: sa.Table):
+    """Add what a table created by an older create_all is missing"""
+    existing = {column["name"]: column["type"] for column in inspector.get_columns(table.name)}
+    for column in table.columns:
+        if column.name not in existing:
+            # Added nullable whatever the declaration, existing rows have no value for it
+            op.add_column(table.name, sa.Column(column.name, column.type))
+        elif (bind.dialect.name == "postgresql" and isinstance(existing[column.name], sa.String)
+              and isinstance(column.type, sa.LargeBinary)):
+            # Rows keep their UTF-8 bytes until rewritten (python -m app.cli compress-content);
+            # SQLite stores either kind in any column
+            op.execute(
+                f"ALTER TABLE {table.name} ALTER COLUMN {column.name} TYPE BYTEA "
+                f"USING convert_to({column.name}, 'UTF8')"
+            )
+    for index in table.indexes:
+        index.create(bind, checkfirst=True)
+
+
+def _decompress(value):
+    """Article body as stored at this revision: a codec byte and the payload, or legacy plain text"""
+    if value is None or isinstance(value, str):
+        return value
+    data = bytes(value)
+    header, body = data[:1], data[1:]
+    if header == b"\x01":
+        return zlib.decompress(body).decode("utf-8")
+    if header == b"\x02":
+        if zstandard is None:
+            raise RuntimeError("Articles hold zstd-compressed bodies, install zstandard to index them")
+        return zstandard.ZstdDecompressor().decompress(body).decode("utf-8")
+    if header == b"\x00":
+        return body.decode("utf-8")
+    return data.decode("utf-8")
+
+
+def _article_chunks(bind, *columns):
+    articles = metadata.tables["articles"]
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(articles.c.id, *(articles.c[name] for name in columns))
+            .where(articles.c.id > last_id).order_by(articles.c.id).limit(BACKFILL_CHUNK_SIZE)
+        ).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+
+def _backfill_search(bind):
+    statement = sa.text(SEARCH_INSERT[bind.dialect.name])
+    for rows in _article_chunks(bind, "title", "summary", "content"):
+        bind.execute(statement, [
+            {"id": row.id, "title": row.title, "summary": row.summary, "content": _decompress(row.content)}
+            for row in rows
+        ])
+
+
+def _backfill_stats(bind):
+    """Fill the rollups (see app.crud.stats) when articles predate them"""
+    stat_counts = metadata.tables["stat_counts"]
+    if bind.execute(sa.select(stat_counts.c.dimension).limit(1)).first() is not None:
+        return
+    counts = Counter()
+    for rows in _article_chunks(bind, "severity", "threat_type", "source", "published_date", "created_at",
+                                "processed_at", "iocs"):
+        for row in rows:
+            day = row.published_date or row.created_at
+            counts.update([
+                ("total", ""),
+                ("severity", row.severity or "unknown"),
+                ("threat_type", row.threat_type or "unknown"),
+                ("source", row.source or "unknown"),
+                ("day", day.date().isoformat() if day else "unknown"),
+            ])
+            if row.processed_at:
+                counts[("processed", "")] += 1
+            if row.iocs and any(row.iocs.values()):
+                counts[("with_iocs", "")] += 1
+    if counts:
+        bind.execute(stat_counts.insert(), [
+            {"dimension": dimension, "value": value, "count": n} for (dimension, value), n in counts.items()
+        ])
+
+
+def upgrade():
+    bind = op.get_bind()
+    offline = context.is_offline_mode()  # `alembic upgrade --sql`: a script for an empty database
+    inspector = None if offline else sa.inspect(bind)
+    existing = set() if offline else set(inspector.get_table_names())
+
+    metadata.create_all(bind, tables=[table for table in metadata.sorted_tables if table.name not in existing],
+                        checkfirst=False)
+    for table in metadata.sorted_tables:
+        if table.name in existing:
+            _adopt_table(bind, inspector, table)
+
+    if "feeds" not in existing:
+        now = datetime.now(timezone.utc)
+        op.bulk_insert(metadata.tables["feeds"], [
+            {**feed, "enabled": True, "next_poll_at": now, "consecutive_failures": 0, "articles_found": 0}
+            for feed in DEFAULT_FEEDS
+        ])
+
+    search_table = {"sqlite": "articles_fts", "postgresql": "article_search"}.get(bind.dialect.name)
+    created_search = search_table is not None and search_table not in existing
+    if created_search:
+        for statement in SQLITE_SEARCH_SCHEMA if bind.dialect.name == "sqlite" else POSTGRES_SEARCH_SCHEMA:
+            op.execute(statement)
+    if offline:
+        return
+
+    # Backfills for adopted databases
+    if created_search:
+        _backfill_search(bind)
+    _backfill_stats(bind)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        op.execute("DROP TABLE IF EXISTS articles_fts")
+    elif bind.dialect.name == "postgresql":
+        op.execute("DROP TABLE IF EXISTS article_search")
+    metadata.drop_all(bind)
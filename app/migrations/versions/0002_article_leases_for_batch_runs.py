@@ -0,0 +1,29 @@
+"""Article leases for batch runs
+
+Per-stage lease columns, set while an LLM processing or IOC extraction run
+works on an article so concurrent runs skip it.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("articles") as batch_op:
+        batch_op.add_column(sa.Column("analysis_lease_until", sa.DateTime(timezone=True), nullable=True))
+        batch_op.add_column(sa.Column("extraction_lease_until", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("articles") as batch_op:
+        batch_op.drop_column("extraction_lease_until")
+        batch_op.drop_column("analysis_lease_until")
@@ -0,0 +1,31 @@
+"""Triage routes and predictions
+
+How the local triage tier routed each article and the labels it predicted,
+kept next to the LLM's for the agreement figures.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("articles") as batch_op:
+        batch_op.add_column(sa.Column("triage_route", sa.String(16), nullable=True))
+        batch_op.add_column(sa.Column("triage_threat_type", sa.String(), nullable=True))
+        batch_op.add_column(sa.Column("triage_severity", sa.String(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("articles") as batch_op:
+        batch_op.drop_column("triage_severity")
+        batch_op.drop_column("triage_threat_type")
+        batch_op.drop_column("triage_route")
@@ -1,19 +1,50 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON
-from sqlalchemy.sql import func
-from app.database import Base
-
-class Article(Base):
-    __tablename__ = "articles"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    title = Column(String, index=True)
-    url = Column(String, unique=True, index=True)
-    content = Column(Text)
-    summary = Column(Text)
-    source = Column(String)
-    threat_type = Column(String)
-    severity = Column(String)
-    iocs = Column(JSON)  # Store Indicators of Compromise as JSON
-    published_date = Column(DateTime)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index, LargeBinary
+from sqlalchemy.orm import deferred
+from sqlalchemy.sql import func
+from app.database import Base
+from app.models.types import CompressedText
+
+def _now():
+    return datetime.now(timezone.utc)
+
+class Article(Base):
+    __tablename__ = "articles"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    title = Column(String, index=True)
+    url = Column(String, unique=True, index=True)
+    # Heavy columns stay unloaded until accessed or undeferred with undefer_group("heavy")
+    content = deferred(Column(CompressedText), group="heavy")
+    summary = Column(Text)
+    source = Column(String)
+    threat_type = Column(String)
+    severity = Column(String)
+    iocs = deferred(Column(JSON), group="heavy")  # Store Indicators of Compromise as JSON
+    iocs_content_hash = Column(String(64))  # Hash of the text (and extractor version) the IOCs came from
+    published_date = Column(DateTime)
+    processed_at = Column(DateTime(timezone=True))  # Last successful AI processing
+    full_text_at = Column(DateTime(timezone=True))  # Last attempt to fetch the full page, successful or not
+    cluster_id = Column(Integer, index=True)  # Id of the canonical article of its near-duplicate cluster
+    minhash = Column(LargeBinary)  # MinHash signature of the normalized text, packed uint64s
+    # Set while a batch run works on the row, so concurrent runs (other threads, processes or nodes) skip it;
+    # one per stage, a row being analyzed is still free for extraction
+    analysis_lease_until = Column(DateTime(timezone=True))
+    extraction_lease_until = Column(DateTime(timezone=True))
+    # How the triage tier routed the article (see app.services.triage) and what it predicted; compared
+    # with the LLM's labels for the agreement figures
+    triage_route = Column(String(16))
+    triage_threat_type = Column(String)
+    triage_severity = Column(String)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set on insert too, so `since` exports see new rows; microsecond precision keeps watermarks exact
+    updated_at = Column(DateTime(timezone=True), default=_now, onupdate=_now)
+
+    # Keyset pagination walks (published_date, id); the filtered variants lead with the filter column
+    __table_args__ = (
+        Index("ix_articles_published_id", "published_date", "id"),
+        Index("ix_articles_source_published_id", "source", "published_date", "id"),
+        Index("ix_articles_threat_type_published_id", "threat_type", "published_date", "id"),
+        Index("ix_articles_severity_published_id", "severity", "published_date", "id"),
+        Index("ix_articles_updated_id", "updated_at", "id"),  # Incremental exports
+    )
\ No newline at end of file
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Float, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+class Feed(Base):
+    __tablename__ = "feeds"
+
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String, unique=True, nullable=False)
+    source = Column(String, nullable=False)  # Stored on every article from this feed
+    enabled = Column(Boolean, nullable=False, default=True)
+    poll_interval = Column(Float)  # Seconds, adapted to the feed's publish rate after every poll
+    next_poll_at = Column(DateTime(timezone=True))
+    lease_until = Column(DateTime(timezone=True))  # Set while a scheduler polls it, so runs never overlap
+    # Conditional GET validators from the last successful fetch
+    etag = Column(String)
+    last_modified = Column(String)
+    last_polled_at = Column(DateTime(timezone=True))
+    last_success_at = Column(DateTime(timezone=True))
+    last_new_at = Column(DateTime(timezone=True))  # Last poll that found new articles
+    consecutive_failures = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text)
+    articles_found = Column(Integer, nullable=False, default=0)  # New articles over the feed's lifetime
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_feeds_enabled_next_poll", "enabled", "next_poll_at"),
+    )
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+
+class Indicator(Base):
+    __tablename__ = "indicators"
+
+    id = Column(Integer, primary_key=True, index=True)
+    type = Column(String(16), nullable=False)
+    value = Column(String, nullable=False)  # Canonical form: refanged, lower-cased but for a URL's path
+    ip_int = Column(BigInteger)  # IPv4 as an integer so CIDR searches become range scans
+    first_seen = Column(DateTime(timezone=True), server_default=func.now())
+    last_seen = Column(DateTime(timezone=True), server_default=func.now())
+    hit_count = Column(Integer, nullable=False, default=0)  # Number of articles mentioning it
+
+    __table_args__ = (
+        UniqueConstraint("type", "value", name="uq_indicators_type_value"),
+        Index("ix_indicators_value", "value"),
+        Index("ix_indicators_ip_int", "ip_int"),
+        Index("ix_indicators_hit_count", "hit_count"),  # Top indicators for /stats
+        Index("ix_indicators_last_seen", "last_seen"),  # Incremental exports
+    )
+
+class ArticleIndicator(Base):
+    __tablename__ = "article_indicators"
+
+    article_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    indicator_id = Column(Integer, ForeignKey("indicators.id", ondelete="CASCADE"), primary_key=True)
+
+    # Reverse lookup: indicator -> articles
+    __table_args__ = (
+        Index("ix_article_indicators_indicator_id", "indicator_id", "article_id"),
+    )
@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, JSON, Index, text
+from sqlalchemy.sql import func
+from app.database import Base
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+ACTIVE_STATUSES = ("queued", "running")
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(32), nullable=False)
+    params = Column(JSON)
+    dedup_key = Column(String(64), nullable=False)  # sha256 of kind + params
+    status = Column(String(16), nullable=False, default="queued")
+    progress = Column(Integer, nullable=False, default=0)
+    total = Column(Integer)  # Unknown until the handler reports it
+    message = Column(String)
+    result = Column(JSON)
+    error = Column(Text)
+    cancel_requested = Column(Boolean, nullable=False, default=False)
+    worker_id = Column(String(64))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    heartbeat_at = Column(DateTime(timezone=True))  # Running jobs that stop beating get requeued
+
+    __table_args__ = (
+        # At most one queued or running job per dedup key; finished ones don't count
+        Index(
+            "uq_jobs_active_dedup_key", "dedup_key", unique=True,
+            sqlite_where=text("status IN ('queued', 'running')"),
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+        Index("ix_jobs_status_id", "status", "id"),
+    )
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, DateTime, JSON
+from sqlalchemy.sql import func
+from app.database import Base
+
+class LLMResponse(Base):
+    __tablename__ = "llm_responses"
+
+    # sha256 of (model, prompt version, content hash)
+    cache_key = Column(String(64), primary_key=True)
+    model = Column(String, nullable=False)
+    prompt_version = Column(String(16), nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    response = Column(JSON, nullable=False)  # Validated analysis, not the raw reply
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
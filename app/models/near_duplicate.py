@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from app.database import Base
+
+class ArticleLSHBucket(Base):
+    __tablename__ = "article_lsh_buckets"
+
+    # One row per (band, bucket) of an article's MinHash signature; articles sharing
+    # any row are near-duplicate candidates. The primary key doubles as the lookup index.
+    band = Column(Integer, primary_key=True)
+    bucket = Column(String(16), primary_key=True)  # Hash of the band's signature values
+    article_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
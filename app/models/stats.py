@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, String
+from app.database import Base
+
+class StatCount(Base):
+    __tablename__ = "stat_counts"
+
+    # Running article counts per (dimension, value), e.g. ("severity", "high") or ("day", "2024-05-01"),
+    # kept current by the article write paths instead of GROUP BY over the articles table
+    dimension = Column(String(16), primary_key=True)
+    value = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,70 @@
+import zlib
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+from app.config import settings
+
+try:
+    import zstandard
+except ImportError:  # Optional, zlib is always available
+    zstandard = None
+
+# First byte of a stored value: how the rest of it is encoded. Anything else is a
+# legacy uncompressed value (plain UTF-8 never starts with these control bytes).
+RAW, ZLIB, ZSTD = b"\x00", b"\x01", b"\x02"
+
+# Below this many bytes compression doesn't pay for its header
+MIN_COMPRESS_BYTES = 128
+
+
+def compression_codec() -> str:
+    """The codec new values are written with: CONTENT_COMPRESSION, falling back to zlib without zstandard"""
+    codec = settings.CONTENT_COMPRESSION
+    if codec == "zstd" and zstandard is None:
+        return "zlib"
+    return codec
+
+
+def compress_text(value: str) -> bytes:
+    data = value.encode("utf-8")
+    codec = compression_codec()
+    if codec == "none" or len(data) < MIN_COMPRESS_BYTES:
+        return RAW + data
+    if codec == "zstd":
+        return ZSTD + zstandard.ZstdCompressor(level=settings.CONTENT_COMPRESSION_LEVEL).compress(data)
+    return ZLIB + zlib.compress(data, settings.CONTENT_COMPRESSION_LEVEL)
+
+
+def decompress_text(value) -> str:
+    if isinstance(value, str):  # Legacy TEXT row on SQLite, not converted yet
+        return value
+    data = bytes(value)
+    header, body = data[:1], data[1:]
+    if header == ZLIB:
+        return zlib.decompress(body).decode("utf-8")
+    if header == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Column holds zstd-compressed values, install zstandard to read them")
+        return zstandard.ZstdDecompressor().decompress(body).decode("utf-8")
+    if header == RAW:
+        return body.decode("utf-8")
+    return data.decode("utf-8")  # Legacy row converted to bytes as-is (Postgres TEXT -> BYTEA)
+
+
+def is_compressed(value) -> bool:
+    return isinstance(value, (bytes, bytearray, memoryview)) and bytes(value[:1]) in (RAW, ZLIB, ZSTD)
+
+
+class CompressedText(TypeDecorator):
+    """Text stored compressed in a binary column; reads and writes plain str.
+
+    SQL can't look inside the value, so LIKE filters and database-side full-text
+    indexing don't work on it; the search index is fed by the application instead.
+    """
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else compress_text(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else decompress_text(value)
@@ -0,0 +1,46 @@
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+
+class Watchlist(Base):
+    __tablename__ = "watchlists"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, nullable=False)
+    description = Column(Text)
+    enabled = Column(Boolean, nullable=False, default=True)
+    entry_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Bumped on every change to the list or its entries; matchers reload when it moves
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class WatchlistEntry(Base):
+    __tablename__ = "watchlist_entries"
+
+    id = Column(Integer, primary_key=True)
+    watchlist_id = Column(Integer, ForeignKey("watchlists.id", ondelete="CASCADE"), nullable=False)
+    type = Column(String(16), nullable=False)  # ip, cidr, domain, hash, email, url or keyword
+    value = Column(String, nullable=False)  # Canonical form, see services.watchlist.parse_entry
+    note = Column(String)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("watchlist_id", "type", "value", name="uq_watchlist_entries_value"),
+    )
+
+class WatchlistMatch(Base):
+    __tablename__ = "watchlist_matches"
+
+    id = Column(Integer, primary_key=True)
+    watchlist_id = Column(Integer, ForeignKey("watchlists.id", ondelete="CASCADE"), nullable=False)
+    entry_id = Column(Integer, ForeignKey("watchlist_entries.id", ondelete="CASCADE"), nullable=False)
+    article_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), nullable=False)
+    ioc_type = Column(String(16), nullable=False)
+    ioc_value = Column(String, nullable=False)  # What the article mentioned, e.g. a subdomain of a watched domain
+    matched_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("entry_id", "article_id", "ioc_value", name="uq_watchlist_matches"),
+        Index("ix_watchlist_matches_watchlist_id", "watchlist_id", "id"),  # Newest matches of a list
+        Index("ix_watchlist_matches_article_id", "article_id"),
+    )
@@ -0,0 +1,104 @@
+"""Opt-in per-request profiling.
+
+With PROFILING=header, a request sending `X-Profile: 1` (or `X-Profile: <PROFILING_TOKEN>`
+when a token is set) is run under a profiler; PROFILING=all profiles every request.
+The profile is written to PROFILE_DIR and its path returned in X-Profile-Path:
+
+    curl -sD- -H 'X-Profile: 1' localhost:8000/api/v1/articles/search?q=ransomware
+    python -m pstats profiles/<file>.prof       # or snakeviz; pyinstrument writes .html
+
+Profilers only see the event-loop thread: sync endpoints and run_in_executor work
+show up as time spent awaiting the threadpool. One request is profiled at a time,
+concurrent requests are served unprofiled.
+"""
+import cProfile
+import logging
+import os
+import re
+import time
+
+from app.config import settings
+
+try:
+    import pyinstrument
+except ImportError:  # Optional, cProfile is always available
+    pyinstrument = None
+
+logger = logging.getLogger(__name__)
+
+
+def profiler_name() -> str:
+    """The profiler in use: PROFILER, falling back to cprofile without pyinstrument"""
+    if settings.PROFILER == "pyinstrument" and pyinstrument is None:
+        return "cprofile"
+    return settings.PROFILER
+
+
+def profile_path(scope) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", scope["path"]).strip("-") or "root"
+    extension = "html" if profiler_name() == "pyinstrument" else "prof"
+    name = f"{time.strftime('%Y%m%dT%H%M%S')}-{int(time.time() * 1000) % 1000:03d}-{scope['method']}-{slug[:80]}"
+    return os.path.join(settings.PROFILE_DIR, f"{name}.{extension}")
+
+
+class ProfilingMiddleware:
+    """Runs the selected requests under cProfile or pyinstrument and saves one profile per request"""
+
+    def __init__(self, app):
+        self.app = app
+        self._busy = False
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        if settings.PROFILER == "pyinstrument" and pyinstrument is None:
+            logger.warning("pyinstrument is not installed, profiling with cProfile")
+
+    def _wanted(self, scope) -> bool:
+        if settings.PROFILING == "all":
+            return True
+        if settings.PROFILING != "header":
+            return False
+        value = dict(scope["headers"]).get(b"x-profile")
+        if value is None:
+            return False
+        return not settings.PROFILING_TOKEN or value.decode("latin-1") == settings.PROFILING_TOKEN
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._busy or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        path = profile_path(scope)
+
+        async def send_with_path(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []),
+                                                  (b"x-profile-path", path.encode("latin-1"))]}
+            await send(message)
+
+        self._busy = True
+        profiler = self._start()
+        try:
+            await self.app(scope, receive, send_with_path)
+        finally:
+            self._busy = False
+            self._save(profiler, path, scope)
+
+    @staticmethod
+    def _start():
+        if profiler_name() == "pyinstrument":
+            profiler = pyinstrument.Profiler(async_mode="enabled")
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        return profiler
+
+    @staticmethod
+    def _save(profiler, path: str, scope):
+        if isinstance(profiler, cProfile.Profile):
+            profiler.disable()
+            profiler.dump_stats(path)
+        else:
+            profiler.stop()
+            with open(path, "w") as f:
+                f.write(profiler.output_html())
+        logger.info("Request profiled", extra={"method": scope["method"], "path": scope["path"], "profile": path})
@@ -0,0 +1,39 @@
+from pydantic import BaseModel, validator
+
+THREAT_TYPES = ["ransomware", "phishing", "vulnerability", "zero-day", "apt", "malware", "ddos", "data-breach", "other"]
+SEVERITIES = ["critical", "high", "medium", "low", "informational"]
+
+SUMMARY_MAX_LENGTH = 150
+
+class ThreatAnalysis(BaseModel):
+    summary: str
+    threat_type: str
+    severity: str
+    confidence: float
+
+    @validator("summary")
+    def trim_summary(cls, value):
+        value = value.strip()
+        if not value:
+            raise ValueError("summary is empty")
+        return value[:SUMMARY_MAX_LENGTH]
+
+    @validator("threat_type")
+    def known_threat_type(cls, value):
+        value = value.strip().lower().replace(" ", "-").replace("_", "-")
+        if value not in THREAT_TYPES:
+            raise ValueError(f"unknown threat_type {value!r}")
+        return value
+
+    @validator("severity")
+    def known_severity(cls, value):
+        value = value.strip().lower()
+        if value not in SEVERITIES:
+            raise ValueError(f"unknown severity {value!r}")
+        return value
+
+    @validator("confidence")
+    def confidence_range(cls, value):
+        if not 0.0 <= value <= 1.0:
+            raise ValueError("confidence must be between 0 and 1")
+        return value
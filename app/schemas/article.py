@@ -1,32 +1,74 @@
-from pydantic import BaseModel, HttpUrl
-from datetime import datetime
-from typing import Optional, Dict, Any
-
-class ArticleBase(BaseModel):
-    title: str
-    url: str
-    content: Optional[str] = None
-    source: Optional[str] = None
-
-class ArticleCreate(ArticleBase):
-    pass
-
-class ArticleUpdate(BaseModel):
-    summary: Optional[str] = None
-    threat_type: Optional[str] = None
-    severity: Optional[str] = None
-    iocs: Optional[Dict[str, Any]] = None
-
-class Article(ArticleBase):
-    id: int
-    summary: Optional[str] = None
-    threat_type: Optional[str] = None
-    severity: Optional[str] = None
-    iocs: Optional[Dict[str, Any]] = None
-    published_date: Optional[datetime] = None
-    created_at: datetime
-    updated_at: Optional[datetime] = None
-
-    class Config:
-        from_attributes = True
-        orm_mode = True
+from pydantic import BaseModel, HttpUrl
+from datetime import datetime
+from typing import Optional, Dict, Any
+
+class ArticleBase(BaseModel):
+    title: str
+    url: str
+    content: Optional[str] = None
+    source: Optional[str] = None
+
+class ArticleCreate(ArticleBase):
+    pass
+
+class ArticleUpdate(BaseModel):
+    summary: Optional[str] = None
+    threat_type: Optional[str] = None
+    severity: Optional[str] = None
+    iocs: Optional[Dict[str, Any]] = None
+
+class Article(ArticleBase):
+    id: int
+    summary: Optional[str] = None
+    threat_type: Optional[str] = None
+    severity: Optional[str] = None
+    iocs: Optional[Dict[str, Any]] = None
+    published_date: Optional[datetime] = None
+    cluster_id: Optional[int] = None  # Equal to id for the canonical article of a near-duplicate cluster
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+        orm_mode = True
+
+class ArticleListItem(BaseModel):
+    """An article without its heavy columns (content, iocs), as listed"""
+    id: int
+    title: str
+    url: str
+    source: Optional[str] = None
+    summary: Optional[str] = None
+    threat_type: Optional[str] = None
+    severity: Optional[str] = None
+    published_date: Optional[datetime] = None
+    cluster_id: Optional[int] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+        orm_mode = True
+
+class ClusterMember(BaseModel):
+    id: int
+    title: str
+    url: str
+    source: Optional[str] = None
+    published_date: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+        orm_mode = True
+
+class ArticleSearchResult(BaseModel):
+    id: int
+    title: str
+    url: str
+    source: Optional[str] = None
+    threat_type: Optional[str] = None
+    severity: Optional[str] = None
+    summary: Optional[str] = None
+    published_date: Optional[datetime] = None
+    snippet: Optional[str] = None  # Matched text with <mark> highlights
+    rank: float
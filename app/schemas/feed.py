@@ -0,0 +1,38 @@
+from pydantic import BaseModel, confloat
+from datetime import datetime
+from typing import Optional
+
+# Seconds between polls of one feed
+PollInterval = confloat(gt=0)
+
+class FeedCreate(BaseModel):
+    url: str
+    source: str
+    enabled: bool = True
+    poll_interval: Optional[PollInterval] = None  # Starts at FEED_DEFAULT_INTERVAL and adapts either way
+
+class FeedUpdate(BaseModel):
+    source: Optional[str] = None
+    enabled: Optional[bool] = None
+    poll_interval: Optional[PollInterval] = None
+    next_poll_at: Optional[datetime] = None
+
+class Feed(BaseModel):
+    id: int
+    url: str
+    source: str
+    enabled: bool
+    poll_interval: Optional[float] = None
+    next_poll_at: Optional[datetime] = None
+    lease_until: Optional[datetime] = None
+    last_polled_at: Optional[datetime] = None
+    last_success_at: Optional[datetime] = None
+    last_new_at: Optional[datetime] = None
+    consecutive_failures: int = 0
+    last_error: Optional[str] = None
+    articles_found: int = 0
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+        orm_mode = True
@@ -0,0 +1,36 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional, List, Dict
+
+class Indicator(BaseModel):
+    id: int
+    type: str
+    value: str
+    first_seen: Optional[datetime] = None
+    last_seen: Optional[datetime] = None
+    hit_count: int
+
+    class Config:
+        from_attributes = True
+        orm_mode = True
+
+class IndicatorArticle(BaseModel):
+    id: int
+    title: str
+    url: str
+    published_date: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+        orm_mode = True
+
+class IndicatorLookup(Indicator):
+    articles: List[IndicatorArticle] = []
+
+class IndicatorCheckRequest(BaseModel):
+    values: List[str] = Field(..., max_items=100000)
+
+class IndicatorCheckResponse(BaseModel):
+    checked: int
+    matched: int
+    matches: Dict[str, List[Indicator]]
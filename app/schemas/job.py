@@ -0,0 +1,31 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional, Any
+
+class Job(BaseModel):
+    id: int
+    kind: str
+    params: Optional[dict] = None
+    status: str
+    progress: int = 0
+    total: Optional[int] = None
+    message: Optional[str] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    cancel_requested: bool = False
+    worker_id: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+        orm_mode = True
+
+class JobSubmitted(BaseModel):
+    job_id: int
+    status: str
+    deduplicated: bool
+    message: str
+    job_ids: Optional[List[int]] = None  # Every part of a parallel run, the first one is job_id
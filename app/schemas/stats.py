@@ -0,0 +1,46 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+
+class DayCount(BaseModel):
+    day: str
+    count: int
+
+class TopIndicator(BaseModel):
+    type: str
+    value: str
+    hit_count: int
+
+class Stats(BaseModel):
+    total_articles: int
+    processed_articles: int
+    articles_with_iocs: int
+    by_severity: Dict[str, int]
+    by_threat_type: Dict[str, int]
+    by_source: Dict[str, int]
+    by_day: List[DayCount]
+    top_iocs: List[TopIndicator]
+
+class BatchStats(BaseModel):
+    total_articles: int
+    processed_articles: int
+    articles_with_iocs: int
+    processing_percentage: float
+
+class TriageRoute(BaseModel):
+    route: str
+    articles: int
+    llm_call: bool
+    compared: int
+    threat_type_agreement: Optional[float]
+    severity_agreement: Optional[float]
+
+class TriageStats(BaseModel):
+    enabled: bool
+    triaged_articles: int
+    labelled_locally: int
+    local_share: float
+    # Over the audit sample: local labels the LLM labelled anyway
+    threat_type_agreement: Optional[float]
+    severity_agreement: Optional[float]
+    routes: List[TriageRoute]
+    model: Optional[dict]
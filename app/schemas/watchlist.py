@@ -0,0 +1,83 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional, List
+
+class WatchlistCreate(BaseModel):
+    name: str
+    description: Optional[str] = None
+    enabled: bool = True
+
+class WatchlistUpdate(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    enabled: Optional[bool] = None
+
+class Watchlist(BaseModel):
+    id: int
+    name: str
+    description: Optional[str] = None
+    enabled: bool
+    entry_count: int = 0
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+        orm_mode = True
+
+class WatchlistEntry(BaseModel):
+    id: int
+    watchlist_id: int
+    type: str
+    value: str
+    note: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+        orm_mode = True
+
+class WatchlistEntriesAdd(BaseModel):
+    values: List[str] = Field(..., max_items=500000)
+    type: Optional[str] = None  # ip, cidr, domain, hash, email, url or keyword; guessed per value if unset
+    note: Optional[str] = None
+
+class WatchlistEntriesAdded(BaseModel):
+    added: int
+    duplicates: int
+    invalid: int
+    errors: List[str] = []  # The first few invalid values and why
+
+class WatchlistMatch(BaseModel):
+    id: int
+    watchlist_id: int
+    watchlist_name: str
+    entry_id: int
+    entry_type: str
+    entry_value: str
+    entry_note: Optional[str] = None
+    article_id: int
+    article_title: str
+    article_url: str
+    ioc_type: str
+    ioc_value: str
+    matched_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+        orm_mode = True
+
+class WatchlistCheckRequest(BaseModel):
+    values: List[str] = Field([], max_items=100000)
+    text: Optional[str] = None  # Matched like an article body: its IOCs, and keywords
+
+class WatchlistHit(BaseModel):
+    entry_id: int
+    watchlist_id: int
+    entry_type: str
+    ioc_type: str
+    ioc_value: str
+
+class WatchlistCheckResponse(BaseModel):
+    checked: int
+    hits: List[WatchlistHit]
@@ -1,121 +1,166 @@
-from groq import Groq
-from app.config import settings
-from sqlalchemy.orm import Session
-from app.crud import article as crud_article
-from app.schemas.article import ArticleUpdate
-import json
-
-
-class AIProcessor:
-    def __init__(self):
-        # Initialize Groq client
-        self.client = Groq(api_key=settings.GROQ_API_KEY)
-
-    def generate_summary(self, content: str, max_length: int = 150) -> str:
-        """Generate a concise summary of the article content"""
-        try:
-            if not content:
-                return "No content available for summary"
-
-            response = self.client.chat.completions.create(
-                model="groq/compound-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a cybersecurity expert. Create a concise summary."
-                    },
-                    {
-                        "role": "user",
-                        "content": f"Summarize this in {max_length} characters: {content[:3000]}"
-                    }
-                ],
-                max_tokens=120
-            )
-
-            # التعديل هنا: استخدام .content بدل ["content"]
-            summary = response.choices[0].message.content.strip()
-            return summary[:max_length]
-
-        except Exception as e:
-            print(f"Error generating summary: {e}")
-            return f"Summary unavailable: {str(e)}"
-
-    def analyze_threat(self, title: str, content: str) -> dict:
-        """Analyze the article to determine threat type and severity"""
-        try:
-            prompt = f"""
-            Analyze this cybersecurity article and return ONLY a JSON object with:
-            - threat_type: one of [ransomware, phishing, vulnerability, zero-day, apt, malware, ddos, data-breach, other]
-            - severity: one of [critical, high, medium, low, informational]
-            - confidence: number between 0.5 and 1.0
-
-            Title: {title}
-            Content: {content[:2000]}
-
-            ONLY return valid JSON.
-            """
-
-            response = self.client.chat.completions.create(
-                model="groq/compound-mini",
-                messages=[
-                    {"role": "system", "content": "You are a cybersecurity analyst."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=200
-            )
-
-            # التعديل هنا أيضاً
-            result = response.choices[0].message.content.strip()
-            return json.loads(result)
-
-        except Exception as e:
-            print(f"Error analyzing threat: {e}")
-            return {
-                "threat_type": "other",
-                "severity": "informational",
-                "confidence": 0.5
-            }
-
-    def process_article(self, db: Session, article_id: int):
-        """Process a single article with AI analysis"""
-        try:
-            article = crud_article.get_article(db, article_id)
-            if not article:
-                print(f"Article {article_id} not found")
-                return False
-
-            print(f"Generating summary for article {article_id}...")
-            summary = self.generate_summary(article.content or article.title)
-
-            print(f"Analyzing threat for article {article_id}...")
-            threat_analysis = self.analyze_threat(article.title, article.content or "")
-
-            update_data = ArticleUpdate(
-                summary=summary,
-                threat_type=threat_analysis.get("threat_type"),
-                severity=threat_analysis.get("severity")
-            )
-
-            print(f"Updating article {article_id}...")
-            crud_article.update_article(db, article_id, update_data)
-
-            print(f"Successfully processed article {article_id}")
-            return True
-
-        except Exception as e:
-            print(f"Error processing article {article_id}: {e}")
-            return False
-
-
-# Global instance
-try:
-    if settings.GROQ_API_KEY and settings.GROQ_API_KEY != "your-groq-key":
-        ai_processor = AIProcessor()
-        print("AI Processor initialized successfully (Groq AI enabled)")
-    else:
-        ai_processor = None
-        print("AI Processor disabled - No Groq API key set")
-
-except Exception as e:
-    ai_processor = None
-    print(f"AI Processor initialization failed: {e}")
+from app import metrics
+from app.config import settings
+from sqlalchemy.orm import Session
+from app.crud import article as crud_article
+from app.schemas.analysis import ThreatAnalysis, THREAT_TYPES, SEVERITIES, SUMMARY_MAX_LENGTH
+from app.services.llm_cache import response_cache
+from app.services.triage import NO_TRIAGE
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional
+import hashlib
+import json
+import logging
+import re
+import time
+
+
+# Bump whenever the prompt or the expected schema changes; it is part of the cache key
+PROMPT_VERSION = "2"
+
+CONTENT_LIMIT = 3000
+ANALYSIS_MAX_TOKENS = 300
+
+_JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+
+logger = logging.getLogger(__name__)
+
+
+def analysis_messages(title: str, content: str) -> list:
+    prompt = f"""
+            Analyze this cybersecurity article and return ONLY a JSON object with:
+            - summary: a concise summary of at most {SUMMARY_MAX_LENGTH} characters
+            - threat_type: one of [{", ".join(THREAT_TYPES)}]
+            - severity: one of [{", ".join(SEVERITIES)}]
+            - confidence: number between 0.5 and 1.0
+
+            Title: {title}
+            Content: {content[:CONTENT_LIMIT]}
+
+            ONLY return valid JSON.
+            """
+    return [
+        {"role": "system", "content": "You are a cybersecurity analyst. You answer with JSON only."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def analysis_content_hash(content: str) -> str:
+    """Hash of what the model actually sees, whitespace-normalized so syndicated copies match"""
+    normalized = " ".join(content[:CONTENT_LIMIT].split()).lower()
+    return hashlib.sha256(normalized.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def parse_analysis(reply: str) -> ThreatAnalysis:
+    """Validate a model reply against the schema, raising ValueError if it doesn't fit"""
+    match = _JSON_OBJECT.search(reply or "")  # Tolerates code fences and chatter around the object
+    if not match:
+        raise ValueError(f"No JSON object in model reply: {reply[:200]!r}")
+    try:
+        data = json.loads(match.group())
+    except ValueError as e:
+        raise ValueError(f"Invalid JSON in model reply: {e}")
+    if not isinstance(data, dict):
+        raise ValueError("Model reply is not a JSON object")
+    return ThreatAnalysis(**data)  # pydantic's ValidationError is a ValueError
+
+
+def analysis_update(analysis: ThreatAnalysis) -> dict:
+    return {
+        "summary": analysis.summary,
+        "threat_type": analysis.threat_type,
+        "severity": analysis.severity,
+        "processed_at": datetime.now(timezone.utc)
+    }
+
+
+class AIProcessor:
+    def __init__(self):
+        # Imported here, the SDK (and httpx under it) is a good part of the app's import time
+        from groq import Groq
+
+        self.client = Groq(api_key=settings.GROQ_API_KEY, base_url=settings.GROQ_BASE_URL or None)
+
+    def analyze_article(self, db: Session, title: str, content: str) -> ThreatAnalysis:
+        """Summary and classification in one call, answered from the response cache when possible.
+
+        A new cache row is staged in db's transaction, so it is committed with the article update.
+        """
+        content_hash = analysis_content_hash(content)
+        cached = response_cache.get(db, settings.GROQ_MODEL, PROMPT_VERSION, content_hash)
+        if cached is not None:
+            return ThreatAnalysis(**cached)
+
+        start = time.perf_counter()
+        try:
+            response = self.client.chat.completions.create(
+                model=settings.GROQ_MODEL,
+                messages=analysis_messages(title, content),
+                max_tokens=ANALYSIS_MAX_TOKENS
+            )
+        except Exception:
+            metrics.llm_call(time.perf_counter() - start, "error")
+            raise
+        metrics.llm_call(time.perf_counter() - start, "ok", response.usage)
+        try:
+            analysis = parse_analysis(response.choices[0].message.content)
+        except ValueError:
+            metrics.LLM_INVALID_REPLIES.inc()
+            raise
+        response_cache.put_many(db, [
+            response_cache.row(settings.GROQ_MODEL, PROMPT_VERSION, content_hash, analysis.dict())
+        ])
+        return analysis
+
+    def process_article(self, db: Session, article_id: int):
+        """Process a single article with AI analysis"""
+        try:
+            article = crud_article.get_article(db, article_id)
+            if not article:
+                logger.warning("Article not found", extra={"article_id": article_id})
+                return False
+
+            # A near-duplicate is analyzed through its cluster's canonical article
+            if article.cluster_id and article.cluster_id != article.id:
+                canonical = crud_article.get_article(db, article.cluster_id)
+                if canonical:
+                    article = canonical
+
+            analysis = self.analyze_article(db, article.title, article.content or article.title)
+            # Asked for explicitly, so no triage: the labels are the LLM's
+            update_data = {**analysis_update(analysis), **NO_TRIAGE}
+
+            crud_article.update_article(db, article.id, update_data)
+            if crud_article.copy_cluster_analysis(db, [article.id]):
+                db.commit()
+
+            logger.info("Processed article", extra={"article_id": article_id, "analyzed_id": article.id})
+            return True
+
+        except Exception as e:
+            db.rollback()
+            logger.exception("Processing article failed", extra={"article_id": article_id})
+            return False
+
+
+def ai_processing_enabled() -> bool:
+    """Whether a GROQ_API_KEY is configured, without building the client"""
+    return bool(settings.GROQ_API_KEY) and settings.GROQ_API_KEY != "your-groq-key"
+
+
+@lru_cache(maxsize=None)
+def get_ai_processor() -> Optional[AIProcessor]:
+    """The shared processor, built on first use; None when AI processing is disabled.
+
+    Also a FastAPI dependency.
+    """
+    if not ai_processing_enabled():
+        logger.info("AI processor disabled, no GROQ_API_KEY set")
+        return None
+    try:
+        processor = AIProcessor()
+    except Exception:
+        logger.exception("AI processor initialization failed")
+        return None
+    logger.info("AI processor enabled", extra={"model": settings.GROQ_MODEL})
+    return processor
@@ -0,0 +1,183 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app import metrics
+from app.config import settings
+from app.crud import article as crud_article
+from app.crud import indicator as crud_indicator
+from app.database import SessionLocal
+from app.services.ioc_extractor import content_hash, extract_batch
+from app.services.watchlist import watchlist_matcher
+
+logger = logging.getLogger(__name__)
+
+
+class BatchIOCExtractor:
+    """Re-extracts IOCs for the whole corpus, fanning the regex work out to a process pool.
+
+    Articles are streamed from the DB in id order, one chunk at a time. Those whose
+    content hash matches the one stored at their last extraction are skipped, the rest
+    are extracted in worker processes and written back, together with their indicator
+    links, in one transaction per task. Only the articles that need extraction are
+    leased, so an incremental pass over an unchanged corpus writes nothing, and runs in
+    other processes or on other nodes skip what one of them holds.
+    """
+
+    def __init__(self):
+        self._run_lock = threading.Lock()
+        self._status_lock = threading.Lock()
+        self._status = self._empty_status()
+
+    @staticmethod
+    def _empty_status() -> dict:
+        return {
+            "running": False,
+            "started_at": None,
+            "finished_at": None,
+            "scanned": 0,
+            "skipped": 0,
+            "extracted": 0,
+            "iocs_found": 0,
+            "bytes": 0,
+            "error": None,
+        }
+
+    @property
+    def is_running(self) -> bool:
+        return self._run_lock.locked()
+
+    def status(self) -> dict:
+        with self._status_lock:
+            status = dict(self._status)
+        if status["started_at"]:
+            elapsed = (status["finished_at"] or time.time()) - status["started_at"]
+            status["elapsed_seconds"] = round(elapsed, 3)
+            status["articles_per_second"] = round(status["extracted"] / elapsed, 1) if elapsed else 0.0
+            status["mb_per_second"] = round(status["bytes"] / elapsed / 1e6, 3) if elapsed else 0.0
+        return status
+
+    def _bump(self, **counters):
+        with self._status_lock:
+            for name, value in counters.items():
+                self._status[name] += value
+
+    def run(self, db: Optional[Session] = None, force: bool = False, workers: Optional[int] = None,
+            chunk_size: Optional[int] = None, progress: Optional[Callable] = None) -> dict:
+        """Run a full pass and return the final status; returns the live status if one is already running.
+
+        progress(done, total) is called after every written batch; an exception raised from it aborts the run.
+        """
+        if not self._run_lock.acquire(blocking=False):
+            return self.status()
+
+        own_session = db is None
+        db = db or SessionLocal()
+        try:
+            with self._status_lock:
+                self._status = self._empty_status()
+                self._status.update(running=True, started_at=time.time())
+            self._run(db, force, workers or settings.IOC_WORKERS or os.cpu_count() or 1,
+                      chunk_size or settings.IOC_CHUNK_SIZE, progress)
+        except Exception as e:
+            logger.exception("Batch IOC extraction failed")
+            with self._status_lock:
+                self._status["error"] = str(e)
+        finally:
+            with self._status_lock:
+                self._status.update(running=False, finished_at=time.time())
+            if own_session:
+                db.close()
+            self._run_lock.release()
+
+        return self.status()
+
+    def _run(self, db: Session, force: bool, workers: int, chunk_size: int, progress: Optional[Callable]):
+        total = crud_article.count_articles(db)
+        # spawn: API workers are multi-threaded, forking them is not safe
+        context = multiprocessing.get_context("spawn")
+        leased = set()  # Claimed by this run and not written back yet
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                self._extract(db, pool, leased, force, workers, chunk_size, total, progress)
+        finally:
+            if leased:
+                # Whatever an early stop left unwritten is free for the next run
+                try:
+                    db.rollback()
+                    crud_article.release_articles(db, "extraction", sorted(leased))
+                except Exception:
+                    logger.exception("Releasing article leases failed", extra={"articles": len(leased)})
+
+    def _extract(self, db: Session, pool: ProcessPoolExecutor, leased: set, force: bool, workers: int,
+                 chunk_size: int, total: int, progress: Optional[Callable]):
+        in_flight = deque()
+        last_id = 0
+        while True:
+            rows = crud_article.get_article_texts(db, after_id=last_id, limit=chunk_size, unleased="extraction")
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            changed = {}
+            for row in rows:
+                text = f"{row.title} {row.content}"
+                digest = content_hash(text)
+                if force or digest != row.iocs_content_hash:
+                    changed[row.id] = (digest, text, row.iocs_content_hash)
+            # Another run may have taken, or even finished, some of them since the read; it extracts those
+            claimed = crud_article.claim_articles_to_extract(
+                db, settings.ARTICLE_LEASE_SECONDS, {article_id: item[2] for article_id, item in changed.items()}
+            ) if changed else []
+            leased.update(claimed)
+            hashes = {article_id: changed[article_id][0] for article_id in claimed}
+            pending = [(article_id, changed[article_id][1]) for article_id in claimed]
+            size = sum(len(text) for _, text in pending)
+            skipped = len(rows) - len(changed)
+            self._bump(scanned=len(rows) - len(changed) + len(claimed), skipped=skipped, bytes=size)
+            metrics.IOC_ARTICLES.labels("skipped").inc(skipped)
+            metrics.IOC_BYTES.inc(size)
+
+            # Split the chunk so every worker gets a share of it
+            step = max(1, -(-len(pending) // workers))
+            for i in range(0, len(pending), step):
+                batch = pending[i:i + step]
+                in_flight.append((pool.submit(extract_batch, batch), hashes, dict(batch)))
+
+            # Keep a bounded number of tasks queued so memory stays flat on big corpora
+            while len(in_flight) > workers * 2:
+                leased.difference_update(self._write_results(db, *in_flight.popleft()))
+                if progress:
+                    progress(self.status()["scanned"], total)
+
+        while in_flight:
+            leased.difference_update(self._write_results(db, *in_flight.popleft()))
+            if progress:
+                progress(self.status()["scanned"], total)
+
+    def _write_results(self, db: Session, future, hashes: dict, texts: dict) -> list:
+        """Store a task's IOCs, which ends those articles' leases; returns their ids"""
+        results = future.result()
+        crud_indicator.sync_article_indicators(db, dict(results))
+        # Matches ride on the articles update's commit
+        watchlist_matcher.match_and_record(db, {article_id: (iocs, texts[article_id]) for article_id, iocs in results})
+        crud_article.bulk_update_articles(db, [
+            {"id": article_id, "iocs": iocs, "iocs_content_hash": hashes[article_id], "extraction_lease_until": None}
+            for article_id, iocs in results
+        ])
+        found = sum(len(v) for _, iocs in results for v in iocs.values())
+        self._bump(extracted=len(results), iocs_found=found)
+        metrics.IOC_ARTICLES.labels("extracted").inc(len(results))
+        metrics.IOC_FOUND.inc(found)
+        return [article_id for article_id, _ in results]
+
+
+# Create a global instance
+batch_ioc_extractor = BatchIOCExtractor()
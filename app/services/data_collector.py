@@ -1,72 +1,138 @@
-import feedparser
-import requests
-from sqlalchemy.orm import Session
-from app.crud import article as crud_article
-from app.schemas.article import ArticleCreate
-import time
-from datetime import datetime
-
-class RSSDataCollector:
-    def __init__(self):
-        self.feeds = [
-            {
-                "url": "https://feeds.feedburner.com/TheHackersNews",
-                "source": "The Hacker News"
-            },
-            # We'll add more feeds later
-        ]
-
-    def fetch_articles(self) -> list:
-        all_articles = []
-        for feed in self.feeds:
-            try:
-                print(f"Fetching from {feed['source']}...")
-                parsed_feed = feedparser.parse(feed["url"])
-                
-                for entry in parsed_feed.entries:
-                    # Convert published_parsed to datetime if available
-                    published_date = None
-                    if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                        published_date = datetime.fromtimestamp(time.mktime(entry.published_parsed))
-                    
-                    article_data = {
-                        "title": entry.title,
-                        "url": entry.link,
-                        "content": self.get_article_content(entry),
-                        "source": feed["source"],
-                        "published_date": published_date
-                    }
-                    all_articles.append(article_data)
-                    
-                print(f"Found {len(parsed_feed.entries)} articles from {feed['source']}")
-                
-            except Exception as e:
-                print(f"Error fetching from {feed['url']}: {e}")
-        
-        return all_articles
-
-    def get_article_content(self, entry):
-        # Try to get the full content, but if not available, use summary
-        if hasattr(entry, 'content'):
-            return entry.content[0].value
-        elif hasattr(entry, 'summary'):
-            return entry.summary
-        else:
-            return entry.title  # Fallback to title if no content
-
-    def save_articles_to_db(self, db: Session):
-        articles = self.fetch_articles()
-        new_articles_count = 0
-        
-        for article_data in articles:
-            # Check if article already exists by URL
-            existing_article = crud_article.get_article_by_url(db, url=article_data["url"])
-            if not existing_article:
-                article_create = ArticleCreate(**article_data)
-                crud_article.create_article(db, article=article_create)
-                new_articles_count += 1
-                
-        return new_articles_count
-
-# Create a global instance
-rss_collector = RSSDataCollector()
\ No newline at end of file
+import asyncio
+import logging
+from sqlalchemy.orm import Session
+from app import metrics
+from app.config import settings
+from app.crud import article as crud_article
+from app.services.near_duplicate import near_duplicate_detector
+from app.services.page_fetcher import page_fetcher
+import time
+from datetime import datetime
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+class RSSDataCollector:
+    """Fetches and parses feeds; which feeds and when is up to the feed scheduler.
+
+    A feed is a dict with url and source, plus the etag/last_modified validators of
+    its last successful fetch; every fetch returns the validators to store next.
+    """
+
+    def open_session(self):
+        """An aiohttp.ClientSession sized by the FEED_* settings"""
+        # aiohttp and feedparser are imported on first use, they add ~150 ms to the app's import time
+        import aiohttp
+
+        connector = aiohttp.TCPConnector(
+            limit=settings.FEED_CONCURRENCY,
+            limit_per_host=settings.FEED_PER_HOST_LIMIT
+        )
+        timeout = aiohttp.ClientTimeout(total=settings.FEED_TIMEOUT)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    def fetch_feeds(self, feeds: List[dict]) -> List[dict]:
+        return asyncio.run(self.fetch_feeds_async(feeds))
+
+    async def fetch_feeds_async(self, feeds: List[dict]) -> List[dict]:
+        """Fetch the feeds concurrently; one result per feed, in order"""
+        semaphore = asyncio.Semaphore(settings.FEED_CONCURRENCY)
+        async with self.open_session() as session:
+            return await asyncio.gather(*(self.fetch_feed(session, semaphore, feed) for feed in feeds))
+
+    async def fetch_feed(self, session, semaphore, feed: dict) -> dict:
+        """{"status": "ok" | "not_modified" | "error", "articles", "etag", "last_modified", "error"}"""
+        result = {
+            "status": "ok",
+            "articles": [],
+            "etag": feed.get("etag"),
+            "last_modified": feed.get("last_modified"),
+            "error": None
+        }
+        headers = {"User-Agent": settings.FEED_USER_AGENT}
+        if feed.get("etag"):
+            headers["If-None-Match"] = feed["etag"]
+        if feed.get("last_modified"):
+            headers["If-Modified-Since"] = feed["last_modified"]
+
+        start = time.perf_counter()
+        try:
+            async with semaphore:
+                logger.debug("Fetching feed", extra={"feed": feed["url"]})
+                async with session.get(feed["url"], headers=headers) as response:
+                    if response.status == 304:
+                        logger.debug("Feed not modified", extra={"feed": feed["url"]})
+                        result["status"] = "not_modified"
+                        return self._observe(result, start)
+                    response.raise_for_status()
+                    body = await response.read()
+                    metrics.FEED_BYTES.inc(len(body))
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+                    response_headers = dict(response.headers)
+
+            # Parsing is CPU bound, keep it off the event loop
+            import feedparser
+
+            loop = asyncio.get_running_loop()
+            parsed_feed = await loop.run_in_executor(
+                None, lambda: feedparser.parse(body, response_headers=response_headers)
+            )
+            result["articles"] = [self._entry_to_article(entry, feed) for entry in parsed_feed.entries]
+
+            # Only hand back new validators once the body has been parsed successfully
+            result["etag"], result["last_modified"] = etag, last_modified
+            logger.info("Fetched feed", extra={"feed": feed["url"], "articles": len(result["articles"]),
+                                               "bytes": len(body)})
+            return self._observe(result, start)
+
+        except Exception as e:
+            logger.warning("Feed fetch failed", extra={"feed": feed["url"], "error": str(e) or type(e).__name__})
+            result["status"], result["error"] = "error", str(e) or type(e).__name__
+            return self._observe(result, start)
+
+    @staticmethod
+    def _observe(result: dict, start: float) -> dict:
+        metrics.FEED_FETCHES.labels(result["status"]).inc()
+        metrics.FEED_FETCH_SECONDS.labels(result["status"]).observe(time.perf_counter() - start)
+        return result
+
+    def _entry_to_article(self, entry, feed) -> dict:
+        # Convert published_parsed to datetime if available
+        published_date = None
+        if hasattr(entry, 'published_parsed') and entry.published_parsed:
+            published_date = datetime.fromtimestamp(time.mktime(entry.published_parsed))
+
+        return {
+            "title": entry.title,
+            "url": entry.link,
+            "content": self.get_article_content(entry),
+            "source": feed["source"],
+            "published_date": published_date
+        }
+
+    def get_article_content(self, entry):
+        # Try to get the full content, but if not available, use summary
+        if hasattr(entry, 'content'):
+            return entry.content[0].value
+        elif hasattr(entry, 'summary'):
+            return entry.summary
+        else:
+            return entry.title  # Fallback to title if no content
+
+    def save_articles_to_db(self, db: Session, articles: List[dict]) -> int:
+        """Store the articles not seen before; returns how many were new"""
+        if not articles:
+            return 0
+
+        new_article_ids = crud_article.bulk_create_articles(db, articles)
+        metrics.FEED_NEW_ARTICLES.inc(len(new_article_ids))
+        if settings.FULL_TEXT_FETCH:
+            # Before clustering, so near-duplicates are matched on the full text
+            page_fetcher.enrich(db, new_article_ids)
+        # Syndicated copies under new URLs join the original's cluster and skip LLM processing
+        near_duplicate_detector.assign_clusters(db, new_article_ids)
+        return len(new_article_ids)
+
+# Create a global instance
+rss_collector = RSSDataCollector()
@@ -0,0 +1,150 @@
+import csv
+import io
+import json
+import uuid
+import zlib
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
+
+from app.crud import export as crud_export
+from app.database import AsyncSessionLocal
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "stix": "application/stix+json;version=2.1",
+}
+
+# Deterministic STIX ids: the same indicator gets the same id in every export
+_STIX_NAMESPACE = uuid.UUID("5e2b8d3c-6a1f-4f57-9a0e-3c1d2b7a8e41")
+
+# STIX object path per indicator type
+_STIX_PATHS = {
+    "ipv4": "ipv4-addr:value",
+    "domain": "domain-name:value",
+    "url": "url:value",
+    "email": "email-addr:value",
+    "md5": "file:hashes.MD5",
+    "sha1": "file:hashes.'SHA-1'",
+    "sha256": "file:hashes.'SHA-256'",
+}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _stix_time(value: Optional[datetime]) -> Optional[str]:
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def stix_indicator(row) -> Optional[dict]:
+    """STIX 2.1 indicator object for an indicators row, None for types STIX has no pattern for"""
+    path = _STIX_PATHS.get(row.type)
+    if path is None:
+        return None
+    value = row.value.replace("\\", "\\\\").replace("'", "\\'")
+    first_seen = _stix_time(row.first_seen)
+    return {
+        "type": "indicator",
+        "spec_version": "2.1",
+        "id": f"indicator--{uuid.uuid5(_STIX_NAMESPACE, f'{row.type}:{row.value}')}",
+        "created": first_seen,
+        "modified": _stix_time(row.last_seen) or first_seen,
+        "name": f"{row.type} {row.value}",
+        "indicator_types": ["malicious-activity"],
+        "pattern": f"[{path} = '{value}']",
+        "pattern_type": "stix",
+        "valid_from": first_seen,
+    }
+
+
+class BulkExporter:
+    """Encodes export row streams as NDJSON, CSV or a STIX 2.1 bundle, optionally gzipped.
+
+    Each partition of rows becomes one chunk of the response body, so the encoded output
+    is never held in memory either. Every export opens its own session: the response body
+    is produced after the request handler (and its dependencies) have returned.
+    """
+
+    async def articles(self, fmt: str, since: Optional[datetime] = None, source: Optional[str] = None,
+                       include_content: bool = False) -> AsyncIterator[bytes]:
+        fields = crud_export.article_fields(include_content)
+        async with AsyncSessionLocal() as db:
+            partitions = crud_export.stream_articles(db, fields, since=since, source=source)
+            if fmt == "csv":
+                encoded = self._csv(partitions, fields)
+            else:
+                encoded = self._ndjson(partitions, fields)
+            async for chunk in encoded:
+                yield chunk
+
+    async def indicators(self, fmt: str, since: Optional[datetime] = None,
+                         ioc_type: Optional[str] = None) -> AsyncIterator[bytes]:
+        fields = crud_export.INDICATOR_FIELDS
+        async with AsyncSessionLocal() as db:
+            partitions = crud_export.stream_indicators(db, since=since, ioc_type=ioc_type)
+            if fmt == "stix":
+                encoded = self._stix_bundle(partitions)
+            elif fmt == "csv":
+                encoded = self._csv(partitions, fields)
+            else:
+                encoded = self._ndjson(partitions, fields)
+            async for chunk in encoded:
+                yield chunk
+
+    @staticmethod
+    async def gzip(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+        async for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
+
+    @staticmethod
+    async def _ndjson(partitions, fields) -> AsyncIterator[bytes]:
+        async for partition in partitions:
+            yield "".join(
+                json.dumps(dict(zip(fields, row)), default=_json_default, ensure_ascii=False) + "\n"
+                for row in partition
+            ).encode()
+
+    @staticmethod
+    async def _csv(partitions, fields) -> AsyncIterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        async for partition in partitions:
+            for row in partition:
+                writer.writerow([
+                    json.dumps(value) if isinstance(value, (dict, list)) else
+                    value.isoformat() if isinstance(value, datetime) else value
+                    for value in row
+                ])
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+    @staticmethod
+    async def _stix_bundle(partitions) -> AsyncIterator[bytes]:
+        yield f'{{"type": "bundle", "id": "bundle--{uuid.uuid4()}", "objects": ['.encode()
+        first = True
+        async for partition in partitions:
+            objects = [json.dumps(obj) for obj in map(stix_indicator, partition) if obj is not None]
+            if objects:
+                yield (("" if first else ",") + ",".join(objects)).encode()
+                first = False
+        yield b"]}"
+
+
+# Create a global instance
+bulk_exporter = BulkExporter()
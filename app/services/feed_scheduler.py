@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.crud import feed as crud_feed
+from app.database import SessionLocal
+from app.services.data_collector import rss_collector
+
+logger = logging.getLogger(__name__)
+
+# Weight of the latest estimate when smoothing a feed's poll interval
+SMOOTHING = 0.5
+# Polls per expected new item: an article waits about an eighth of the gap between items on average
+POLLS_PER_ITEM = 4
+# A feed never seen publishing anything new is polled this much less often each time
+IDLE_GROWTH = 1.5
+
+
+def clamp(interval: float) -> float:
+    return min(max(interval, settings.FEED_MIN_INTERVAL), settings.FEED_MAX_INTERVAL)
+
+
+def jitter(seconds: float) -> timedelta:
+    # Spread feeds that share an interval so they don't all fall due in the same tick
+    return timedelta(seconds=seconds * random.uniform(0.9, 1.1))
+
+
+def publish_gap(articles: List[dict], now: datetime) -> Optional[float]:
+    """Average seconds between items, from the entries a feed currently lists.
+
+    Measured up to now rather than to the newest entry, so a feed that has gone
+    quiet looks as slow as it has become.
+    """
+    naive_now = now.astimezone(timezone.utc).replace(tzinfo=None)  # published_date is naive UTC
+    dates = [a["published_date"] for a in articles if a.get("published_date") and a["published_date"] <= naive_now]
+    if len(dates) < 2:
+        return None
+    return (naive_now - min(dates)).total_seconds() / len(dates)
+
+
+class FeedScheduler:
+    """Polls every enabled feed when it falls due, on its own adaptive interval.
+
+    A background thread runs an event loop with one shared HTTP session. Due feeds
+    are leased in the feeds table before they are fetched, so a feed is never polled
+    twice at once, whether by this loop, another worker process or a manual fetch.
+    After each poll the feed's interval moves towards its observed publish rate;
+    failures instead push the next poll out exponentially.
+    """
+
+    def __init__(self):
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def schedule(self, feed: dict, result: dict, new_articles: int, now: datetime) -> dict:
+        """Feed column values after a poll with this result"""
+        interval = feed.get("poll_interval") or settings.FEED_DEFAULT_INTERVAL
+        if result["status"] == "error":
+            failures = (feed.get("consecutive_failures") or 0) + 1
+            backoff = min(interval * 2 ** failures, max(settings.FEED_MAX_BACKOFF, interval))
+            return {
+                "consecutive_failures": failures,
+                "last_error": result["error"],
+                "next_poll_at": now + jitter(backoff),
+            }
+
+        gap = publish_gap(result["articles"], now)
+        last_new_at = feed.get("last_new_at")
+        if gap is not None:
+            target = gap / POLLS_PER_ITEM
+        elif new_articles:
+            target = interval / 2
+        elif last_new_at is not None:
+            # Nothing new and no dates to go by (304): the quiet spell so far is a lower bound on the gap
+            if last_new_at.tzinfo is None:
+                last_new_at = last_new_at.replace(tzinfo=timezone.utc)
+            target = max(interval, (now - last_new_at).total_seconds() / POLLS_PER_ITEM)
+        else:
+            target = interval * IDLE_GROWTH
+        interval = clamp((1 - SMOOTHING) * interval + SMOOTHING * target)
+
+        values = {
+            "poll_interval": interval,
+            "next_poll_at": now + jitter(interval),
+            "consecutive_failures": 0,
+            "last_error": None,
+            "last_success_at": now,
+            "etag": result["etag"],
+            "last_modified": result["last_modified"],
+        }
+        if new_articles:
+            values["last_new_at"] = now
+        return values
+
+    def record(self, feed: dict, result: dict) -> int:
+        """Store a poll's articles and the feed's next schedule; returns the new article count"""
+        db = SessionLocal()
+        try:
+            new_articles = rss_collector.save_articles_to_db(db, result["articles"])
+            values = self.schedule(feed, result, new_articles, datetime.now(timezone.utc))
+            crud_feed.record_poll(db, feed["id"], values, new_articles=new_articles)
+            return new_articles
+        except Exception as e:
+            db.rollback()
+            logger.exception("Storing feed articles failed", extra={"feed": feed["url"]})
+            failed = {**result, "status": "error", "error": f"storing articles: {e}"}
+            crud_feed.record_poll(db, feed["id"], self.schedule(feed, failed, 0, datetime.now(timezone.utc)))
+            return 0
+        finally:
+            db.close()
+
+    async def poll(self, session, semaphore, feed: dict) -> int:
+        result = await rss_collector.fetch_feed(session, semaphore, feed)
+        # Inserts and clustering are blocking, keep them off the event loop
+        return await asyncio.get_running_loop().run_in_executor(None, self.record, feed, result)
+
+    def poll_now(self, db: Session, progress: Optional[Callable] = None) -> dict:
+        """Poll every enabled feed right away, skipping ones being polled elsewhere"""
+        feeds = []
+        while True:
+            claimed = crud_feed.claim_feeds(db, settings.FEED_LEASE_SECONDS, due_only=False,
+                                            exclude=[feed["id"] for feed in feeds])
+            if not claimed:
+                break
+            feeds += claimed
+
+        async def run():
+            semaphore = asyncio.Semaphore(settings.FEED_CONCURRENCY)
+            done = 0
+
+            async def poll_one(feed):
+                nonlocal done
+                new_articles = await self.poll(session, semaphore, feed)
+                done += 1
+                if progress:
+                    progress(done, len(feeds))
+                return new_articles
+
+            async with rss_collector.open_session() as session:
+                return await asyncio.gather(*(poll_one(feed) for feed in feeds))
+
+        new_articles = sum(asyncio.run(run())) if feeds else 0
+        return {"feeds_polled": len(feeds), "new_articles": new_articles}
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._run()), name="feed-scheduler", daemon=True)
+        self._thread.start()
+        logger.info("Feed scheduler started")
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(settings.FEED_CONCURRENCY)
+        in_flight = {}
+        async with rss_collector.open_session() as session:
+            while not self._stop.is_set():
+                try:
+                    free = settings.FEED_CONCURRENCY - len(in_flight)
+                    feeds = await loop.run_in_executor(None, self._claim_due, free, list(in_flight)) if free > 0 else []
+                    for feed in feeds:
+                        task = asyncio.create_task(self.poll(session, semaphore, feed))
+                        in_flight[feed["id"]] = task
+                        task.add_done_callback(lambda _, feed_id=feed["id"]: in_flight.pop(feed_id, None))
+                    wait = await loop.run_in_executor(None, self._seconds_until_due)
+                except Exception as e:
+                    logger.exception("Feed scheduler error")
+                    wait = settings.FEED_SCHEDULER_TICK
+                # Sleep in short steps so stop() is noticed quickly
+                deadline = loop.time() + wait
+                while not self._stop.is_set() and loop.time() < deadline:
+                    await asyncio.sleep(min(1.0, deadline - loop.time()))
+            if in_flight:
+                # Unfinished polls keep their lease and are retried once it runs out
+                for task in in_flight.values():
+                    task.cancel()
+                await asyncio.gather(*in_flight.values(), return_exceptions=True)
+
+    def _claim_due(self, limit: int, exclude: List[int]) -> List[dict]:
+        db = SessionLocal()
+        try:
+            return crud_feed.claim_feeds(db, settings.FEED_LEASE_SECONDS, limit=limit, exclude=exclude)
+        finally:
+            db.close()
+
+    def _seconds_until_due(self) -> float:
+        db = SessionLocal()
+        try:
+            due = crud_feed.next_due_at(db)
+        finally:
+            db.close()
+        if due is None:
+            return settings.FEED_SCHEDULER_TICK
+        if due.tzinfo is None:
+            due = due.replace(tzinfo=timezone.utc)
+        wait = (due - datetime.now(timezone.utc)).total_seconds()
+        return min(max(wait, 1.0), settings.FEED_SCHEDULER_TICK)
+
+
+# Create a global instance
+feed_scheduler = FeedScheduler()
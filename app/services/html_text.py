@@ -0,0 +1,108 @@
+"""Main-text extraction from article pages in one pass of the stdlib HTML parser.
+
+Text is collected per block element. Chrome (scripts, navigation, headers,
+footers, sidebars, forms) is skipped outright, and blocks that are mostly link
+text (menus, tag clouds, related-article lists) are dropped. When the page marks
+its content with <article> or <main>, only the blocks inside it are kept.
+"""
+import re
+from html.parser import HTMLParser
+from typing import List
+
+SKIPPED_TAGS = {
+    "head", "title", "script", "style", "noscript", "template", "svg", "canvas", "iframe",
+    "nav", "header", "footer", "aside", "form", "button", "select", "textarea",
+}
+BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "li", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6",
+    "blockquote", "pre", "table", "tr", "td", "th", "dd", "dt", "figcaption", "br", "hr",
+}
+VOID_TAGS = {"br", "hr", "img", "input", "meta", "link", "source", "wbr", "area", "base", "col", "embed", "param", "track"}
+CONTENT_TAGS = {"article", "main"}
+
+# Blocks where links make up more of the text than this are navigation, not prose
+MAX_LINK_DENSITY = 0.5
+# Text inside <article>/<main> shorter than this means the markup is misleading; use the whole page
+MIN_CONTENT_CHARS = 200
+
+_WHITESPACE = re.compile(r"\s+")
+_TAGS = re.compile(r"<[^>]+>")
+
+
+class _BlockCollector(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks = []  # (text, link_chars, in_content)
+        self._parts: List[str] = []
+        self._link_chars = 0
+        self._skip_depth = 0
+        self._link_depth = 0
+        self._content_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif self._skip_depth:
+            return
+        if tag in BLOCK_TAGS:
+            self._flush()
+        if tag in CONTENT_TAGS:
+            self._content_depth += 1
+        elif tag == "a":
+            self._link_depth += 1
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in BLOCK_TAGS and not self._skip_depth:
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+            return
+        if self._skip_depth or tag in VOID_TAGS:
+            return
+        if tag in BLOCK_TAGS:
+            self._flush()
+        if tag in CONTENT_TAGS:
+            self._content_depth = max(0, self._content_depth - 1)
+        elif tag == "a":
+            self._link_depth = max(0, self._link_depth - 1)
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        self._parts.append(data)
+        if self._link_depth:
+            self._link_chars += len(data.strip())
+
+    def _flush(self):
+        text = _WHITESPACE.sub(" ", "".join(self._parts)).strip()
+        if text:
+            self.blocks.append((text, self._link_chars, self._content_depth > 0))
+        self._parts, self._link_chars = [], 0
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def html_to_text(html: str) -> str:
+    """The readable body of a page as paragraphs separated by blank lines"""
+    collector = _BlockCollector()
+    try:
+        collector.feed(html)
+        collector.close()
+    except Exception:
+        # html.parser is lenient, but keep whatever was collected before a hard failure
+        pass
+    prose = [(text, in_content) for text, link_chars, in_content in collector.blocks
+             if link_chars / len(text) <= MAX_LINK_DENSITY]
+    content = [text for text, in_content in prose if in_content]
+    if sum(map(len, content)) < MIN_CONTENT_CHARS:
+        content = [text for text, _ in prose]
+    return "\n\n".join(content)
+
+
+def strip_tags(html: str) -> str:
+    """Cheap text of a feed snippet, to compare its length with an extracted page"""
+    return _WHITESPACE.sub(" ", _TAGS.sub(" ", html or "")).strip()
@@ -0,0 +1,84 @@
+import bisect
+import threading
+import time
+from collections import deque
+from typing import Iterable, Set
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.crud import indicator as crud_indicator
+
+
+class IndicatorIndex:
+    """In-memory set of every known indicator value, used to answer "never seen" without the DB.
+
+    The set only grows, so a miss is authoritative while a hit still has to be confirmed
+    against the indicators table. Before each check it pulls the rows added since the
+    highest id it has seen, which also picks up indicators written by other processes.
+
+    Ids aren't committed in order everywhere: on Postgres a transaction that took a lower
+    id can commit after a higher one was loaded. Each load is kept as an open (low, high]
+    segment with its row count for INDICATOR_INDEX_SETTLE_SECONDS; when the DB counts more
+    rows in the open segments than were loaded, they are read again. A full reload every
+    INDICATOR_INDEX_RELOAD_SECONDS covers transactions slower than that. SQLite serializes
+    writers, so its ids settle as soon as they are loaded.
+    """
+
+    def __init__(self):
+        self._values: Set[str] = set()
+        self._max_id = 0
+        self._settled_id = 0  # Ids up to here are final: loaded, or never coming
+        self._segments = deque()  # (loaded at, low, high, rows), open segments in id order
+        self._reloaded_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def refresh(self, db: Session):
+        with self._lock:
+            now = time.monotonic()
+            if now - self._reloaded_at >= settings.INDICATOR_INDEX_RELOAD_SECONDS:
+                self._values, self._max_id, self._settled_id = set(), 0, 0
+                self._segments.clear()
+                self._reloaded_at = now
+            while self._segments and now - self._segments[0][0] >= settings.INDICATOR_INDEX_SETTLE_SECONDS:
+                self._settled_id = self._segments.popleft()[2]
+
+            if self._segments:
+                loaded = sum(segment[3] for segment in self._segments)
+                if crud_indicator.count_indicators_between(db, self._settled_id, self._max_id) != loaded:
+                    self._reload_open(db)
+
+            rows = crud_indicator.get_indicator_values_after(db, self._max_id)
+            if rows:
+                self._values.update(value for _, value in rows)
+                if self._commits_in_order(db):
+                    self._settled_id = rows[-1][0]
+                else:
+                    self._segments.append((now, self._max_id, rows[-1][0], len(rows)))
+                self._max_id = rows[-1][0]
+
+    @staticmethod
+    def _commits_in_order(db: Session) -> bool:
+        return db.get_bind().dialect.name == "sqlite"
+
+    def _reload_open(self, db: Session):
+        """Read the open segments again, picking up rows that committed late"""
+        rows = crud_indicator.get_indicator_values_after(db, self._settled_id, self._max_id)
+        self._values.update(value for _, value in rows)
+        ids = [row_id for row_id, _ in rows]
+        self._segments = deque(
+            (loaded_at, low, high, bisect.bisect_right(ids, high) - bisect.bisect_right(ids, low))
+            for loaded_at, low, high, _ in self._segments
+        )
+
+    def filter_known(self, db: Session, values: Iterable[str]) -> Set[str]:
+        """Subset of values that may exist in the DB; everything else certainly doesn't"""
+        self.refresh(db)
+        return {value for value in values if value in self._values}
+
+    def __len__(self):
+        return len(self._values)
+
+
+# Create a global instance
+indicator_index = IndicatorIndex()
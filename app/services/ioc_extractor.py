@@ -1,39 +1,198 @@
-import re
-import json
-from typing import Dict, List, Any
-
-class IOCExtractor:
-    def __init__(self):
-        # Regular expressions for common IOCs
-        self.patterns = {
-            'ipv4': r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b',
-            'domain': r'\b([a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,}\b',
-            'md5': r'\b[a-fA-F0-9]{32}\b',
-            'sha1': r'\b[a-fA-F0-9]{40}\b',
-            'sha256': r'\b[a-fA-F0-9]{64}\b',
-            'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-            'url': r'https?://(?:[-\w.]|(?:%[\da-fA-F]{2}))+[/\w\.-]*\??[/\w\.-=&]*'
-        }
-    
-    def extract_iocs(self, text: str) -> Dict[str, List[str]]:
-        """Extract Indicators of Compromise from text"""
-        if not text:
-            return {}
-            
-        iocs = {}
-        
-        for ioc_type, pattern in self.patterns.items():
-            matches = re.findall(pattern, text)
-            # Clean up matches
-            if ioc_type == 'domain':
-                # Filter out common non-malicious domains
-                matches = [m for m in matches if not any(common in m.lower() for common in 
-                          ['microsoft.com', 'google.com', 'apple.com', 'amazon.com'])]
-            
-            if matches:
-                iocs[ioc_type] = list(set(matches))  # Remove duplicates
-        
-        return iocs
-
-# Create a global instance
-ioc_extractor = IOCExtractor()
\ No newline at end of file
+import hashlib
+import re
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+# Bump whenever the patterns or filters change so stored IOCs get re-extracted
+EXTRACTOR_VERSION = "3"
+
+# Separators seen in defanged indicators: evil[.]com, 10(.)0.0.1, evil[dot]com
+_DOT = r'(?:\[\.\]|\(\.\)|\{\.\}|\[dot\]|\(dot\)|\.)'
+_LABEL = r'[A-Za-z0-9](?:[A-Za-z0-9\-]{0,61}[A-Za-z0-9])?'
+
+# Cheap first stage: a word followed by something that can continue an indicator
+# (., @, [.], (.), {.}, ://) or ending in a 32+ char hex run. Plain prose never gets past it.
+# The word is matched atomically, (?=(...))\1, so a failed word isn't retried shorter; a
+# possessive ++ would do the same but needs Python 3.11
+_CANDIDATE = re.compile(r'\b(?=([\w\-%+]+))\1(?:(?=[.@\[({:])|(?<=[0-9A-Fa-f]{32}))')
+
+# Second stage, anchored at each candidate: one alternation tried left to right,
+# so a URL wins over the domain inside it and an email wins over its local part
+_SCANNER = re.compile(
+    rf'''
+    (?P<url>\b(?:hxxps?|https?|fxps?|ftps?)(?:://|\[://\]|\[:\]//)[^\s<>"'`]+)
+  | (?P<email>\b[A-Za-z0-9._%+\-]+(?:@|\[@\]|\[at\]){_LABEL}(?:{_DOT}{_LABEL})*{_DOT}[A-Za-z]{{2,63}}\b)
+  | (?P<hash>\b[A-Fa-f0-9]{{32,64}}\b)
+  | (?P<ipv4>(?<![\w.\-])(?:\d{{1,3}}{_DOT}){{3}}\d{{1,3}}(?!\.?[\w\-]))
+  | (?P<domain>\b(?:{_LABEL}{_DOT})+[A-Za-z]{{2,63}}\b)
+    ''',
+    re.VERBOSE | re.IGNORECASE
+)
+
+_REFANG = [
+    (re.compile(r'^hxxp', re.IGNORECASE), 'http'),
+    (re.compile(r'^fxp', re.IGNORECASE), 'ftp'),
+    (re.compile(r'\[://\]|\[:\]//'), '://'),
+    (re.compile(r'\[@\]|\[at\]', re.IGNORECASE), '@'),
+    (re.compile(r'\[\.\]|\(\.\)|\{\.\}|\[dot\]|\(dot\)', re.IGNORECASE), '.'),
+]
+
+# Host part of a (refanged) URL: skips userinfo, stops at port, path, query or fragment
+_URL_HOST = re.compile(r'^(?P<scheme>[a-z]+)://(?:[^@/?#]*@)?(?P<host>[^:/?#]+)', re.IGNORECASE)
+
+_HASH_TYPES = {32: 'md5', 40: 'sha1', 64: 'sha256'}
+
+# Every type scan() yields
+IOC_TYPES = ('url', 'email', 'md5', 'sha1', 'sha256', 'ipv4', 'domain')
+
+# Well-known domains never worth reporting; matched on label boundaries, so
+# "login.microsoft.com" is skipped but "microsoft.com.evil.io" is not
+BENIGN_DOMAINS = frozenset({
+    'microsoft.com', 'windows.com', 'office.com', 'live.com', 'bing.com',
+    'google.com', 'googleapis.com', 'gstatic.com', 'youtube.com', 'android.com',
+    'apple.com', 'icloud.com', 'amazon.com', 'amazonaws.com', 'cloudflare.com',
+    'github.com', 'twitter.com', 'x.com', 'linkedin.com', 'facebook.com',
+    'mozilla.org', 'wikipedia.org', 'w3.org', 'schema.org',
+    'thehackernews.com', 'feedburner.com', 'blogger.com',
+})
+
+# File names look like domains ("loader.exe", "index.php"); no real indicator ends in these
+FILE_EXTENSIONS = frozenset({
+    'exe', 'dll', 'sys', 'bat', 'cmd', 'ps1', 'vbs', 'js', 'jar', 'py', 'sh', 'bin',
+    'msi', 'lnk', 'iso', 'img', 'dmg', 'apk', 'doc', 'docx', 'docm', 'xls', 'xlsx',
+    'xlsm', 'ppt', 'pptx', 'pdf', 'rtf', 'txt', 'log', 'csv', 'json', 'xml', 'yaml',
+    'ini', 'cfg', 'conf', 'dat', 'tmp', 'php', 'asp', 'aspx', 'jsp', 'html', 'htm',
+    'css', 'png', 'jpg', 'jpeg', 'gif', 'svg', 'rar', 'gz', 'tar', '7z', 'cab',
+})
+
+
+class IOCMatch(NamedTuple):
+    type: str
+    value: str
+    start: int
+    end: int
+
+
+def refang(value: str) -> str:
+    """Turn defanged notation (hxxp, [.], [at]) back into the real indicator"""
+    for pattern, replacement in _REFANG:
+        value = pattern.sub(replacement, value)
+    return value
+
+
+def canonical_url(url: str) -> str:
+    """Scheme and host lower-cased; userinfo, path and query are case-sensitive and kept"""
+    parts = _URL_HOST.match(url)
+    if not parts:
+        return url
+    return (url[:parts.end('scheme')].lower() + url[parts.end('scheme'):parts.start('host')]
+            + parts.group('host').lower() + url[parts.end('host'):])
+
+
+def canonical(value: str) -> str:
+    """The form indicators are stored and looked up in: refanged, lower-cased except a URL's path"""
+    value = refang(value.strip())
+    return canonical_url(value) if '://' in value else value.lower()
+
+
+def content_hash(text: str) -> str:
+    """Fingerprint of the text IOCs are extracted from, tied to the extractor version"""
+    return hashlib.sha256(f"{EXTRACTOR_VERSION}\0{text}".encode("utf-8", "surrogatepass")).hexdigest()
+
+
+def is_benign_domain(domain: str) -> bool:
+    labels = domain.split('.')
+    return any('.'.join(labels[i:]) in BENIGN_DOMAINS for i in range(len(labels) - 1))
+
+
+class IOCExtractor:
+    def scan(self, text: str) -> Iterator[IOCMatch]:
+        """Yield every indicator in text with its offsets, in a single pass"""
+        if not text:
+            return
+
+        pos = 0
+        while True:
+            candidate = _CANDIDATE.search(text, pos)
+            if not candidate:
+                return
+            match = _SCANNER.match(text, candidate.start())
+            if not match:
+                pos = candidate.end()
+                continue
+            pos = match.end()
+
+            kind = match.lastgroup
+            raw = match.group()
+            start, end = match.span()
+
+            if kind == 'url':
+                # Trailing punctuation belongs to the sentence, not the URL
+                trimmed = raw.rstrip('.,;:!?)\'"')
+                while trimmed.endswith(']') and trimmed.count('[') < trimmed.count(']'):
+                    trimmed = trimmed[:-1]
+                end = start + len(trimmed)
+                value = canonical_url(refang(trimmed))
+                yield IOCMatch('url', value, start, end)
+                host = _URL_HOST.match(value)
+                if host:
+                    host_match = self._classify_host(host.group('host').lower(), start, end)
+                    if host_match:
+                        yield host_match
+
+            elif kind == 'email':
+                value = refang(raw).lower()
+                yield IOCMatch('email', value, start, end)
+                host_match = self._classify_host(value.rsplit('@', 1)[1], start, end)
+                if host_match:
+                    yield host_match
+
+            elif kind == 'hash':
+                hash_type = _HASH_TYPES.get(len(raw))
+                if hash_type:
+                    yield IOCMatch(hash_type, raw.lower(), start, end)
+
+            elif kind == 'ipv4':
+                value = refang(raw)
+                if self._valid_ipv4(value):
+                    yield IOCMatch('ipv4', value, start, end)
+
+            else:
+                domain_match = self._classify_host(refang(raw).lower(), start, end)
+                if domain_match:
+                    yield domain_match
+
+    def extract_iocs(self, text: str) -> Dict[str, List[str]]:
+        """Extract Indicators of Compromise from text"""
+        if not text:
+            return {}
+
+        iocs = {}
+        for match in self.scan(text):
+            # dict keeps first-seen order while removing duplicates
+            iocs.setdefault(match.type, {})[match.value] = None
+
+        return {ioc_type: list(values) for ioc_type, values in iocs.items()}
+
+    def _classify_host(self, host: str, start: int, end: int) -> Optional[IOCMatch]:
+        if self._valid_ipv4(host):
+            return IOCMatch('ipv4', host, start, end)
+        tld = host.rsplit('.', 1)[-1]
+        if '.' not in host or not tld.isalpha() or tld in FILE_EXTENSIONS or is_benign_domain(host):
+            return None
+        return IOCMatch('domain', host, start, end)
+
+    @staticmethod
+    def _valid_ipv4(value: str) -> bool:
+        octets = value.split('.')
+        return (
+            len(octets) == 4
+            and all(octet.isdigit() and len(octet) <= 3 and int(octet) <= 255 for octet in octets)
+        )
+
+# Create a global instance
+ioc_extractor = IOCExtractor()
+
+
+def extract_batch(items: List[Tuple[int, str]]) -> List[Tuple[int, Dict[str, List[str]]]]:
+    """Process pool entry point: extract IOCs for a chunk of (article_id, text) pairs"""
+    return [(article_id, ioc_extractor.extract_iocs(text)) for article_id, text in items]
@@ -0,0 +1,197 @@
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from typing import Callable, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app import metrics
+from app.config import settings
+from app.crud import job as crud_job
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    """Raised from JobContext.progress once the job should stop"""
+
+
+class JobContext:
+    """Handed to every handler: report progress, find out about cancellation.
+
+    progress() only touches memory; the queue's heartbeat thread persists it and
+    fetches the cancel flag, so handlers can call it as often as they like.
+    """
+
+    def __init__(self, job_id: int):
+        self.job_id = job_id
+        self.done = 0
+        self.total = None
+        self.message = None
+        self.cancel_requested = False
+        self.shutting_down = False
+
+    def progress(self, done: int, total: Optional[int] = None, message: Optional[str] = None):
+        self.done = done
+        if total is not None:
+            self.total = total
+        if message is not None:
+            self.message = message
+        self.raise_if_cancelled()
+
+    def raise_if_cancelled(self):
+        if self.cancel_requested:
+            raise JobCancelled("Cancelled on request")
+        if self.shutting_down:
+            raise JobCancelled("Worker shutting down")
+
+
+class JobQueue:
+    """Durable job queue backed by the jobs table.
+
+    Worker threads claim queued jobs with a conditional UPDATE, so any number of them
+    can run in the API process or in separate `python -m app.cli worker` processes
+    against the same database. A heartbeat thread persists progress, picks up cancel
+    requests and requeues jobs whose worker died.
+    """
+
+    def __init__(self):
+        self.handlers: Dict[str, Callable] = {}
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._active: Dict[int, JobContext] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def register(self, kind: str):
+        """Decorator: handler(db, params, ctx) -> JSON-serializable result"""
+        def decorator(handler: Callable):
+            self.handlers[kind] = handler
+            return handler
+        return decorator
+
+    def submit(self, db: Session, kind: str, params: Optional[dict] = None):
+        """Returns (job, created); an identical queued or running job is returned instead of a new one"""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        return crud_job.create_job(db, kind, params)
+
+    def submit_parallel(self, db: Session, kind: str, params: Optional[dict] = None, parts: int = 1) -> list:
+        """Submit a run as parts jobs that free workers, here or in other processes, pick up side by side.
+
+        Only for handlers whose runs lease their rows (process-all, extract-iocs), so the parts
+        split the work. The first part carries params unchanged, so parts=1 is plain submit().
+        """
+        return [self.submit(db, kind, {**(params or {}), "part": part} if part else params) for part in range(parts)]
+
+    @property
+    def is_running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self, workers: int = 1):
+        if self.is_running:
+            return
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._work, args=(f"{self.worker_id}:{n}",), name=f"job-worker-{n}", daemon=True)
+            for n in range(workers)
+        ]
+        self._threads.append(threading.Thread(target=self._beat, name="job-heartbeat", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        logger.info("Job queue started", extra={"workers": workers, "worker_id": self.worker_id})
+
+    def stop(self, timeout: float = 10.0):
+        """Ask running handlers to stop at their next progress report; their jobs go back to the queue"""
+        self._stop.set()
+        with self._lock:
+            for ctx in self._active.values():
+                ctx.shutting_down = True
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _work(self, worker_id: str):
+        while not self._stop.is_set():
+            db = SessionLocal()
+            try:
+                job = crud_job.claim_next_job(db, worker_id, kinds=list(self.handlers))
+                if job is None:
+                    self._stop.wait(settings.JOB_POLL_INTERVAL)
+                else:
+                    self._execute(db, job)
+            except Exception as e:
+                logger.exception("Job worker error", extra={"worker_id": worker_id})
+                self._stop.wait(settings.JOB_POLL_INTERVAL)
+            finally:
+                db.close()
+
+    def _execute(self, db: Session, job):
+        ctx = JobContext(job.id)
+        ctx.cancel_requested = job.cancel_requested
+        with self._lock:
+            self._active[job.id] = ctx
+        job_log = {"job_id": job.id, "kind": job.kind}
+        logger.info("Job started", extra=job_log)
+        start = time.perf_counter()
+        status = "succeeded"
+        try:
+            ctx.raise_if_cancelled()
+            result = self.handlers[job.kind](db, dict(job.params or {}), ctx)
+        except JobCancelled as e:
+            db.rollback()
+            if ctx.cancel_requested:
+                status = "cancelled"
+                crud_job.finish_job(db, job.id, status, error=str(e))
+                logger.info("Job cancelled", extra=job_log)
+            else:
+                status = "requeued"
+                crud_job.requeue_job(db, job.id)
+                logger.info("Job requeued", extra={**job_log, "reason": str(e)})
+        except Exception as e:
+            db.rollback()
+            status = "failed"
+            crud_job.finish_job(db, job.id, status, error="".join(traceback.format_exception_only(type(e), e)).strip())
+            logger.exception("Job failed", extra=job_log)
+        else:
+            self._save_progress(db, ctx)
+            crud_job.finish_job(db, job.id, status, result=result)
+            logger.info("Job succeeded", extra={**job_log, "seconds": round(time.perf_counter() - start, 3)})
+        finally:
+            metrics.JOBS_FINISHED.labels(job.kind, status).inc()
+            metrics.JOB_SECONDS.labels(job.kind).observe(time.perf_counter() - start)
+            with self._lock:
+                self._active.pop(job.id, None)
+
+    def _beat(self):
+        last_sweep = 0.0
+        while not self._stop.wait(settings.JOB_HEARTBEAT_INTERVAL):
+            db = SessionLocal()
+            try:
+                with self._lock:
+                    active = list(self._active.values())
+                for ctx in active:
+                    ctx.cancel_requested = self._save_progress(db, ctx) or ctx.cancel_requested
+
+                if time.monotonic() - last_sweep >= settings.JOB_STALE_AFTER_SECONDS / 2:
+                    last_sweep = time.monotonic()
+                    requeued = crud_job.requeue_stale_jobs(db, settings.JOB_STALE_AFTER_SECONDS)
+                    if requeued:
+                        logger.warning("Requeued stale jobs", extra={"jobs": requeued})
+            except Exception as e:
+                db.rollback()
+                logger.exception("Job heartbeat error")
+            finally:
+                db.close()
+
+    @staticmethod
+    def _save_progress(db: Session, ctx: JobContext) -> bool:
+        return crud_job.heartbeat(db, ctx.job_id, ctx.done, ctx.total, ctx.message)
+
+
+# Create a global instance
+job_queue = JobQueue()
@@ -0,0 +1,58 @@
+"""Handlers for the long-running operations the API hands off to the job queue.
+
+Import job_queue from here rather than from job_queue.py so the handlers are registered.
+"""
+from sqlalchemy.orm import Session
+
+from app.services.ai_processor import ai_processing_enabled, get_ai_processor
+from app.services.batch_extractor import batch_ioc_extractor
+from app.services.feed_scheduler import feed_scheduler
+from app.services.job_queue import JobContext, job_queue
+from app.services.llm_batch import default_stale_before, llm_batch_processor
+from app.services.page_fetcher import page_fetcher
+from app.services.watchlist import watchlist_matcher
+
+
+@job_queue.register("fetch-articles")
+def fetch_articles(db: Session, params: dict, ctx: JobContext) -> dict:
+    result = feed_scheduler.poll_now(db, progress=ctx.progress)
+    ctx.progress(result["feeds_polled"], result["feeds_polled"], message=f"{result['new_articles']} new articles")
+    return result
+
+
+@job_queue.register("process-article")
+def process_article(db: Session, params: dict, ctx: JobContext) -> dict:
+    ai_processor = get_ai_processor()
+    if ai_processor is None:
+        raise RuntimeError("AI processing is disabled, set GROQ_API_KEY")
+    article_id = params["article_id"]
+    if not ai_processor.process_article(db, article_id):
+        raise RuntimeError(f"Article {article_id} not found or processing failed")
+    return {"article_id": article_id}
+
+
+@job_queue.register("process-all")
+def process_all(db: Session, params: dict, ctx: JobContext) -> dict:
+    if not ai_processing_enabled():
+        raise RuntimeError("AI processing is disabled, set GROQ_API_KEY")
+    return llm_batch_processor.run(db, stale_before=default_stale_before(), progress=ctx.progress)
+
+
+@job_queue.register("extract-iocs")
+def extract_iocs(db: Session, params: dict, ctx: JobContext) -> dict:
+    status = batch_ioc_extractor.run(db, force=params.get("force", False), progress=ctx.progress)
+    if status["error"]:
+        # The extractor records a cancellation as its error, surface it as one
+        ctx.raise_if_cancelled()
+        raise RuntimeError(status["error"])
+    return status
+
+
+@job_queue.register("fetch-full-text")
+def fetch_full_text(db: Session, params: dict, ctx: JobContext) -> dict:
+    return page_fetcher.enrich(db, force=params.get("force", False), progress=ctx.progress)
+
+
+@job_queue.register("match-watchlists")
+def match_watchlists(db: Session, params: dict, ctx: JobContext) -> dict:
+    return watchlist_matcher.scan(db, progress=ctx.progress)
@@ -0,0 +1,306 @@
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app import metrics
+from app.config import settings
+from app.crud import article as crud_article
+from app.schemas.analysis import ThreatAnalysis
+from app.services.ai_processor import (
+    ANALYSIS_MAX_TOKENS,
+    PROMPT_VERSION,
+    analysis_content_hash,
+    analysis_messages,
+    analysis_update,
+    parse_analysis,
+)
+from app.services.llm_cache import response_cache
+from app.services.triage import NO_TRIAGE, TriageModel, triage
+
+# Articles leased per claim, per concurrent call: enough to keep every call slot busy
+CLAIM_PER_SLOT = 2
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(messages: list) -> int:
+    # ~4 characters per token is close enough for budgeting; actual usage is settled afterwards
+    return sum(len(message["content"]) for message in messages) // 4 + 1
+
+
+class TokenBucket:
+    """Refills continuously up to capacity, at capacity units per period seconds"""
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        self._refill()
+        self.tokens -= amount
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute buckets shared by every in-flight call"""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int):
+        # Callers queue on the lock, so they are served in order and never overshoot together
+        async with self._lock:
+            while True:
+                wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+                if wait <= 0:
+                    self.requests.consume(1)
+                    self.tokens.consume(tokens)
+                    return
+                await asyncio.sleep(wait)
+
+    def settle(self, estimated: int, actual: int):
+        """Correct the token bucket once the provider reports real usage"""
+        self.tokens.consume(actual - estimated)
+
+    def pause(self, seconds: float):
+        """After a 429 nobody should fire until the provider's window has passed"""
+        self.requests.consume(self.requests.tokens + seconds * self.requests.rate)
+
+
+class LLMBatchProcessor:
+    """Summarizes and classifies every article that needs it, with bounded concurrency.
+
+    Each article costs at most one structured call, none when the response cache already
+    holds an analysis for the same content. Calls go through a token-bucket limiter sized
+    to the provider quota, 429s and transient errors are retried with exponential backoff
+    and full jitter, and results are committed in batches rather than per article.
+    Articles are leased a chunk at a time, so runs in other threads, processes or nodes
+    share the backlog instead of analyzing it twice. With TRIAGE_ENABLED the local triage
+    tier labels what it can first, see app.services.triage.
+    """
+
+    @staticmethod
+    def _empty_stats() -> dict:
+        return {"requests": 0, "retries": 0, "rate_limited": 0, "tokens_used": 0, "triaged_locally": 0}
+
+    async def _complete(self, client, limiter: RateLimiter, stats: dict, messages: list, max_tokens: int) -> str:
+        from groq import APIConnectionError, InternalServerError, RateLimitError
+
+        estimated = estimate_tokens(messages) + max_tokens
+        for attempt in range(settings.LLM_MAX_RETRIES + 1):
+            await limiter.acquire(estimated)
+            stats["requests"] += 1
+            retry_after = None
+            start = time.perf_counter()
+            try:
+                response = await client.chat.completions.create(
+                    model=settings.GROQ_MODEL,
+                    messages=messages,
+                    max_tokens=max_tokens
+                )
+            except RateLimitError as e:
+                metrics.llm_call(time.perf_counter() - start, "rate_limited")
+                stats["rate_limited"] += 1
+                retry_after = _retry_after(e)
+                if retry_after:
+                    limiter.pause(retry_after)
+                error = e
+            except (APIConnectionError, InternalServerError) as e:
+                metrics.llm_call(time.perf_counter() - start, "error")
+                error = e
+            except Exception:
+                metrics.llm_call(time.perf_counter() - start, "error")
+                raise
+            else:
+                metrics.llm_call(time.perf_counter() - start, "ok", response.usage)
+                if response.usage:
+                    stats["tokens_used"] += response.usage.total_tokens
+                    limiter.settle(estimated, response.usage.total_tokens)
+                return response.choices[0].message.content.strip()
+
+            if attempt == settings.LLM_MAX_RETRIES:
+                raise error
+            stats["retries"] += 1
+            metrics.LLM_RETRIES.inc()
+            backoff = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+            await asyncio.sleep(max(backoff, retry_after or 0))
+
+    async def _analyze(self, client, limiter: RateLimiter, stats: dict, semaphore: asyncio.Semaphore,
+                       title: str, content: str) -> ThreatAnalysis:
+        async with semaphore:
+            reply = await self._complete(client, limiter, stats, analysis_messages(title, content), ANALYSIS_MAX_TOKENS)
+        try:
+            return parse_analysis(reply)
+        except ValueError:
+            metrics.LLM_INVALID_REPLIES.inc()
+            raise
+
+    async def _process_one(self, db: Session, client, limiter: RateLimiter, stats: dict,
+                           semaphore: asyncio.Semaphore, model: Optional[TriageModel], row, inflight: dict,
+                           cache_rows: list) -> dict:
+        content = row.content or row.title or ""
+        content_hash = analysis_content_hash(content)
+
+        cached = response_cache.get(db, settings.GROQ_MODEL, PROMPT_VERSION, content_hash)
+        if cached is not None:
+            return {"id": row.id, **analysis_update(ThreatAnalysis(**cached)), **NO_TRIAGE}
+
+        decision = triage.decide(model, row.title or "", content, content_hash) if settings.TRIAGE_ENABLED else None
+        if decision and decision.analysis:
+            stats["triaged_locally"] += 1
+            return {"id": row.id, **analysis_update(decision.analysis), **decision.columns()}
+
+        # Syndicated copies in the same run share one call instead of racing each other
+        if content_hash not in inflight:
+            inflight[content_hash] = asyncio.ensure_future(
+                self._analyze(client, limiter, stats, semaphore, row.title, content)
+            )
+            analysis = await inflight[content_hash]
+            cache_rows.append(response_cache.row(settings.GROQ_MODEL, PROMPT_VERSION, content_hash, analysis.dict()))
+        else:
+            analysis = await inflight[content_hash]
+        if decision:
+            triage.record(decision, analysis)
+            return {"id": row.id, **analysis_update(analysis), **decision.columns()}
+        return {"id": row.id, **analysis_update(analysis), **NO_TRIAGE}
+
+    async def _process_safely(self, db: Session, client, limiter: RateLimiter, stats: dict,
+                              semaphore: asyncio.Semaphore, model: Optional[TriageModel], row, inflight: dict,
+                              cache_rows: list):
+        try:
+            update = await self._process_one(db, client, limiter, stats, semaphore, model, row, inflight,
+                                             cache_rows)
+            return row.id, update, None
+        except Exception as e:
+            return row.id, None, e
+
+    async def run_async(self, db: Session, stale_before: Optional[datetime] = None,
+                        progress: Optional[Callable] = None) -> dict:
+        """progress(done, total) is called after every commit; an exception raised from it stops the run"""
+        # Imported on first use like in ai_processor, it is slow to import
+        from groq import AsyncGroq
+
+        stats = self._empty_stats()
+        client = AsyncGroq(api_key=settings.GROQ_API_KEY, base_url=settings.GROQ_BASE_URL or None, max_retries=0)
+        limiter = RateLimiter(settings.LLM_REQUESTS_PER_MINUTE, settings.LLM_TOKENS_PER_MINUTE)
+        semaphore = asyncio.Semaphore(settings.LLM_CONCURRENCY)
+
+        total = crud_article.count_articles_to_process(db, stale_before)
+        model = triage.model(db) if settings.TRIAGE_ENABLED else None
+        processed, failed, updates, cache_rows, inflight = 0, [], [], [], {}
+        leased = set()  # Claimed by this run and not written back yet
+        claim_size = settings.LLM_CONCURRENCY * CLAIM_PER_SLOT
+        pending, last_id, exhausted = set(), 0, False
+        try:
+            while True:
+                # Claim more as calls finish, rather than a big chunk up front, so runs in other
+                # processes share even a short backlog
+                if not exhausted and len(pending) < claim_size:
+                    article_ids = crud_article.claim_articles_to_process(
+                        db, settings.ARTICLE_LEASE_SECONDS, after_id=last_id, limit=claim_size,
+                        stale_before=stale_before
+                    )
+                    exhausted = not article_ids
+                    if article_ids:
+                        leased.update(article_ids)
+                        rows = crud_article.get_articles_to_process(db, after_id=last_id, limit=claim_size,
+                                                                    stale_before=stale_before, article_ids=article_ids)
+                        last_id = article_ids[-1]
+                        pending.update(
+                            asyncio.ensure_future(self._process_safely(db, client, limiter, stats, semaphore,
+                                                                       model, row, inflight, cache_rows))
+                            for row in rows
+                        )
+                if not pending:
+                    break
+
+                finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    article_id, update, error = task.result()
+                    if error:
+                        logger.warning("LLM analysis failed", extra={"article_id": article_id, "error": str(error)})
+                        failed.append({"article_id": article_id, "error": str(error)})
+                        continue
+                    updates.append(update)
+                if len(updates) >= settings.LLM_COMMIT_BATCH:
+                    self._flush(db, updates, cache_rows)
+                    leased.difference_update(update["id"] for update in updates)
+                    processed += len(updates)
+                    updates = []
+                    cache_rows.clear()
+                    if progress:
+                        progress(processed + len(failed), total)
+
+            self._flush(db, updates, cache_rows)
+            leased.difference_update(update["id"] for update in updates)
+            processed += len(updates)
+        finally:
+            for task in pending:
+                task.cancel()
+            await client.close()
+            # Failed articles, and on an early stop everything not written yet, are free for the next run
+            _release(db, leased)
+
+        return {"total_articles": total, "processed_articles": processed,
+                "failed_articles": failed, "stats": stats, "cache": response_cache.stats()}
+
+    @staticmethod
+    def _flush(db: Session, updates: list, cache_rows: list):
+        # Cache rows ride on the article update's commit, which also ends the leases
+        response_cache.put_many(db, cache_rows)
+        crud_article.bulk_update_articles(db, [{**update, "analysis_lease_until": None} for update in updates])
+        # Near-duplicates of the processed articles share their analysis
+        crud_article.copy_cluster_analysis(db, [update["id"] for update in updates])
+        db.commit()
+
+    def run(self, db: Session, stale_before: Optional[datetime] = None, progress: Optional[Callable] = None) -> dict:
+        return asyncio.run(self.run_async(db, stale_before, progress))
+
+
+def default_stale_before() -> Optional[datetime]:
+    if settings.LLM_REPROCESS_AFTER_DAYS <= 0:
+        return None
+    return datetime.now(timezone.utc) - timedelta(days=settings.LLM_REPROCESS_AFTER_DAYS)
+
+
+def _release(db: Session, leased: set):
+    if not leased:
+        return
+    try:
+        db.rollback()
+        crud_article.release_articles(db, "analysis", sorted(leased))
+    except Exception:
+        # They free themselves when the lease runs out
+        logger.exception("Releasing article leases failed", extra={"articles": len(leased)})
+
+
+def _retry_after(error) -> Optional[float]:
+    """Seconds a groq.RateLimitError asks to wait, if it says"""
+    try:
+        return float(error.response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+# Create a global instance
+llm_batch_processor = LLMBatchProcessor()
@@ -0,0 +1,64 @@
+import hashlib
+import threading
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app import metrics
+from app.crud import llm_cache as crud_llm_cache
+
+
+class ResponseCache:
+    """Persistent cache of validated LLM analyses keyed by (model, prompt version, content hash).
+
+    Re-processing an unchanged article, or a syndicated copy of one, is answered from the
+    llm_responses table without an API call. Hit/miss counters are per process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model: str, prompt_version: str, content_hash: str) -> str:
+        return hashlib.sha256(f"{model}|{prompt_version}|{content_hash}".encode()).hexdigest()
+
+    def get(self, db: Session, model: str, prompt_version: str, content_hash: str) -> Optional[dict]:
+        response = crud_llm_cache.get_response(db, self.key(model, prompt_version, content_hash))
+        self.record(hit=response is not None)
+        return response
+
+    def row(self, model: str, prompt_version: str, content_hash: str, response: dict) -> dict:
+        return {
+            "cache_key": self.key(model, prompt_version, content_hash),
+            "model": model,
+            "prompt_version": prompt_version,
+            "content_hash": content_hash,
+            "response": response,
+        }
+
+    def put_many(self, db: Session, rows: List[dict]):
+        """Stage cache rows in the caller's transaction"""
+        crud_llm_cache.put_responses(db, rows)
+
+    def record(self, hit: bool):
+        metrics.cache_lookup("llm_response", hit)
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Create a global instance
+response_cache = ResponseCache()
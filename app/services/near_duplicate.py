@@ -0,0 +1,167 @@
+import hashlib
+import random
+import re
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.crud import article as crud_article
+from app.crud import near_duplicate as crud_near_duplicate
+from app.models.article import Article
+
+# Changing any of these invalidates stored signatures and buckets; re-cluster with
+# `python -m app.cli cluster-articles --rebuild`
+NUM_PERMUTATIONS = 128
+BANDS = 32  # 32 bands of 4 rows: pairs above ~0.6 Jaccard almost always share a bucket
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SHINGLE_SIZE = 5
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_TAGS = re.compile(r"<[^>]+>")
+_WORDS = re.compile(r"\w+")
+
+# Fixed seed: signatures must be comparable across processes and restarts
+_rng = random.Random(1)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_PERMUTATIONS)
+]
+
+
+def normalize(text: str) -> List[str]:
+    """Lower-cased words of the text with markup dropped, so feed formatting doesn't matter"""
+    return _WORDS.findall(_TAGS.sub(" ", text or "").lower())
+
+
+def shingle_hashes(words: List[str]) -> set:
+    if len(words) < SHINGLE_SIZE:
+        shingles = [" ".join(words)] if words else []
+    else:
+        shingles = (" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1))
+    return {int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "little") for s in shingles}
+
+
+def signature(text: str) -> Optional[List[int]]:
+    """MinHash signature of the text's word 5-shingles, or None when there is no text"""
+    hashes = shingle_hashes(normalize(text))
+    if not hashes:
+        return None
+    return [min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def pack(values: List[int]) -> bytes:
+    return array("Q", values).tobytes()
+
+
+def unpack(data: bytes) -> List[int]:
+    values = array("Q")
+    values.frombytes(data)
+    return values.tolist()
+
+
+def band_keys(values: List[int]) -> List[Tuple[int, str]]:
+    """(band, bucket) pairs of a signature; an LSH bucket is the hash of one band's rows"""
+    return [
+        (band, hashlib.blake2b(pack(values[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]), digest_size=8).hexdigest())
+        for band in range(BANDS)
+    ]
+
+
+def similarity(a: List[int], b: List[int]) -> float:
+    """Estimated Jaccard similarity: the share of permutations with the same minimum"""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class NearDuplicateDetector:
+    """Assigns articles to clusters of near-duplicate stories at ingest time.
+
+    A syndicated copy under a new URL has almost the same word shingles as the original.
+    Candidates come from the LSH buckets shared with the new article's signature (one
+    index seek per band, whatever the corpus size), the best candidate above
+    NEAR_DUPLICATE_THRESHOLD gives its cluster, otherwise the article starts its own.
+    The cluster id is the id of its first (canonical) article, the only one sent to the LLM.
+    """
+
+    def assign_clusters(self, db: Session, article_ids: Iterable[int]) -> dict:
+        """Cluster the given articles, in id order, and commit. Already clustered ones are skipped."""
+        threshold = settings.NEAR_DUPLICATE_THRESHOLD
+        ids = sorted(set(article_ids))
+        stats = {"clustered": 0, "duplicates": 0}
+        if not ids:
+            return stats
+
+        rows = []
+        for i in range(0, len(ids), crud_near_duplicate.IN_CHUNK_SIZE):
+            chunk = ids[i:i + crud_near_duplicate.IN_CHUNK_SIZE]
+            rows += db.execute(
+                select(Article.id, Article.title, Article.content)
+                .where(Article.id.in_(chunk), Article.minhash.is_(None))
+                .order_by(Article.id)
+            ).all()
+
+        # Articles of this batch are matched against each other too, before anything is written
+        batch_buckets: Dict[Tuple[int, str], List[int]] = {}
+        batch_signatures: Dict[int, Tuple[int, List[int]]] = {}
+        updates, buckets, joined = [], [], set()
+        for article_id, title, content in rows:
+            values = signature(f"{title or ''} {content or ''}")
+            if values is None:
+                updates.append({"id": article_id, "cluster_id": article_id, "minhash": None})
+                continue
+            keys = band_keys(values)
+
+            candidates = {
+                candidate: (cluster_id, unpack(minhash))
+                for candidate, (cluster_id, minhash) in crud_near_duplicate.get_signatures(
+                    db, list(crud_near_duplicate.get_candidate_ids(db, keys))
+                ).items()
+                # Only earlier articles can be a cluster's canonical
+                if candidate < article_id
+            }
+            for key in keys:
+                for candidate in batch_buckets.get(key, ()):
+                    candidates[candidate] = batch_signatures[candidate]
+
+            cluster_id, best = article_id, threshold
+            for candidate, (candidate_cluster, candidate_values) in candidates.items():
+                score = similarity(values, candidate_values)
+                if score >= best:
+                    cluster_id, best = candidate_cluster or candidate, score
+
+            if cluster_id != article_id:
+                stats["duplicates"] += 1
+                joined.add(cluster_id)
+            stats["clustered"] += 1
+            updates.append({"id": article_id, "cluster_id": cluster_id, "minhash": pack(values)})
+            buckets += [{"band": band, "bucket": bucket, "article_id": article_id} for band, bucket in keys]
+            batch_signatures[article_id] = (cluster_id, values)
+            for key in keys:
+                batch_buckets.setdefault(key, []).append(article_id)
+
+        crud_near_duplicate.add_buckets(db, buckets)
+        crud_article.bulk_update_articles(db, updates)
+        # Duplicates of an already processed story get its analysis right away
+        if joined:
+            crud_article.copy_cluster_analysis(db, sorted(joined))
+            db.commit()
+        return stats
+
+    def cluster_all(self, db: Session, rebuild: bool = False, chunk_size: int = 500) -> dict:
+        """Cluster every article not clustered yet (every article with rebuild), oldest first"""
+        totals = {"clustered": 0, "duplicates": 0}
+        if rebuild:
+            crud_near_duplicate.clear_clusters(db)
+        last_id = 0
+        while True:
+            ids = crud_near_duplicate.get_unclustered_ids(db, after_id=last_id, limit=chunk_size)
+            if not ids:
+                return totals
+            last_id = ids[-1]
+            for name, value in self.assign_clusters(db, ids).items():
+                totals[name] += value
+
+
+# Create a global instance
+near_duplicate_detector = NearDuplicateDetector()
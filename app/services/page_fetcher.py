@@ -0,0 +1,232 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from sqlalchemy.orm import Session
+
+from app import metrics
+from app.config import settings
+from app.crud import article as crud_article
+from app.services.html_text import html_to_text, strip_tags
+
+logger = logging.getLogger(__name__)
+
+
+class PageCache:
+    """Content-addressed on-disk cache of fetched pages.
+
+    Bodies are stored zlib-compressed under the sha256 of their bytes, so a page
+    syndicated under several URLs is kept once; a small JSON record per URL points
+    at its body and keeps the validators for revalidating it later.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, kind: str, key: str) -> str:
+        return os.path.join(self.root, kind, key[:2], key)
+
+    @staticmethod
+    def _url_key(url: str) -> str:
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    @staticmethod
+    def _write(path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write-then-rename: concurrent readers see the old file or the new one, never half of one
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def lookup(self, url: str) -> Optional[dict]:
+        try:
+            with open(self._path("urls", self._url_key(url)), "rb") as f:
+                return json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def body(self, digest: str) -> Optional[bytes]:
+        try:
+            with open(self._path("objects", digest), "rb") as f:
+                return zlib.decompress(f.read())
+        except (OSError, zlib.error):
+            return None
+
+    def store(self, url: str, body: bytes, etag: Optional[str], last_modified: Optional[str],
+              encoding: Optional[str]) -> dict:
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._path("objects", digest)
+        if not os.path.exists(path):
+            self._write(path, zlib.compress(body, 6))
+        return self.touch(url, {"sha256": digest, "etag": etag, "last_modified": last_modified, "encoding": encoding})
+
+    def touch(self, url: str, record: dict) -> dict:
+        """Save the URL's record with a fresh fetch time, e.g. after a 304"""
+        record = {**record, "url": url, "fetched_at": time.time()}
+        self._write(self._path("urls", self._url_key(url)), json.dumps(record).encode())
+        return record
+
+
+class _HostThrottle:
+    """At most PAGE_PER_DOMAIN_LIMIT requests in flight per host, started PAGE_DOMAIN_DELAY apart"""
+
+    def __init__(self):
+        self.semaphore = asyncio.Semaphore(settings.PAGE_PER_DOMAIN_LIMIT)
+        self.lock = asyncio.Lock()
+        self.next_start = 0.0
+
+    async def wait_turn(self):
+        async with self.lock:
+            loop = asyncio.get_running_loop()
+            delay = self.next_start - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.next_start = loop.time() + settings.PAGE_DOMAIN_DELAY
+
+
+class PageFetcher:
+    """Optional full-text stage: fetches article pages and keeps their main text.
+
+    Pages are fetched concurrently, but politely per host, and go through the page
+    cache: a URL fetched within PAGE_CACHE_TTL is served from disk, an older one is
+    revalidated with a conditional GET. The text extracted from the page replaces
+    the article's content when it is longer than what the feed carried.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache = PageCache(cache_dir or settings.PAGE_CACHE_DIR)
+
+    async def fetch_texts(self, urls: Iterable[str]) -> Dict[str, Optional[str]]:
+        """{url: main text, or None when the page couldn't be fetched}"""
+        import aiohttp  # Imported on first use, see RSSDataCollector.open_session
+
+        urls = list(dict.fromkeys(urls))
+        throttles: Dict[str, _HostThrottle] = {}
+        semaphore = asyncio.Semaphore(settings.PAGE_CONCURRENCY)
+        connector = aiohttp.TCPConnector(limit=settings.PAGE_CONCURRENCY, limit_per_host=settings.PAGE_PER_DOMAIN_LIMIT)
+        timeout = aiohttp.ClientTimeout(total=settings.PAGE_TIMEOUT)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            bodies = await asyncio.gather(*(self._fetch(session, semaphore, throttles, url) for url in urls))
+
+        # Extraction is CPU bound, keep it off the event loop
+        loop = asyncio.get_running_loop()
+        texts = await asyncio.gather(*(
+            loop.run_in_executor(None, self._extract, body) if body is not None else asyncio.sleep(0)
+            for body in bodies
+        ))
+        return dict(zip(urls, texts))
+
+    @staticmethod
+    def _extract(body: tuple) -> Optional[str]:
+        data, encoding = body
+        text = html_to_text(data.decode(encoding or "utf-8", errors="replace"))
+        return text or None
+
+    async def _fetch(self, session, semaphore, throttles, url: str) -> Optional[tuple]:
+        """(body bytes, encoding) from the cache or the network"""
+        record = self.cache.lookup(url)
+        if record and time.time() - record["fetched_at"] < settings.PAGE_CACHE_TTL:
+            body = self.cache.body(record["sha256"])
+            if body is not None:
+                metrics.PAGE_FETCHES.labels("cached").inc()
+                metrics.cache_lookup("page", hit=True)
+                return body, record.get("encoding")
+            record = None
+        metrics.cache_lookup("page", hit=False)
+
+        headers = {"User-Agent": settings.FEED_USER_AGENT, "Accept": "text/html,application/xhtml+xml"}
+        if record and record.get("etag"):
+            headers["If-None-Match"] = record["etag"]
+        if record and record.get("last_modified"):
+            headers["If-Modified-Since"] = record["last_modified"]
+
+        host = urlsplit(url).hostname or ""
+        throttle = throttles.setdefault(host, _HostThrottle())
+        try:
+            async with semaphore, throttle.semaphore:
+                await throttle.wait_turn()
+                async with session.get(url, headers=headers) as response:
+                    if response.status == 304 and record:
+                        body = self.cache.body(record["sha256"])
+                        if body is None:
+                            return None
+                        self.cache.touch(url, record)
+                        metrics.PAGE_FETCHES.labels("not_modified").inc()
+                        return body, record.get("encoding")
+                    response.raise_for_status()
+                    if "html" not in response.headers.get("Content-Type", "text/html"):
+                        metrics.PAGE_FETCHES.labels("not_html").inc()
+                        return None
+                    # Anything past PAGE_MAX_BYTES is dropped rather than buffered
+                    body = bytearray()
+                    async for chunk in response.content.iter_chunked(65536):
+                        body += chunk
+                        if len(body) >= settings.PAGE_MAX_BYTES:
+                            break
+                    body = bytes(body[:settings.PAGE_MAX_BYTES])
+                    encoding = response.get_encoding() if response.charset else None
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+        except Exception as e:
+            metrics.PAGE_FETCHES.labels("error").inc()
+            logger.warning("Page fetch failed", extra={"url": url, "error": str(e) or type(e).__name__})
+            return None
+
+        metrics.PAGE_FETCHES.labels("fetched").inc()
+        metrics.PAGE_BYTES.inc(len(body))
+        self.cache.store(url, body, etag, last_modified, encoding)
+        return body, encoding
+
+    def enrich(self, db: Session, article_ids: Optional[List[int]] = None, force: bool = False,
+               progress: Optional[Callable] = None, chunk_size: int = 100) -> dict:
+        """Fetch the pages of the given articles (every article not fetched yet by default) and commit"""
+        stats = {"fetched": 0, "failed": 0, "updated": 0}
+        ids = sorted(set(article_ids)) if article_ids is not None else None
+        total = len(ids) if ids is not None else None
+        last_id = 0
+        while True:
+            if ids is not None:
+                chunk_ids = [i for i in ids if i > last_id][:chunk_size]
+                if not chunk_ids:
+                    break
+                rows = crud_article.get_articles_without_full_text(db, after_id=last_id, limit=chunk_size, force=force,
+                                                                   article_ids=chunk_ids)
+                last_id = chunk_ids[-1]
+            else:
+                rows = crud_article.get_articles_without_full_text(db, after_id=last_id, limit=chunk_size, force=force)
+                if not rows:
+                    break
+                last_id = rows[-1].id
+            if not rows:
+                continue
+
+            texts = asyncio.run(self.fetch_texts(row.url for row in rows))
+            now = datetime.now(timezone.utc)
+            updates = []
+            for row in rows:
+                text = texts.get(row.url)
+                update = {"id": row.id, "full_text_at": now}
+                if text is None:
+                    stats["failed"] += 1
+                else:
+                    stats["fetched"] += 1
+                    if len(text) > len(strip_tags(row.content)):
+                        update["content"] = text
+                        stats["updated"] += 1
+                updates.append(update)
+            crud_article.bulk_update_articles(db, updates)
+            if progress:
+                progress(stats["fetched"] + stats["failed"], total)
+        return stats
+
+
+# Create a global instance
+page_fetcher = PageFetcher()
@@ -0,0 +1,76 @@
+import asyncio
+import hashlib
+import json
+import time
+from typing import Awaitable, Callable, Dict, Tuple
+
+from app import metrics
+from app.config import settings
+
+
+class StatsCache:
+    """Short-lived in-process cache of dashboard stats payloads with their ETags.
+
+    Dashboards poll the same few queries every few seconds; within STATS_CACHE_TTL a
+    payload is served from memory, and a client sending back the ETag gets a 304 without
+    the database being touched. Concurrent misses for one key share a single computation.
+    """
+
+    def __init__(self, ttl: float = None):
+        self.ttl = settings.STATS_CACHE_TTL if ttl is None else ttl
+        self._entries: Dict[tuple, Tuple[float, str, dict]] = {}
+        self._locks: Dict[tuple, asyncio.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def etag(payload: dict) -> str:
+        body = json.dumps(payload, sort_keys=True, default=str).encode()
+        return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+    def peek(self, key: tuple):
+        """(etag, payload) while the entry is fresh, otherwise None"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1], entry[2]
+
+    async def get(self, key: tuple, compute: Callable[[], Awaitable[dict]]) -> Tuple[str, dict]:
+        cached = self.peek(key)
+        if cached is not None:
+            self.hits += 1
+            metrics.cache_lookup("stats", hit=True)
+            return cached
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Another request may have filled it while this one waited
+            cached = self.peek(key)
+            if cached is not None:
+                self.hits += 1
+                metrics.cache_lookup("stats", hit=True)
+                return cached
+            self.misses += 1
+            metrics.cache_lookup("stats", hit=False)
+            payload = await compute()
+            tag = self.etag(payload)
+            now = time.monotonic()
+            self._prune(now)
+            self._entries[key] = (now + self.ttl, tag, payload)
+            return tag, payload
+
+    def _prune(self, now: float):
+        """Drop expired entries, and the locks of keys no request is computing"""
+        for key in [key for key, entry in self._entries.items() if entry[0] < now]:
+            del self._entries[key]
+        for key in [key for key, lock in self._locks.items() if key not in self._entries and not lock.locked()]:
+            del self._locks[key]
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "ttl_seconds": self.ttl}
+
+
+# Create a global instance
+stats_cache = StatsCache()
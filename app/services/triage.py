@@ -0,0 +1,342 @@
+"""Local triage tier in front of the LLM.
+
+Every article the batch run would send to the LLM goes through two cheap checks first:
+
+- a keyword / IOC-density scorer, which labels obvious vendor marketing (webinars,
+  press releases...) as other / informational and flags high-value articles (CVE ids,
+  zero-days, many IOCs) that always deserve the LLM;
+- a TF-IDF + multinomial naive Bayes classifier (a linear model, in pure Python) trained
+  on the threat_type / severity the LLM already stored, which labels an article itself
+  when both of its predictions clear a confidence threshold.
+
+The thresholds are calibrated on held-out LLM labels so that the local labels agree with
+the LLM's at TRIAGE_TARGET_AGREEMENT. A small audit sample of the articles the tier could
+label goes to the LLM anyway; its predictions are stored next to the LLM's labels, which
+is what the agreement figures (GET /stats/triage, argus_triage_agreement_total) are
+computed from.
+"""
+import logging
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app import metrics
+from app.config import settings
+from app.crud import triage as crud_triage
+from app.schemas.analysis import SUMMARY_MAX_LENGTH, ThreatAnalysis
+from app.services.ioc_extractor import ioc_extractor
+
+# Same slice of the body the LLM sees (ai_processor.CONTENT_LIMIT)
+CONTENT_LIMIT = 3000
+
+# Routes labelled here; the others (crud_triage.LLM_ROUTES) go to the LLM, with the local prediction
+# kept for the agreement figures
+LOCAL_ROUTES = ("noise", "confident")
+FIELDS = ("threat_type", "severity")
+
+# Columns of an article analyzed without triage, e.g. on an explicit request
+NO_TRIAGE = {"triage_route": None, "triage_threat_type": None, "triage_severity": None}
+
+MIN_VOCABULARY_DF = 2
+MAX_VOCABULARY = 20000
+HOLDOUT_SHARE = 0.2
+MIN_CONFIDENT_SUPPORT = 20  # Held-out articles a threshold must be backed by
+
+_TAGS = re.compile(r"<[^>]+>")
+_WORDS = re.compile(r"[a-z][a-z0-9\-]+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def _term_pattern(terms: Tuple[str, ...]):
+    return re.compile(r"\b(?:" + "|".join(re.escape(term) for term in terms) + r")\b", re.IGNORECASE)
+
+
+MARKETING_TERMS = _term_pattern((
+    "webinar", "register now", "register today", "sponsored", "whitepaper", "white paper", "ebook", "e-book",
+    "press release", "announces", "announced today", "partnership", "award", "award-winning", "podcast", "join us",
+    "conference", "summit", "product launch", "now available", "free trial", "customer story", "case study",
+    "we're hiring", "giveaway", "discount", "on-demand", "live demo", "book a demo",
+))
+THREAT_TERMS = _term_pattern((
+    "ransomware", "malware", "phishing", "exploit", "exploited", "vulnerability", "vulnerabilities", "breach",
+    "backdoor", "trojan", "botnet", "threat actor", "threat actors", "apt", "zero-day", "0-day", "ddos",
+    "compromised", "attack", "attacks", "campaign", "infostealer", "stealer", "wiper", "spyware", "leak",
+))
+HIGH_VALUE = re.compile(r"\bcve-\d{4}-\d{4,}\b|\bzero[- ]day\b|\bactively exploited\b|\bexploited in the wild\b",
+                        re.IGNORECASE)
+
+logger = logging.getLogger(__name__)
+
+
+def tokens(title: str, content: str) -> List[str]:
+    """Lower-cased words of the title (counted twice) and the body the LLM would see, markup dropped"""
+    text = _TAGS.sub(" ", f"{title} {title} {content[:CONTENT_LIMIT]}").lower()
+    return _WORDS.findall(text)
+
+
+def extract_summary(title: str, content: str) -> str:
+    """Leading sentences of the body that fit the summary length, the title when there are none"""
+    text = " ".join(_TAGS.sub(" ", content[:CONTENT_LIMIT]).split())
+    summary = ""
+    for sentence in _SENTENCE_END.split(text):
+        if len(summary) + len(sentence) + 1 > SUMMARY_MAX_LENGTH:
+            break
+        summary = f"{summary} {sentence}".strip()
+    if not summary and text:
+        summary = text[:SUMMARY_MAX_LENGTH - 3].rsplit(" ", 1)[0] + "..."
+    return summary or title or "No summary"
+
+
+class Signals(NamedTuple):
+    marketing: int  # Distinct marketing terms
+    threat: int  # Distinct threat terms
+    iocs: int
+    high_value: bool
+
+
+def signals(title: str, content: str) -> Signals:
+    text = _TAGS.sub(" ", f"{title}\n{content[:CONTENT_LIMIT]}")
+    iocs = sum(len(values) for values in ioc_extractor.extract_iocs(text).values())
+    return Signals(
+        marketing=len({match.lower() for match in MARKETING_TERMS.findall(text)}),
+        threat=len({match.lower() for match in THREAT_TERMS.findall(text)}),
+        iocs=iocs,
+        high_value=bool(HIGH_VALUE.search(text)) or iocs >= settings.TRIAGE_HIGH_VALUE_IOCS,
+    )
+
+
+class Labelled(NamedTuple):
+    title: str
+    content: str
+    threat_type: str
+    severity: str
+
+
+def clean_labels(rows: list) -> List[Labelled]:
+    """Training rows with their labels normalized the way the LLM's replies are; rows stored before
+    validation with labels outside THREAT_TYPES / SEVERITIES are dropped, they'd be unusable classes"""
+    cleaned = []
+    for row in rows:
+        try:
+            labels = ThreatAnalysis(summary="-", threat_type=row.threat_type, severity=row.severity, confidence=1.0)
+        except ValidationError:
+            continue
+        cleaned.append(Labelled(row.title or "", row.content or "", labels.threat_type, labels.severity))
+    return cleaned
+
+
+class TfidfVectorizer:
+    """Sublinear tf x smoothed idf, L2-normalized, over the most common terms of the training set"""
+
+    def fit(self, documents: List[List[str]]) -> "TfidfVectorizer":
+        df = Counter()
+        for words in documents:
+            df.update(set(words))
+        common = [term for term, count in df.most_common(MAX_VOCABULARY) if count >= MIN_VOCABULARY_DF]
+        self.vocabulary = {term: index for index, term in enumerate(common)}
+        n = len(documents)
+        self.idf = [math.log((1 + n) / (1 + df[term])) + 1 for term in common]
+        return self
+
+    def transform(self, words: List[str]) -> Dict[int, float]:
+        counts = Counter(self.vocabulary[word] for word in words if word in self.vocabulary)
+        vector = {index: (1 + math.log(count)) * self.idf[index] for index, count in counts.items()}
+        norm = math.sqrt(sum(value * value for value in vector.values())) or 1.0
+        return {index: value / norm for index, value in vector.items()}
+
+
+class NaiveBayes:
+    """Multinomial naive Bayes over TF-IDF weights: one linear score per class, softmaxed"""
+
+    def fit(self, vectors: List[Dict[int, float]], labels: List[str], features: int,
+            smoothing: float = 0.1) -> "NaiveBayes":
+        self.classes = sorted(set(labels))
+        index = {label: n for n, label in enumerate(self.classes)}
+        mass = [[0.0] * len(self.classes) for _ in range(features)]
+        totals = [0.0] * len(self.classes)
+        for vector, label in zip(vectors, labels):
+            c = index[label]
+            for feature, value in vector.items():
+                mass[feature][c] += value
+                totals[c] += value
+        counts = Counter(labels)
+        self.priors = [math.log(counts[label] / len(labels)) for label in self.classes]
+        denominators = [total + smoothing * features for total in totals]
+        # Per feature, the log-likelihood of every class: scoring walks the document's features once
+        self.weights = [
+            [math.log((class_mass[c] + smoothing) / denominators[c]) for c in range(len(self.classes))]
+            for class_mass in mass
+        ]
+        return self
+
+    def predict(self, vector: Dict[int, float]) -> Tuple[str, float]:
+        """(label, probability) of the best class"""
+        scores = list(self.priors)
+        for feature, value in vector.items():
+            for c, weight in enumerate(self.weights[feature]):
+                scores[c] += value * weight
+        best = max(range(len(scores)), key=scores.__getitem__)
+        total = sum(math.exp(score - scores[best]) for score in scores)
+        return self.classes[best], 1.0 / total
+
+
+def confidence_threshold(held_out: List[Tuple[float, bool]], target: float) -> float:
+    """Lowest confidence above which at least target of the held-out predictions were right.
+
+    math.inf when no threshold reaches it with MIN_CONFIDENT_SUPPORT predictions behind it.
+    """
+    threshold, right = math.inf, 0
+    for n, (confidence, correct) in enumerate(sorted(held_out, reverse=True), start=1):
+        right += correct
+        if n >= MIN_CONFIDENT_SUPPORT and right / n >= target:
+            threshold = confidence
+    return threshold
+
+
+class TriageModel:
+    """The vectorizer and one classifier per label, with thresholds calibrated on held-out LLM labels"""
+
+    def __init__(self, rows: List[Labelled], target: float, seed: int = 0):
+        rows = list(rows)
+        random.Random(seed).shuffle(rows)
+        split = int(len(rows) * (1 - HOLDOUT_SHARE))
+        train, held_out = rows[:split], rows[split:]
+        documents = [tokens(row.title or "", row.content or "") for row in train]
+
+        self.vectorizer = TfidfVectorizer().fit(documents)
+        vectors = [self.vectorizer.transform(words) for words in documents]
+        features = len(self.vectorizer.vocabulary)
+        self.heads = {
+            field: NaiveBayes().fit(vectors, [getattr(row, field) for row in train], features) for field in FIELDS
+        }
+
+        predictions = [self.predict(tokens(row.title or "", row.content or "")) for row in held_out]
+        self.thresholds = {
+            field: confidence_threshold(
+                [(prediction[field][1], prediction[field][0] == getattr(row, field))
+                 for prediction, row in zip(predictions, held_out)],
+                target,
+            )
+            for field in FIELDS
+        }
+        confident = [
+            (prediction, row) for prediction, row in zip(predictions, held_out) if self.is_confident(prediction)
+        ]
+        self.report = {
+            "trained_on": len(train),
+            "held_out": len(held_out),
+            "vocabulary": features,
+            "thresholds": {field: None if math.isinf(t) else round(t, 4) for field, t in self.thresholds.items()},
+            # Share of held-out articles the classifier would label, and how often both labels matched then
+            "held_out_coverage": round(len(confident) / len(held_out), 4) if held_out else 0.0,
+            "held_out_agreement": round(
+                sum(all(p[field][0] == getattr(row, field) for field in FIELDS) for p, row in confident)
+                / len(confident), 4
+            ) if confident else None,
+            "held_out_accuracy": {
+                field: round(sum(p[field][0] == getattr(row, field) for p, row in zip(predictions, held_out))
+                             / len(held_out), 4) if held_out else None
+                for field in FIELDS
+            },
+        }
+
+    def predict(self, words: List[str]) -> Dict[str, Tuple[str, float]]:
+        vector = self.vectorizer.transform(words)
+        return {field: head.predict(vector) for field, head in self.heads.items()}
+
+    def is_confident(self, prediction: Dict[str, Tuple[str, float]]) -> bool:
+        return all(prediction[field][1] >= self.thresholds[field] for field in FIELDS)
+
+
+class Decision(NamedTuple):
+    route: str
+    analysis: Optional[ThreatAnalysis]  # Set when the article needs no LLM call
+    threat_type: Optional[str]  # The tier's own prediction, stored for the agreement figures
+    severity: Optional[str]
+
+    def columns(self) -> dict:
+        return {"triage_route": self.route, "triage_threat_type": self.threat_type, "triage_severity": self.severity}
+
+
+class Triage:
+    """Routes articles between local labelling and the LLM; the model is retrained as LLM labels accumulate"""
+
+    def __init__(self):
+        self._model: Optional[TriageModel] = None
+        self._trained_at = 0.0
+        self._lock = threading.Lock()
+
+    def model(self, db: Session) -> Optional[TriageModel]:
+        """The classifier, (re)trained when older than TRIAGE_RETRAIN_SECONDS; None below TRIAGE_MIN_LABELS"""
+        with self._lock:
+            if time.monotonic() - self._trained_at < settings.TRIAGE_RETRAIN_SECONDS and self._trained_at:
+                return self._model
+            start = time.perf_counter()
+            rows = clean_labels(crud_triage.get_training_rows(db, settings.TRIAGE_MAX_LABELS))
+            self._trained_at = time.monotonic()
+            if len(rows) < settings.TRIAGE_MIN_LABELS:
+                logger.info("Triage classifier needs more LLM labels",
+                            extra={"labels": len(rows), "required": settings.TRIAGE_MIN_LABELS})
+                self._model = None
+                return None
+            self._model = TriageModel(rows, settings.TRIAGE_TARGET_AGREEMENT)
+            logger.info("Triage classifier trained",
+                        extra={**self._model.report, "seconds": round(time.perf_counter() - start, 3)})
+            return self._model
+
+    def info(self) -> Optional[dict]:
+        """The last trained model's held-out report, if this process trained one"""
+        return dict(self._model.report) if self._model else None
+
+    def decide(self, model: Optional[TriageModel], title: str, content: str, content_hash: str) -> Decision:
+        found = signals(title, content)
+        prediction = model.predict(tokens(title, content)) if model else None
+        predicted = {field: prediction[field][0] for field in FIELDS} if prediction else {}
+
+        if found.high_value:
+            route = "high_value"
+        elif found.marketing >= 2 and not found.threat and not found.iocs:
+            route, predicted = "noise", {"threat_type": "other", "severity": "informational"}
+        elif prediction is None:
+            route = "untrained"
+        elif not model.is_confident(prediction):
+            route = "uncertain"
+        elif predicted["severity"] in ("critical", "high"):
+            route = "high_value"
+        else:
+            route = "confident"
+
+        # Audit sample, the same articles whichever process sees them: the LLM checks the local labels
+        if route in LOCAL_ROUTES and int(content_hash[:8], 16) / 0x100000000 < settings.TRIAGE_AUDIT_RATE:
+            route = "audit"
+
+        analysis = None
+        if route in LOCAL_ROUTES:
+            confidence = min(prediction[field][1] for field in FIELDS) if route == "confident" else 1.0
+            try:
+                analysis = ThreatAnalysis(summary=extract_summary(title, content), confidence=confidence, **predicted)
+            except ValidationError:
+                # A label the schema no longer accepts: let the LLM have it rather than fail the article
+                route = "uncertain"
+        metrics.TRIAGE_DECISIONS.labels(route).inc()
+        return Decision(route, analysis, predicted.get("threat_type"), predicted.get("severity"))
+
+    @staticmethod
+    def record(decision: Decision, analysis: ThreatAnalysis):
+        """Count whether the tier's prediction matched the LLM's analysis"""
+        for field in FIELDS:
+            predicted = getattr(decision, field)
+            if predicted is not None:
+                result = "agree" if predicted == getattr(analysis, field) else "disagree"
+                metrics.TRIAGE_AGREEMENT.labels(field, decision.route, result).inc()
+
+
+# Create a global instance
+triage = Triage()
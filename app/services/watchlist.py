@@ -0,0 +1,365 @@
+"""Watchlist matching: every freshly extracted IOC set is checked against the enabled watchlists.
+
+The entries are compiled into an immutable in-memory snapshot, one structure per kind
+of entry, so the cost per article depends on what the article mentions rather than on
+how long the lists are:
+
+  * ip, hash, email, url - hash tables keyed by the canonical value
+  * domain  - a table of watched domains; an article domain is looked up once per label
+              suffix (a.b.evil.com, b.evil.com, evil.com), so subdomains match on label boundaries
+  * cidr    - the (possibly nested) networks flattened into sorted disjoint intervals,
+              each carrying every network that covers it; one bisect per IP
+  * keyword - an Aho-Corasick automaton over word tokens, run on the article text, so a
+              phrase matches whole words in one pass however many phrases there are
+
+Reloads build a new snapshot beside the live one and swap the reference, so matching
+never waits on a reload.
+"""
+import ipaddress
+import logging
+import re
+import socket
+import threading
+import time
+from bisect import bisect_right
+from collections import defaultdict, deque
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app import metrics
+from app.config import settings
+from app.crud import article as crud_article
+from app.crud import watchlist as crud_watchlist
+from app.services.ioc_extractor import refang
+
+logger = logging.getLogger(__name__)
+
+ENTRY_TYPES = ("ip", "cidr", "domain", "hash", "email", "url", "keyword")
+# Extractor types accepted as entry types
+TYPE_ALIASES = {"ipv4": "ip", "md5": "hash", "sha1": "hash", "sha256": "hash"}
+# Extracted IOC types looked up in the exact table, and the entry type they match
+EXACT_IOC_TYPES = {"ipv4": "ip", "md5": "hash", "sha1": "hash", "sha256": "hash", "email": "email", "url": "url"}
+
+_WORD = re.compile(r"\w+")
+_NUMERIC = re.compile(r"^[\d.]+$")
+_HASH = re.compile(r"^(?:[0-9a-f]{32}|[0-9a-f]{40}|[0-9a-f]{64})$")
+_DOMAIN = re.compile(r"^(?:[a-z0-9](?:[a-z0-9\-]{0,61}[a-z0-9])?\.)+[a-z]{2,63}$")
+
+def _ip_int(address: str) -> int:
+    """Canonical dotted IPv4 as an integer, much cheaper than going through ipaddress"""
+    return int.from_bytes(socket.inet_aton(address), "big")
+
+
+# (entry id, watchlist id) of every entry sharing a value
+Refs = Tuple[Tuple[int, int], ...]
+
+
+class WatchlistHit(NamedTuple):
+    entry_id: int
+    watchlist_id: int
+    entry_type: str
+    ioc_type: str
+    ioc_value: str
+
+
+def parse_entry(value: str, entry_type: Optional[str] = None) -> Tuple[str, str]:
+    """(type, canonical value) of a watchlist entry, guessing the type if not given; raises ValueError"""
+    value = refang(value.strip())
+    entry_type = TYPE_ALIASES.get(entry_type, entry_type)
+    if not value:
+        raise ValueError("empty value")
+    if entry_type is not None and entry_type not in ENTRY_TYPES:
+        raise ValueError(f"unknown type {entry_type!r}, expected one of {', '.join(ENTRY_TYPES)}")
+
+    if entry_type in (None, "ip"):
+        try:
+            return "ip", str(ipaddress.IPv4Address(value))
+        except ValueError:
+            if entry_type or _NUMERIC.match(value):
+                raise ValueError(f"{value!r} is not an IPv4 address") from None
+    if entry_type == "cidr" or (entry_type is None and "/" in value and "://" not in value):
+        try:
+            return "cidr", str(ipaddress.IPv4Network(value, strict=False))
+        except ValueError:
+            raise ValueError(f"{value!r} is not an IPv4 network") from None
+
+    lowered = value.lower()
+    if entry_type in (None, "hash") and _HASH.match(lowered):
+        return "hash", lowered
+    if entry_type in (None, "url") and "://" in lowered:
+        return "url", lowered
+    if entry_type in (None, "email") and "@" in lowered:
+        if _DOMAIN.match(lowered.rsplit("@", 1)[1]):
+            return "email", lowered
+    if entry_type in (None, "domain") and _DOMAIN.match(lowered.rstrip(".")):
+        return "domain", lowered.rstrip(".")
+    if entry_type in (None, "keyword"):
+        words = _WORD.findall(lowered)
+        if words and len(" ".join(words)) >= 3:
+            return "keyword", " ".join(words)
+        raise ValueError(f"keyword {value!r} is too short")
+    raise ValueError(f"{value!r} is not a valid {entry_type}")
+
+
+class KeywordAutomaton:
+    """Aho-Corasick over word tokens: every node is a dict of next words"""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[list] = [[]]
+
+    def add(self, phrase: str, payload):
+        node = 0
+        for word in phrase.split():
+            following = self._goto[node].get(word)
+            if following is None:
+                following = len(self._goto)
+                self._goto[node][word] = following
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = following
+        self._out[node].append(payload)
+
+    def build(self):
+        """Compute failure links breadth first; each node's output includes its failure chain's"""
+        queue = deque(self._goto[0].values())  # Depth 1 fails to the root, as initialised
+        while queue:
+            node = queue.popleft()
+            for word, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(word, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def search(self, words: List[str]) -> list:
+        """Payloads of every phrase occurring in the word sequence (repeats included)"""
+        goto, fail, out, root = self._goto, self._fail, self._out, self._goto[0]
+        if root.keys().isdisjoint(words):
+            return []  # No phrase starts anywhere in the text, the usual case
+        found, node = [], 0
+        for word in words:
+            if node == 0:
+                # Most words start nothing, skip the loop for them
+                node = root.get(word, 0)
+            else:
+                while node and word not in goto[node]:
+                    node = fail[node]
+                node = goto[node].get(word, 0)
+            if out[node]:
+                found.extend(out[node])
+        return found
+
+    def __len__(self):
+        return len(self._goto) - 1
+
+
+class CompiledWatchlists:
+    """One immutable snapshot of the enabled entries"""
+
+    def __init__(self, rows, version: tuple = ()):
+        self.version = version
+        exact: Dict[str, list] = defaultdict(list)
+        domains: Dict[str, list] = defaultdict(list)
+        networks, keywords = [], defaultdict(list)
+        self.counts = dict.fromkeys(ENTRY_TYPES, 0)
+
+        for entry_id, watchlist_id, entry_type, value in rows:
+            ref = (entry_id, watchlist_id)
+            self.counts[entry_type] = self.counts.get(entry_type, 0) + 1
+            if entry_type == "domain":
+                domains[value].append(ref)
+            elif entry_type == "cidr":
+                address, prefix = value.split("/")
+                first, size = _ip_int(address), 1 << (32 - int(prefix))
+                networks.append((first, first + size - 1, ref))
+            elif entry_type == "keyword":
+                keywords[value].append(ref)
+            else:
+                exact[value].append(ref)
+
+        self.exact: Dict[str, Refs] = {value: tuple(refs) for value, refs in exact.items()}
+        self.domains: Dict[str, Refs] = {value: tuple(refs) for value, refs in domains.items()}
+        self.starts, self.covers = self._flatten(networks)
+        self.keywords: Optional[KeywordAutomaton] = None
+        if keywords:
+            self.keywords = KeywordAutomaton()
+            for phrase, refs in keywords.items():
+                self.keywords.add(phrase, (phrase, tuple(refs)))
+            self.keywords.build()
+
+    @staticmethod
+    def _flatten(networks: list) -> Tuple[List[int], List[Refs]]:
+        """Sweep the networks into disjoint [start, next start) intervals and what covers each"""
+        events = defaultdict(lambda: ([], []))
+        for first, last, ref in networks:
+            events[first][0].append(ref)
+            events[last + 1][1].append(ref)
+        starts, covers, active = [], [], {}
+        for point in sorted(events):
+            opened, closed = events[point]
+            for ref in closed:
+                active[ref] -= 1
+                if not active[ref]:
+                    del active[ref]
+            for ref in opened:
+                active[ref] = active.get(ref, 0) + 1
+            starts.append(point)
+            covers.append(tuple(active))
+        return starts, covers
+
+    def match(self, iocs: Dict[str, List[str]], text: Optional[str] = None) -> List[WatchlistHit]:
+        hits = []
+        exact = self.exact
+        for ioc_type, entry_type in EXACT_IOC_TYPES.items():
+            for value in iocs.get(ioc_type, ()):
+                refs = exact.get(value if ioc_type != "url" else value.lower())
+                if refs:
+                    hits.extend(WatchlistHit(entry_id, watchlist_id, entry_type, ioc_type, value)
+                                for entry_id, watchlist_id in refs)
+
+        if self.starts:
+            for value in iocs.get("ipv4", ()):
+                index = bisect_right(self.starts, _ip_int(value)) - 1
+                if index >= 0:
+                    hits.extend(WatchlistHit(entry_id, watchlist_id, "cidr", "ipv4", value)
+                                for entry_id, watchlist_id in self.covers[index])
+
+        if self.domains:
+            for value in iocs.get("domain", ()):
+                suffix = value
+                while True:
+                    refs = self.domains.get(suffix)
+                    if refs:
+                        hits.extend(WatchlistHit(entry_id, watchlist_id, "domain", "domain", value)
+                                    for entry_id, watchlist_id in refs)
+                    dot = suffix.find(".")
+                    if dot < 0:
+                        break
+                    suffix = suffix[dot + 1:]
+
+        if self.keywords is not None and text:
+            seen = set()
+            for phrase, refs in self.keywords.search(_WORD.findall(text.lower())):
+                if phrase not in seen:
+                    seen.add(phrase)
+                    hits.extend(WatchlistHit(entry_id, watchlist_id, "keyword", "keyword", phrase)
+                                for entry_id, watchlist_id in refs)
+        return hits
+
+    @property
+    def size(self) -> int:
+        return sum(self.counts.values())
+
+
+class WatchlistMatcher:
+    """Holds the live snapshot and reloads it when the watchlists change, in this process or another"""
+
+    def __init__(self):
+        self._compiled = CompiledWatchlists([])
+        self._build_lock = threading.Lock()
+        self._checked_at = 0.0
+        self._loaded_at: Optional[float] = None
+        self._build_seconds = 0.0
+
+    def refresh(self, db: Session, force: bool = False):
+        """Reload if the lists changed; checks at most every WATCHLIST_RELOAD_INTERVAL seconds unless forced.
+
+        Only one thread rebuilds; the others keep matching against the current snapshot meanwhile.
+        """
+        if not force and time.monotonic() - self._checked_at < settings.WATCHLIST_RELOAD_INTERVAL:
+            return
+        if not self._build_lock.acquire(blocking=False):
+            return
+        try:
+            self._checked_at = time.monotonic()
+            version = crud_watchlist.get_version(db)
+            if version == self._compiled.version and self._loaded_at is not None:
+                return
+            start = time.perf_counter()
+            compiled = CompiledWatchlists(crud_watchlist.iter_enabled_entries(db), version)
+            self._build_seconds = time.perf_counter() - start
+            self._compiled, self._loaded_at = compiled, time.time()
+            metrics.WATCHLIST_RELOADS.inc()
+            for entry_type, count in compiled.counts.items():
+                metrics.WATCHLIST_ENTRIES.labels(entry_type).set(count)
+            logger.info("Watchlists loaded", extra={"entries": compiled.size,
+                                                    "seconds": round(self._build_seconds, 3)})
+        finally:
+            self._build_lock.release()
+
+    def match(self, iocs: Dict[str, List[str]], text: Optional[str] = None) -> List[WatchlistHit]:
+        """Hits of one article's IOCs (and text, for keywords) against the current snapshot"""
+        start = time.perf_counter()
+        hits = self._compiled.match(iocs or {}, text)
+        metrics.WATCHLIST_MATCH_SECONDS.observe(time.perf_counter() - start)
+        return hits
+
+    def match_and_record(self, db: Session, articles: Dict[int, Tuple[dict, Optional[str]]]) -> int:
+        """Match {article id: (iocs, text)} and store the hits not recorded yet. Does not commit.
+
+        Returns the number of new matches; each article with new ones is logged as an alert.
+        """
+        self.refresh(db)
+        if not self._compiled.size:
+            return 0
+        hits = {article_id: self.match(iocs, text) for article_id, (iocs, text) in articles.items()}
+        hits = {article_id: found for article_id, found in hits.items() if found}
+        if not hits:
+            return 0
+
+        existing = crud_watchlist.get_existing_matches(db, list(hits))
+        rows = []
+        for article_id, found in hits.items():
+            new = {(hit.entry_id, hit.ioc_value): hit for hit in found
+                   if (hit.entry_id, article_id, hit.ioc_value) not in existing}
+            if not new:
+                continue
+            rows.extend(
+                {"watchlist_id": hit.watchlist_id, "entry_id": hit.entry_id, "article_id": article_id,
+                 "ioc_type": hit.ioc_type, "ioc_value": hit.ioc_value}
+                for hit in new.values()
+            )
+            logger.warning("Watchlist match", extra={
+                "article_id": article_id,
+                "watchlists": sorted({hit.watchlist_id for hit in new.values()}),
+                "values": sorted({hit.ioc_value for hit in new.values()})[:20],
+            })
+        crud_watchlist.add_matches(db, rows)
+        metrics.WATCHLIST_MATCHES.inc(len(rows))
+        return len(rows)
+
+    def scan(self, db: Session, chunk_size: int = 500, progress: Optional[Callable] = None) -> dict:
+        """Match every stored article (its extracted IOCs and its text), e.g. after adding a list; commits per chunk"""
+        self.refresh(db, force=True)
+        total = crud_article.count_articles(db)
+        scanned = matched = last_id = 0
+        while True:
+            rows = crud_article.get_article_iocs(db, after_id=last_id, limit=chunk_size)
+            if not rows:
+                break
+            last_id = rows[-1].id
+            matched += self.match_and_record(db, {row.id: (row.iocs or {}, f"{row.title} {row.content}") for row in rows})
+            db.commit()
+            scanned += len(rows)
+            if progress:
+                progress(scanned, total)
+        return {"scanned": scanned, "new_matches": matched}
+
+    def stats(self) -> dict:
+        compiled = self._compiled
+        return {
+            "entries": compiled.counts,
+            "cidr_intervals": len(compiled.starts),
+            "keyword_nodes": len(compiled.keywords) if compiled.keywords else 0,
+            "loaded_at": self._loaded_at,
+            "build_seconds": round(self._build_seconds, 3),
+        }
+
+
+# Create a global instance
+watchlist_matcher = WatchlistMatcher()
@@ -0,0 +1,105 @@
+"""GET /articles latency: offset paging vs keyset cursors at depth.
+
+Seeds a throwaway SQLite database with N articles, then reports p50/p99
+latency of page 1 and page P through the API, once with ?skip= and once
+with ?cursor=, plus a projected (fields=) variant of the cursor request.
+
+Usage:
+    python -m benchmarks.bench_article_pagination --rows 1000000 --page 10000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+SOURCES = ["The Hacker News", "BleepingComputer", "SecurityWeek", "Krebs on Security", "CISA"]
+THREAT_TYPES = ["ransomware", "phishing", "vulnerability", "zero-day", "apt", "malware", "ddos", "data-breach", "other"]
+SEVERITIES = ["critical", "high", "medium", "low", "informational"]
+
+
+def seed(engine, rows: int, batch: int = 20000):
+    from sqlalchemy import insert
+    from app.models.article import Article
+
+    rng = random.Random(42)
+    start_date = datetime(2020, 1, 1)
+    body = "Threat actors exploited a flaw to deploy malware. " * 8
+    with engine.begin() as conn:
+        for offset in range(0, rows, batch):
+            conn.execute(insert(Article), [
+                {
+                    "title": f"Synthetic advisory {i}",
+                    "url": f"https://bench.local/articles/{i}",
+                    "content": body,
+                    "summary": "Synthetic summary",
+                    "source": rng.choice(SOURCES),
+                    "threat_type": rng.choice(THREAT_TYPES),
+                    "severity": rng.choice(SEVERITIES),
+                    "iocs": {"ipv4": [f"10.{i % 256}.{(i // 256) % 256}.1"]},
+                    "published_date": start_date + timedelta(minutes=i),
+                }
+                for i in range(offset, min(offset + batch, rows))
+            ])
+
+
+def measure(client, url: str, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(url)
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.text
+    timings.sort()
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    return statistics.median(timings), p99
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page", type=int, default=10_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    # Imported late so the app binds to the throwaway database
+    from fastapi.testclient import TestClient
+    from app.crud import article as crud_article
+    from app.database import SessionLocal, engine, migrate
+    from app.main import app
+
+    migrate()
+    start = time.perf_counter()
+    seed(engine, args.rows)
+    print(f"seeded {args.rows} rows in {time.perf_counter() - start:.1f}s ({db_path})")
+
+    # Cursor pointing at the row right before page P, as a client paging from page 1 would hold
+    db = SessionLocal()
+    skip = (args.page - 1) * args.limit
+    boundary = crud_article.get_articles(db, skip=skip - 1, limit=1, fields=["id"])[0] if skip else None
+    db.close()
+    deep_cursor = crud_article.encode_cursor(boundary["published_date"], boundary["id"]) if boundary else None
+
+    base = f"/api/v1/articles/?limit={args.limit}"
+    cases = [
+        ("offset page 1", base),
+        (f"offset page {args.page}", f"{base}&skip={skip}"),
+        ("cursor page 1", base),
+        (f"cursor page {args.page}", f"{base}&cursor={deep_cursor}"),
+        (f"cursor page {args.page} fields", f"{base}&cursor={deep_cursor}&fields=id,title,severity,threat_type"),
+    ]
+    # Entered so lifespan disposes the async engine, whose aiosqlite threads otherwise keep the process alive
+    with TestClient(app) as client:
+        for label, url in cases:
+            p50, p99 = measure(client, url, args.repeat)
+            print(f"{label:<28} p50 {p50:9.2f} ms   p99 {p99:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Batch AI processing throughput against the fake chat-completions server.
+
+Seeds a throwaway SQLite database with N unprocessed articles and runs
+/batch/process-all's engine against benchmarks.fake_llm_server with
+injected latency and 429s. --sequential also times the old one-article-
+at-a-time path (AIProcessor.process_article) for comparison.
+
+Usage:
+    python -m benchmarks.bench_batch_process --articles 200 --latency 300 --error-rate 0.05
+"""
+import argparse
+import os
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--articles", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=300, help="ms per completion")
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--server-rpm", type=int, default=0, help="quota enforced by the fake server")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rpm", type=int, default=6000, help="client-side limiter requests per minute")
+    parser.add_argument("--tpm", type=int, default=2_000_000, help="client-side limiter tokens per minute")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--duplicates", type=float, default=0.0,
+                        help="fraction of articles that are syndicated copies of another one")
+    parser.add_argument("--sequential", action="store_true")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    os.environ["GROQ_API_KEY"] = "fake-key"
+    os.environ["GROQ_BASE_URL"] = f"http://127.0.0.1:{args.port}"
+    os.environ.update(
+        LLM_CONCURRENCY=str(args.concurrency),
+        LLM_REQUESTS_PER_MINUTE=str(args.rpm),
+        LLM_TOKENS_PER_MINUTE=str(args.tpm),
+    )
+
+    # Imported late so settings pick up the environment above
+    from benchmarks.fake_llm_server import start_in_thread
+    from app import metrics
+    from app.crud import article as crud_article
+    from app.database import SessionLocal, migrate
+    from app.services.llm_batch import llm_batch_processor
+
+    server = start_in_thread(args.port, latency=args.latency / 1000, error_rate=args.error_rate, rpm=args.server_rpm)
+    migrate()
+
+    unique = max(1, int(args.articles * (1 - args.duplicates)))
+
+    def seed(prefix, content_prefix=None):
+        # Content is unique per run prefix, so the sequential run doesn't warm the batch run's cache
+        db = SessionLocal()
+        crud_article.bulk_create_articles(db, [
+            {"title": f"Advisory {i}", "url": f"https://bench.local/{prefix}/{i}",
+             "content": f"[{content_prefix or prefix} {i % unique}] Threat actors exploited CVE-2024-0001 "
+                        "to deploy ransomware. " * 20}
+            for i in range(args.articles)
+        ])
+        return db
+
+    if args.sequential:
+        from app.services.ai_processor import AIProcessor
+        db = seed("sequential")
+        processor = AIProcessor()
+        ids = [row.id for row in crud_article.get_articles_to_process(db, limit=args.articles)]
+        start = time.perf_counter()
+        for article_id in ids:
+            processor.process_article(db, article_id)
+        report("sequential", start, len(ids))
+        db.close()
+
+    db = seed("batch")
+    start = time.perf_counter()
+    result = llm_batch_processor.run(db)
+    report("batch", start, result["processed_articles"])
+    print(f"failed {len(result['failed_articles'])}  stats {result['stats']}  cache {result['cache']}")
+    print(f"server {server['counters']}")
+
+    # Second pass over the same content: every analysis should come from the cache
+    db = seed("batch-rerun", content_prefix="batch")
+    start = time.perf_counter()
+    result = llm_batch_processor.run(db)
+    report("cached", start, result["processed_articles"])
+    print(f"stats {result['stats']}  cache {result['cache']}")
+    print("".join(
+        line + "\n" for line in metrics.render()[0].decode().splitlines()
+        if line.startswith(("argus_llm_requests_total", "argus_llm_retries_total", "argus_llm_tokens_total",
+                            "argus_cache_lookups_total"))
+    ), end="")
+
+
+def report(label, start, count):
+    elapsed = time.perf_counter() - start
+    print(f"{label:<11} {elapsed:8.2f}s  {count:5d} articles  {count / elapsed:7.2f} articles/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Compressed article bodies and deferred heavy columns: file size, list latency and memory.
+
+For each codec, a throwaway SQLite database gets N synthetic articles with a few
+KB of markup-laden prose each (no search index, so the size is the articles
+table's). Reports the file size, then times a 100-row listing page and measures
+the peak Python memory of loading every article, once with content and iocs
+deferred (the default) and once with them undeferred as before.
+
+Usage:
+    python -m benchmarks.bench_content_storage --rows 20000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+WORDS = (
+    "the attackers exploited a critical vulnerability in the vpn appliance to gain initial access and "
+    "deployed a web shell before moving laterally with stolen credentials researchers observed the "
+    "threat actor using living off the land binaries to disable endpoint protection exfiltrate data "
+    "to cloud storage and encrypt hypervisors customers are urged to apply the patch rotate secrets "
+    "and hunt for the indicators listed below ransomware loader backdoor campaign phishing firmware"
+).split()
+
+
+def body(rng) -> str:
+    paragraphs = []
+    for _ in range(rng.randint(6, 12)):
+        sentences = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize() + "."
+                     for _ in range(rng.randint(3, 6))]
+        paragraphs.append("<p>" + " ".join(sentences) + "</p>")
+    paragraphs.append(f"<p>Indicators: 185.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}, "
+                      f"{rng.getrandbits(256):064x}</p>")
+    return "\n".join(paragraphs)
+
+
+def seed(engine, rows: int, batch: int = 2000):
+    from sqlalchemy import insert
+    from app.models.article import Article
+
+    rng = random.Random(7)
+    with engine.begin() as conn:
+        for offset in range(0, rows, batch):
+            conn.execute(insert(Article), [
+                {"title": f"Advisory {i}", "url": f"https://bench.local/{i}", "content": body(rng),
+                 "source": "Bench", "summary": "A short summary of the advisory.",
+                 "iocs": {"ips": [f"10.0.{i % 256}.{j}" for j in range(20)], "hashes": [f"{i:064x}"]}}
+                for i in range(offset, min(offset + batch, rows))
+            ])
+
+
+def measure_reads(db, undeferred: bool, repeat: int = 20):
+    from sqlalchemy import select
+    from sqlalchemy.orm import undefer_group
+    from app.models.article import Article
+
+    options = [undefer_group("heavy")] if undeferred else []
+    page = select(Article).options(*options).order_by(Article.published_date.desc(), Article.id.desc()).limit(100)
+    timings = []
+    for _ in range(repeat):
+        db.expunge_all()
+        start = time.perf_counter()
+        db.execute(page).scalars().all()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    db.expunge_all()
+    tracemalloc.start()
+    start = time.perf_counter()
+    articles = db.execute(select(Article).options(*options)).scalars().all()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del articles
+    db.expunge_all()
+    return sorted(timings)[len(timings) // 2], elapsed, peak
+
+
+def run(codec: str, rows: int):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.config import settings
+    from app.database import migrate
+    from app.models.types import compression_codec
+
+    settings.CONTENT_COMPRESSION = codec
+    if compression_codec() != codec:
+        print(f"{codec:>5}: not available, skipped")
+        return
+    path = os.path.join(tempfile.mkdtemp(), "content.db")
+    engine = create_engine(f"sqlite:///{path}")
+    migrate(engine)
+    start = time.perf_counter()
+    seed(engine, rows)
+    seeded = time.perf_counter() - start
+    print(f"{codec:>5}: {os.path.getsize(path) / 1e6:7.1f} MB on disk, seeded in {seeded:.1f}s")
+
+    db = sessionmaker(bind=engine)()
+    for undeferred in (True, False):
+        page_ms, load_s, peak = measure_reads(db, undeferred)
+        label = "content+iocs loaded" if undeferred else "deferred (default)"
+        print(f"       {label:<20}  100-row page p50 {page_ms:6.2f} ms   "
+              f"all rows {load_s:5.2f}s, peak {peak / 1e6:6.1f} MB")
+    db.close()
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--codecs", default="none,zlib,zstd")
+    args = parser.parse_args()
+
+    import app.crud  # noqa: F401  registers every table
+    for codec in args.codecs.split(","):
+        run(codec, args.rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Feed ingestion benchmark: serial feedparser vs the async collector.
+
+Starts the local fake feed server (benchmarks.fake_feed_server) with N RSS feeds with configurable
+latency, then times:
+
+  * serial   - the old loop, feedparser.parse(url) one feed at a time
+  * cold     - RSSDataCollector.fetch_feeds_async with no validators
+  * warm     - the same feeds again with the returned validators, every feed answers 304
+
+Usage:
+    python -m benchmarks.bench_feed_ingest --feeds 200 --latency 100
+"""
+import argparse
+import asyncio
+import time
+
+import feedparser
+from aiohttp import web
+
+from app.config import settings
+from app.services.data_collector import RSSDataCollector
+from benchmarks.fake_feed_server import feed_urls, make_app
+
+
+async def run(args):
+    runner = web.AppRunner(make_app(args.feeds, args.entries, args.latency / 1000))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", args.port)
+    await site.start()
+
+    # Every stub feed lives on the same host, so the per-host cap is the real limit here
+    settings.FEED_CONCURRENCY = args.concurrency
+    settings.FEED_PER_HOST_LIMIT = args.per_host
+    collector = RSSDataCollector()
+    feeds = [{"url": url, "source": f"Stub {i}"} for i, url in enumerate(feed_urls(args.port, args.feeds))]
+
+    try:
+        if not args.skip_serial:
+            loop = asyncio.get_running_loop()
+            start = time.perf_counter()
+            serial_count = await loop.run_in_executor(
+                None, lambda: sum(len(feedparser.parse(f["url"]).entries) for f in feeds)
+            )
+            report("serial", start, serial_count)
+
+        start = time.perf_counter()
+        cold = await collector.fetch_feeds_async(feeds)
+        report("cold", start, sum(len(result["articles"]) for result in cold))
+
+        for feed, result in zip(feeds, cold):
+            feed.update(etag=result["etag"], last_modified=result["last_modified"])
+        start = time.perf_counter()
+        warm = await collector.fetch_feeds_async(feeds)
+        report("warm (304)", start, sum(len(result["articles"]) for result in warm))
+    finally:
+        await runner.cleanup()
+
+
+def report(label: str, start: float, articles: int):
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {elapsed:8.3f}s  {articles:7d} articles")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--feeds", type=int, default=100)
+    parser.add_argument("--entries", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=100, help="per-request latency in ms")
+    parser.add_argument("--concurrency", type=int, default=settings.FEED_CONCURRENCY)
+    parser.add_argument("--per-host", type=int, default=settings.FEED_CONCURRENCY)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--skip-serial", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
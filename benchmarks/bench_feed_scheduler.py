@@ -0,0 +1,92 @@
+"""Adaptive feed polling vs fixed intervals, simulated over a week.
+
+Each simulated feed publishes on a Poisson process at its own rate and lists its
+20 latest items; a poll that finds nothing new gets 304 Not Modified, as with
+ETags. Compares a fixed interval with FeedScheduler.schedule (the policy the
+scheduler applies after every real poll): requests sent, and how long an item
+waits between being published and being fetched. One feed fails for a day in
+the middle of the week to show the backoff.
+
+Usage:
+    python -m benchmarks.bench_feed_scheduler --days 7
+"""
+import argparse
+import bisect
+import random
+import statistics
+from datetime import datetime, timedelta, timezone
+
+# Items per hour: a busy vendor blog down to a feed that posts a few times a year
+FEEDS = {"busy": 6.0, "hourly": 1.0, "daily": 1 / 24, "weekly": 1 / 168, "dormant": 1 / 2000}
+LISTED_ITEMS = 20
+START = datetime(2025, 1, 6, tzinfo=timezone.utc)
+
+
+def publish_times(rng, rate_per_hour: float, days: int) -> list:
+    # A year of history before the start, so every feed has a full item list on the first poll
+    times, t = [], START - timedelta(days=365)
+    end = START + timedelta(days=days)
+    while t < end:
+        t += timedelta(hours=rng.expovariate(rate_per_hour))
+        times.append(t)
+    return times
+
+
+def simulate(times: list, days: int, policy, outage=None) -> dict:
+    end = START + timedelta(days=days)
+    feed = {"poll_interval": None, "consecutive_failures": 0, "last_new_at": None}
+    now, seen, requests, delays = START, 0, 0, []
+    while now < end:
+        requests += 1
+        published = bisect.bisect_right(times, now)
+        if outage and outage[0] <= now < outage[1]:
+            result = {"status": "error", "error": "HTTP 503", "articles": []}
+            new = 0
+        else:
+            new = published - seen if seen else 0
+            delays += [(now - t).total_seconds() / 60 for t in times[seen:published]] if seen else []
+            seen = published
+            listed = times[max(0, published - LISTED_ITEMS):published]
+            result = {
+                "status": "ok" if new else "not_modified",
+                "articles": [{"published_date": t.replace(tzinfo=None)} for t in listed] if new else [],
+                "etag": None, "last_modified": None, "error": None,
+            }
+        values = policy(feed, result, new, now)
+        feed.update({k: v for k, v in values.items() if k in ("poll_interval", "consecutive_failures", "last_new_at")})
+        now = values["next_poll_at"]
+    return {"requests": requests, "delays": delays}
+
+
+def fixed(seconds: float):
+    def policy(feed, result, new_articles, now):
+        return {"next_poll_at": now + timedelta(seconds=seconds)}
+    return policy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=7)
+    args = parser.parse_args()
+
+    from app.services.feed_scheduler import feed_scheduler
+
+    rng = random.Random(4)
+    policies = {"fixed 1h": fixed(3600), "fixed 5min": fixed(300), "adaptive": feed_scheduler.schedule}
+    outage = (START + timedelta(days=3), START + timedelta(days=4))
+    print(f"{'feed':<9} {'policy':<11} {'requests':>9} {'items':>6} {'median wait':>12} {'p95 wait':>10}")
+    totals = {name: 0 for name in policies}
+    for feed, rate in FEEDS.items():
+        times = publish_times(rng, rate, args.days)
+        for name, policy in policies.items():
+            result = simulate(times, args.days, policy, outage=outage if feed == "hourly" else None)
+            totals[name] += result["requests"]
+            delays = sorted(result["delays"])
+            median = f"{statistics.median(delays):9.1f} min" if delays else "-"
+            p95 = f"{delays[int(len(delays) * 0.95) - 1] if len(delays) > 1 else delays[0]:7.1f} min" if delays else "-"
+            print(f"{feed:<9} {name:<11} {result['requests']:>9} {len(delays):>6} {median:>12} {p95:>10}")
+    print("total requests: " + ", ".join(f"{name} {count}" for name, count in totals.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""IOC extraction throughput: the old seven-pass extractor vs the single-pass scanner.
+
+The corpus is the article content already stored in the database (real
+advisories pulled from the feeds), or every *.txt/*.html file under
+--corpus. It is repeated until it reaches --min-mb so timings are stable.
+
+Usage:
+    python -m benchmarks.bench_ioc_extractor
+    python -m benchmarks.bench_ioc_extractor --corpus ./advisories --min-mb 20
+"""
+import argparse
+import pathlib
+import re
+import time
+
+from app.services.ioc_extractor import IOCExtractor
+
+
+class LegacyIOCExtractor:
+    """The extractor as it was before the single-pass scanner, kept as the baseline.
+
+    The domain pattern has capture groups, so findall returned tuples and the old
+    allowlist filter raised on them; str() keeps the same work without the crash.
+    """
+
+    def __init__(self):
+        self.patterns = {
+            'ipv4': r'\b(?:[0-9]{1,3}\.){3}[0-9]{1,3}\b',
+            'domain': r'\b([a-zA-Z0-9]([a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]{2,}\b',
+            'md5': r'\b[a-fA-F0-9]{32}\b',
+            'sha1': r'\b[a-fA-F0-9]{40}\b',
+            'sha256': r'\b[a-fA-F0-9]{64}\b',
+            'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
+            'url': r'https?://(?:[-\w.]|(?:%[\da-fA-F]{2}))+[/\w\.-]*\??[/\w\.-=&]*'
+        }
+
+    def extract_iocs(self, text):
+        if not text:
+            return {}
+        iocs = {}
+        for ioc_type, pattern in self.patterns.items():
+            matches = re.findall(pattern, text)
+            if ioc_type == 'domain':
+                matches = [m for m in matches if not any(common in str(m).lower() for common in
+                          ['microsoft.com', 'google.com', 'apple.com', 'amazon.com'])]
+            if matches:
+                iocs[ioc_type] = list(set(matches))
+        return iocs
+
+
+def load_corpus(path):
+    if path:
+        files = [p for p in pathlib.Path(path).rglob("*") if p.suffix in (".txt", ".html", ".md")]
+        return [p.read_text(errors="ignore") for p in files]
+
+    from app.database import SessionLocal
+    from app.models.article import Article
+
+    db = SessionLocal()
+    try:
+        return [f"{title} {content}" for title, content in db.query(Article.title, Article.content) if content]
+    finally:
+        db.close()
+
+
+def measure(extractor, documents, total_bytes):
+    start = time.perf_counter()
+    found = sum(sum(len(v) for v in extractor.extract_iocs(doc).values()) for doc in documents)
+    elapsed = time.perf_counter() - start
+    return total_bytes / elapsed / 1e6, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", help="directory of advisory text files (defaults to stored articles)")
+    parser.add_argument("--min-mb", type=float, default=10)
+    args = parser.parse_args()
+
+    documents = load_corpus(args.corpus)
+    if not documents:
+        raise SystemExit("empty corpus: fetch some articles first or pass --corpus")
+
+    size = sum(len(doc.encode()) for doc in documents)
+    repeat = max(1, int(args.min_mb * 1e6 // size) + 1)
+    documents = documents * repeat
+    total_bytes = size * repeat
+    print(f"corpus: {len(documents)} documents, {total_bytes / 1e6:.1f} MB")
+
+    for label, extractor in (("legacy", LegacyIOCExtractor()), ("single-pass", IOCExtractor())):
+        mb_per_s, found = measure(extractor, documents, total_bytes)
+        print(f"{label:<12} {mb_per_s:8.2f} MB/s  {found // repeat:6d} IOCs per corpus pass")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Near-duplicate clustering at ingest: cost per article as the corpus grows, and accuracy.
+
+For each corpus size, a throwaway SQLite database gets that many stored articles
+with random MinHash signatures and their LSH buckets. A batch of new articles is
+then ingested through near_duplicate_detector.assign_clusters: stories with
+lightly edited syndicated copies (different boilerplate, a changed sentence)
+plus unrelated stories. Reports ms per ingested article, which should stay flat
+as the corpus grows, and how many planted copies landed in their original's
+cluster versus unrelated stories wrongly merged.
+
+Usage:
+    python -m benchmarks.bench_near_duplicates --sizes 1000,10000,100000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+WORDS = [
+    "attackers", "exploited", "vulnerability", "ransomware", "campaign", "targeting", "organizations",
+    "researchers", "observed", "payload", "credentials", "network", "servers", "patch", "released",
+    "critical", "remote", "code", "execution", "phishing", "emails", "malicious", "loader", "backdoor",
+    "threat", "actor", "infrastructure", "command", "control", "data", "exfiltration", "customers",
+    "government", "agencies", "advisory", "firmware", "devices", "botnet", "cloud", "accounts",
+]
+
+
+def story(rng, sentences: int = 12) -> list:
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(10, 18))) + "." for _ in range(sentences)]
+
+
+def syndicated_copy(rng, sentences: list) -> str:
+    copy = list(sentences)
+    copy[rng.randrange(len(copy))] = " ".join(rng.choice(WORDS) for _ in range(12)) + "."
+    return "<p>" + " ".join(copy) + "</p> The post appeared first on " + rng.choice(["Wire", "Digest", "Daily"]) + "."
+
+
+def seed_corpus(engine, size: int, batch: int = 5000):
+    from sqlalchemy import insert
+    from app.models.article import Article
+    from app.models.near_duplicate import ArticleLSHBucket
+    from app.services.near_duplicate import NUM_PERMUTATIONS, band_keys, pack
+
+    rng = random.Random(3)
+    with engine.begin() as conn:
+        for offset in range(0, size, batch):
+            articles, buckets = [], []
+            for i in range(offset + 1, min(offset + batch, size) + 1):
+                values = [rng.getrandbits(61) for _ in range(NUM_PERMUTATIONS)]
+                articles.append({"id": i, "title": f"Stored {i}", "url": f"https://bench.local/stored/{i}",
+                                 "cluster_id": i, "minhash": pack(values)})
+                buckets += [{"band": band, "bucket": bucket, "article_id": i} for band, bucket in band_keys(values)]
+            conn.execute(insert(Article), articles)
+            conn.execute(insert(ArticleLSHBucket), buckets)
+
+
+def run(size: int, stories: int, copies: int):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from app.crud import article as crud_article
+    from app.database import migrate
+    from app.services.near_duplicate import near_duplicate_detector
+
+    # One throwaway database per corpus size
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'dedup.db')}")
+    migrate(engine)
+    seed_corpus(engine, size)
+    db = sessionmaker(bind=engine)()
+
+    rng = random.Random(size)
+    incoming, origin = [], {}
+    for n in range(stories):
+        sentences = story(rng)
+        url = f"https://bench.local/new/{n}"
+        incoming.append({"title": f"Story {n}", "url": url, "content": " ".join(sentences), "source": "Origin"})
+        for c in range(copies):
+            copy_url = f"https://bench.local/new/{n}/copy{c}"
+            origin[copy_url] = url
+            incoming.append({"title": f"Story {n}", "url": copy_url, "content": syndicated_copy(rng, sentences),
+                             "source": f"Syndicator {c}"})
+
+    ids = crud_article.bulk_create_articles(db, incoming)
+    start = time.perf_counter()
+    stats = near_duplicate_detector.assign_clusters(db, ids)
+    elapsed = time.perf_counter() - start
+
+    from app.models.article import Article
+    clusters = dict(db.query(Article.url, Article.cluster_id).filter(Article.id.in_(ids)))
+    ids_by_url = dict(db.query(Article.url, Article.id).filter(Article.id.in_(ids)))
+    found = sum(clusters[copy_url] == ids_by_url[original] for copy_url, original in origin.items())
+    wrong = sum(
+        1 for url, cluster_id in clusters.items()
+        if url not in origin and cluster_id != ids_by_url[url]
+    )
+    db.close()
+    print(f"corpus {size:>9,}   {elapsed / len(ids) * 1000:7.2f} ms/article   "
+          f"copies clustered {found}/{len(origin)}   originals merged by mistake {wrong}   "
+          f"duplicates {stats['duplicates']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--stories", type=int, default=100)
+    parser.add_argument("--copies", type=int, default=3, help="syndicated copies per story")
+    args = parser.parse_args()
+
+    for size in (int(s) for s in args.sizes.split(",")):
+        run(size, args.stories, args.copies)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Full-text page fetching against a local fixture server.
+
+Serves N article pages spread over D virtual hosts (127.0.0.x addresses), each
+answering after a fixed latency with a realistic page: navigation, sidebar,
+share links and the article body, with ETag and Last-Modified validators
+(conditional GETs get a 304). Times:
+
+  * serial   - requests.get one page at a time, as a naive stage would
+  * cold     - PageFetcher.fetch_texts with an empty page cache
+  * warm     - the same URLs again, served from the cache without requests
+
+and checks politeness from the server side: the most requests one host had in
+flight at once, and the shortest gap between two request starts on one host.
+
+Usage:
+    python -m benchmarks.bench_page_fetcher --pages 200 --hosts 10 --latency 100
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+from collections import defaultdict
+
+import requests
+from aiohttp import web
+
+from app.config import settings
+from app.services.page_fetcher import PageFetcher
+
+LAST_MODIFIED = "Wed, 01 Jan 2025 00:00:00 GMT"
+PARAGRAPH = ("Researchers observed the operators pivoting through compromised VPN appliances before "
+             "deploying a loader that contacted 203.0.113.{n} and update-{n}.example.net for tasks. ")
+
+
+def page(n: int) -> bytes:
+    body = "".join(f"<p>{PARAGRAPH.format(n=(n + i) % 250) * 3}</p>" for i in range(8))
+    links = "".join(f'<li><a href="/related/{i}">Related story {i}</a></li>' for i in range(30))
+    return (
+        "<!doctype html><html><head><title>Advisory</title><script>var tracking = 1;</script></head><body>"
+        '<header><nav><a href="/">Home</a><a href="/news">News</a><a href="/about">About</a></nav></header>'
+        f"<main><article><h1>Advisory {n}</h1>{body}"
+        '<div class="share"><a href="#">Tweet</a><a href="#">Share</a></div></article></main>'
+        f"<aside><ul>{links}</ul></aside><footer>Copyright</footer></body></html>"
+    ).encode()
+
+
+def make_app(latency: float, stats: dict, validators: tuple = ("etag", "last_modified")) -> web.Application:
+    """stats gets per-host request starts and in-flight counts, and the number of 304s sent"""
+    stats.setdefault("not_modified", 0)
+
+    async def handler(request):
+        host = request.host.split(":")[0]
+        body = page(int(request.match_info["n"]))
+        headers = {}
+        if "etag" in validators:
+            headers["ETag"] = '"' + hashlib.md5(body).hexdigest() + '"'
+        if "last_modified" in validators:
+            headers["Last-Modified"] = LAST_MODIFIED
+        now = time.monotonic()
+        starts = stats["starts"][host]
+        if starts:
+            stats["min_gap"] = min(stats["min_gap"], now - starts[-1])
+        starts.append(now)
+        stats["in_flight"][host] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"][host])
+        try:
+            await asyncio.sleep(latency)
+            if ((headers.get("ETag") and request.headers.get("If-None-Match") == headers["ETag"])
+                    or (headers.get("Last-Modified") and request.headers.get("If-Modified-Since") == LAST_MODIFIED)):
+                stats["not_modified"] += 1
+                return web.Response(status=304, headers=headers)
+            return web.Response(body=body, content_type="text/html", charset="utf-8", headers=headers)
+        finally:
+            stats["in_flight"][host] -= 1
+
+    app = web.Application()
+    app.router.add_get("/article/{n}", handler)
+    return app
+
+
+async def run(args):
+    stats = {"starts": defaultdict(list), "in_flight": defaultdict(int), "max_in_flight": 0, "min_gap": float("inf")}
+    runner = web.AppRunner(make_app(args.latency / 1000, stats))
+    await runner.setup()
+    site = web.TCPSite(runner, "0.0.0.0", args.port)
+    await site.start()
+    urls = [f"http://127.0.0.{n % args.hosts + 1}:{args.port}/article/{n}" for n in range(args.pages)]
+    fetcher = PageFetcher(cache_dir=os.path.join(tempfile.mkdtemp(), "pages"))
+
+    try:
+        if not args.skip_serial:
+            loop = asyncio.get_running_loop()
+            start = time.perf_counter()
+            await loop.run_in_executor(None, lambda: [requests.get(url, timeout=30) for url in urls])
+            report("serial", start, len(urls))
+            stats.update(starts=defaultdict(list), max_in_flight=0, min_gap=float("inf"))
+
+        start = time.perf_counter()
+        texts = await fetcher.fetch_texts(urls)
+        report("cold", start, sum(text is not None for text in texts.values()))
+        print(f"{'':12} max in flight per host {stats['max_in_flight']} (limit {settings.PAGE_PER_DOMAIN_LIMIT}), "
+              f"min gap per host {stats['min_gap'] * 1000:.0f} ms (delay {settings.PAGE_DOMAIN_DELAY * 1000:.0f} ms)")
+        sample = next(iter(texts.values()))
+        print(f"{'':12} {len(page(0)):,} bytes of HTML -> {len(sample):,} chars of text, "
+              f"navigation kept: {'Related story' in sample}")
+
+        requests_before = sum(map(len, stats["starts"].values()))
+        start = time.perf_counter()
+        texts = await fetcher.fetch_texts(urls)
+        report("warm", start, sum(text is not None for text in texts.values()))
+        print(f"{'':12} requests sent: {sum(map(len, stats['starts'].values())) - requests_before}")
+    finally:
+        await runner.cleanup()
+
+
+def report(label: str, start: float, pages: int):
+    print(f"{label:<12} {time.perf_counter() - start:8.3f}s  {pages:6d} pages")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--hosts", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=100, help="per-request latency in ms")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--skip-serial", action="store_true")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
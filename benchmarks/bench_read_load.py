@@ -0,0 +1,182 @@
+"""Read throughput under concurrent readers while ingestion writes.
+
+Seeds a throwaway SQLite database, starts the API under uvicorn and hammers
+the read endpoints (GET /articles list, cursor page and single article) with
+--readers concurrent clients for --seconds, while a separate writer process
+inserts batches of new articles through bulk_create_articles the way feed
+ingestion does. Runs once per journal mode so WAL can be compared with the
+default rollback journal, and reports requests/s, p50/p99 latency, errors
+and the rows the writer got in.
+
+Usage:
+    python -m benchmarks.bench_read_load --rows 50000 --readers 64 --seconds 20
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+
+def _env(db_path: str, wal: bool) -> dict:
+    return {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{db_path}",
+        "SQLITE_WAL": "true" if wal else "false",
+        "JOB_WORKERS": "0",
+        "PYTHONPATH": os.getcwd(),
+    }
+
+
+def prepare(db_path: str, rows: int, wal: bool):
+    # Child processes get the database through the environment, so the app's settings pick it up
+    subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_read_load", "--seed", str(rows)],
+        env=_env(db_path, wal), check=True
+    )
+
+
+def seed_database(rows: int):
+    from app.database import engine, migrate
+    from benchmarks.bench_article_pagination import seed
+
+    migrate()
+    seed(engine, rows)
+
+
+def write_forever(batch: int, interval: float):
+    from app.crud import article as crud_article
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    inserted, n = 0, 0
+    try:
+        while True:
+            articles = [
+                {"title": f"Ingested {os.getpid()}-{n + i}", "url": f"https://ingest.local/{os.getpid()}/{n + i}",
+                 "content": "Fresh advisory text. " * 20, "source": "Load test", "published_date": None}
+                for i in range(batch)
+            ]
+            n += batch
+            inserted += len(crud_article.bulk_create_articles(db, articles))
+            print(inserted, flush=True)
+            time.sleep(interval)
+    finally:
+        db.close()
+
+
+async def reader(session, base_url: str, max_id: int, deadline: float, latencies: list, errors: list):
+    rng = random.Random()
+    cursor = None
+    while time.perf_counter() < deadline:
+        choice = rng.random()
+        if choice < 0.4:
+            url = f"{base_url}/api/v1/articles/?limit=50"
+        elif choice < 0.7 and cursor:
+            url = f"{base_url}/api/v1/articles/?limit=50&cursor={cursor}"
+        else:
+            url = f"{base_url}/api/v1/articles/{rng.randint(1, max_id)}"
+        start = time.perf_counter()
+        try:
+            async with session.get(url) as response:
+                await response.read()
+                if response.status != 200:
+                    errors.append(response.status)
+                    continue
+                cursor = response.headers.get("X-Next-Cursor", cursor)
+        except aiohttp.ClientError as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def load(base_url: str, readers: int, seconds: float, max_id: int):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + seconds
+    connector = aiohttp.TCPConnector(limit=readers)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(*(reader(session, base_url, max_id, deadline, latencies, errors) for _ in range(readers)))
+    return latencies, errors
+
+
+def wait_until_up(base_url: str, timeout: float = 30.0):
+    import urllib.request
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"{base_url}/health", timeout=1)
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit("server did not come up")
+
+
+def run_mode(args, wal: bool):
+    db_path = os.path.join(tempfile.mkdtemp(), "load.db")
+    prepare(db_path, args.rows, wal)
+    env = _env(db_path, wal)
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+        env=env
+    )
+    writer, output = None, []
+    try:
+        wait_until_up(base_url)
+        writer = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.bench_read_load", "--write",
+             "--write-batch", str(args.write_batch), "--write-interval", str(args.write_interval)],
+            env=env, stdout=subprocess.PIPE, text=True
+        )
+        latencies, errors = asyncio.run(load(base_url, args.readers, args.seconds, args.rows))
+    finally:
+        if writer:
+            writer.terminate()
+            output = writer.communicate()[0].split()
+        server.terminate()
+        server.wait()
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else 0.0
+    label = "wal" if wal else "rollback journal"
+    print(
+        f"{label:<17} {len(latencies) / args.seconds:8.1f} req/s   p50 {statistics.median(latencies or [0]):8.2f} ms"
+        f"   p99 {p99:8.2f} ms   errors {len(errors):5d}   rows written {output[-1] if output else 0}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--readers", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--port", type=int, default=8777)
+    parser.add_argument("--write-batch", type=int, default=200)
+    parser.add_argument("--write-interval", type=float, default=0.05)
+    parser.add_argument("--modes", default="rollback,wal", help="comma-separated: rollback, wal")
+    # Internal: the child processes
+    parser.add_argument("--seed", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--write", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        return seed_database(args.seed)
+    if args.write:
+        return write_forever(args.write_batch, args.write_interval)
+
+    print(f"{args.rows} rows, {args.readers} readers, {args.seconds:.0f}s per mode, "
+          f"writer inserting {args.write_batch} rows every {args.write_interval}s")
+    for mode in args.modes.split(","):
+        run_mode(args, wal=mode.strip() == "wal")
+
+
+if __name__ == "__main__":
+    main()
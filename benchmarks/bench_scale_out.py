@@ -0,0 +1,149 @@
+"""Several worker processes sharing one database: throughput and duplicate work.
+
+For each worker count K in --workers, fills a fresh database with --articles
+synthetic articles (--llm-articles of them still to be analyzed), starts K
+`python -m app.cli worker` processes and submits process-all, then extract-iocs,
+as parallel runs of K parts, the way `?parallel=K` does. LLM calls go to
+benchmarks.fake_llm_server with an injected latency; every worker runs one job
+at a time with one IOC extraction process.
+
+Reports each stage's wall time, from the first part starting to the last one
+finishing, and fails when any work was done twice: the fake server must have
+seen one request per article to analyze, and the parts' extracted counts must
+add up to the corpus. The database is a temporary SQLite file, or the
+(disposable!) one given with --database-url, e.g. a Postgres scratch database
+to exercise SKIP LOCKED; it is downgraded to empty before every round.
+
+Usage:
+    python -m benchmarks.bench_scale_out --workers 1,2,4 --articles 20000 --llm-articles 300
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def start_workers(count: int, env: dict) -> list:
+    command = [sys.executable, "-m", "app.cli", "worker", "--threads", "1", "--no-scheduler"]
+    return [subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL) for _ in range(count)]
+
+
+def stop_workers(workers: list):
+    for worker in workers:
+        worker.terminate()
+    for worker in workers:
+        worker.wait(30)
+
+
+def run_parts(kind: str, params: dict, parts: int, timeout: float) -> tuple:
+    """Submit the parallel run and wait for its jobs; returns (seconds, [job result])"""
+    from app.crud.job import get_job
+    from app.database import SessionLocal
+    from app.services.jobs import job_queue
+
+    with SessionLocal() as db:
+        job_ids = [job.id for job, _ in job_queue.submit_parallel(db, kind, params, parts)]
+        deadline = time.monotonic() + timeout
+        while True:
+            db.expire_all()
+            jobs = [get_job(db, job_id) for job_id in job_ids]
+            if all(job.status not in ("queued", "running") for job in jobs):
+                break
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{kind} parts still running after {timeout:.0f}s")
+            time.sleep(0.2)
+    failed = [f"{job.id}: {job.error}" for job in jobs if job.status != "succeeded"]
+    if failed:
+        raise RuntimeError(f"{kind} parts failed: {'; '.join(failed)}")
+    elapsed = max(job.finished_at for job in jobs) - min(job.started_at for job in jobs)
+    return elapsed.total_seconds(), [job.result for job in jobs]
+
+
+def reset_database(articles: int, llm_articles: int, seed: int):
+    from alembic import command
+    from sqlalchemy import update
+    from app.database import SessionLocal, alembic_config, migrate
+    from app.models.article import Article
+    from benchmarks.synthetic import seed_articles
+
+    command.downgrade(alembic_config(), "base")
+    migrate()
+    with SessionLocal() as db:
+        seed_articles(db, articles, seed=seed)
+        # Only the first llm_articles are left for the LLM stage
+        db.execute(update(Article).where(Article.id > llm_articles).values(summary="Analyzed before the run."))
+        db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="worker process counts to compare")
+    parser.add_argument("--articles", type=int, default=20000, help="corpus size, all of it goes through extraction")
+    parser.add_argument("--llm-articles", type=int, default=300, help="articles left to analyze")
+    parser.add_argument("--latency", type=float, default=200, help="ms per completion")
+    parser.add_argument("--concurrency", type=int, default=4, help="LLM calls in flight per worker")
+    parser.add_argument("--chunk-size", type=int, default=500, help="articles leased per extraction claim")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--database-url", help="disposable database to use instead of a temporary SQLite file")
+    parser.add_argument("--timeout", type=float, default=600, help="seconds to wait for a stage")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    os.environ.update(
+        DATABASE_URL=database_url,
+        GROQ_API_KEY="fake-key",
+        GROQ_BASE_URL=f"http://127.0.0.1:{args.port}",
+        LLM_CONCURRENCY=str(args.concurrency),
+        LLM_REQUESTS_PER_MINUTE="60000",
+        LLM_TOKENS_PER_MINUTE="100000000",
+        IOC_WORKERS="1",
+        IOC_CHUNK_SIZE=str(args.chunk_size),
+        JOB_POLL_INTERVAL="0.1",
+        LOG_LEVEL="WARNING",
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")]))}
+
+    # Imported late so settings pick up the environment above
+    from benchmarks.fake_llm_server import start_in_thread
+
+    server = start_in_thread(args.port, latency=args.latency / 1000)
+    failures, baseline = [], {}
+    print(f"{args.articles} articles, {args.llm_articles} to analyze, {args.latency:.0f} ms per LLM call\n")
+    for count in (int(n) for n in args.workers.split(",")):
+        reset_database(args.articles, args.llm_articles, args.seed)
+        requests_before = server["counters"]["requests"]
+        workers = start_workers(count, env)
+        try:
+            llm_s, llm_results = run_parts("process-all", None, count, args.timeout)
+            ioc_s, ioc_results = run_parts("extract-iocs", {"force": False}, count, args.timeout)
+        finally:
+            stop_workers(workers)
+
+        llm_calls = server["counters"]["requests"] - requests_before
+        analyzed = sum(result["processed_articles"] for result in llm_results)
+        extracted = sum(result["extracted"] for result in ioc_results)
+        baseline.setdefault("llm", llm_s)
+        baseline.setdefault("ioc", ioc_s)
+        print(
+            f"{count:>2} workers  analysis {llm_s:7.2f}s {args.llm_articles / llm_s:8.1f} articles/s "
+            f"(x{baseline['llm'] / llm_s:.2f}, {llm_calls} calls)  "
+            f"extraction {ioc_s:7.2f}s {args.articles / ioc_s:8.1f} articles/s (x{baseline['ioc'] / ioc_s:.2f})  "
+            f"split {[result['processed_articles'] for result in llm_results]} "
+            f"{[result['extracted'] for result in ioc_results]}"
+        )
+        if llm_calls != args.llm_articles or analyzed != args.llm_articles:
+            failures.append(f"{count} workers: {llm_calls} LLM calls and {analyzed} analyses "
+                            f"for {args.llm_articles} articles")
+        if extracted != args.articles:
+            failures.append(f"{count} workers: {extracted} extractions for {args.articles} articles")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
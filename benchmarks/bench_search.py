@@ -0,0 +1,143 @@
+"""Full-text search latency: the FTS index vs a LIKE '%term%' scan.
+
+Seeds a throwaway SQLite database with N synthetic advisories whose words
+follow a Zipf distribution, with known terms planted at common, uncommon and
+rare ranks,
+builds the FTS5 index and reports p50/p99 per query for
+crud.search.search_articles and for the equivalent LIKE scan, both returning
+the first 20 hits. Content is stored compressed, so LIKE only gets to scan
+title and summary; the index covers all three.
+
+Usage:
+    python -m benchmarks.bench_search --rows 500000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+VOCABULARY_SIZE = 50_000
+
+# Placed at fixed ranks of a Zipf-distributed vocabulary: common terms show up in a large
+# share of the corpus, uncommon ones in a few percent, rare ones in a handful of articles
+PLACED_TERMS = {
+    40: "exploit", 60: "remote", 75: "access", 90: "malware",
+    1500: "ransomware", 2200: "citrix", 2600: "backdoor",
+    30000: "lazarusvariant", 42000: "operationnight", 45000: "cve202499042",
+}
+
+QUERIES = ["exploit", "ransomware", "citrix backdoor", '"remote access"', "lazarusvariant",
+           "cve202499042 OR operationnight"]
+
+
+def vocabulary(rng):
+    alphabet = "abcdefghijklmnopqrstuvwxyz"
+    words = ["".join(rng.choice(alphabet) for _ in range(rng.randint(3, 10))) for _ in range(VOCABULARY_SIZE)]
+    for rank, term in PLACED_TERMS.items():
+        words[rank] = term
+    weights, total = [], 0.0
+    for rank in range(1, VOCABULARY_SIZE + 1):
+        total += 1.0 / rank
+        weights.append(total)
+    return words, weights
+
+
+def sentence(rng, words, weights) -> str:
+    return " ".join(rng.choices(words, cum_weights=weights, k=rng.randint(12, 24))).capitalize() + "."
+
+
+def seed(engine, rows: int, batch: int = 10000):
+    from sqlalchemy import insert
+    from app.models.article import Article
+
+    rng = random.Random(11)
+    words, weights = vocabulary(rng)
+    start_date = datetime(2020, 1, 1)
+    with engine.begin() as conn:
+        for offset in range(0, rows, batch):
+            conn.execute(insert(Article), [
+                {
+                    "title": sentence(rng, words, weights)[:90],
+                    "url": f"https://bench.local/search/{i}",
+                    "content": " ".join(sentence(rng, words, weights) for _ in range(rng.randint(4, 10))),
+                    "summary": sentence(rng, words, weights),
+                    "source": "Synthetic",
+                    "severity": rng.choice(["critical", "high", "medium", "low"]),
+                    "published_date": start_date + timedelta(minutes=i),
+                }
+                for i in range(offset, min(offset + batch, rows))
+            ])
+
+
+def like_search(db, query: str, limit: int = 20):
+    from sqlalchemy import and_, or_, select
+    from app.models.article import Article
+
+    # Best effort LIKE equivalent: every term (or OR branch) must appear somewhere
+    def term_filter(term):
+        pattern = f"%{term.strip(chr(34))}%"
+        return or_(Article.title.like(pattern), Article.summary.like(pattern))
+
+    if " OR " in query:
+        condition = or_(*(term_filter(t) for t in query.split(" OR ")))
+    elif query.startswith('"'):
+        condition = term_filter(query)
+    else:
+        condition = and_(*(term_filter(t) for t in query.split()))
+    statement = (
+        select(Article.id, Article.title, Article.summary)
+        .where(condition)
+        .order_by(Article.published_date.desc(), Article.id.desc())
+        .limit(limit)
+    )
+    return db.execute(statement).all()
+
+
+def measure(fn, repeat: int):
+    timings, hits = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        hits = len(fn())
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[min(len(timings) - 1, int(len(timings) * 0.99))], hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), "search.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    # Imported late so the app binds to the throwaway database
+    from app.crud import search as crud_search
+    from app.database import SessionLocal, engine, migrate
+
+    migrate()
+    start = time.perf_counter()
+    seed(engine, args.rows)
+    print(f"seeded {args.rows} rows in {time.perf_counter() - start:.1f}s")
+    start = time.perf_counter()
+    with SessionLocal() as db:
+        crud_search.rebuild_search_index(db)
+    print(f"built the FTS index in {time.perf_counter() - start:.1f}s, db size {os.path.getsize(db_path) / 1e6:.0f} MB")
+
+    db = SessionLocal()
+    try:
+        for query in QUERIES:
+            fts = measure(lambda: crud_search.search_articles(db, query, limit=20), args.repeat)
+            like = measure(lambda: like_search(db, query), max(1, args.repeat // 5))
+            print(f"{query:<34} fts p50 {fts[0]:8.2f} ms p99 {fts[1]:8.2f} ms ({fts[2]:2d} hits)   "
+                  f"like p50 {like[0]:9.2f} ms p99 {like[1]:9.2f} ms ({like[2]:2d} hits)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
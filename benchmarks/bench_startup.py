@@ -0,0 +1,137 @@
+"""Import time and startup time of the API, checked against a budget.
+
+Imports app.main in fresh interpreters under `python -X importtime` and takes
+app.main's cumulative import time, then times the lifespan startup (schema
+check and migrations included) against a fresh database and an up to date one.
+Also checks that `import app.main` leaves out the modules that are only meant to
+load on first use: the LLM SDK, the HTTP clients and Alembic.
+
+Exits 1 when a budget is exceeded or a lazy module got imported. The default
+budgets leave ~30% headroom over the figures measured when they were set
+(~770 ms import, ~130 ms startup); pass your own for a slower machine.
+
+Usage:
+    python -m benchmarks.bench_startup [--repeat 5] [--budget-ms 1000] [--startup-budget-ms 500]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, Tuple
+
+LAZY_MODULES = ("groq", "httpx", "aiohttp", "feedparser", "alembic")
+
+
+def child_env(database_path: str) -> dict:
+    return {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")])),
+        "DATABASE_URL": f"sqlite:///{database_path}",
+        "JOB_WORKERS": "0",
+        "LOG_LEVEL": "WARNING",
+    }
+
+
+def import_profile(env: dict) -> Dict[str, Tuple[int, int]]:
+    """{module: (self us, cumulative us)} of `import app.main` in a fresh interpreter"""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        env=env, capture_output=True, text=True, check=True
+    )
+    profile = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        profile[name.strip()] = (int(own), int(cumulative))
+    return profile
+
+
+def by_package(profile: Dict[str, Tuple[int, int]]) -> Dict[str, int]:
+    """Self time summed per top-level package, in us"""
+    totals = {}
+    for name, (own, _) in profile.items():
+        package = name.split(".")[0]
+        totals[package] = totals.get(package, 0) + own
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def startup_times(env: dict) -> dict:
+    """Wall-clock import and lifespan startup of the app, in a fresh interpreter"""
+    process = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child"],
+        env=env, stdout=subprocess.PIPE, text=True, check=True
+    )
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def measure(repeat: int, database_path: str) -> dict:
+    env = child_env(database_path)
+    # The first start migrates the empty database, the rest find it up to date
+    first = startup_times(env)
+    profiles = [import_profile(env) for _ in range(repeat)]
+    starts = [startup_times(env) for _ in range(repeat)]
+    imported = profiles[-1]
+    return {
+        "import_ms": statistics.median(profile["app.main"][1] for profile in profiles) / 1000,
+        "startup_ms": statistics.median(start["startup_s"] for start in starts) * 1000,
+        "first_startup_ms": first["startup_s"] * 1000,
+        "lazy_modules_imported": [name for name in LAZY_MODULES if name in imported],
+        "packages_ms": {name: us / 1000 for name, us in list(by_package(imported).items())[:12]},
+    }
+
+
+def child():
+    import asyncio
+
+    start = time.perf_counter()
+    from app.main import app
+    imported = time.perf_counter() - start
+
+    async def enter():
+        started = time.perf_counter()
+        async with app.router.lifespan_context(app):
+            return time.perf_counter() - started
+
+    print(json.dumps({"import_s": imported, "startup_s": asyncio.run(enter())}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1000, help="app.main cumulative import time")
+    parser.add_argument("--startup-budget-ms", type=float, default=500, help="lifespan startup, database up to date")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child()
+        return 0
+
+    with tempfile.TemporaryDirectory() as directory:
+        result = measure(args.repeat, os.path.join(directory, "startup.db"))
+
+    print("self time by package (ms):")
+    for name, ms in result["packages_ms"].items():
+        print(f"  {name:<24} {ms:8.1f}")
+    print(f"\nimport app.main     {result['import_ms']:8.1f} ms  (budget {args.budget_ms:.0f})")
+    print(f"startup             {result['startup_ms']:8.1f} ms  (budget {args.startup_budget_ms:.0f})")
+    print(f"first startup       {result['first_startup_ms']:8.1f} ms  (migrates an empty database)")
+
+    failures = []
+    if result["import_ms"] > args.budget_ms:
+        failures.append(f"import time {result['import_ms']:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+    if result["startup_ms"] > args.startup_budget_ms:
+        failures.append(f"startup {result['startup_ms']:.0f} ms is over the {args.startup_budget_ms:.0f} ms budget")
+    if result["lazy_modules_imported"]:
+        failures.append(f"imported at import time: {', '.join(result['lazy_modules_imported'])}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""Dashboard stats: GROUP BY over the articles table vs the rollup counters.
+
+Seeds a throwaway SQLite database with N articles spread over sources,
+severities, threat types and two years of publication dates, fills the
+stat_counts rollups with crud.stats.rebuild_stats, then reports p50/p99 for
+the dashboard aggregates computed three ways: GROUP BY queries over articles
+(what a naive /stats would run per poll), a read of the rollup counters, and
+the /stats endpoint answered from the in-process cache.
+
+Usage:
+    python -m benchmarks.bench_stats --rows 200000
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+SOURCES = [f"Source {i}" for i in range(40)]
+SEVERITIES = ["critical", "high", "medium", "low", "informational", None]
+THREAT_TYPES = ["malware", "ransomware", "phishing", "vulnerability", "apt", "data_breach", "other", None]
+
+
+def seed(engine, rows: int, batch: int = 10000):
+    from sqlalchemy import insert
+    from app.models.article import Article
+
+    rng = random.Random(5)
+    start_date = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        for offset in range(0, rows, batch):
+            conn.execute(insert(Article), [
+                {
+                    "title": f"Advisory {i}",
+                    "url": f"https://bench.local/{i}",
+                    "source": rng.choice(SOURCES),
+                    "severity": rng.choice(SEVERITIES),
+                    "threat_type": rng.choice(THREAT_TYPES),
+                    "published_date": start_date + timedelta(minutes=rng.randrange(2 * 365 * 24 * 60)),
+                    "processed_at": start_date if rng.random() < 0.6 else None,
+                    "iocs": {"ips": ["10.0.0.1"]} if rng.random() < 0.3 else {},
+                }
+                for i in range(offset, min(offset + batch, rows))
+            ])
+
+
+def timed(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1]
+
+
+def group_by_stats(db):
+    from sqlalchemy import func, select
+    from app.models.article import Article
+
+    day = func.date(func.coalesce(Article.published_date, Article.created_at))
+    return {
+        "total": db.scalar(select(func.count(Article.id))),
+        "processed": db.scalar(select(func.count(Article.id)).where(Article.processed_at.isnot(None))),
+        "severity": db.execute(select(Article.severity, func.count()).group_by(Article.severity)).all(),
+        "threat_type": db.execute(select(Article.threat_type, func.count()).group_by(Article.threat_type)).all(),
+        "source": db.execute(select(Article.source, func.count()).group_by(Article.source)).all(),
+        "day": db.execute(select(day, func.count()).group_by(day)).all(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "stats.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ["JOB_WORKERS"] = "0"
+    from fastapi.testclient import TestClient
+    from app.crud.stats import rebuild_stats
+    from app.database import SessionLocal, engine, migrate
+
+    migrate()
+    start = time.perf_counter()
+    seed(engine, args.rows)
+    print(f"seeded {args.rows:,} articles in {time.perf_counter() - start:.1f}s")
+    db = SessionLocal()
+    start = time.perf_counter()
+    rebuild_stats(db)
+    print(f"rollups rebuilt in {time.perf_counter() - start:.1f}s")
+
+    from app.main import app
+    from app.crud.stats import get_counts_async
+    from app.database import AsyncSessionLocal
+
+    async def read_rollups():
+        async with AsyncSessionLocal() as session:
+            return await get_counts_async(session)
+
+    loop = asyncio.new_event_loop()
+    with TestClient(app) as client:
+        etag = client.get("/api/v1/stats").headers["etag"]
+        results = {
+            "GROUP BY over articles": timed(lambda: group_by_stats(db), args.repeat),
+            "rollup counters": timed(lambda: loop.run_until_complete(read_rollups()), args.repeat),
+            "GET /stats (cached)": timed(lambda: client.get("/api/v1/stats"), args.repeat),
+            "GET /stats (304)": timed(lambda: client.get("/api/v1/stats", headers={"If-None-Match": etag}),
+                                      args.repeat),
+        }
+    loop.close()
+    db.close()
+    for name, (p50, p99) in results.items():
+        print(f"{name:<26} p50 {p50:8.2f} ms   p99 {p99:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
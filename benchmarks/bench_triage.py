@@ -0,0 +1,127 @@
+"""Triage tier: LLM calls saved and agreement of the local labels.
+
+Builds a labelled synthetic corpus: the synthetic.py prose, plus words typical of
+each threat type and severity, label noise standing in for the LLM's own
+inconsistency, and a share of vendor-marketing posts labelled other /
+informational. --labelled articles are stored as LLM-analyzed and the classifier
+is trained on them through Triage.model(); --articles fresh ones are then routed
+with Triage.decide().
+
+Reports training time, routing throughput, the share of articles labelled
+locally (LLM calls saved) and how often those labels match the corpus labels,
+against --target. Fails when the local agreement is more than 3 points under the
+target. Runs on a temporary SQLite database.
+
+Usage:
+    python -m benchmarks.bench_triage --labelled 3000 --articles 2000 --target 0.9
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+THREAT_WORDS = {
+    "ransomware": "encrypted files ransom note decryptor double extortion lockbit affiliates negotiation",
+    "phishing": "lure email spoofed login page credential harvesting attachment smishing invoice",
+    "vulnerability": "flaw patch advisory remote code execution authentication bypass update fixed versions",
+    "apt": "state-sponsored espionage nation group tooling implant long-term intelligence diplomats",
+    "malware": "loader dropper payload sample obfuscated persistence registry beacon variant",
+    "data-breach": "exposed database records customers leaked personal information notification stolen",
+}
+SEVERITY_WORDS = {
+    "critical": "emergency widespread mass exploitation urgent immediately",
+    "high": "significant serious many organizations warned",
+    "medium": "limited targeted some users mitigations",
+    "low": "minor theoretical unlikely few proof-of-concept",
+}
+MARKETING = (
+    "Join us for a live webinar where our experts discuss the platform. Register now to save your seat. "
+    "The company announced today a new partnership and an award-winning product launch, now available "
+    "with a free trial. Download the whitepaper and the customer case study."
+)
+
+
+def labelled_article(rng: random.Random, n: int, noise: float, marketing_share: float) -> dict:
+    from benchmarks.synthetic import article, paragraph
+
+    item = article(rng, n, url_prefix="https://bench.local/triage")
+    if rng.random() < marketing_share:
+        item.update(title=f"Vendor news {n}", content=f"<p>{MARKETING}</p>",
+                    threat_type="other", severity="informational")
+        return item
+    threat_type, severity = rng.choice(list(THREAT_WORDS)), rng.choice(list(SEVERITY_WORDS))
+    topical = (THREAT_WORDS[threat_type] + " " + SEVERITY_WORDS[severity]).split()
+    paragraphs = [paragraph(rng, ioc_rate=0.002) for _ in range(rng.randint(2, 5))]
+    paragraphs.insert(1, "<p>" + " ".join(rng.choices(topical, k=rng.randint(8, 20))) + ".</p>")
+    if rng.random() < noise:
+        threat_type, severity = rng.choice(list(THREAT_WORDS)), rng.choice(list(SEVERITY_WORDS))
+    item.update(title=f"{item['title']} {rng.choice(topical)}", content="\n".join(paragraphs),
+                threat_type=threat_type, severity=severity)
+    return item
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--labelled", type=int, default=3000, help="LLM-labelled articles to train on")
+    parser.add_argument("--articles", type=int, default=2000, help="fresh articles to route")
+    parser.add_argument("--target", type=float, default=0.9, help="TRIAGE_TARGET_AGREEMENT")
+    parser.add_argument("--noise", type=float, default=0.05, help="share of labels drawn at random")
+    parser.add_argument("--marketing", type=float, default=0.1, help="share of vendor-marketing posts")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    os.environ.update(
+        DATABASE_URL=f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}",
+        TRIAGE_TARGET_AGREEMENT=str(args.target),
+        TRIAGE_MAX_LABELS=str(args.labelled),
+        TRIAGE_MIN_LABELS="1",
+        TRIAGE_AUDIT_RATE="0",
+        LOG_LEVEL="WARNING",
+    )
+    # Imported late so settings pick up the environment above
+    from datetime import datetime, timezone
+    from app.database import SessionLocal, migrate
+    from app.models.article import Article
+    from app.services.ai_processor import analysis_content_hash
+    from app.services.triage import LOCAL_ROUTES, triage
+
+    migrate()
+    rng = random.Random(args.seed)
+    corpus = [labelled_article(rng, n, args.noise, args.marketing) for n in range(args.labelled + args.articles)]
+    stored, fresh = corpus[:args.labelled], corpus[args.labelled:]
+    with SessionLocal() as db:
+        now = datetime.now(timezone.utc)
+        db.add_all(Article(**item, summary="Analyzed by the LLM.", processed_at=now) for item in stored)
+        db.commit()
+        start = time.perf_counter()
+        model = triage.model(db)
+        train_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    decisions = [triage.decide(model, item["title"], item["content"], analysis_content_hash(item["content"]))
+                 for item in fresh]
+    route_s = time.perf_counter() - start
+
+    routes = {}
+    for decision in decisions:
+        routes[decision.route] = routes.get(decision.route, 0) + 1
+    local = [(decision, item) for decision, item in zip(decisions, fresh) if decision.route in LOCAL_ROUTES]
+    agreed = sum(decision.analysis.threat_type == item["threat_type"] and decision.analysis.severity == item["severity"]
+                 for decision, item in local)
+    agreement = agreed / len(local) if local else 1.0
+
+    print(f"trained on {model.report['trained_on']} articles in {train_s:.2f}s, "
+          f"thresholds {model.report['thresholds']}")
+    print(f"routed {len(fresh)} articles in {route_s:.2f}s ({len(fresh) / route_s:.0f}/s): {routes}")
+    print(f"labelled locally {len(local)} ({len(local) / len(fresh):.1%} of LLM calls saved), "
+          f"agreement {agreement:.1%} (target {args.target:.0%})")
+    if agreement < args.target - 0.03:
+        print(f"FAIL: local agreement {agreement:.1%} under the {args.target:.0%} target")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
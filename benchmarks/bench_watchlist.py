@@ -0,0 +1,112 @@
+"""Watchlist matching cost per article as the lists grow.
+
+Builds watchlists of N random entries (IPs, CIDRs, domains, hashes and a few
+keywords, some of them planted so synthetic articles hit them), compiles them
+the way the matcher does and times matching the extracted IOCs and text of
+--articles synthetic advisories. For small lists it also times a naive scan
+that checks every IOC against every entry, to show how that cost grows instead.
+
+Usage:
+    python -m benchmarks.bench_watchlist --sizes 1000,10000,100000,500000
+"""
+import argparse
+import ipaddress
+import random
+import time
+import tracemalloc
+
+from app.services.ioc_extractor import ioc_extractor
+from app.services.watchlist import CompiledWatchlists
+from benchmarks.synthetic import VOCABULARY, articles
+
+
+def make_entries(size: int, corpus_iocs: list, rng: random.Random) -> list:
+    """(entry id, watchlist id, type, value) rows; about 1% are taken from the corpus so there are hits"""
+    seen = [(t, v) for iocs in corpus_iocs for t, values in iocs.items() for v in values]
+    rows = []
+    for n in range(1, size + 1):
+        roll = rng.random()
+        if roll < 0.01 and seen:
+            ioc_type, value = rng.choice(seen)
+            entry_type = {"ipv4": "ip", "md5": "hash", "sha1": "hash", "sha256": "hash"}.get(ioc_type, ioc_type)
+        elif roll < 0.40:
+            entry_type, value = "ip", str(ipaddress.IPv4Address(rng.getrandbits(32)))
+        elif roll < 0.60:
+            prefix = rng.randint(16, 28)
+            entry_type = "cidr"
+            value = str(ipaddress.IPv4Network((rng.getrandbits(32), prefix), strict=False))
+        elif roll < 0.85:
+            entry_type, value = "domain", f"{rng.getrandbits(40):x}.{rng.choice(['com', 'net', 'io', 'ru'])}"
+        elif roll < 0.999:
+            entry_type, value = "hash", f"{rng.getrandbits(256):064x}"
+        else:
+            entry_type, value = "keyword", " ".join(rng.sample(VOCABULARY, 2)) + f" {rng.getrandbits(16):x}"
+        rows.append((n, 1 + n % 10, entry_type, value))
+    return rows
+
+
+def naive_match(rows: list, iocs: dict) -> int:
+    hits = 0
+    values = [v for vs in iocs.values() for v in vs]
+    for _, _, entry_type, entry in rows:
+        if entry_type == "cidr":
+            network = ipaddress.IPv4Network(entry)
+            hits += sum(ipaddress.IPv4Address(v) in network for v in iocs.get("ipv4", ()))
+        elif entry_type == "domain":
+            hits += sum(v == entry or v.endswith("." + entry) for v in iocs.get("domain", ()))
+        else:
+            hits += entry in values
+    return hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000,500000")
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--naive-max", type=int, default=10000, help="largest list the naive scan is timed on")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = []
+    for entry in articles(args.articles, seed=args.seed):
+        text = f"{entry['title']} {entry['content']}"
+        corpus.append((ioc_extractor.extract_iocs(text), text))
+    per_article = sum(len(v) for iocs, _ in corpus for v in iocs.values()) / len(corpus)
+    print(f"{len(corpus)} articles, {per_article:.1f} IOCs each\n")
+
+    rng = random.Random(args.seed)
+    for size in (int(s) for s in args.sizes.split(",")):
+        rows = make_entries(size, [iocs for iocs, _ in corpus[: len(corpus) // 2]], rng)
+
+        start = time.perf_counter()
+        compiled = CompiledWatchlists(rows)
+        build_s = time.perf_counter() - start
+        # Measured on a second build, tracemalloc slows allocation down too much to time the first
+        tracemalloc.start()
+        snapshot = CompiledWatchlists(rows)
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del snapshot
+
+        start = time.perf_counter()
+        hits = sum(len(compiled.match(iocs)) for iocs, _ in corpus)
+        iocs_us = (time.perf_counter() - start) / len(corpus) * 1e6
+        start = time.perf_counter()
+        for iocs, text in corpus:
+            compiled.match(iocs, text)
+        text_us = (time.perf_counter() - start) / len(corpus) * 1e6
+
+        line = (f"{size:>8} entries  built in {build_s:6.2f}s  {memory / 1e6:7.1f} MB  "
+                f"{iocs_us:7.1f} us/article (IOCs)  {text_us:7.1f} us/article (+keywords)  "
+                f"{hits / len(corpus):.2f} hits/article")
+        if size <= args.naive_max:
+            sample = corpus[:100]
+            start = time.perf_counter()
+            for iocs, _ in sample:
+                naive_match(rows, iocs)
+            line += f"  naive {(time.perf_counter() - start) / len(sample) * 1e6:9.0f} us/article"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
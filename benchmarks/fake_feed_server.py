@@ -0,0 +1,93 @@
+"""Local RSS server for the ingestion benchmarks.
+
+Serves --feeds feeds at /feed/<n>.xml with --entries synthetic advisories each,
+after an injected latency. Every feed has an ETag, so a poll sending it back
+gets a 304, like a well-behaved publisher.
+
+Usage:
+    python -m benchmarks.fake_feed_server --port 8765 --feeds 50 --entries 20 --latency 50
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+import threading
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+
+from aiohttp import web
+
+from benchmarks.synthetic import article
+
+
+def build_feed(feed_id: int, entries: int, seed: int = 0) -> bytes:
+    items = []
+    for i in range(entries):
+        n = feed_id * entries + i
+        entry = article(random.Random(seed * 1_000_003 + n), n, url_prefix=f"http://stub.local/{feed_id}")
+        items.append(
+            f"<item><title>{escape(entry['title'])}</title><link>{entry['url']}</link>"
+            f"<description>{escape(entry['content'])}</description>"
+            f"<pubDate>{format_datetime(entry['published_date'])} GMT</pubDate></item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        f"<title>Stub feed {feed_id}</title>{''.join(items)}</channel></rss>"
+    ).encode()
+
+
+def make_app(feeds: int, entries: int, latency: float = 0.05, seed: int = 0) -> web.Application:
+    bodies = {i: build_feed(i, entries, seed) for i in range(feeds)}
+    etags = {i: '"' + hashlib.md5(body).hexdigest() + '"' for i, body in bodies.items()}
+    counters = {"requests": 0, "not_modified": 0}
+
+    async def handler(request):
+        feed_id = int(request.match_info["feed_id"])
+        counters["requests"] += 1
+        await asyncio.sleep(latency)
+        if request.headers.get("If-None-Match") == etags[feed_id]:
+            counters["not_modified"] += 1
+            return web.Response(status=304)
+        return web.Response(body=bodies[feed_id], content_type="application/rss+xml",
+                            headers={"ETag": etags[feed_id]})
+
+    app = web.Application()
+    app["counters"] = counters
+    app.router.add_get("/feed/{feed_id}.xml", handler)
+    return app
+
+
+def feed_urls(port: int, feeds: int) -> list:
+    return [f"http://127.0.0.1:{port}/feed/{i}.xml" for i in range(feeds)]
+
+
+def start_in_thread(port: int, **options) -> web.Application:
+    """Serve the feeds from a daemon thread, for benchmarks driving sync code"""
+    app = make_app(**options)
+    started = threading.Event()
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        runner = web.AppRunner(app)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", port).start())
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, daemon=True).start()
+    started.wait()
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--feeds", type=int, default=50)
+    parser.add_argument("--entries", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=50, help="ms per request")
+    args = parser.parse_args()
+    web.run_app(make_app(args.feeds, args.entries, args.latency / 1000), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Local stand-in for the Groq chat-completions API.
+
+Answers POST /openai/v1/chat/completions after an injected latency, with a
+JSON threat analysis when the prompt asks for JSON and a short summary
+otherwise. It can inject 429s at random (--error-rate) or on the first N
+requests (--rate-limit-first), and enforce a real requests-per-minute quota
+(--rpm), all with a Retry-After header.
+
+Point the app at it with GROQ_BASE_URL=http://127.0.0.1:<port> and any
+non-empty GROQ_API_KEY.
+
+Usage:
+    python -m benchmarks.fake_llm_server --port 8766 --latency 300 --error-rate 0.05
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import deque
+
+from aiohttp import web
+
+THREAT_TYPES = ["ransomware", "phishing", "vulnerability", "apt", "malware", "data-breach"]
+SEVERITIES = ["critical", "high", "medium", "low"]
+
+
+def make_app(latency: float = 0.2, error_rate: float = 0.0, rpm: int = 0, retry_after: float = 0.25,
+             seed: int = 7, rate_limit_first: int = 0) -> web.Application:
+    rng = random.Random(seed)
+    window = deque()
+    counters = {"requests": 0, "rate_limited": 0}
+    arrivals = []  # monotonic time of every request, for tests checking the client's pacing
+
+    async def chat_completions(request):
+        counters["requests"] += 1
+        payload = await request.json()
+        now = time.monotonic()
+        arrivals.append(now)
+        while window and now - window[0] > 60:
+            window.popleft()
+        if (rpm and len(window) >= rpm) or counters["requests"] <= rate_limit_first or rng.random() < error_rate:
+            counters["rate_limited"] += 1
+            wait = 60 - (now - window[0]) if rpm and len(window) >= rpm else retry_after
+            return web.json_response(
+                {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                status=429,
+                headers={"Retry-After": f"{max(wait, 0.1):.2f}"},
+            )
+        window.append(now)
+
+        await asyncio.sleep(latency)
+        prompt = payload["messages"][-1]["content"]
+        if "JSON" in prompt:
+            content = json.dumps({
+                "threat_type": rng.choice(THREAT_TYPES),
+                "severity": rng.choice(SEVERITIES),
+                "confidence": round(rng.uniform(0.5, 1.0), 2),
+                "summary": "Attackers exploited a flaw to deploy malware.",
+            })
+        else:
+            content = "Attackers exploited a flaw to deploy malware on exposed servers."
+
+        prompt_tokens = sum(len(m["content"]) for m in payload["messages"]) // 4
+        completion_tokens = len(content) // 4
+        return web.json_response({
+            "id": f"chatcmpl-{counters['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "fake"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        })
+
+    app = web.Application()
+    app["counters"] = counters
+    app["arrivals"] = arrivals
+    app.router.add_post("/openai/v1/chat/completions", chat_completions)
+    return app
+
+
+def start_in_thread(port: int, **options) -> web.Application:
+    """Serve the fake API from a daemon thread, for benchmarks driving sync code"""
+    app = make_app(**options)
+    started = threading.Event()
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        runner = web.AppRunner(app)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", port).start())
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, daemon=True).start()
+    started.wait()
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=200, help="ms per completion")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--rpm", type=int, default=0, help="enforced requests per minute (0 = unlimited)")
+    parser.add_argument("--retry-after", type=float, default=0.25, help="seconds advertised on injected 429s")
+    parser.add_argument("--rate-limit-first", type=int, default=0, help="answer the first N requests with 429")
+    args = parser.parse_args()
+    web.run_app(make_app(args.latency / 1000, args.error_rate, args.rpm, args.retry_after,
+                         rate_limit_first=args.rate_limit_first),
+                host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
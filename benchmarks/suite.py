@@ -0,0 +1,356 @@
+"""Reproducible benchmark suite with JSON results that can be compared across commits.
+
+Every scenario runs in its own process against a fresh SQLite database filled
+from benchmarks.synthetic (seeded, so two runs see the same corpus), with the
+network stubbed by benchmarks.fake_feed_server and benchmarks.fake_llm_server:
+
+  ingest - FeedScheduler.poll_now over --feeds fake feeds: cold (every entry new), then warm (all 304)
+  api    - p50/p95 latency of list, deep offset page, cursor page, detail and search at each --sizes
+  ioc    - IOC extraction MB/s on one core, then through the batch extractor's process pool
+  batch  - LLM batch processing articles/s against the fake chat-completions server
+  startup - `import app.main` time under -X importtime and lifespan startup, see benchmarks.bench_startup
+
+Metric names end in _per_s (higher is better), _ms or _s (lower is better).
+
+Usage:
+    python -m benchmarks.suite --output before.json
+    python -m benchmarks.suite --output after.json --compare before.json
+    python -m benchmarks.suite --quick --scenarios api,ioc
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+SCENARIOS = ("ingest", "api", "ioc", "batch", "startup")
+
+
+def percentiles(timings: list) -> dict:
+    ordered = sorted(timings)
+    return {"p50": ordered[len(ordered) // 2], "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]}
+
+
+def prepare_database():
+    from app.database import migrate
+
+    migrate()
+
+
+# -------------------------------
+# Scenarios, run in a child process
+# -------------------------------
+
+def run_ingest(args) -> dict:
+    from sqlalchemy import delete
+    from app.crud.feed import seed_feeds
+    from app.database import SessionLocal
+    from app.models.feed import Feed
+    from app.services.feed_scheduler import feed_scheduler
+    from benchmarks.fake_feed_server import feed_urls, start_in_thread
+
+    server = start_in_thread(args.feed_port, feeds=args.feeds, entries=args.entries, latency=args.latency / 1000,
+                             seed=args.seed)
+    prepare_database()
+    with SessionLocal() as db:
+        # In place of the default feed the baseline migration stores
+        db.execute(delete(Feed))
+        seed_feeds(db, [{"url": url, "source": f"Fake {i}"} for i, url in enumerate(feed_urls(args.feed_port, args.feeds))])
+
+        start = time.perf_counter()
+        cold = feed_scheduler.poll_now(db)
+        cold_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        feed_scheduler.poll_now(db)
+        warm_s = time.perf_counter() - start
+
+    return {
+        "cold_s": cold_s,
+        "cold_articles_per_s": cold["new_articles"] / cold_s,
+        "warm_s": warm_s,
+        "warm_feeds_per_s": args.feeds / warm_s,
+        "new_articles": cold["new_articles"],
+        "not_modified": server["counters"]["not_modified"],
+    }
+
+
+def run_api(args) -> dict:
+    from fastapi.testclient import TestClient
+    from app.database import SessionLocal
+    from app.main import app
+    from benchmarks.synthetic import VOCABULARY, seed_articles
+
+    rng = random.Random(args.seed)
+    results, seeded = {}, 0
+    with TestClient(app) as client:
+
+        def timed(request) -> dict:
+            timings = []
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                response = request()
+                timings.append((time.perf_counter() - start) * 1000)
+                response.raise_for_status()
+            return percentiles(timings)
+
+        for size in args.sizes:
+            start = time.perf_counter()
+            with SessionLocal() as db:
+                added = seed_articles(db, size - seeded, start=seeded, seed=args.seed)
+            insert_s = time.perf_counter() - start
+            seeded += added
+
+            first_cursor = client.get("/api/v1/articles/", params={"limit": 50}).headers.get("X-Next-Cursor")
+            cursor = first_cursor
+
+            def next_page():
+                # Walks down the listing page by page, like a client paging through results
+                nonlocal cursor
+                response = client.get("/api/v1/articles/", params={"limit": 50, "cursor": cursor})
+                cursor = response.headers.get("X-Next-Cursor") or first_cursor
+                return response
+
+            figures = {
+                "list": timed(lambda: client.get("/api/v1/articles/", params={"limit": 50})),
+                "offset": timed(lambda: client.get("/api/v1/articles/", params={"limit": 50, "skip": size // 2})),
+                "cursor": timed(next_page),
+                "detail": timed(lambda: client.get(f"/api/v1/articles/{rng.randint(1, size)}")),
+                "search": timed(lambda: client.get("/api/v1/articles/search", params={"q": rng.choice(VOCABULARY)})),
+            }
+            results[f"rows_{size}"] = {
+                "insert_articles_per_s": added / insert_s,
+                **{f"{name}_{p}_ms": value for name, stats in figures.items() for p, value in stats.items()},
+            }
+    return results
+
+
+def run_ioc(args) -> dict:
+    from app.database import SessionLocal
+    from app.services.batch_extractor import batch_ioc_extractor
+    from app.services.ioc_extractor import ioc_extractor
+    from benchmarks.synthetic import articles, seed_articles
+
+    texts, size = [], 0
+    for entry in articles(args.ioc_articles, seed=args.seed):
+        texts.append(f"{entry['title']} {entry['content']}")
+        size += len(texts[-1])
+
+    best = min(_time(lambda: [ioc_extractor.extract_iocs(text) for text in texts]) for _ in range(args.repeat))
+
+    prepare_database()
+    with SessionLocal() as db:
+        seed_articles(db, args.ioc_articles, seed=args.seed)
+        start = time.perf_counter()
+        status = batch_ioc_extractor.run(db, force=True)
+        batch_s = time.perf_counter() - start
+
+    return {
+        "corpus_mb": size / 1e6,
+        "single_core_mb_per_s": size / 1e6 / best,
+        "batch_mb_per_s": status["bytes"] / 1e6 / batch_s,
+        "batch_articles_per_s": status["scanned"] / batch_s,
+        "workers": os.cpu_count(),
+    }
+
+
+def run_batch(args) -> dict:
+    from app.database import SessionLocal
+    from app.services.llm_batch import llm_batch_processor
+    from benchmarks.fake_llm_server import start_in_thread
+    from benchmarks.synthetic import seed_articles
+
+    server = start_in_thread(args.llm_port, latency=args.llm_latency / 1000, error_rate=args.error_rate,
+                             seed=args.seed)
+    prepare_database()
+    with SessionLocal() as db:
+        seed_articles(db, args.llm_articles, seed=args.seed)
+        start = time.perf_counter()
+        result = llm_batch_processor.run(db)
+        elapsed = time.perf_counter() - start
+
+    return {
+        "batch_s": elapsed,
+        "articles_per_s": result["processed_articles"] / elapsed,
+        "failed": len(result["failed_articles"]),
+        "requests": server["counters"]["requests"],
+        "rate_limited": server["counters"]["rate_limited"],
+    }
+
+
+def run_startup(args) -> dict:
+    from benchmarks.bench_startup import measure
+
+    result = measure(args.repeat, os.path.join(os.path.dirname(os.environ["DATABASE_URL"][len("sqlite:///"):]),
+                                               "startup.db"))
+    return {
+        "import_ms": result["import_ms"],
+        "startup_ms": result["startup_ms"],
+        "first_startup_ms": result["first_startup_ms"],
+        "lazy_modules_imported": len(result["lazy_modules_imported"]),
+    }
+
+
+def _time(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+RUNNERS = {"ingest": run_ingest, "api": run_api, "ioc": run_ioc, "batch": run_batch, "startup": run_startup}
+
+
+# -------------------------------
+# Parent: isolation, metadata and comparison
+# -------------------------------
+
+def child_env(args, directory: str) -> dict:
+    return {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")])),
+        "DATABASE_URL": f"sqlite:///{os.path.join(directory, 'bench.db')}",
+        "JOB_WORKERS": "0",
+        "FEED_SCHEDULER": "false",
+        "FULL_TEXT_FETCH": "false",
+        "LOG_LEVEL": "WARNING",
+        "PAGE_CACHE_DIR": os.path.join(directory, "page_cache"),
+        # Every fake feed is on one host; lift the per-host cap so it isn't the only thing measured
+        "FEED_PER_HOST_LIMIT": os.environ.get("FEED_PER_HOST_LIMIT", "16"),
+        "GROQ_API_KEY": "fake-key",
+        "GROQ_BASE_URL": f"http://127.0.0.1:{args.llm_port}",
+        "LLM_CONCURRENCY": "16",
+        "LLM_REQUESTS_PER_MINUTE": "60000",
+        "LLM_TOKENS_PER_MINUTE": "100000000",
+    }
+
+
+def run_scenario(name: str, args, argv: list) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        process = subprocess.run(
+            [sys.executable, "-m", "benchmarks.suite", "--child", name, *argv],
+            env=child_env(args, directory), stdout=subprocess.PIPE, text=True
+        )
+    if process.returncode != 0:
+        return {"error": f"exited with {process.returncode}"}
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def git(*command) -> str:
+    try:
+        return subprocess.run(["git", *command], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def metadata(args) -> dict:
+    import sqlite3
+
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "sqlite": sqlite3.sqlite_version,
+        "args": {key: value for key, value in vars(args).items() if key not in ("output", "compare", "child")},
+    }
+
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> int:
+    """Print the change of every shared metric; returns the number of regressions beyond threshold %"""
+    old, new = flatten(baseline["results"]), flatten(current["results"])
+    print(f"\nvs {baseline['meta'].get('commit', '?')[:10]} ({baseline['meta'].get('timestamp', '?')})")
+    regressions = 0
+    for name in sorted(old.keys() & new.keys()):
+        if name.endswith("_per_s"):
+            better = 1
+        elif name.endswith(("_ms", "_s")):
+            better = -1
+        else:
+            continue
+        if not old[name]:
+            continue
+        change = (new[name] - old[name]) / old[name] * 100
+        verdict = ""
+        if abs(change) >= threshold:
+            verdict = "faster" if change * better > 0 else "SLOWER"
+            regressions += verdict == "SLOWER"
+        print(f"  {name:<40} {old[name]:12.3f} -> {new[name]:12.3f}  {change:+7.1f}%  {verdict}")
+    return regressions
+
+
+def print_results(results: dict):
+    for name, value in flatten(results).items():
+        print(f"  {name:<40} {value:12.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--quick", action="store_true", help="smaller sizes, for a smoke run")
+    parser.add_argument("--output", help="write the results JSON here")
+    parser.add_argument("--compare", help="results JSON of a baseline run to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="%% change reported as faster/SLOWER")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit 1 if anything got SLOWER")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--feeds", type=int, default=50)
+    parser.add_argument("--entries", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=20, help="fake feed latency in ms")
+    parser.add_argument("--feed-port", type=int, default=8765)
+    parser.add_argument("--sizes", default="1000,10000,100000", help="article counts the API is measured at")
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint and size")
+    parser.add_argument("--ioc-articles", type=int, default=5000)
+    parser.add_argument("--llm-articles", type=int, default=300)
+    parser.add_argument("--llm-latency", type=float, default=50, help="fake completion latency in ms")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="fake server 429 rate")
+    parser.add_argument("--llm-port", type=int, default=8766)
+    parser.add_argument("--child", choices=SCENARIOS, help=argparse.SUPPRESS)
+    argv = sys.argv[1:]
+    args = parser.parse_args()
+    if args.quick:
+        args.feeds, args.sizes, args.requests = min(args.feeds, 20), "1000,5000", min(args.requests, 50)
+        args.ioc_articles, args.llm_articles = min(args.ioc_articles, 1000), min(args.llm_articles, 50)
+    args.sizes = sorted(int(size) for size in str(args.sizes).split(","))
+
+    if args.child:
+        print(json.dumps(RUNNERS[args.child](args)))
+        return
+
+    current = {"meta": metadata(args), "results": {}}
+    for name in args.scenarios.split(","):
+        start = time.perf_counter()
+        current["results"][name] = run_scenario(name, args, argv)
+        print(f"{name} ({time.perf_counter() - start:.1f}s)")
+        print_results(current["results"][name])
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), current, args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,23 +15,34 @@ const Dashboard: React.FC = () => {
   const [searchTerm, setSearchTerm] = useState('');
   const [selectedThreatType, setSelectedThreatType] = useState('all');
   const [selectedSeverity, setSelectedSeverity] = useState('all');
+  const [searchIds, setSearchIds] = useState<Set<number> | null>(null);
+
+  // Full-text search runs on the server, debounced while typing
+  useEffect(() => {
+    if (searchTerm.trim() === '') {
+      setSearchIds(null);
+      return;
+    }
+    const timer = setTimeout(() => {
+      argusApi
+        .searchArticles(searchTerm)
+        .then(results => setSearchIds(new Set(results.map(result => result.id))))
+        .catch(err => console.error('Search failed:', err));
+    }, 300);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
 
   // Filter articles based on search and filters
   const filteredArticles = useMemo(() => {
     return articles.filter(article => {
-      const searchMatch =
-        searchTerm === '' ||
-        article.title.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        article.content.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        article.source.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        (article.summary && article.summary.toLowerCase().includes(searchTerm.toLowerCase()));
+      const searchMatch = searchIds === null || searchIds.has(article.id);
 
       const typeMatch = selectedThreatType === 'all' || article.threat_type === selectedThreatType;
       const severityMatch = selectedSeverity === 'all' || article.severity === selectedSeverity;
 
       return searchMatch && typeMatch && severityMatch;
     });
-  }, [articles, searchTerm, selectedThreatType, selectedSeverity]);
+  }, [articles, searchIds, selectedThreatType, selectedSeverity]);
 
   const loadData = async () => {
     try {
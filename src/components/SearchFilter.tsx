@@ -31,7 +31,7 @@ const SearchFilter: React.FC<SearchFilterProps> = ({
           <label className="block text-sm font-medium text-gray-700 mb-2">Search Threats</label>
           <input
             type="text"
-            placeholder="Search by title, content, or source..."
+            placeholder="Search by title, summary, or content..."
             value={searchTerm}
             onChange={e => onSearchChange(e.target.value)}
             className="w-full px-3 py-2 border border-gray-300 rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500 focus:border-transparent"
@@ -32,6 +32,30 @@ export interface SystemStatus {
   message: string;
 }
 
+export interface Job {
+  id: number;
+  kind: string;
+  status: 'queued' | 'running' | 'succeeded' | 'failed' | 'cancelled';
+  progress: number;
+  total: number | null;
+  message: string | null;
+  result: any;
+  error: string | null;
+}
+
+export interface SearchResult {
+  id: number;
+  title: string;
+  url: string;
+  source: string | null;
+  threat_type: string | null;
+  severity: string | null;
+  summary: string | null;
+  published_date: string | null;
+  snippet: string | null;
+  rank: number;
+}
+
 export interface BatchStats {
   total_articles: number;
   processed_articles: number;
@@ -39,12 +63,15 @@ export interface BatchStats {
   processing_percentage: number;
 }
 
+// Columns the dashboard cards render; the list endpoint leaves iocs out unless asked for
+const CARD_FIELDS = 'id,title,url,summary,source,threat_type,severity,iocs,published_date,created_at';
+
 // API class
 class ArgusApi {
   async getArticles(): Promise<Article[]> {
     try {
       console.log('Fetching articles from:', `${API_BASE_URL}/articles/`);
-      const response = await api.get('/articles/');
+      const response = await api.get('/articles/', { params: { fields: CARD_FIELDS } });
       console.log('Articles response:', response.data);
       return response.data;
     } catch (error) {
@@ -53,19 +80,40 @@ class ArgusApi {
     }
   }
 
+  async searchArticles(query: string, limit = 100): Promise<SearchResult[]> {
+    const response = await api.get('/articles/search', { params: { q: query, limit } });
+    return response.data;
+  }
+
   async getArticle(id: number): Promise<Article> {
     const response = await api.get(`/articles/${id}`);
     return response.data;
   }
 
-  async fetchArticles(): Promise<any> {
-    const response = await api.post('/operations/fetch-articles');
+  async getJob(id: number): Promise<Job> {
+    const response = await api.get(`/jobs/${id}`);
     return response.data;
   }
 
+  // Long-running operations are queued as jobs; poll until the job finishes
+  async waitForJob(id: number, intervalMs = 2000): Promise<Job> {
+    for (;;) {
+      const job = await this.getJob(id);
+      if (job.status !== 'queued' && job.status !== 'running') {
+        return job;
+      }
+      await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    }
+  }
+
+  async fetchArticles(): Promise<Job> {
+    const response = await api.post('/operations/fetch-articles');
+    return this.waitForJob(response.data.job_id);
+  }
+
   async processArticle(id: number): Promise<any> {
     const response = await api.post(`/articles/${id}/process`);
-    return response.data;
+    return response.data.job_id ? this.waitForJob(response.data.job_id) : response.data;
   }
 
   async extractIOCs(id: number): Promise<any> {
@@ -107,7 +155,7 @@ class ArgusApi {
 
   async processAllArticles(): Promise<any> {
     const response = await api.post('/batch/process-all');
-    return response.data;
+    return response.data.job_id ? this.waitForJob(response.data.job_id) : response.data;
   }
 }
 
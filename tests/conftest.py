@@ -0,0 +1,53 @@
+"""Every test session runs against its own temporary SQLite database and page cache.
+
+The environment is set before anything from app is imported, since settings and the
+engines are read at import time.
+"""
+import os
+import socket
+import tempfile
+
+_TMP = tempfile.mkdtemp(prefix="argus-tests-")
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{os.path.join(_TMP, 'test.db')}",
+    ASYNC_DATABASE_URL="",
+    PAGE_CACHE_DIR=os.path.join(_TMP, "page_cache"),
+    GROQ_API_KEY="fake-key",
+    TRIAGE_ENABLED="false",
+    LOG_LEVEL="WARNING",
+)
+
+import pytest  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def db():
+    """A session on an empty, fully migrated database"""
+    from alembic import command
+    from app.database import SessionLocal, alembic_config, migrate
+
+    command.downgrade(alembic_config(), "base")
+    migrate()
+    with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    """A test client for the API on the migrated database, without job workers or the feed scheduler.
+
+    Requests run inside the app's lifespan, which disposes the async engine's connections on exit.
+    """
+    from fastapi.testclient import TestClient
+    from app.config import settings
+    from app.main import app
+
+    monkeypatch.setattr(settings, "JOB_WORKERS", 0)
+    with TestClient(app) as test_client:
+        yield test_client
@@ -0,0 +1,87 @@
+"""Article leases: batch runs in several worker processes share the work without doing any of it twice."""
+import os
+
+from sqlalchemy import event, func, select, update
+
+from app.database import engine
+from app.models.article import Article
+from app.services.batch_extractor import batch_ioc_extractor
+from benchmarks.bench_scale_out import run_parts, start_workers, stop_workers
+from benchmarks.fake_llm_server import start_in_thread
+from benchmarks.synthetic import seed_articles
+from tests.conftest import free_port
+
+
+def count_updates(statements: list):
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("UPDATE"):
+            statements.append(statement)
+    return before_cursor_execute
+
+
+def test_unchanged_articles_are_neither_leased_nor_rewritten(db):
+    seed_articles(db, 40)
+    first = batch_ioc_extractor.run(db, workers=1, chunk_size=15)
+    assert first["extracted"] == 40
+
+    statements = []
+    listener = count_updates(statements)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        second = batch_ioc_extractor.run(db, workers=1, chunk_size=15)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert second["error"] is None
+    assert (second["scanned"], second["skipped"], second["extracted"]) == (40, 40, 0)
+    assert statements == []
+
+
+def test_changed_articles_are_the_only_ones_extracted_again(db):
+    seed_articles(db, 30)
+    batch_ioc_extractor.run(db, workers=1, chunk_size=10)
+    db.execute(update(Article).where(Article.id.in_([3, 17])).values(title="Updated advisory"))
+    db.commit()
+
+    result = batch_ioc_extractor.run(db, workers=1, chunk_size=10)
+
+    assert (result["skipped"], result["extracted"]) == (28, 2)
+    assert db.scalar(select(func.count()).where(Article.extraction_lease_until.isnot(None))) == 0
+
+
+def test_worker_processes_split_the_work(db):
+    workers, articles, to_analyze = 3, 600, 45
+    seed_articles(db, articles)
+    db.execute(update(Article).where(Article.id > to_analyze).values(summary="Analyzed before the run."))
+    db.commit()
+
+    port = free_port()
+    server = start_in_thread(port, latency=0.05)
+    env = {
+        **os.environ,
+        "GROQ_BASE_URL": f"http://127.0.0.1:{port}",
+        "LLM_CONCURRENCY": "2",
+        "LLM_REQUESTS_PER_MINUTE": "60000",
+        "LLM_TOKENS_PER_MINUTE": "100000000",
+        "IOC_WORKERS": "1",
+        "IOC_CHUNK_SIZE": "50",
+        "JOB_POLL_INTERVAL": "0.1",
+        "PYTHONPATH": os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")])),
+    }
+    processes = start_workers(workers, env)
+    try:
+        _, analysis = run_parts("process-all", None, workers, timeout=120)
+        _, extraction = run_parts("extract-iocs", {"force": False}, workers, timeout=120)
+    finally:
+        stop_workers(processes)
+
+    # One LLM call and one extraction per article, whichever process took it
+    assert server["counters"]["requests"] == to_analyze
+    assert sum(part["processed_articles"] for part in analysis) == to_analyze
+    assert sum(part["extracted"] for part in extraction) == articles
+    db.expire_all()
+    assert db.scalar(select(func.count()).where(Article.summary.is_(None))) == 0
+    leased = select(func.count()).where(
+        Article.analysis_lease_until.isnot(None) | Article.extraction_lease_until.isnot(None)
+    )
+    assert db.scalar(leased) == 0
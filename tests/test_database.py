@@ -0,0 +1,54 @@
+"""Engine setup for databases without a usable async driver."""
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app import database
+from app.config import settings
+
+IMPORT_APP = """
+from app.database import AsyncSessionLocal, async_engine
+import app.main
+import app.cli
+assert async_engine is None
+try:
+    AsyncSessionLocal()
+except RuntimeError as e:
+    print("async:", e)
+"""
+
+
+def test_async_url_is_derived_for_known_backends():
+    assert database.async_database_url("sqlite:///./argus.db") == "sqlite+aiosqlite:///./argus.db"
+    assert (database.async_database_url("postgresql://argus:secret@db/argus")
+            == "postgresql+asyncpg://argus:secret@db/argus")
+    assert database.async_database_url("mysql://argus@db/argus") is None
+
+
+@pytest.mark.parametrize("database_url, async_url", [
+    ("mysql://argus@db/argus", ""),
+    ("sqlite:///argus.db", "sqlite+nosuchdriver:///argus.db"),
+])
+def test_no_async_engine_without_a_usable_driver(monkeypatch, database_url, async_url):
+    monkeypatch.setattr(settings, "DATABASE_URL", database_url)
+    monkeypatch.setattr(settings, "ASYNC_DATABASE_URL", async_url)
+
+    assert database._create_async_engine() is None
+
+
+def test_app_starts_on_postgres_without_asyncpg():
+    pytest.importorskip("psycopg2")
+    try:
+        import asyncpg  # noqa: F401
+        pytest.skip("asyncpg is installed")
+    except ImportError:
+        pass
+    env = {**os.environ, "DATABASE_URL": "postgresql://argus@127.0.0.1:1/argus", "ASYNC_DATABASE_URL": "",
+           "PYTHONPATH": os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")]))}
+
+    result = subprocess.run([sys.executable, "-c", IMPORT_APP], env=env, capture_output=True, text=True, timeout=60)
+
+    assert result.returncode == 0, result.stderr
+    assert "async: No async database engine" in result.stdout
@@ -0,0 +1,32 @@
+"""Exports are gzipped only when the client's Accept-Encoding allows it."""
+import pytest
+
+from app.api.endpoints.export import accepts_gzip
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", True),
+    ("deflate, gzip;q=0.5", True),
+    ("GZIP; Q=1", True),
+    ("x-gzip", True),
+    ("br, *", True),
+    ("", False),
+    ("identity", False),
+    ("gzip;q=0", False),
+    ("gzip;q=0.0, deflate", False),
+    ("*;q=0", False),
+    ("gzip;q=0, *", False),
+    ("*, gzip;q=0", False),
+    ("gzip;q=bogus", False),
+    ("xgzipx, notgzip", False),
+])
+def test_accept_encoding(header, expected):
+    assert accepts_gzip(header) is expected
+
+
+@pytest.mark.parametrize("header, encoded", [("gzip, deflate", True), ("gzip;q=0, identity", False)])
+def test_export_response_encoding(client, header, encoded):
+    response = client.get("/api/v1/export/articles", headers={"Accept-Encoding": header})
+
+    assert response.status_code == 200
+    assert (response.headers.get("content-encoding") == "gzip") is encoded
@@ -0,0 +1,22 @@
+"""Feed schedules can only be given a positive poll interval."""
+import pytest
+
+
+@pytest.mark.parametrize("poll_interval", [0, -60, "nan"])
+def test_non_positive_poll_interval_is_rejected(client, poll_interval):
+    created = client.post("/api/v1/feeds", json={"url": "https://test.local/feed", "source": "Test"})
+    assert created.status_code == 201, created.text
+
+    update = client.patch(f"/api/v1/feeds/{created.json()['id']}", json={"poll_interval": poll_interval})
+    create = client.post("/api/v1/feeds", json={"url": "https://test.local/other", "source": "Test",
+                                                "poll_interval": poll_interval})
+
+    assert (update.status_code, create.status_code) == (422, 422)
+
+
+def test_positive_poll_interval_is_kept(client):
+    created = client.post("/api/v1/feeds", json={"url": "https://test.local/feed", "source": "Test",
+                                                 "poll_interval": 900})
+
+    assert created.status_code == 201, created.text
+    assert created.json()["poll_interval"] == 900
@@ -0,0 +1,39 @@
+"""The in-memory indicator index must not miss rows that commit below its high-water mark."""
+import pytest
+
+from app.models.indicator import Indicator
+from app.services.indicator_index import IndicatorIndex
+
+
+def add(db, *ids):
+    db.add_all(Indicator(id=i, type="domain", value=f"host-{i}.example", hit_count=1) for i in ids)
+    db.commit()
+
+
+@pytest.fixture
+def index(monkeypatch):
+    # Behave like Postgres, where ids can commit out of order
+    monkeypatch.setattr(IndicatorIndex, "_commits_in_order", staticmethod(lambda db: False))
+    return IndicatorIndex()
+
+
+def test_late_commit_below_the_mark_is_picked_up(db, index):
+    add(db, 1, 2, 4)
+    assert index.filter_known(db, ["host-4.example", "host-3.example"]) == {"host-4.example"}
+
+    add(db, 3)  # Took id 3 before 4 was loaded, committed after
+    assert index.filter_known(db, ["host-3.example"]) == {"host-3.example"}
+
+
+def test_settled_ids_are_not_rechecked(db, index, monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "INDICATOR_INDEX_SETTLE_SECONDS", 0)
+    add(db, 1, 3)
+    index.refresh(db)
+    add(db, 2)
+    # Past the settle window only a full reload would see it
+    assert index.filter_known(db, ["host-2.example"]) == set()
+
+    monkeypatch.setattr(settings, "INDICATOR_INDEX_RELOAD_SECONDS", 0)
+    assert index.filter_known(db, ["host-2.example"]) == {"host-2.example"}
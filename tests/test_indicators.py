@@ -0,0 +1,44 @@
+"""Indicator lookups find what the extractor stored, whatever case the caller types."""
+import pytest
+
+from app.api.endpoints import indicators as indicators_endpoint
+from app.crud import article as crud_article
+from app.services.batch_extractor import batch_ioc_extractor
+from app.services.indicator_index import IndicatorIndex
+from app.services.ioc_extractor import canonical, ioc_extractor
+
+URL = "HTTP://Evil.COM/Path0?Id=AbC"
+
+
+@pytest.fixture
+def stored(db, monkeypatch):
+    # The global index may hold ids from another test's database
+    monkeypatch.setattr(indicators_endpoint, "indicator_index", IndicatorIndex())
+    crud_article.bulk_create_articles(db, [
+        {"title": "Loader staged on a compromised site", "url": "https://test.local/1", "source": "Test",
+         "content": f"<p>The loader was downloaded from {URL} before the second stage.</p>"},
+    ])
+    batch_ioc_extractor.run(db, workers=1)
+
+
+def test_urls_keep_the_case_of_their_path():
+    assert canonical(URL) == "http://evil.com/Path0?Id=AbC"
+    assert canonical(" hxxps://User:Pw@Evil[.]COM:8443/A ") == "https://User:Pw@evil.com:8443/A"
+    assert canonical("Evil[.]COM") == "evil.com"
+    assert ioc_extractor.extract_iocs(f"Seen at {URL}.")["url"] == ["http://evil.com/Path0?Id=AbC"]
+
+
+@pytest.mark.parametrize("value", [URL, "hxxp://evil[.]com/Path0?Id=AbC", "http://EVIL.com/Path0?Id=AbC"])
+def test_mixed_case_url_is_found(client, stored, value):
+    lookup = client.get("/api/v1/indicators/lookup", params={"value": value})
+    assert lookup.status_code == 200, lookup.text
+    assert [(row["type"], row["value"]) for row in lookup.json()] == [("url", "http://evil.com/Path0?Id=AbC")]
+
+    check = client.post("/api/v1/indicators/check", json={"values": [value]}).json()
+    assert check["matched"] == 1
+
+
+def test_path_case_still_matters(client, stored):
+    assert client.get("/api/v1/indicators/lookup", params={"value": "http://evil.com/path0?id=abc"}).status_code == 404
+    prefix = client.get("/api/v1/indicators/search", params={"prefix": "HTTP://EVIL.com/Pa"}).json()
+    assert [row["value"] for row in prefix] == ["http://evil.com/Path0?Id=AbC"]
@@ -0,0 +1,136 @@
+"""Batch LLM processing against benchmarks.fake_llm_server: 429 backoff, retry cap, rate limits, selection."""
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select, update
+
+from app.config import settings
+from app.crud import article as crud_article
+from app.models.article import Article
+from app.services import llm_batch
+from app.services.llm_batch import RateLimiter, llm_batch_processor
+from benchmarks.fake_llm_server import start_in_thread
+from tests.conftest import free_port
+
+
+@pytest.fixture
+def llm_server(monkeypatch):
+    """start(**make_app options) serves a fake chat-completions API and points the batch processor at it"""
+    monkeypatch.setattr(settings, "LLM_REQUESTS_PER_MINUTE", 60000)
+    monkeypatch.setattr(settings, "LLM_TOKENS_PER_MINUTE", 100_000_000)
+    monkeypatch.setattr(llm_batch, "BACKOFF_BASE", 0.01)
+
+    def start(**options):
+        port = free_port()
+        monkeypatch.setattr(settings, "GROQ_BASE_URL", f"http://127.0.0.1:{port}")
+        return start_in_thread(port, **{"latency": 0.01, **options})
+
+    return start
+
+
+def seed(db, count: int) -> list:
+    ids = crud_article.bulk_create_articles(db, [
+        {"title": f"Advisory {n}", "url": f"https://test.local/{n}", "source": "Test",
+         "content": f"<p>Attackers exploited flaw number {n} in the appliance.</p>"}
+        for n in range(count)
+    ])
+    return sorted(ids)
+
+
+def test_rate_limited_calls_wait_for_retry_after(db, llm_server):
+    server = llm_server(rate_limit_first=2, retry_after=0.3)
+    seed(db, 1)
+
+    result = llm_batch_processor.run(db)
+
+    assert result["processed_articles"] == 1 and not result["failed_articles"]
+    assert result["stats"]["rate_limited"] == 2
+    assert result["stats"]["retries"] == 2
+    arrivals = server["arrivals"]
+    assert len(arrivals) == 3
+    # Backoff is well under Retry-After here, the advertised wait wins
+    assert all(later - earlier >= 0.28 for earlier, later in zip(arrivals, arrivals[1:]))
+
+
+def test_retries_stop_at_the_cap_and_release_the_lease(db, llm_server, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_MAX_RETRIES", 2)
+    server = llm_server(error_rate=1.0, retry_after=0.01)
+    [article_id] = seed(db, 1)
+
+    result = llm_batch_processor.run(db)
+
+    assert result["processed_articles"] == 0
+    assert [failure["article_id"] for failure in result["failed_articles"]] == [article_id]
+    assert server["counters"]["requests"] == settings.LLM_MAX_RETRIES + 1
+    db.expire_all()
+    article = db.get(Article, article_id)
+    assert article.summary is None
+    assert article.analysis_lease_until is None
+
+
+def test_rate_limiter_holds_requests_per_minute():
+    async def run():
+        limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=10**9)
+        start = time.monotonic()
+        for _ in range(600):  # The bucket starts full
+            await limiter.acquire(1)
+        burst = time.monotonic() - start
+        for _ in range(5):  # 10 per second from here on
+            await limiter.acquire(1)
+        return burst, time.monotonic() - start - burst
+
+    burst, paced = asyncio.run(run())
+    assert burst < 0.2
+    assert paced >= 0.45
+
+
+def test_rate_limiter_holds_tokens_per_minute():
+    async def run():
+        limiter = RateLimiter(requests_per_minute=10**6, tokens_per_minute=600)
+        await limiter.acquire(600)
+        start = time.monotonic()
+        await limiter.acquire(5)  # 10 tokens per second
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.45
+
+
+def test_rate_limiter_pause_holds_every_caller():
+    async def run():
+        limiter = RateLimiter(requests_per_minute=6000, tokens_per_minute=10**9)
+        limiter.pause(0.3)
+        start = time.monotonic()
+        await asyncio.gather(*(limiter.acquire(1) for _ in range(3)))
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.28
+
+
+def test_only_unprocessed_failed_and_stale_articles_are_sent(db, llm_server):
+    server = llm_server()
+    new, failed, stale, fresh, duplicate = seed(db, 5)
+    now = datetime.now(timezone.utc)
+    analyzed = {"summary": "Analyzed.", "threat_type": "malware", "severity": "low"}
+    db.execute(update(Article).where(Article.id == failed)
+               .values(summary="Summary unavailable due to processing error", processed_at=now))
+    db.execute(update(Article).where(Article.id == stale).values(**analyzed, processed_at=now - timedelta(days=10)))
+    db.execute(update(Article).where(Article.id == fresh).values(**analyzed, processed_at=now))
+    # Near-duplicates take their canonical article's analysis rather than a call of their own
+    db.execute(update(Article).where(Article.id == duplicate).values(cluster_id=new))
+    db.commit()
+
+    result = llm_batch_processor.run(db)
+    assert result["processed_articles"] == 2
+    assert server["counters"]["requests"] == 2
+
+    result = llm_batch_processor.run(db, stale_before=now - timedelta(days=5))
+    assert result["processed_articles"] == 1
+    assert server["counters"]["requests"] == 3
+
+    db.expire_all()
+    summaries = dict(db.execute(select(Article.id, Article.summary)).all())
+    assert summaries[fresh] == "Analyzed."
+    assert all(summaries[article_id] != "Analyzed." for article_id in (new, failed, stale, duplicate))
+    assert summaries[duplicate] == summaries[new]
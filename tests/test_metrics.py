@@ -0,0 +1,23 @@
+"""Query timing on an instrumented engine."""
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app import metrics
+
+
+def test_failed_queries_do_not_leave_their_start_behind():
+    engine = create_engine("sqlite://")
+    metrics.instrument_engine(engine, "test")
+    queries = metrics.DB_QUERIES.labels("test")
+
+    with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing_table"))
+        assert conn.info["query_start"] == []
+
+        before = queries._value.get()
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+        assert conn.info["query_start"] == []
+        assert queries._value.get() == before + 1
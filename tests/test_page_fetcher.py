@@ -0,0 +1,108 @@
+"""Full-text fetching against the fixture server of benchmarks.bench_page_fetcher."""
+import asyncio
+import time
+from collections import defaultdict
+
+import pytest
+from aiohttp import web
+
+from app.config import settings
+from app.services.html_text import html_to_text
+from app.services.page_fetcher import PageFetcher
+from benchmarks.bench_page_fetcher import make_app, page
+from tests.conftest import free_port
+
+
+@pytest.fixture(autouse=True)
+def short_host_delay(monkeypatch):
+    monkeypatch.setattr(settings, "PAGE_DOMAIN_DELAY", 0.01)
+
+
+def fetch_rounds(tmp_path, urls_for_port, rounds: int = 1, latency: float = 0.02,
+                 validators: tuple = ("etag", "last_modified")) -> tuple:
+    """Serve the fixture pages and fetch the URLs `rounds` times with one fetcher.
+
+    Returns ([{url: text} per round], server stats, [requests the server saw per round]).
+    """
+    stats = {"starts": defaultdict(list), "in_flight": defaultdict(int), "max_in_flight": 0, "min_gap": float("inf")}
+    fetcher = PageFetcher(cache_dir=str(tmp_path / "pages"))
+
+    async def run():
+        port = free_port()
+        runner = web.AppRunner(make_app(latency, stats, validators))
+        await runner.setup()
+        await web.TCPSite(runner, "0.0.0.0", port).start()
+        results, requests = [], []
+        try:
+            for _ in range(rounds):
+                before = sum(map(len, stats["starts"].values()))
+                results.append(await fetcher.fetch_texts(urls_for_port(port)))
+                requests.append(sum(map(len, stats["starts"].values())) - before)
+        finally:
+            await runner.cleanup()
+        return results, requests
+
+    results, requests = asyncio.run(run())
+    return results, stats, requests
+
+
+def test_requests_are_throttled_per_host(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PAGE_PER_DOMAIN_LIMIT", 2)
+    monkeypatch.setattr(settings, "PAGE_DOMAIN_DELAY", 0.05)
+
+    def urls(port):
+        return [f"http://127.0.0.{n % 2 + 1}:{port}/article/{n}" for n in range(12)]
+
+    start = time.monotonic()
+    [texts], stats, _ = fetch_rounds(tmp_path, urls, latency=0.1)
+    elapsed = time.monotonic() - start
+
+    assert all(texts.values())
+    assert stats["max_in_flight"] <= settings.PAGE_PER_DOMAIN_LIMIT
+    assert stats["min_gap"] >= settings.PAGE_DOMAIN_DELAY * 0.9
+    assert set(stats["starts"]) == {"127.0.0.1", "127.0.0.2"}
+    # Hosts are throttled independently: 6 pages per host 50 ms apart, not 12 in one queue
+    assert elapsed < 12 * settings.PAGE_DOMAIN_DELAY + 0.1
+
+
+def test_rerun_is_served_from_the_cache(tmp_path):
+    def urls(port):
+        return [f"http://127.0.0.1:{port}/article/{n}" for n in range(5)]
+
+    (cold, warm), _, requests = fetch_rounds(tmp_path, urls, rounds=2)
+
+    assert requests == [5, 0]
+    assert warm == cold and all(cold.values())
+
+
+@pytest.mark.parametrize("validators", [("etag",), ("last_modified",)])
+def test_expired_pages_are_revalidated(tmp_path, monkeypatch, validators):
+    monkeypatch.setattr(settings, "PAGE_CACHE_TTL", 0)
+
+    def urls(port):
+        return [f"http://127.0.0.1:{port}/article/{n}" for n in range(3)]
+
+    (cold, revalidated), stats, requests = fetch_rounds(tmp_path, urls, rounds=2, validators=validators)
+
+    assert requests == [3, 3]
+    assert stats["not_modified"] == 3
+    assert revalidated == cold and all(cold.values())
+
+
+def test_html_to_text_keeps_the_article_body():
+    text = html_to_text(page(7).decode())
+
+    assert text.startswith("Advisory 7\n\nResearchers observed the operators")
+    assert "203.0.113.7" in text
+    for chrome in ("tracking", "Home", "Related story", "Tweet", "Copyright"):
+        assert chrome not in text
+
+
+def test_html_to_text_without_content_markup_drops_link_lists():
+    html = (
+        "<html><body><div><a href='/a'>Menu</a> <a href='/b'>Links</a></div>"
+        "<div>First paragraph &amp; more.</div><p>Second <a href='/c'>with a link</a> inside prose.</p>"
+        "<script>ignored()</script></body></html>"
+    )
+
+    assert html_to_text(html) == "First paragraph & more.\n\nSecond with a link inside prose."
@@ -0,0 +1,41 @@
+"""Full-text search through /articles/search: user input never reaches FTS5 as a syntax error."""
+import pytest
+
+from app.crud import article as crud_article
+from app.crud.search import fts5_query
+
+
+@pytest.fixture
+def articles(db):
+    crud_article.bulk_create_articles(db, [
+        {"title": "Ransomware hits hospitals", "url": "https://test.local/1", "source": "Test",
+         "content": "<p>The operators encrypted patient records.</p>"},
+        {"title": "Phishing kit targets banks", "url": "https://test.local/2", "source": "Test",
+         "content": "<p>Credential harvesting pages mimic the login portal.</p>"},
+    ])
+
+
+@pytest.mark.parametrize("q, expected", [
+    ("ransomware OR OR phishing", '"ransomware" OR "phishing"'),
+    ("ransomware NOT NOT phishing", '"ransomware" NOT "phishing"'),
+    ("ransomware OR NOT phishing", '"ransomware" OR "phishing"'),
+    ("ransomware AND OR phishing", '"ransomware" AND "phishing"'),
+    ("OR NOT ransomware AND", '"ransomware"'),
+    ("OR AND NOT", ""),
+])
+def test_operator_runs_are_collapsed(q, expected):
+    assert fts5_query(q) == expected
+
+
+@pytest.mark.parametrize("q, expected", [
+    ("ransomware OR OR phishing", {"Ransomware hits hospitals", "Phishing kit targets banks"}),
+    ("ransomware OR NOT phishing", {"Ransomware hits hospitals", "Phishing kit targets banks"}),
+    ("ransomware AND OR phishing", set()),
+    ("ransomware NOT NOT phishing", {"Ransomware hits hospitals"}),
+    ("NOT NOT", set()),
+])
+def test_operator_runs_search_instead_of_failing(client, articles, q, expected):
+    response = client.get("/api/v1/articles/search", params={"q": q})
+
+    assert response.status_code == 200, response.text
+    assert {result["title"] for result in response.json()} == expected
@@ -0,0 +1,54 @@
+"""Conditional requests against the cached /stats payloads, and what the cache keeps."""
+import asyncio
+
+import pytest
+
+from app.api.endpoints.stats import etag_matches
+from app.services.stats_cache import StatsCache, stats_cache
+
+ETAG = '"3f786850e387550fdab836ed7e6dc881de23001b"'
+
+
+@pytest.mark.parametrize("header", [
+    ETAG,
+    f'"other", {ETAG}',
+    f'W/{ETAG}',
+    f' "a,b" ,W/{ETAG} ',
+    "*",
+])
+def test_matching_if_none_match(header):
+    assert etag_matches(header, ETAG)
+
+
+@pytest.mark.parametrize("header", [
+    "",
+    '"3f786850"',
+    ETAG[:-1] + '0"',
+    f'"x{ETAG[1:]}',
+    '"other", W/"different"',
+    ETAG.strip('"'),
+])
+def test_other_if_none_match(header):
+    assert not etag_matches(header, ETAG)
+
+
+def test_unknown_ioc_type_is_rejected(client):
+    stats_cache.clear()
+
+    assert client.get("/api/v1/stats", params={"ioc_type": "domain"}).status_code == 200
+    assert client.get("/api/v1/stats", params={"ioc_type": "no-such-type"}).status_code == 422
+    assert stats_cache.stats()["entries"] == 1
+
+
+def test_expired_entries_and_their_locks_are_dropped():
+    async def run(cache):
+        async def compute():
+            return {"n": 1}
+        for n in range(50):
+            await cache.get(("stats", n), compute)
+
+    cache = StatsCache(ttl=0)
+    asyncio.run(run(cache))
+
+    assert len(cache._entries) == 1
+    assert len(cache._locks) == 1